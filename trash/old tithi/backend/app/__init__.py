@@ -68,6 +68,9 @@ def create_app(config_name=None):
     # Register blueprints
     register_blueprints(app)
     
+    # Register CLI commands
+    register_commands(app)
+    
     # Register error handlers
     register_error_handlers(app)
     
@@ -132,6 +135,13 @@ def register_middleware(app: Flask) -> None:
     idempotency_middleware.init_app(app)
 
 
+def register_commands(app: Flask) -> None:
+    """Register flask CLI command groups."""
+    
+    from .commands.customer_metrics_commands import customer_metrics
+    app.cli.add_command(customer_metrics)
+
+
 def register_blueprints(app: Flask) -> None:
     """Register application blueprints."""
     
@@ -44,10 +44,12 @@ from typing import Dict, Any, Optional, List
 
 from ..middleware.error_handler import TithiError
 from ..middleware.auth_middleware import require_auth, require_tenant, require_role, get_current_user
+from ..middleware.conditional_get import conditional_response
 from ..services.business_phase2 import (
     ServiceService, BookingService, AvailabilityService, CustomerService, 
     StaffService, StaffAvailabilityService
 )
+from ..services.cache import AvailabilityCacheService
 from ..services.analytics_service import AnalyticsService
 from ..services.financial import PaymentService, BillingService
 from ..services.promotion import PromotionService
@@ -167,43 +169,47 @@ def list_admin_services():
         
         service_service = ServiceService()
         
-        # Get services with search and filtering
-        services = service_service.search_services(tenant_id, search_term, category)
-        
-        # Filter by active status if requested
-        if active_only:
-            services = [s for s in services if s.active]
-        
-        # Convert to response format
-        services_data = []
-        for service in services:
-            services_data.append({
-                "id": str(service.id),
-                "slug": service.slug,
-                "name": service.name,
-                "description": service.description,
-                "duration_minutes": service.duration_min,
-                "price_cents": service.price_cents,
-                "buffer_before_min": service.buffer_before_min,
-                "buffer_after_min": service.buffer_after_min,
-                "category": service.category,
-                "active": service.active,
-                "created_at": service.created_at.isoformat() + "Z",
-                "updated_at": service.updated_at.isoformat() + "Z"
-            })
+        def build_response():
+            # Get services with search and filtering
+            services = service_service.search_services(tenant_id, search_term, category)
+            
+            # Filter by active status if requested
+            if active_only:
+                services = [s for s in services if s.active]
+            
+            # Convert to response format
+            services_data = []
+            for service in services:
+                services_data.append({
+                    "id": str(service.id),
+                    "slug": service.slug,
+                    "name": service.name,
+                    "description": service.description,
+                    "duration_minutes": service.duration_min,
+                    "price_cents": service.price_cents,
+                    "buffer_before_min": service.buffer_before_min,
+                    "buffer_after_min": service.buffer_after_min,
+                    "category": service.category,
+                    "active": service.active,
+                    "created_at": service.created_at.isoformat() + "Z",
+                    "updated_at": service.updated_at.isoformat() + "Z"
+                })
+            
+            return jsonify({
+                "services": services_data,
+                "total_count": len(services_data),
+                "filters": {
+                    "search_term": search_term,
+                    "category": category,
+                    "active_only": active_only
+                }
+            }), 200
         
         # Log admin action
         logger.info(f"ADMIN_ACTION_PERFORMED: tenant_id={tenant_id}, user_id={current_user.id}, action_type=services_list")
         
-        return jsonify({
-            "services": services_data,
-            "total_count": len(services_data),
-            "filters": {
-                "search_term": search_term,
-                "category": category,
-                "active_only": active_only
-            }
-        }), 200
+        etag = AvailabilityCacheService().get_etag(tenant_id, request.full_path, catalogs=["services"])
+        return conditional_response(etag, build_response)
         
     except TithiError:
         raise
@@ -668,11 +674,10 @@ def bulk_booking_actions():
         
         booking_service = BookingService()
         
-        # Perform bulk action atomically
-        with db.session.begin():
-            results = booking_service.bulk_action_bookings(
-                tenant_id, booking_ids, action, data.get('action_data', {}), current_user.id
-            )
+        # Confirm and cancel commit in chunks; results report each booking
+        results = booking_service.bulk_action_bookings(
+            tenant_id, booking_ids, action, data.get('action_data', {}), current_user.id
+        )
         
         # Log admin action
         logger.info(f"ADMIN_ACTION_PERFORMED: tenant_id={tenant_id}, user_id={current_user.id}, action_type=bookings_bulk_{action}")
@@ -1151,40 +1156,44 @@ def list_admin_staff():
         
         staff_service = StaffService()
         
-        # Get all staff profiles for tenant
-        staff_profiles = staff_service.list_staff_profiles(tenant_id)
-        
-        # Filter by active status if requested
-        if active_only:
-            staff_profiles = [s for s in staff_profiles if s.is_active]
-        
-        # Convert to response format
-        staff_data = []
-        for staff in staff_profiles:
-            staff_data.append({
-                "id": str(staff.id),
-                "membership_id": str(staff.membership_id),
-                "resource_id": str(staff.resource_id),
-                "display_name": staff.display_name,
-                "bio": staff.bio,
-                "specialties": staff.specialties or [],
-                "hourly_rate_cents": staff.hourly_rate_cents,
-                "is_active": staff.is_active,
-                "max_concurrent_bookings": staff.max_concurrent_bookings,
-                "created_at": staff.created_at.isoformat() + "Z",
-                "updated_at": staff.updated_at.isoformat() + "Z"
-            })
+        def build_response():
+            # Get all staff profiles for tenant
+            staff_profiles = staff_service.list_staff_profiles(tenant_id)
+            
+            # Filter by active status if requested
+            if active_only:
+                staff_profiles = [s for s in staff_profiles if s.is_active]
+            
+            # Convert to response format
+            staff_data = []
+            for staff in staff_profiles:
+                staff_data.append({
+                    "id": str(staff.id),
+                    "membership_id": str(staff.membership_id),
+                    "resource_id": str(staff.resource_id),
+                    "display_name": staff.display_name,
+                    "bio": staff.bio,
+                    "specialties": staff.specialties or [],
+                    "hourly_rate_cents": staff.hourly_rate_cents,
+                    "is_active": staff.is_active,
+                    "max_concurrent_bookings": staff.max_concurrent_bookings,
+                    "created_at": staff.created_at.isoformat() + "Z",
+                    "updated_at": staff.updated_at.isoformat() + "Z"
+                })
+            
+            return jsonify({
+                "staff": staff_data,
+                "total_count": len(staff_data),
+                "filters": {
+                    "active_only": active_only
+                }
+            }), 200
         
         # Log admin action
         logger.info(f"ADMIN_ACTION_PERFORMED: tenant_id={tenant_id}, user_id={current_user.id}, action_type=staff_list")
         
-        return jsonify({
-            "staff": staff_data,
-            "total_count": len(staff_data),
-            "filters": {
-                "active_only": active_only
-            }
-        }), 200
+        etag = AvailabilityCacheService().get_etag(tenant_id, request.full_path, catalogs=["staff"])
+        return conditional_response(etag, build_response)
         
     except TithiError:
         raise
@@ -20,18 +20,21 @@ Features:
 - OpenAPI documentation
 """
 
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, Response, jsonify, request, g, stream_with_context
 from flask_smorest import Api, abort
 import uuid
 import re
+import json
 import logging
 import hashlib
 import jwt
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
 from ..middleware.error_handler import TithiError, TenantError
 from ..middleware.auth_middleware import require_auth, require_tenant, get_current_user
+from ..middleware.conditional_get import conditional_response
 from ..services.core import TenantService, UserService
-from ..services.business_phase2 import ServiceService, BookingService, AvailabilityService, CustomerService, StaffService, StaffAvailabilityService, ValidationError
+from ..services.business_phase2 import ServiceService, BookingService, AvailabilityService, CustomerService, StaffService, StaffAvailabilityService, ValidationError, BookingConflictError
+from ..services.cache import AvailabilityCacheService
 from ..models.core import Tenant
 from ..extensions import db
 from ..config import Config
@@ -40,6 +43,32 @@ from ..config import Config
 api_v1_bp = Blueprint("api_v1", __name__)
 
 
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def _wants_ndjson() -> bool:
+    """Whether the client asked for a streamed NDJSON response."""
+    return (request.args.get('stream') == 'ndjson' or
+            request.accept_mimetypes.best == NDJSON_MIMETYPE)
+
+
+def _ndjson_day_stream(days, header: dict) -> Response:
+    """
+    Stream (date, slots) pairs as NDJSON: a header line, one line per day,
+    then a trailer with the total, so clients can render early days while
+    later ones are still being computed.
+    """
+    def generate():
+        yield json.dumps(header) + "\n"
+        total = 0
+        for day, slots in days:
+            total += len(slots)
+            yield json.dumps({"date": day.isoformat(), "slots": slots}) + "\n"
+        yield json.dumps({"done": True, "total": total}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
 @api_v1_bp.route("/tenants", methods=["GET"])
 @require_auth
 def list_tenants():
@@ -520,47 +549,77 @@ def delete_service(service_id: str):
 
 
 # Bookings (Module G)
+def _booking_json(booking) -> dict:
+    """Listing representation of a booking."""
+    return {
+        "id": str(booking.id),
+        "customer_id": str(booking.customer_id),
+        "resource_id": str(booking.resource_id),
+        "start_at": booking.start_at.isoformat() + "Z",
+        "end_at": booking.end_at.isoformat() + "Z",
+        "status": booking.status,
+        "attendee_count": booking.attendee_count,
+        "total_amount_cents": getattr(booking, 'total_amount_cents', 0),
+        "currency": getattr(booking, 'currency', 'USD'),
+        "created_at": booking.created_at.isoformat() + "Z",
+        "updated_at": booking.updated_at.isoformat() + "Z"
+    }
+
+
+def _booking_list_filters() -> dict:
+    """Status and start_at range filters shared by listing and export."""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    return {
+        "status": request.args.get('status'),
+        "start_date": datetime.fromisoformat(start_date.replace('Z', '+00:00')) if start_date else None,
+        "end_date": datetime.fromisoformat(end_date.replace('Z', '+00:00')) if end_date else None
+    }
+
+
 @api_v1_bp.route("/bookings", methods=["GET"])
 @require_auth
 @require_tenant
 def list_bookings():
-    """List bookings for the current tenant."""
+    """
+    List bookings for the current tenant, one keyset page at a time.
+    
+    Pages are ordered by (start_at, id). Pass pagination.next_cursor back as
+    ?cursor= for the next page; it is null on the last page. ?limit= sets the
+    page size and ?include_total=true adds an approximate total.
+    """
     try:
         tenant_id = g.tenant_id
         booking_service = BookingService()
         
-        # Get query parameters
-        status = request.args.get('status')
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        
-        # Parse dates if provided
-        start_dt = None
-        end_dt = None
-        if start_date:
-            start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        if end_date:
-            end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+        try:
+            filters = _booking_list_filters()
+            limit = request.args.get('limit', type=int)
+            bookings, next_cursor = booking_service.list_bookings_page(
+                tenant_id, cursor=request.args.get('cursor'), limit=limit, **filters
+            )
+        except ValueError as e:
+            raise TithiError(
+                message=str(e),
+                code="TITHI_VALIDATION_ERROR",
+                status_code=400
+            )
         
-        bookings = booking_service.get_bookings(tenant_id, status, start_dt, end_dt)
+        pagination = {
+            "limit": limit or booking_service.config.DEFAULT_BOOKING_PAGE_SIZE,
+            "next_cursor": next_cursor,
+            "has_next": next_cursor is not None
+        }
+        if request.args.get('include_total', '').lower() == 'true':
+            pagination["total_estimate"] = booking_service.estimate_bookings_count(tenant_id, **filters)
         
         return jsonify({
-            "bookings": [{
-                "id": str(booking.id),
-                "customer_id": str(booking.customer_id),
-                "resource_id": str(booking.resource_id),
-                "start_at": booking.start_at.isoformat() + "Z",
-                "end_at": booking.end_at.isoformat() + "Z",
-                "status": booking.status,
-                "attendee_count": booking.attendee_count,
-                "total_amount_cents": getattr(booking, 'total_amount_cents', 0),
-                "currency": getattr(booking, 'currency', 'USD'),
-                "created_at": booking.created_at.isoformat() + "Z",
-                "updated_at": booking.updated_at.isoformat() + "Z"
-            } for booking in bookings],
-            "total": len(bookings)
+            "bookings": [_booking_json(booking) for booking in bookings],
+            "pagination": pagination
         }), 200
         
+    except TithiError:
+        raise
     except Exception as e:
         raise TithiError(
             message="Failed to list bookings",
@@ -568,6 +627,40 @@ def list_bookings():
         )
 
 
+@api_v1_bp.route("/bookings/export", methods=["GET"])
+@require_auth
+@require_tenant
+def export_bookings():
+    """
+    Export every matching booking as one streamed JSON document.
+    
+    Takes the same filters as the listing. Bookings are read in keyset
+    batches and encoded as they arrive, so memory stays flat regardless of
+    how many bookings the tenant has.
+    """
+    tenant_id = g.tenant_id
+    try:
+        filters = _booking_list_filters()
+    except ValueError as e:
+        raise TithiError(
+            message=str(e),
+            code="TITHI_VALIDATION_ERROR",
+            status_code=400
+        )
+    
+    bookings = BookingService().iter_bookings(tenant_id, **filters)
+    
+    def generate():
+        yield '{"bookings":['
+        count = 0
+        for booking in bookings:
+            yield (',' if count else '') + json.dumps(_booking_json(booking))
+            count += 1
+        yield '],"count":' + str(count) + '}'
+    
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
 @api_v1_bp.route("/bookings", methods=["POST"])
 @require_auth
 @require_tenant
@@ -602,6 +695,12 @@ def create_booking():
             "updated_at": booking.updated_at.isoformat() + "Z"
         }), 201
         
+    except BookingConflictError as e:
+        raise TithiError(
+            message=str(e),
+            code="TITHI_BOOKING_CONFLICT",
+            status_code=409
+        )
     except ValueError as e:
         raise TithiError(
             message=str(e),
@@ -615,6 +714,72 @@ def create_booking():
         )
 
 
+@api_v1_bp.route("/bookings/series", methods=["POST"])
+@require_auth
+@require_tenant
+def create_booking_series():
+    """
+    Book a recurring series, e.g. every Tuesday for three months.
+    
+    Takes the create_booking fields for the first occurrence plus an rrule
+    such as "FREQ=WEEKLY;BYDAY=TU;COUNT=12" and optional skip_conflicts.
+    Occurrences that clash or fall outside working hours come back in
+    conflicts; without skip_conflicts nothing is booked then and the
+    response is 409 so the client can adjust those dates and retry.
+    """
+    try:
+        tenant_id = g.tenant_id
+        data = request.get_json()
+        
+        if not data:
+            raise TithiError(
+                message="Request body is required",
+                code="TITHI_VALIDATION_ERROR",
+                status_code=400
+            )
+        
+        result = BookingService().create_booking_series(tenant_id, data, g.user_id)
+        body = {
+            "series_id": str(result['series_id']),
+            "bookings": [_booking_json(booking) for booking in result['bookings']],
+            "conflicts": [{
+                "start_at": conflict['start_at'].isoformat() + "Z",
+                "end_at": conflict['end_at'].isoformat() + "Z",
+                "reason": conflict['reason']
+            } for conflict in result['conflicts']]
+        }
+        
+        if not result['bookings']:
+            raise TithiError(
+                message="Series occurrences conflict; nothing was booked",
+                code="TITHI_BOOKING_SERIES_CONFLICT",
+                status_code=409,
+                details=body
+            )
+        
+        return jsonify(body), 201 if result['created'] else 200
+        
+    except TithiError:
+        raise
+    except BookingConflictError as e:
+        raise TithiError(
+            message=str(e),
+            code="TITHI_BOOKING_CONFLICT",
+            status_code=409
+        )
+    except (ValueError, ValidationError) as e:
+        raise TithiError(
+            message=str(e),
+            code="TITHI_VALIDATION_ERROR",
+            status_code=400
+        )
+    except Exception as e:
+        raise TithiError(
+            message="Failed to create booking series",
+            code="TITHI_BOOKING_SERIES_CREATE_ERROR"
+        )
+
+
 @api_v1_bp.route("/bookings/<booking_id>/confirm", methods=["POST"])
 @require_auth
 @require_tenant
@@ -757,24 +922,27 @@ def list_staff():
         if resource_id:
             filters['resource_id'] = resource_id
         
-        staff_profiles = staff_service.list_staff_profiles(tenant_id, filters)
+        def build_response():
+            staff_profiles = staff_service.list_staff_profiles(tenant_id, filters)
+            return jsonify({
+                "staff": [{
+                    "id": str(profile.id),
+                    "membership_id": str(profile.membership_id),
+                    "resource_id": str(profile.resource_id),
+                    "display_name": profile.display_name,
+                    "bio": profile.bio,
+                    "specialties": profile.specialties or [],
+                    "hourly_rate_cents": profile.hourly_rate_cents,
+                    "is_active": profile.is_active,
+                    "max_concurrent_bookings": profile.max_concurrent_bookings,
+                    "created_at": profile.created_at.isoformat() + "Z",
+                    "updated_at": profile.updated_at.isoformat() + "Z"
+                } for profile in staff_profiles],
+                "total": len(staff_profiles)
+            }), 200
         
-        return jsonify({
-            "staff": [{
-                "id": str(profile.id),
-                "membership_id": str(profile.membership_id),
-                "resource_id": str(profile.resource_id),
-                "display_name": profile.display_name,
-                "bio": profile.bio,
-                "specialties": profile.specialties or [],
-                "hourly_rate_cents": profile.hourly_rate_cents,
-                "is_active": profile.is_active,
-                "max_concurrent_bookings": profile.max_concurrent_bookings,
-                "created_at": profile.created_at.isoformat() + "Z",
-                "updated_at": profile.updated_at.isoformat() + "Z"
-            } for profile in staff_profiles],
-            "total": len(staff_profiles)
-        }), 200
+        etag = AvailabilityCacheService().get_etag(tenant_id, request.full_path, catalogs=["staff"])
+        return conditional_response(etag, build_response)
         
     except Exception as e:
         raise TithiError(
@@ -1341,7 +1509,24 @@ def get_staff_availability_slots(staff_id: str):
 @require_auth
 @require_tenant
 def get_availability_slots(resource_id: str):
-    """Get available time slots for a resource."""
+    """
+    Get available time slots for a resource; ?stream=ndjson streams them day by day.
+    
+    ?format=compact returns service and staff metadata once, then per day the
+    slot starts of each staff member as minutes after midnight:
+    
+        {"format": "compact", "service": {..., "duration_minutes": 60},
+         "staff": [{"id": ..., "name": ...}],
+         "days": [{"date": "2030-01-07", "starts": [[540, 600], [780]]}]}
+    
+    Decoding (app.services.availability_unified.expand_compact_slots in Python):
+    
+        for day in days:
+            for staff, starts in zip(payload.staff, day.starts):
+                for minute in starts:
+                    start = day.date at 00:00 + minute minutes
+                    end = start + service.duration_minutes
+    """
     try:
         tenant_id = g.tenant_id
         start_date = request.args.get('start_date')
@@ -1374,12 +1559,81 @@ def get_availability_slots(resource_id: str):
         staff_id = request.args.get('staff_id')
         staff_uuid = uuid.UUID(staff_id) if staff_id else None
         
-        slots = unified_service.get_available_slots(
-            tenant_id, uuid.UUID(service_id), staff_uuid, start_dt, end_dt
+        etag = unified_service.get_availability_etag(
+            tenant_id, uuid.UUID(service_id), staff_uuid, start_dt.date(), end_dt.date(),
+            f"{request.full_path}|{_wants_ndjson()}"
+        )
+        
+        def build_response():
+            if request.args.get('format') == 'compact':
+                payload = unified_service.get_available_slots_compact(
+                    tenant_id, uuid.UUID(service_id), staff_uuid, start_dt, end_dt
+                )
+                payload.update({"resource_id": resource_id, "service_id": service_id, "staff_id": staff_id})
+                return jsonify(payload), 200
+            
+            if _wants_ndjson():
+                days = unified_service.iter_available_slots_by_day(
+                    tenant_id, uuid.UUID(service_id), staff_uuid, start_dt, end_dt, chunk_days=7
+                )
+                return _ndjson_day_stream(days, {
+                    "resource_id": resource_id,
+                    "service_id": service_id,
+                    "staff_id": staff_id
+                })
+            
+            slots = unified_service.get_available_slots(
+                tenant_id, uuid.UUID(service_id), staff_uuid, start_dt, end_dt
+            )
+            
+            return jsonify({
+                "resource_id": resource_id,
+                "service_id": service_id,
+                "staff_id": staff_id,
+                "slots": slots,
+                "total": len(slots)
+            }), 200
+        
+        response = conditional_response(etag, build_response)
+        # The representation (JSON or NDJSON) depends on Accept
+        response.vary.add('Accept')
+        return response
+        
+    except ValueError as e:
+        raise TithiError(
+            message="Invalid date format or resource ID",
+            code="TITHI_VALIDATION_ERROR",
+            status_code=400
+        )
+    except TithiError:
+        raise
+    except Exception as e:
+        raise TithiError(
+            message="Failed to get availability slots",
+            code="TITHI_AVAILABILITY_ERROR"
+        )
+
+
+@api_v1_bp.route("/availability/services/<service_id>/next", methods=["GET"])
+@require_auth
+@require_tenant
+def get_next_available_slots(service_id: str):
+    """Get the first N open slots for a service, across staff unless staff_id is given."""
+    try:
+        tenant_id = g.tenant_id
+        after = request.args.get('after')
+        after_dt = datetime.fromisoformat(after.replace('Z', '+00:00')) if after else datetime.utcnow()
+        limit = min(int(request.args.get('limit', 10)), 100)
+        
+        staff_id = request.args.get('staff_id')
+        staff_uuid = uuid.UUID(staff_id) if staff_id else None
+        
+        from ..services.availability_unified import UnifiedAvailabilityService
+        slots = UnifiedAvailabilityService().find_next_available_slots(
+            tenant_id, uuid.UUID(service_id), after_dt, limit=limit, staff_id=staff_uuid
         )
         
         return jsonify({
-            "resource_id": resource_id,
             "service_id": service_id,
             "staff_id": staff_id,
             "slots": slots,
@@ -1388,7 +1642,7 @@ def get_availability_slots(resource_id: str):
         
     except ValueError as e:
         raise TithiError(
-            message="Invalid date format or resource ID",
+            message=f"Invalid parameters: {str(e)}",
             code="TITHI_VALIDATION_ERROR",
             status_code=400
         )
@@ -1396,7 +1650,61 @@ def get_availability_slots(resource_id: str):
         raise
     except Exception as e:
         raise TithiError(
-            message="Failed to get availability slots",
+            message="Failed to find next available slots",
+            code="TITHI_AVAILABILITY_ERROR"
+        )
+
+
+@api_v1_bp.route("/availability/services/<service_id>/heatmap", methods=["GET"])
+@require_auth
+@require_tenant
+def get_availability_heatmap(service_id: str):
+    """Get per-day and per-staff open slot counts for a calendar month view."""
+    try:
+        tenant_id = g.tenant_id
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        
+        if not start_date or not end_date:
+            raise TithiError(
+                message="start_date and end_date parameters are required",
+                code="TITHI_VALIDATION_ERROR",
+                status_code=400
+            )
+        
+        start_day = date.fromisoformat(start_date[:10])
+        end_day = date.fromisoformat(end_date[:10])
+        if (end_day - start_day).days > 92:
+            raise TithiError(
+                message="Date range cannot exceed 92 days",
+                code="TITHI_VALIDATION_ERROR",
+                status_code=400
+            )
+        
+        staff_id = request.args.get('staff_id')
+        staff_uuid = uuid.UUID(staff_id) if staff_id else None
+        
+        from ..services.availability_unified import UnifiedAvailabilityService
+        unified_service = UnifiedAvailabilityService()
+        etag = unified_service.get_availability_etag(
+            tenant_id, uuid.UUID(service_id), staff_uuid, start_day, end_day, request.full_path
+        )
+        
+        return conditional_response(etag, lambda: jsonify(unified_service.get_availability_heatmap(
+            tenant_id, uuid.UUID(service_id), start_day, end_day, staff_id=staff_uuid
+        )))
+        
+    except ValueError as e:
+        raise TithiError(
+            message=f"Invalid parameters: {str(e)}",
+            code="TITHI_VALIDATION_ERROR",
+            status_code=400
+        )
+    except TithiError:
+        raise
+    except Exception as e:
+        raise TithiError(
+            message="Failed to get availability heatmap",
             code="TITHI_AVAILABILITY_ERROR"
         )
 
@@ -6,8 +6,9 @@ including service selection, availability checking, customer data collection,
 payment processing, and booking confirmation.
 """
 
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, Response, jsonify, request, g, stream_with_context
 from flask_smorest import Api, abort
+import json
 import uuid
 import logging
 from datetime import datetime
@@ -90,6 +91,10 @@ def check_availability():
         - service_name: Service name
         - duration_minutes: Service duration
         - price_cents: Service price
+    
+    Set "stream": true (or send Accept: application/x-ndjson) to receive
+    NDJSON instead: one {"date", "slots"} line per day as it is computed,
+    followed by a {"done": true, "total_slots": n} line.
     """
     try:
         data = request.get_json()
@@ -111,13 +116,27 @@ def check_availability():
                 )
         
         booking_flow_service = BookingFlowService()
-        availability = booking_flow_service.check_availability(
-            tenant_id=data['tenant_id'],
-            service_id=data['service_id'],
-            start_date=datetime.fromisoformat(data['start_date']),
-            end_date=datetime.fromisoformat(data['end_date']),
-            team_member_id=data.get('team_member_id')
-        )
+        query = {
+            'tenant_id': uuid.UUID(data['tenant_id']),
+            'service_id': uuid.UUID(data['service_id']),
+            'start_date': datetime.fromisoformat(data['start_date']),
+            'end_date': datetime.fromisoformat(data['end_date']),
+            'team_member_id': uuid.UUID(data['team_member_id']) if data.get('team_member_id') else None
+        }
+        
+        if data.get('stream') or request.accept_mimetypes.best == "application/x-ndjson":
+            days = booking_flow_service.iter_availability_by_day(**query, chunk_days=7)
+            
+            def generate():
+                total = 0
+                for day, slots in days:
+                    total += len(slots)
+                    yield json.dumps({"date": day.isoformat(), "slots": slots}) + "\n"
+                yield json.dumps({"done": True, "total_slots": total}) + "\n"
+            
+            return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+        
+        availability = booking_flow_service.check_availability(**query)
         
         return jsonify({
             "success": True,
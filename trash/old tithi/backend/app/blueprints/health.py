@@ -31,7 +31,8 @@ import redis
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 from flask import Blueprint, jsonify, current_app
-from ..extensions import db
+from ..extensions import db, get_redis
+from ..services.cache import get_local_cache
 from ..services.alerting_service import get_alerting_service, AlertType, AlertSeverity
 
 health_bp = Blueprint("health", __name__)
@@ -422,7 +423,9 @@ def _check_redis_health_comprehensive() -> Dict[str, Any]:
                 'operation_time_ms': operation_time * 1000,
                 'memory_usage_bytes': memory_usage,
                 'connected_clients': connected_clients,
-                'redis_version': info.get('redis_version', 'unknown')
+                'redis_version': info.get('redis_version', 'unknown'),
+                'local_cache': get_local_cache().stats(),
+                'pool': get_redis().pool_stats() if get_redis() else None
             }
         }
         
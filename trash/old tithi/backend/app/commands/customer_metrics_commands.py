@@ -0,0 +1,40 @@
+"""
+Customer Metrics CLI Commands
+
+Provides CLI commands for maintaining the customer_metrics read model.
+"""
+
+import uuid
+
+import click
+
+from ..services.customer_metrics import CustomerMetricsService
+
+
+@click.group("customer-metrics")
+def customer_metrics():
+    """Customer metrics maintenance commands."""
+    pass
+
+
+@customer_metrics.command()
+@click.option('--tenant-id', default=None, help='Tenant ID to rebuild (default: all tenants)')
+def rebuild(tenant_id: str):
+    """Recompute customer metrics from bookings with one aggregate query."""
+    try:
+        customers = CustomerMetricsService().rebuild(uuid.UUID(tenant_id) if tenant_id else None)
+        click.echo(f"Rebuilt metrics for {customers} customers")
+    except Exception as e:
+        click.echo(f"Error rebuilding customer metrics: {str(e)}", err=True)
+        raise SystemExit(1)
+
+
+@customer_metrics.command("apply-deltas")
+def apply_deltas():
+    """Apply pending metric deltas now instead of waiting for the worker."""
+    service = CustomerMetricsService()
+    applied = total = service.apply_pending_deltas()
+    while applied == service.DELTA_BATCH_SIZE:
+        applied = service.apply_pending_deltas()
+        total += applied
+    click.echo(f"Applied {total} metric deltas")
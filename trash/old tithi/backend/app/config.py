@@ -34,12 +34,30 @@ class Config:
     
     # Redis settings
     REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", "1.0"))  # seconds
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.environ.get("REDIS_SOCKET_CONNECT_TIMEOUT", "1.0"))  # seconds
+    # Open the Redis circuit after this many consecutive connection failures,
+    # then probe again after REDIS_BREAKER_RESET_SECONDS
+    REDIS_BREAKER_FAILURE_THRESHOLD = int(os.environ.get("REDIS_BREAKER_FAILURE_THRESHOLD", "5"))
+    REDIS_BREAKER_RESET_SECONDS = float(os.environ.get("REDIS_BREAKER_RESET_SECONDS", "5"))
     
     # Availability cache settings
     AVAILABILITY_CACHE_TTL = int(os.environ.get("AVAILABILITY_CACHE_TTL", "300"))  # 5 minutes
     AVAILABILITY_CACHE_PREFIX = "tithi:availability"
     BOOKING_HOLD_TTL = int(os.environ.get("BOOKING_HOLD_TTL", "900"))  # 15 minutes
     WAITLIST_NOTIFICATION_TTL = int(os.environ.get("WAITLIST_NOTIFICATION_TTL", "3600"))  # 1 hour
+    AVAILABILITY_PRECOMPUTE_DAYS = int(os.environ.get("AVAILABILITY_PRECOMPUTE_DAYS", "14"))
+    AVAILABILITY_PRECOMPUTE_TTL = int(os.environ.get("AVAILABILITY_PRECOMPUTE_TTL", "21600"))  # 6 hours
+    # Process-wide in-memory cache tier in front of Redis
+    CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", "10000"))
+    CACHE_LOCAL_MAX_BYTES = int(os.environ.get("CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024)))  # 64 MB
+    # Cached value encoding: "json" or "orjson"; values this large or larger are zlib-compressed
+    CACHE_CODEC = os.environ.get("CACHE_CODEC", "json")
+    CACHE_COMPRESS_MIN_BYTES = int(os.environ.get("CACHE_COMPRESS_MIN_BYTES", "4096"))
+    # "constraint" relies on the bookings exclusion constraint, "query" checks overlaps
+    # in the application, "auto" uses the constraint on PostgreSQL
+    BOOKING_OVERLAP_ENFORCEMENT = os.environ.get("BOOKING_OVERLAP_ENFORCEMENT", "auto")
     
     # Celery settings
     CELERY_BROKER_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
@@ -13,14 +13,15 @@ from celery import Celery
 from app.middleware.sentry_middleware import init_sentry
 from app.middleware.metrics_middleware import MetricsMiddleware
 from app.middleware.enhanced_logging_middleware import EnhancedLoggingMiddleware
+from app.redis_breaker import CircuitBreakerRedis, RedisCircuitBreaker
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
 cors = CORS()
 
-# Redis client (optional)
-redis_client: Optional[redis.Redis] = None
+# Redis client (optional); one pool and circuit breaker shared by every Redis user
+redis_client: Optional[CircuitBreakerRedis] = None
 
 # Celery instance (initialized lazily)
 celery: Celery = Celery(__name__)
@@ -31,13 +32,25 @@ enhanced_logging_middleware = EnhancedLoggingMiddleware()
 
 
 def init_redis(app):
-    """Initialize Redis client if configured."""
+    """Initialize the shared Redis client, pool and circuit breaker if configured."""
     global redis_client
     
     redis_url = app.config.get('REDIS_URL')
     if redis_url:
         try:
-            redis_client = redis.from_url(redis_url, decode_responses=True)
+            pool = redis.ConnectionPool.from_url(
+                redis_url,
+                decode_responses=True,
+                max_connections=app.config.get('REDIS_MAX_CONNECTIONS', 50),
+                socket_timeout=app.config.get('REDIS_SOCKET_TIMEOUT', 1.0),
+                socket_connect_timeout=app.config.get('REDIS_SOCKET_CONNECT_TIMEOUT', 1.0),
+                health_check_interval=30
+            )
+            breaker = RedisCircuitBreaker(
+                failure_threshold=app.config.get('REDIS_BREAKER_FAILURE_THRESHOLD', 5),
+                reset_seconds=app.config.get('REDIS_BREAKER_RESET_SECONDS', 5.0)
+            )
+            redis_client = CircuitBreakerRedis(connection_pool=pool, breaker=breaker)
             # Test connection
             redis_client.ping()
             app.logger.info("Redis connection established")
@@ -49,7 +62,7 @@ def init_redis(app):
 
 
 def get_redis():
-    """Get Redis client instance."""
+    """Get the shared Redis client; commands fail fast while its circuit is open."""
     return redis_client
 
 
@@ -65,6 +78,7 @@ def init_celery(app):
         timezone='UTC',
         enable_utc=True,
         task_routes={},
+        imports=('app.jobs.availability_precompute', 'app.jobs.booking_holds', 'app.jobs.customer_metrics'),
     )
 
     class ContextTask(celery.Task):
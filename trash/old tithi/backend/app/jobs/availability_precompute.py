@@ -0,0 +1,62 @@
+"""
+Availability Precompute Worker
+
+Celery tasks that keep the availability_cache table filled with precomputed
+free windows: a periodic sweep over the next N days for every active resource,
+and a targeted refresh for dates touched by booking or hold changes.
+"""
+
+import uuid
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+from celery.schedules import crontab
+
+from ..extensions import celery
+from ..services.availability_materialized import MaterializedAvailabilityService
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name="app.jobs.availability_precompute.precompute_availability")
+def precompute_availability(days_ahead: Optional[int] = None) -> Dict[str, int]:
+    """Precompute availability for the next N days for every active resource."""
+    try:
+        result = MaterializedAvailabilityService().precompute(days_ahead)
+        logger.info("Precomputed availability", extra=result)
+        return result
+    except Exception as e:
+        logger.error(f"Failed to precompute availability: {str(e)}")
+        raise
+
+
+@celery.task(name="app.jobs.availability_precompute.refresh_availability_dates")
+def refresh_availability_dates(tenant_id: str, resource_id: str, dates: List[str]) -> int:
+    """Recompute precomputed availability for specific dates of one resource."""
+    try:
+        written = MaterializedAvailabilityService().refresh_dates(
+            uuid.UUID(tenant_id),
+            [uuid.UUID(resource_id)],
+            [date.fromisoformat(day) for day in dates]
+        )
+        logger.info("Refreshed availability dates", extra={
+            'tenant_id': tenant_id,
+            'resource_id': resource_id,
+            'dates': dates,
+            'rows_written': written
+        })
+        return written
+    except Exception as e:
+        logger.error(f"Failed to refresh availability dates: {str(e)}")
+        raise
+
+
+# Celery beat schedule configuration
+celery.conf.beat_schedule = {
+    **(celery.conf.beat_schedule or {}),
+    'precompute-availability': {
+        'task': 'app.jobs.availability_precompute.precompute_availability',
+        'schedule': crontab(minute=15),  # Hourly, rolls the window forward
+    },
+}
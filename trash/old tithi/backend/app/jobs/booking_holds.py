@@ -0,0 +1,154 @@
+"""
+Booking Hold Worker
+
+Celery tasks that write Redis-claimed booking holds behind to the database:
+an immediate per-hold persist queued at claim time, and a periodic
+reconciliation that persists claims whose queued write never completed.
+
+Expired holds are deleted by a batched periodic sweep. HoldExpiryListener
+optionally subscribes to Redis keyspace expiry events for tithi:hold:* keys
+so a hold's row is released as soon as its TTL fires instead of waiting for
+the next sweep.
+"""
+
+import uuid
+import logging
+from typing import Dict, Optional, Tuple
+
+import redis
+from celery.schedules import crontab
+
+from ..extensions import celery, get_redis
+from ..services.business_phase2 import AvailabilityService
+from ..services.cache import BookingHoldCacheService
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name="app.jobs.booking_holds.persist_booking_hold")
+def persist_booking_hold(tenant_id: str, hold_key: str) -> Optional[str]:
+    """Persist one claimed hold; returns the hold id, or None if it was released."""
+    try:
+        hold = AvailabilityService().persist_booking_hold(uuid.UUID(tenant_id), hold_key)
+        return str(hold.id) if hold else None
+    except Exception as e:
+        logger.error(f"Failed to persist booking hold {hold_key}: {str(e)}")
+        raise
+
+
+@celery.task(name="app.jobs.booking_holds.reconcile_booking_holds")
+def reconcile_booking_holds(older_than_seconds: int = 60) -> Dict[str, int]:
+    """Persist claimed holds whose write-behind is overdue."""
+    try:
+        result = AvailabilityService().reconcile_booking_holds(older_than_seconds)
+        logger.info("Reconciled booking holds", extra=result)
+        return result
+    except Exception as e:
+        logger.error(f"Failed to reconcile booking holds: {str(e)}")
+        raise
+
+
+@celery.task(name="app.jobs.booking_holds.sweep_expired_holds")
+def sweep_expired_holds(batch_size: int = 500) -> Dict[str, int]:
+    """Delete expired hold rows in batches."""
+    try:
+        result = AvailabilityService().sweep_expired_holds(batch_size=batch_size)
+        logger.info("Swept expired booking holds", extra=result)
+        return result
+    except Exception as e:
+        logger.error(f"Failed to sweep expired booking holds: {str(e)}")
+        raise
+
+
+class HoldExpiryListener:
+    """Release hold rows when their Redis payload keys expire."""
+    
+    # Seconds to wait for an event before polling again
+    poll_seconds = 5.0
+    
+    def __init__(self, redis_client=None):
+        self.redis_client = redis_client or get_redis()
+        self.hold_prefix = BookingHoldCacheService().hold_prefix + ":"
+    
+    def enable_notifications(self) -> bool:
+        """Turn on expired-key events; managed Redis may require doing this out of band."""
+        try:
+            self.redis_client.config_set('notify-keyspace-events', 'Ex')
+            return True
+        except Exception as e:
+            logger.warning(f"Could not enable keyspace notifications: {str(e)}")
+            return False
+    
+    def parse_hold_key(self, key: str) -> Optional[Tuple[uuid.UUID, str]]:
+        """Return (tenant_id, hold_key) for a hold payload key, None for anything else."""
+        if not key.startswith(self.hold_prefix):
+            return None
+        
+        tenant_part, _, hold_key = key[len(self.hold_prefix):].partition(':')
+        try:
+            tenant_id = uuid.UUID(tenant_part)
+        except ValueError:
+            # Interval sets, the pending index and other hold bookkeeping keys
+            return None
+        
+        return (tenant_id, hold_key) if hold_key else None
+    
+    def handle_expired_key(self, key: str) -> bool:
+        """Release the hold row behind an expired payload key."""
+        parsed = self.parse_hold_key(key)
+        if not parsed:
+            return False
+        
+        tenant_id, hold_key = parsed
+        try:
+            return AvailabilityService().release_expired_hold(tenant_id, hold_key)
+        except Exception as e:
+            # The periodic sweep remains the safety net
+            logger.error(f"Failed to release expired hold {hold_key}: {str(e)}")
+            return False
+    
+    def run(self) -> None:
+        """Block on expiry events; must run inside an application context."""
+        if not self.redis_client:
+            raise RuntimeError("Redis is not configured")
+        
+        self.enable_notifications()
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe('__keyevent@*__:expired')
+        logger.info("Listening for booking hold expiry events")
+        
+        while True:
+            try:
+                message = pubsub.get_message(timeout=self.poll_seconds)
+            except redis.TimeoutError:
+                # The shared pool's socket timeout is shorter than a quiet spell
+                continue
+            if message and message.get('type') == 'pmessage':
+                self.handle_expired_key(message['data'])
+
+
+def run_hold_expiry_listener() -> None:
+    """Entrypoint for the hold expiry listener process."""
+    from .. import create_app
+    
+    app = create_app()
+    with app.app_context():
+        HoldExpiryListener().run()
+
+
+# Celery beat schedule configuration
+celery.conf.beat_schedule = {
+    **(celery.conf.beat_schedule or {}),
+    'reconcile-booking-holds': {
+        'task': 'app.jobs.booking_holds.reconcile_booking_holds',
+        'schedule': crontab(),  # Every minute
+    },
+    'sweep-expired-booking-holds': {
+        'task': 'app.jobs.booking_holds.sweep_expired_holds',
+        'schedule': crontab(minute='*/5'),
+    },
+}
+
+
+if __name__ == "__main__":
+    run_hold_expiry_listener()
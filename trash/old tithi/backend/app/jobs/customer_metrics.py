@@ -0,0 +1,57 @@
+"""
+Customer Metrics Worker
+
+Celery tasks that keep customer_metrics current off the booking request path:
+a frequent sweep folding CUSTOMER_METRICS_DELTA outbox events into the table
+in coalesced batches, and an on-demand full rebuild from bookings.
+"""
+
+import uuid
+import logging
+from typing import Dict, Optional
+
+from celery.schedules import crontab
+
+from ..extensions import celery
+from ..services.customer_metrics import CustomerMetricsService
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name="app.jobs.customer_metrics.apply_customer_metric_deltas")
+def apply_customer_metric_deltas(max_batches: int = 10) -> int:
+    """Apply ready metric deltas, a batch per transaction, until drained or max_batches."""
+    service = CustomerMetricsService()
+    applied = 0
+    try:
+        for _ in range(max_batches):
+            batch_applied = service.apply_pending_deltas()
+            applied += batch_applied
+            if batch_applied < service.DELTA_BATCH_SIZE:
+                break
+        return applied
+    except Exception as e:
+        logger.error(f"Failed to apply customer metric deltas: {str(e)}")
+        raise
+
+
+@celery.task(name="app.jobs.customer_metrics.rebuild_customer_metrics")
+def rebuild_customer_metrics(tenant_id: Optional[str] = None) -> Dict[str, int]:
+    """Recompute customer_metrics from bookings for one tenant, or all tenants."""
+    try:
+        customers = CustomerMetricsService().rebuild(uuid.UUID(tenant_id) if tenant_id else None)
+        logger.info("Rebuilt customer metrics", extra={'tenant_id': tenant_id, 'customers': customers})
+        return {'customers': customers}
+    except Exception as e:
+        logger.error(f"Failed to rebuild customer metrics: {str(e)}")
+        raise
+
+
+# Celery beat schedule configuration
+celery.conf.beat_schedule = {
+    **(celery.conf.beat_schedule or {}),
+    'apply-customer-metric-deltas': {
+        'task': 'app.jobs.customer_metrics.apply_customer_metric_deltas',
+        'schedule': crontab(),  # Every minute
+    },
+}
@@ -10,6 +10,7 @@ import uuid
 
 from ..extensions import celery, db
 from ..models.audit import EventOutbox
+from ..services.customer_metrics import CUSTOMER_METRICS_EVENT
 
 
 def emit_event(
@@ -70,6 +71,8 @@ def process_ready_outbox_events(batch_limit: int = 100) -> int:
             EventOutbox.status == "ready",
             EventOutbox.attempts < EventOutbox.max_attempts,
             EventOutbox.ready_at <= now,
+            # Claimed in batches by app.jobs.customer_metrics instead
+            EventOutbox.event_code != CUSTOMER_METRICS_EVENT,
         )
         .order_by(EventOutbox.ready_at.asc())
         .limit(batch_limit)
@@ -0,0 +1,35 @@
+"""
+Conditional GET Helpers
+
+ETag / If-None-Match handling for read-heavy endpoints polled by booking
+widgets. Tags come from cache generation counters, so a matching tag can be
+answered with 304 Not Modified before any availability or catalog work runs.
+"""
+
+from typing import Callable, Optional
+
+from flask import Response, make_response, request
+
+# Clients may store responses but must revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def conditional_response(etag: Optional[str], build: Callable[[], object]) -> Response:
+    """
+    Answer 304 when the client already holds etag, otherwise build the response.
+
+    build is only called on a miss and may return anything a Flask view can
+    (a Response or a (body, status) tuple); the ETag is attached either way.
+    Without a tag (no Redis to version against) the response is always built.
+    """
+    if etag is None:
+        return make_response(build())
+
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = make_response(build())
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
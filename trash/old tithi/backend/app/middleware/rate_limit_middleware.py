@@ -19,7 +19,6 @@ import json
 from typing import Optional, Dict, Any, Tuple
 from flask import request, g, current_app, jsonify
 from functools import wraps
-import redis
 from ..middleware.error_handler import TithiError
 
 
@@ -65,17 +64,13 @@ class RateLimitMiddleware:
         """Initialize the middleware with Flask app."""
         self.app = app
         
-        # Initialize Redis client
-        redis_url = app.config.get('REDIS_URL', 'redis://localhost:6379/0')
-        try:
-            self.redis_client = redis.from_url(redis_url, decode_responses=True)
-            # Test Redis connection
-            self.redis_client.ping()
-            self.logger.info("Rate limiting Redis connection established")
-        except Exception as e:
-            self.logger.error(f"Failed to connect to Redis for rate limiting: {e}")
+        # Use the shared Redis client; its circuit breaker sends checks to the
+        # in-memory fallback at once while Redis is down
+        from ..extensions import get_redis
+        self.redis_client = get_redis()
+        if not self.redis_client:
             # Fallback to in-memory rate limiting (not recommended for production)
-            self.redis_client = None
+            self.logger.error("Redis unavailable for rate limiting; using in-memory fallback")
         
         # Register before_request handler
         app.before_request(self._check_rate_limit)
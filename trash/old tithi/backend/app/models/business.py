@@ -120,6 +120,7 @@ class Booking(TenantModel):
     no_show_flag = Column(Boolean, nullable=False, default=False)
     attendee_count = Column(Integer, nullable=False, default=1)
     rescheduled_from = Column(UUID(as_uuid=True), ForeignKey("bookings.id"))
+    series_id = Column(UUID(as_uuid=True))  # shared by bookings created as one recurring series
     
     # Relationships
     tenant = relationship("Tenant", back_populates="bookings")
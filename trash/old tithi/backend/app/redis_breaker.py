@@ -0,0 +1,160 @@
+"""
+Redis Circuit Breaker
+
+Wraps the shared Redis client so an outage costs a failed check instead of
+a connect timeout on every call. Every Redis user in the process (cache,
+rate limiter, locks, holds) shares one connection pool and one breaker:
+
+    closed     commands run; consecutive connection failures are counted
+    open       after REDIS_BREAKER_FAILURE_THRESHOLD failures, commands fail
+               at once with CircuitOpenError for REDIS_BREAKER_RESET_SECONDS
+    half_open  then one probe command is let through; success closes the
+               circuit, failure opens it again
+
+CircuitOpenError is a redis.ConnectionError, so callers' existing fallbacks
+handle it like any other Redis failure. Only connection and timeout errors
+count as failures: a command error still means the server answered.
+"""
+
+import time
+import logging
+from threading import Lock
+from typing import Any, Callable, Dict
+
+import redis
+from redis.client import Pipeline
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(redis.ConnectionError):
+    """Raised instead of calling Redis while the circuit is open."""
+
+
+class RedisCircuitBreaker:
+    """Tracks Redis health and decides whether commands may be sent."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 5.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = Lock()
+        self._counters = {'calls': 0, 'failures': 0, 'short_circuited': 0, 'trips': 0}
+
+    def allow(self) -> bool:
+        """Return whether a command may be sent now; claims the probe when half open."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            if self.state != CLOSED:
+                self._counters['short_circuited'] += 1
+                return False
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counters['calls'] += 1
+            self._failures = 0
+            if self.state != CLOSED:
+                logger.info("Redis circuit closed")
+            self.state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._counters['calls'] += 1
+            self._counters['failures'] += 1
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self._counters['trips'] += 1
+                    logger.warning(f"Redis circuit opened after {self._failures} consecutive failures")
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def call(self, command: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a Redis call through the breaker."""
+        if not self.allow():
+            raise CircuitOpenError("Redis circuit is open")
+
+        try:
+            result = command(*args, **kwargs)
+        except (redis.ConnectionError, redis.TimeoutError):
+            self.record_failure()
+            raise
+        except BaseException:
+            # The server answered (or the caller gave up); the connection is fine
+            self.record_success()
+            raise
+
+        self.record_success()
+        return result
+
+    def reset(self) -> None:
+        """Close the circuit and clear the failure count."""
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                **self._counters
+            }
+
+
+class CircuitBreakerPipeline(Pipeline):
+    """Pipeline whose round trip goes through the client's breaker."""
+
+    breaker: RedisCircuitBreaker
+
+    def execute(self, raise_on_error: bool = True):
+        if not self.command_stack and not self.scripts:
+            return super().execute(raise_on_error)
+        return self.breaker.call(super().execute, raise_on_error)
+
+
+class CircuitBreakerRedis(redis.Redis):
+    """Redis client that sends every command through a RedisCircuitBreaker."""
+
+    def __init__(self, *args, breaker: RedisCircuitBreaker = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker or RedisCircuitBreaker()
+
+    def execute_command(self, *args, **options):
+        return self.breaker.call(super().execute_command, *args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> CircuitBreakerPipeline:
+        pipe = CircuitBreakerPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+        pipe.breaker = self.breaker
+        return pipe
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool usage and breaker state, for health metrics."""
+        pool = self.connection_pool
+        return {
+            'max_connections': pool.max_connections,
+            'connections_created': getattr(pool, '_created_connections', None),
+            'connections_in_use': len(getattr(pool, '_in_use_connections', ())),
+            'connections_idle': len(getattr(pool, '_available_connections', ())),
+            'circuit': self.breaker.stats()
+        }
@@ -24,6 +24,7 @@ from ..models.analytics import (
 )
 from ..models.financial import Payment
 from ..middleware.error_handler import TithiError
+from .cache import CacheService
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +32,12 @@ logger = logging.getLogger(__name__)
 class AnalyticsService:
     """Service for comprehensive business analytics and reporting."""
     
+    # Dashboard overviews are recomputed at most once per key per TTL
+    DASHBOARD_CACHE_TTL = 300
+    
     def __init__(self):
         self.db = db
+        self.cache = CacheService()
     
     def get_dashboard_overview(self, tenant_id: str, date_range: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -49,32 +54,11 @@ class AnalyticsService:
             start_date = datetime.fromisoformat(date_range['start_date'])
             end_date = datetime.fromisoformat(date_range['end_date'])
             
-            # Revenue metrics
-            revenue_metrics = self._calculate_revenue_metrics(tenant_id, start_date, end_date)
-            
-            # Booking metrics
-            booking_metrics = self._calculate_booking_metrics(tenant_id, start_date, end_date)
-            
-            # Customer metrics
-            customer_metrics = self._calculate_customer_metrics(tenant_id, start_date, end_date)
-            
-            # Staff performance
-            staff_metrics = self._calculate_staff_metrics(tenant_id, start_date, end_date)
-            
-            # Service performance
-            service_metrics = self._calculate_service_metrics(tenant_id, start_date, end_date)
-            
-            return {
-                'revenue': revenue_metrics,
-                'bookings': booking_metrics,
-                'customers': customer_metrics,
-                'staff': staff_metrics,
-                'services': service_metrics,
-                'date_range': {
-                    'start_date': start_date.isoformat(),
-                    'end_date': end_date.isoformat()
-                }
-            }
+            return self.cache.get_or_compute(
+                f"tithi:analytics:dashboard:{tenant_id}:{start_date.isoformat()}:{end_date.isoformat()}",
+                lambda: self._build_dashboard_overview(tenant_id, start_date, end_date),
+                self.DASHBOARD_CACHE_TTL
+            )
             
         except Exception as e:
             logger.error(f"Failed to get dashboard overview: {str(e)}")
@@ -83,6 +67,35 @@ class AnalyticsService:
                 code="TITHI_ANALYTICS_ERROR"
             )
     
+    def _build_dashboard_overview(self, tenant_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Compute the dashboard overview for a date range."""
+        # Revenue metrics
+        revenue_metrics = self._calculate_revenue_metrics(tenant_id, start_date, end_date)
+        
+        # Booking metrics
+        booking_metrics = self._calculate_booking_metrics(tenant_id, start_date, end_date)
+        
+        # Customer metrics
+        customer_metrics = self._calculate_customer_metrics(tenant_id, start_date, end_date)
+        
+        # Staff performance
+        staff_metrics = self._calculate_staff_metrics(tenant_id, start_date, end_date)
+        
+        # Service performance
+        service_metrics = self._calculate_service_metrics(tenant_id, start_date, end_date)
+        
+        return {
+            'revenue': revenue_metrics,
+            'bookings': booking_metrics,
+            'customers': customer_metrics,
+            'staff': staff_metrics,
+            'services': service_metrics,
+            'date_range': {
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat()
+            }
+        }
+    
     def get_revenue_analytics(self, tenant_id: str, date_range: Dict[str, str]) -> Dict[str, Any]:
         """
         Get comprehensive revenue analytics.
@@ -0,0 +1,508 @@
+"""
+Materialized Availability Service
+
+Precomputed per-resource, per-date free windows stored in the availability_cache
+table. A background job fills the next N days for every active resource and
+refreshes only the dates touched by booking or hold changes, so public slot
+endpoints read one indexed row per day instead of recomputing availability.
+
+Each row stores the day's working window and the free gaps inside it:
+
+    {"opens_at": "2030-01-07T09:00:00", "closes_at": "2030-01-07T17:00:00",
+     "free": [["2030-01-07T09:00:00", "2030-01-07T10:00:00"], ...]}
+
+Slots for any service duration are derived from the free gaps in memory.
+
+Stale rows are dropped inside the transaction of the change that made them
+stale; the refresh job for their dates is queued only once that transaction
+commits, so the worker never recomputes from data it cannot see yet. A drop
+empties the row (or inserts an empty one) rather than deleting it, and
+updated_at records when a row's content was true: the invalidation time for
+dropped rows, the snapshot time for refreshed ones. A refresh therefore skips
+rows dropped after it started reading, leaving them to the refresh that the
+drop queued. Callers bump the cache generations only after the drop commits,
+so a reader can never cache a dropped row under the new generation.
+"""
+
+import uuid
+import logging
+from bisect import bisect_right
+from datetime import datetime, date, time, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import and_, event
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models.business import AvailabilityCache, Resource, StaffProfile, StaffAvailability
+from .business_phase2 import BaseService, DatabaseError
+from .cache import AvailabilityCacheService
+from .occupancy import OccupancyIndex
+
+logger = logging.getLogger(__name__)
+
+
+DayWindows = Dict[str, Any]
+
+# availability_slots of a dropped row awaiting its refresh; readers treat it as missing
+DROPPED: DayWindows = {}
+
+# Refreshes wait in Session.info until the transaction that dropped their rows commits
+PENDING_REFRESHES_KEY = 'availability_pending_refreshes'
+
+
+@event.listens_for(Session, 'after_commit')
+def _queue_pending_refreshes(session: Session) -> None:
+    for tenant_id, resource_id, dates in session.info.pop(PENDING_REFRESHES_KEY, []):
+        try:
+            from ..jobs.availability_precompute import refresh_availability_dates
+            refresh_availability_dates.delay(
+                str(tenant_id), str(resource_id), [day.isoformat() for day in dates]
+            )
+        except Exception as e:
+            # The periodic precompute picks these dates up on its next run
+            logger.warning("Failed to queue availability refresh", extra={
+                'tenant_id': str(tenant_id),
+                'resource_id': str(resource_id),
+                'error': str(e)
+            })
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_refreshes(session: Session) -> None:
+    session.info.pop(PENDING_REFRESHES_KEY, None)
+
+
+def iter_slots(day_windows: DayWindows, duration: timedelta,
+               step: timedelta) -> List[Tuple[datetime, datetime]]:
+    """
+    Return (start, end) slots on the working-hours grid that fit a free gap.
+
+    The grid is anchored at the day's opening time so results match slot
+    generation against live occupancy.
+    """
+    if not day_windows or not day_windows.get('opens_at'):
+        return []
+
+    opens_at = datetime.fromisoformat(day_windows['opens_at'])
+    closes_at = datetime.fromisoformat(day_windows['closes_at'])
+    free = [
+        (datetime.fromisoformat(start_at), datetime.fromisoformat(end_at))
+        for start_at, end_at in day_windows.get('free', [])
+    ]
+    free_ends = [end_at for _, end_at in free]
+
+    slots = []
+    current_slot = opens_at
+    while current_slot + duration <= closes_at:
+        slot_end = current_slot + duration
+        # The only gap that can contain the slot is the first one ending after its start
+        index = bisect_right(free_ends, current_slot)
+        if index < len(free) and free[index][0] <= current_slot and free[index][1] >= slot_end:
+            slots.append((current_slot, slot_end))
+        current_slot += step
+
+    return slots
+
+
+def count_slots(day_windows: Sequence[Optional[DayWindows]], duration: timedelta,
+                step: timedelta) -> np.ndarray:
+    """
+    Count the slots iter_slots would yield for each entry, without building them.
+
+    Free gaps are flattened into arrays of minute offsets from each day's
+    opening time; the first grid point inside every gap and the number of
+    steps that still fit are computed in one vectorized pass, then summed
+    back onto their entries.
+    """
+    owners: List[int] = []
+    gap_starts: List[float] = []
+    gap_ends: List[float] = []
+    for index, windows in enumerate(day_windows):
+        if not windows or not windows.get('opens_at'):
+            continue
+        opens_at = datetime.fromisoformat(windows['opens_at'])
+        for start_at, end_at in windows.get('free', []):
+            owners.append(index)
+            gap_starts.append((datetime.fromisoformat(start_at) - opens_at).total_seconds() / 60)
+            gap_ends.append((datetime.fromisoformat(end_at) - opens_at).total_seconds() / 60)
+
+    if not owners:
+        return np.zeros(len(day_windows), dtype=np.int64)
+
+    duration_min = duration.total_seconds() / 60
+    step_min = step.total_seconds() / 60
+    starts = np.asarray(gap_starts)
+    ends = np.asarray(gap_ends)
+
+    first_slot = np.ceil(starts / step_min) * step_min
+    fitting = np.floor((ends - duration_min - first_slot) / step_min) + 1
+    counts = np.bincount(owners, weights=np.maximum(fitting, 0), minlength=len(day_windows))
+    return counts.astype(np.int64)
+
+
+class MaterializedAvailabilityService(BaseService):
+    """Read and maintain precomputed availability windows."""
+
+    def __init__(self):
+        super().__init__()
+        self.default_days_ahead = 14
+        self.default_ttl_seconds = 6 * 3600
+
+    def _days_ahead(self) -> int:
+        return int(current_app.config.get('AVAILABILITY_PRECOMPUTE_DAYS', self.default_days_ahead))
+
+    def _row_ttl(self) -> timedelta:
+        return timedelta(seconds=int(
+            current_app.config.get('AVAILABILITY_PRECOMPUTE_TTL', self.default_ttl_seconds)
+        ))
+
+    @staticmethod
+    def _dates(start_date: date, end_date: date) -> List[date]:
+        return [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+    def compute_day_windows(self, tenant_id: uuid.UUID, resource_ids: Iterable[uuid.UUID],
+                            start_date: date, end_date: date) -> Dict[Tuple[uuid.UUID, date], DayWindows]:
+        """
+        Compute free windows live for several resources over a date range.
+
+        Uses a fixed number of queries (staff, weekly availability, bookings,
+        holds) regardless of the number of resources or days.
+        """
+        windows, _ = self._compute(tenant_id, resource_ids, start_date, end_date)
+        return windows
+
+    def _compute(self, tenant_id: uuid.UUID, resource_ids: Iterable[uuid.UUID],
+                 start_date: date, end_date: date) -> Tuple[Dict[Tuple[uuid.UUID, date], DayWindows], OccupancyIndex]:
+        """Compute free windows and return them with the occupancy they were built from."""
+        resource_ids = list(resource_ids)
+        windows: Dict[Tuple[uuid.UUID, date], DayWindows] = {}
+        if not resource_ids:
+            return windows, OccupancyIndex()
+
+        staff_profiles = StaffProfile.query.filter(
+            and_(
+                StaffProfile.tenant_id == tenant_id,
+                StaffProfile.resource_id.in_(resource_ids),
+                StaffProfile.is_active == True
+            )
+        ).all()
+        resource_by_staff = {staff.id: staff.resource_id for staff in staff_profiles}
+
+        hours_by_resource: Dict[uuid.UUID, Dict[int, Tuple[time, time]]] = {}
+        if resource_by_staff:
+            records = StaffAvailability.query.filter(
+                and_(
+                    StaffAvailability.tenant_id == tenant_id,
+                    StaffAvailability.staff_profile_id.in_(list(resource_by_staff.keys())),
+                    StaffAvailability.is_active == True
+                )
+            ).all()
+            for record in records:
+                resource_hours = hours_by_resource.setdefault(resource_by_staff[record.staff_profile_id], {})
+                resource_hours.setdefault(record.weekday, (record.start_time, record.end_time))
+
+        occupancy_index = OccupancyIndex.load(
+            tenant_id,
+            resource_ids,
+            datetime.combine(start_date, time.min),
+            datetime.combine(end_date + timedelta(days=1), time.min)
+        )
+
+        for resource_id in resource_ids:
+            occupancy = occupancy_index.for_resource(resource_id)
+            resource_hours = hours_by_resource.get(resource_id, {})
+
+            for day in self._dates(start_date, end_date):
+                hours = resource_hours.get(day.isoweekday())
+                if not hours:
+                    windows[(resource_id, day)] = {'opens_at': None, 'closes_at': None, 'free': []}
+                    continue
+
+                opens_at = datetime.combine(day, hours[0])
+                closes_at = datetime.combine(day, hours[1])
+                windows[(resource_id, day)] = {
+                    'opens_at': opens_at.isoformat(),
+                    'closes_at': closes_at.isoformat(),
+                    'free': [
+                        [start_at.isoformat(), end_at.isoformat()]
+                        for start_at, end_at in occupancy.free_windows(opens_at, closes_at)
+                    ]
+                }
+
+        return windows, occupancy_index
+
+    def get_day_windows(self, tenant_id: uuid.UUID, resource_ids: Iterable[uuid.UUID],
+                        start_date: date, end_date: date) -> Dict[Tuple[uuid.UUID, date], DayWindows]:
+        """
+        Return free windows per (resource, date), reading precomputed rows.
+
+        Windows cached in Redis for the current generations are fetched for
+        every pair in one round trip. Fresh rows for the rest are fetched with
+        one indexed query; any (resource, date) without a fresh row, or whose
+        row was dropped, is computed live in bulk but not written back, so the
+        background job remains the only writer of rows. Everything read or
+        computed is cached.
+        """
+        resource_ids = list(resource_ids)
+        if not resource_ids:
+            return {}
+
+        pairs = [(resource_id, day) for resource_id in resource_ids for day in self._dates(start_date, end_date)]
+        availability_cache = AvailabilityCacheService()
+        cache_keys, cached = availability_cache.get_day_windows_many(
+            tenant_id, [(resource_id, day.isoformat()) for resource_id, day in pairs]
+        )
+        windows = {pair: value for pair, value in zip(pairs, cached) if value is not None}
+        if len(windows) == len(pairs):
+            return windows
+
+        uncached_resource_ids = list({resource_id for resource_id, day in pairs if (resource_id, day) not in windows})
+        rows = db.session.query(
+            AvailabilityCache.resource_id, AvailabilityCache.date, AvailabilityCache.availability_slots
+        ).filter(
+            and_(
+                AvailabilityCache.tenant_id == tenant_id,
+                AvailabilityCache.resource_id.in_(uncached_resource_ids),
+                AvailabilityCache.date >= start_date,
+                AvailabilityCache.date <= end_date,
+                AvailabilityCache.expires_at > datetime.utcnow()
+            )
+        ).all()
+        uncached = {}
+        for resource_id, day, slots in rows:
+            if slots != DROPPED and (resource_id, day) not in windows:
+                uncached[(resource_id, day)] = slots
+
+        missing = [pair for pair in pairs if pair not in windows and pair not in uncached]
+        if missing:
+            live = self.compute_day_windows(
+                tenant_id,
+                {resource_id for resource_id, _ in missing},
+                min(day for _, day in missing),
+                max(day for _, day in missing)
+            )
+            for key in missing:
+                uncached[key] = live[key]
+
+        availability_cache.set_many({
+            cache_key: uncached[pair] for pair, cache_key in zip(pairs, cache_keys) if pair in uncached
+        }, availability_cache.default_ttl)
+        windows.update(uncached)
+        return windows
+
+    def refresh_dates(self, tenant_id: uuid.UUID, resource_ids: Iterable[uuid.UUID],
+                      dates: Iterable[date]) -> int:
+        """
+        Recompute and upsert precomputed rows for the given resources and dates.
+
+        Rows dropped or refreshed after this refresh began reading are newer
+        than its result and are left alone; the existing rows are locked
+        before that check so a concurrent drop lands after this write.
+        """
+        dates = sorted(set(dates))
+        if not dates:
+            return 0
+
+        # Only materialize real resources (the booking flow keys bookings by team member)
+        resource_ids = [
+            resource_id for (resource_id,) in db.session.query(Resource.id).filter(
+                and_(
+                    Resource.tenant_id == tenant_id,
+                    Resource.id.in_(list(resource_ids))
+                )
+            ).all()
+        ]
+        if not resource_ids:
+            return 0
+
+        snapshot_at = datetime.utcnow()
+        windows, occupancy_index = self._compute(tenant_id, resource_ids, dates[0], dates[-1])
+        wanted = set(dates)
+
+        existing = {
+            (row.resource_id, row.date): row
+            for row in AvailabilityCache.query.filter(
+                and_(
+                    AvailabilityCache.tenant_id == tenant_id,
+                    AvailabilityCache.resource_id.in_(resource_ids),
+                    AvailabilityCache.date.in_(dates)
+                )
+            ).with_for_update().all()
+        }
+
+        now = datetime.utcnow()
+        default_expiry = now + self._row_ttl()
+        written = 0
+
+        try:
+            for (resource_id, day), day_windows in windows.items():
+                if day not in wanted:
+                    continue
+
+                # Rows built from holds go stale once the earliest hold lapses
+                hold_expires_at = occupancy_index.hold_expiry(resource_id, day)
+                expires_at = min(default_expiry, hold_expires_at) if hold_expires_at else default_expiry
+                if expires_at <= now:
+                    continue
+
+                row = existing.get((resource_id, day))
+                if row is not None and row.updated_at > snapshot_at:
+                    continue
+                if row is None:
+                    row = AvailabilityCache(
+                        tenant_id=tenant_id,
+                        resource_id=resource_id,
+                        date=day
+                    )
+                    db.session.add(row)
+                row.availability_slots = day_windows
+                row.expires_at = expires_at
+                row.updated_at = snapshot_at
+                written += 1
+
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseError(f"Failed to refresh availability: {str(e)}")
+
+        return written
+
+    def precompute(self, days_ahead: Optional[int] = None) -> Dict[str, int]:
+        """Precompute the next N days for every active resource, one tenant at a time."""
+        days_ahead = days_ahead or self._days_ahead()
+        start_date = datetime.utcnow().date()
+        dates = self._dates(start_date, start_date + timedelta(days=days_ahead - 1))
+
+        resources = db.session.query(Resource.tenant_id, Resource.id).filter(
+            and_(
+                Resource.is_active == True,
+                Resource.deleted_at.is_(None)
+            )
+        ).all()
+
+        resources_by_tenant: Dict[uuid.UUID, List[uuid.UUID]] = {}
+        for tenant_id, resource_id in resources:
+            resources_by_tenant.setdefault(tenant_id, []).append(resource_id)
+
+        rows_written = 0
+        for tenant_id, resource_ids in resources_by_tenant.items():
+            rows_written += self.refresh_dates(tenant_id, resource_ids, dates)
+
+        return {
+            'tenants': len(resources_by_tenant),
+            'resources': len(resources),
+            'rows_written': rows_written
+        }
+
+    @classmethod
+    def interval_dates(cls, start_at: datetime, end_at: datetime) -> List[date]:
+        """Dates an interval touches; an end at midnight does not touch the next day."""
+        last_date = (end_at - timedelta(microseconds=1)).date() if end_at > start_at else start_at.date()
+        return cls._dates(start_at.date(), last_date)
+
+    @classmethod
+    def group_dates(cls, intervals: Iterable[Tuple[uuid.UUID, datetime, datetime]]) -> Dict[uuid.UUID, set]:
+        """Dates touched per resource by (resource_id, start_at, end_at) intervals."""
+        resource_dates: Dict[uuid.UUID, set] = {}
+        for resource_id, start_at, end_at in intervals:
+            resource_dates.setdefault(resource_id, set()).update(cls.interval_dates(start_at, end_at))
+        return resource_dates
+
+    def mark_stale(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                   start_at: datetime, end_at: datetime) -> int:
+        """Drop precomputed rows for the dates an interval touches and queue a refresh."""
+        return self._drop_and_refresh(tenant_id, resource_id, self.interval_dates(start_at, end_at))
+
+    def mark_dates_stale(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, dates: List[date]) -> int:
+        """Drop precomputed rows for specific dates of a resource and queue a refresh."""
+        return self._drop_and_refresh(tenant_id, resource_id, list(dates))
+
+    def mark_resource_stale(self, tenant_id: uuid.UUID, resource_id: uuid.UUID) -> int:
+        """Drop every precomputed row for a resource (e.g. after working hours change)."""
+        return self._drop_and_refresh(tenant_id, resource_id, None)
+
+    def drop_stale(self, tenant_id: uuid.UUID,
+                   resource_dates: Dict[uuid.UUID, Optional[Iterable[date]]]) -> int:
+        """
+        Drop precomputed rows after a change that has already committed.
+
+        resource_dates maps each resource to the dates to drop, or to None for
+        all of them. The drops get a transaction of their own, which has
+        committed by the time this returns, so callers bump the cache
+        generations afterwards. A failure is logged and left to the periodic
+        precompute and the rows' expiry.
+        """
+        try:
+            dropped = sum(
+                self._drop_and_refresh(tenant_id, resource_id, sorted(dates) if dates is not None else None)
+                for resource_id, dates in resource_dates.items()
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning("Failed to drop precomputed availability", extra={
+                'tenant_id': str(tenant_id),
+                'resources': [str(resource_id) for resource_id in resource_dates],
+                'error': str(e)
+            })
+            return 0
+        return dropped
+
+    def _drop_and_refresh(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                          dates: Optional[List[date]]) -> int:
+        """
+        Delete precomputed rows in the caller's transaction and queue their recomputation.
+
+        Rows are emptied, and empty rows inserted for dates that had none,
+        stamped with the drop time so a refresh that started earlier skips
+        them. The writes are flushed, not committed: they commit or roll back
+        with the change that made the rows stale, and the refresh is queued
+        after that commit (or discarded with a rollback). Readers fall back to
+        live computation until the refresh lands, so a slow or unavailable
+        worker never serves stale availability.
+
+        Returns:
+            Number of existing rows dropped
+        """
+        filters = [
+            AvailabilityCache.tenant_id == tenant_id,
+            AvailabilityCache.resource_id == resource_id
+        ]
+        if dates is not None:
+            filters.append(AvailabilityCache.date.in_(dates))
+        else:
+            start_date = datetime.utcnow().date()
+            dates = self._dates(start_date, start_date + timedelta(days=self._days_ahead() - 1))
+
+        now = datetime.utcnow()
+        rows = AvailabilityCache.query.filter(and_(*filters)).all()
+        dropped = len(rows)
+        missing = sorted(set(dates) - {row.date for row in rows})
+        if missing:
+            try:
+                with db.session.begin_nested():
+                    db.session.add_all([
+                        AvailabilityCache(
+                            tenant_id=tenant_id,
+                            resource_id=resource_id,
+                            date=day,
+                            availability_slots=DROPPED,
+                            expires_at=now + self._row_ttl(),
+                            updated_at=now
+                        )
+                        for day in missing
+                    ])
+            except IntegrityError:
+                # A concurrent drop or refresh inserted some of them first
+                rows += AvailabilityCache.query.filter(and_(*filters, AvailabilityCache.date.in_(missing))).all()
+
+        for row in rows:
+            row.availability_slots = DROPPED
+            row.updated_at = now
+        db.session.flush()
+        db.session.info.setdefault(PENDING_REFRESHES_KEY, []).append((tenant_id, resource_id, dates))
+        return dropped
@@ -6,15 +6,48 @@ as the canonical model, with proper slot generation and booking validation.
 """
 
 import uuid
+import heapq
 from datetime import datetime, date, time, timedelta
 from typing import List, Dict, Any, Optional
-from sqlalchemy import and_, or_
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
 from ..extensions import db
-from ..models.business import StaffAvailability, StaffProfile, Booking, BookingHold, Service
+from ..models.business import StaffAvailability, StaffProfile, Service, ServiceResource
 from ..models.availability import AvailabilityRule
-from .base import BaseService
+from .business_phase2 import BaseService
+from .availability_materialized import MaterializedAvailabilityService, count_slots, iter_slots
+from .cache import AvailabilityCacheService
+from .occupancy import OccupancyIndex
+
+
+def expand_compact_slots(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Decode a compact availability payload into the standard slot list."""
+    service = payload["service"]
+    duration = timedelta(minutes=service["duration_minutes"])
+    slots = []
+    
+    for day in payload["days"]:
+        midnight = datetime.combine(date.fromisoformat(day["date"]), time.min)
+        day_slots = []
+        for staff, starts in zip(payload["staff"], day["starts"]):
+            for offset in starts:
+                slot_start = midnight + timedelta(minutes=offset)
+                day_slots.append({
+                    "start_at": slot_start.isoformat(),
+                    "end_at": (slot_start + duration).isoformat(),
+                    "date": day["date"],
+                    "weekday": slot_start.isoweekday(),
+                    "staff_id": staff["id"],
+                    "staff_name": staff["name"],
+                    "service_id": service["id"],
+                    "service_name": service["name"],
+                    "duration_minutes": service["duration_minutes"],
+                    "price_cents": service["price_cents"]
+                })
+        slots.extend(sorted(day_slots, key=lambda slot: slot["start_at"]))
+    
+    return slots
 
 
 class UnifiedAvailabilityService(BaseService):
@@ -41,177 +74,344 @@ class UnifiedAvailabilityService(BaseService):
         Returns:
             List of available time slots
         """
-        # Get service details
-        service = Service.query.filter_by(
-            tenant_id=tenant_id,
-            id=service_id,
-            deleted_at=None
-        ).first()
-        
-        if not service:
-            raise ValueError("Service not found")
-        
-        # Get staff members assigned to this service
-        if staff_id:
-            staff_members = [StaffProfile.query.filter_by(
-                tenant_id=tenant_id,
-                id=staff_id,
-                is_active=True
-            ).first()]
-            if not staff_members[0]:
-                raise ValueError("Staff member not found")
-        else:
-            # Get all staff assigned to this service
-            staff_members = StaffProfile.query.filter(
-                and_(
-                    StaffProfile.tenant_id == tenant_id,
-                    StaffProfile.is_active == True,
-                    StaffProfile.services.any(Service.id == service_id)
-                )
-            ).all()
-        
-        if not staff_members:
-            return []
-        
-        # Generate slots for each staff member
-        all_slots = []
-        for staff in staff_members:
-            staff_slots = self._generate_staff_slots(
-                tenant_id, staff, service, start_date, end_date
+        return [
+            slot
+            for _, day_slots in self.iter_available_slots_by_day(
+                tenant_id, service_id, staff_id, start_date, end_date
             )
-            all_slots.extend(staff_slots)
-        
-        # Remove duplicates and sort
-        unique_slots = self._deduplicate_slots(all_slots)
-        return sorted(unique_slots, key=lambda x: x['start_at'])
+            for slot in day_slots
+        ]
     
-    def _generate_staff_slots(self, tenant_id: uuid.UUID, staff: StaffProfile, 
-                             service: Service, start_date: datetime, 
-                             end_date: datetime) -> List[Dict[str, Any]]:
-        """Generate slots for a specific staff member."""
-        slots = []
-        
-        # Get staff availability
-        availability_records = StaffAvailability.query.filter_by(
-            tenant_id=tenant_id,
-            staff_profile_id=staff.id,
-            is_active=True
-        ).all()
+    def iter_available_slots_by_day(self, tenant_id: uuid.UUID, service_id: uuid.UUID,
+                                    staff_id: Optional[uuid.UUID], start_date: datetime,
+                                    end_date: datetime, chunk_days: Optional[int] = None):
+        """
+        Return an iterator of (date, slots) pairs in date order, one per day in the range.
         
-        if not availability_records:
-            return []
+        Precomputed free windows are read in chunks of `chunk_days` (the whole
+        range in one read when omitted), so streaming callers hold only one
+        chunk of windows and one day of slot dicts at a time.
         
-        # Generate slots for each day in range
-        current_date = start_date.date()
-        end_date_only = end_date.date()
+        Args:
+            tenant_id: Tenant identifier
+            service_id: Service identifier
+            staff_id: Optional staff member identifier
+            start_date: Start of date range
+            end_date: End of date range
+            chunk_days: Days of windows to read per query
+        """
+        # Resolve service and staff eagerly so lookup errors surface before
+        # a streaming response has started
+        service = self._get_service(tenant_id, service_id)
+        staff_members = self._get_staff_members(tenant_id, service_id, staff_id)
+        day_slots = self._iter_day_slots(tenant_id, service, staff_members, start_date.date(),
+                                         end_date.date(), chunk_days)
+        return (
+            (day, [self._slot_dict(staff, service, slot_start, slot_end) for slot_start, slot_end, staff in slots])
+            for day, slots in day_slots
+        )
+    
+    def get_available_slots_compact(self, tenant_id: uuid.UUID, service_id: uuid.UUID,
+                                    staff_id: Optional[uuid.UUID], start_date: datetime,
+                                    end_date: datetime) -> Dict[str, Any]:
+        """
+        Get available slots in the compact columnar encoding.
         
-        while current_date <= end_date_only:
-            weekday = current_date.isoweekday()  # 1=Monday, 7=Sunday
+        Service and staff metadata are sent once; each day with openings
+        carries, per staff member (in the order of "staff"), the slot starts
+        as minutes after midnight. Every slot lasts duration_minutes. The
+        same slots as get_available_slots are encoded, and
+        expand_compact_slots turns the payload back into that list.
+        """
+        service = self._get_service(tenant_id, service_id)
+        staff_members = self._get_staff_members(tenant_id, service_id, staff_id)
+        position = {staff.id: index for index, staff in enumerate(staff_members)}
+        
+        days = []
+        for day, slots in self._iter_day_slots(tenant_id, service, staff_members, start_date.date(),
+                                               end_date.date(), None):
+            if not slots:
+                continue
             
-            # Find availability for this weekday
-            availability = next(
-                (av for av in availability_records if av.weekday == weekday), 
-                None
-            )
+            midnight = datetime.combine(day, time.min)
+            starts = [[] for _ in staff_members]
+            for slot_start, _, staff in slots:
+                starts[position[staff.id]].append(int((slot_start - midnight).total_seconds() // 60))
+            days.append({"date": day.isoformat(), "starts": starts})
+        
+        return {
+            "format": "compact",
+            "service": {
+                "id": str(service.id),
+                "name": service.name,
+                "duration_minutes": service.duration_min,
+                "price_cents": service.price_cents
+            },
+            "staff": [{"id": str(staff.id), "name": staff.display_name} for staff in staff_members],
+            "days": days
+        }
+    
+    def get_availability_etag(self, tenant_id: uuid.UUID, service_id: uuid.UUID,
+                              staff_id: Optional[uuid.UUID], start_date: date, end_date: date,
+                              variant: str) -> Optional[str]:
+        """
+        Entity tag for a service's availability over [start_date, end_date].
+        
+        Only the staff lookup touches the database; the tag itself comes from
+        the generation counters that booking, hold, schedule, service and staff
+        mutations bump, so an unchanged range can be answered with 304.
+        """
+        availability_cache = AvailabilityCacheService()
+        if not availability_cache.redis_client:
+            return None
+        
+        staff_members = self._get_staff_members(tenant_id, service_id, staff_id)
+        days = [
+            (start_date + timedelta(days=offset)).isoformat()
+            for offset in range((end_date - start_date).days + 1)
+        ]
+        return availability_cache.get_etag(
+            tenant_id, f"{service_id}|{variant}", catalogs=["services", "staff"],
+            resource_ids=[staff.resource_id for staff in staff_members], dates=days
+        )
+    
+    def _iter_day_slots(self, tenant_id: uuid.UUID, service: Service, staff_members: List[StaffProfile],
+                        current_date: date, last_date: date, chunk_days: Optional[int]):
+        """Generate per-day (start, end, staff) slots, one per distinct time, in start order."""
+        if not staff_members:
+            return
+        
+        materialized = MaterializedAvailabilityService()
+        resource_ids = [staff.resource_id for staff in staff_members]
+        duration = timedelta(minutes=service.duration_min)
+        step = timedelta(minutes=self.default_slot_duration)
+        chunk = timedelta(days=(chunk_days or (last_date - current_date).days + 1) - 1)
+        
+        while current_date <= last_date:
+            chunk_end = min(current_date + chunk, last_date)
+            # Read precomputed free windows (one indexed row per resource and day);
+            # days without a fresh row are computed live in bulk, so the query
+            # count does not grow with the number of days or candidate slots
+            day_windows = materialized.get_day_windows(tenant_id, resource_ids, current_date, chunk_end)
             
-            if availability:
-                day_slots = self._create_day_slots(
-                    current_date, 
-                    availability.start_time, 
-                    availability.end_time,
-                    service,
-                    staff
+            while current_date <= chunk_end:
+                # The first staff member offering a time keeps it
+                day_slots = {}
+                for staff in staff_members:
+                    windows = day_windows.get((staff.resource_id, current_date))
+                    for slot_start, slot_end in iter_slots(windows, duration, step):
+                        day_slots.setdefault((slot_start, slot_end), staff)
+                
+                yield current_date, sorted(
+                    ((slot_start, slot_end, staff) for (slot_start, slot_end), staff in day_slots.items()),
+                    key=lambda slot: slot[0]
                 )
-                slots.extend(day_slots)
+                current_date += timedelta(days=1)
+    
+    def find_next_available_slots(self, tenant_id: uuid.UUID, service_id: uuid.UUID,
+                                  after: datetime, limit: int = 10,
+                                  staff_id: Optional[uuid.UUID] = None,
+                                  max_days: int = 60) -> List[Dict[str, Any]]:
+        """
+        Find the first open slots for a service at or after a point in time.
+        
+        Days are read in growing chunks and each day's per-staff slot streams
+        are merged through a heap, so the search stops as soon as `limit`
+        distinct times are found instead of materializing the whole range.
+        
+        Args:
+            tenant_id: Tenant identifier
+            service_id: Service identifier
+            after: Earliest acceptable slot start
+            limit: Number of slots to return
+            staff_id: Optional staff member identifier (any staff if omitted)
+            max_days: Maximum number of days to search ahead
             
-            current_date += timedelta(days=1)
+        Returns:
+            Up to `limit` slots in start order, one per distinct time
+        """
+        if limit <= 0:
+            return []
         
-        return slots
-    
-    def _create_day_slots(self, date: date, start_time: time, end_time: time, 
-                          service: Service, staff: StaffProfile) -> List[Dict[str, Any]]:
-        """Create time slots for a specific day."""
-        slots = []
+        service = self._get_service(tenant_id, service_id)
+        staff_members = self._get_staff_members(tenant_id, service_id, staff_id)
         
-        # Convert to datetime objects
-        start_datetime = datetime.combine(date, start_time)
-        end_datetime = datetime.combine(date, end_time)
+        if not staff_members:
+            return []
         
-        # Calculate slot duration (service duration + buffer)
-        slot_duration = timedelta(minutes=service.duration_min + self.default_buffer_minutes)
+        materialized = MaterializedAvailabilityService()
+        resource_ids = [staff.resource_id for staff in staff_members]
+        duration = timedelta(minutes=service.duration_min)
+        step = timedelta(minutes=self.default_slot_duration)
         
-        current_slot = start_datetime
+        results = []
+        seen = set()
+        last_date = after.date() + timedelta(days=max_days - 1)
+        chunk_start = after.date()
+        chunk_days = 1
         
-        while current_slot + timedelta(minutes=service.duration_min) <= end_datetime:
-            slot_end = current_slot + timedelta(minutes=service.duration_min)
+        while chunk_start <= last_date:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), last_date)
+            day_windows = materialized.get_day_windows(tenant_id, resource_ids, chunk_start, chunk_end)
             
-            # Check if this slot is available
-            if self._is_slot_available(staff.tenant_id, staff.resource_id, current_slot, slot_end):
-                slots.append({
-                    "start_at": current_slot.isoformat(),
-                    "end_at": slot_end.isoformat(),
-                    "date": date.isoformat(),
-                    "weekday": date.isoweekday(),
-                    "staff_id": str(staff.id),
-                    "staff_name": staff.name,
-                    "service_id": str(service.id),
-                    "service_name": service.name,
-                    "duration_minutes": service.duration_min,
-                    "price_cents": service.price_cents
-                })
+            current_date = chunk_start
+            while current_date <= chunk_end:
+                streams = [
+                    self._staff_day_slots(order, staff, day_windows.get((staff.resource_id, current_date)),
+                                          duration, step, after)
+                    for order, staff in enumerate(staff_members)
+                ]
+                
+                for slot_start, slot_end, _, staff in heapq.merge(*streams):
+                    if (slot_start, slot_end) in seen:
+                        continue
+                    seen.add((slot_start, slot_end))
+                    results.append(self._slot_dict(staff, service, slot_start, slot_end))
+                    if len(results) >= limit:
+                        return results
+                
+                current_date += timedelta(days=1)
             
-            # Move to next slot
-            current_slot += timedelta(minutes=self.default_slot_duration)
+            # Near openings are found with a single day read; widen for sparse calendars
+            chunk_start = chunk_end + timedelta(days=1)
+            chunk_days = min(chunk_days * 2, 7)
         
-        return slots
+        return results
     
-    def _is_slot_available(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, 
-                           start_at: datetime, end_at: datetime) -> bool:
-        """Check if a time slot is available (no conflicts)."""
-        # Check for existing bookings
-        existing_booking = Booking.query.filter(
-            and_(
-                Booking.tenant_id == tenant_id,
-                Booking.resource_id == resource_id,
-                Booking.status.in_(['pending', 'confirmed', 'checked_in']),
-                or_(
-                    and_(Booking.start_at < end_at, Booking.end_at > start_at)
-                )
-            )
-        ).first()
+    def get_availability_heatmap(self, tenant_id: uuid.UUID, service_id: uuid.UUID,
+                                 start_date: date, end_date: date,
+                                 staff_id: Optional[uuid.UUID] = None) -> Dict[str, Any]:
+        """
+        Count open slots per day and per staff member for calendar views.
         
-        if existing_booking:
-            return False
+        Counts come from vectorized arithmetic over each day's free windows, so
+        no per-slot dictionaries are built regardless of the range length.
         
-        # Check for active holds
-        active_hold = BookingHold.query.filter(
-            and_(
-                BookingHold.tenant_id == tenant_id,
-                BookingHold.resource_id == resource_id,
-                BookingHold.hold_until > datetime.now(),
-                or_(
-                    and_(BookingHold.start_at < end_at, BookingHold.end_at > start_at)
-                )
+        Args:
+            tenant_id: Tenant identifier
+            service_id: Service identifier
+            start_date: First day of the range
+            end_date: Last day of the range (inclusive)
+            staff_id: Optional staff member identifier (all assigned staff if omitted)
+            
+        Returns:
+            Staff list plus one entry per day with the slot count summed across
+            staff, an availability flag and non-zero per-staff counts
+        """
+        if end_date < start_date:
+            raise ValueError("end_date must not be before start_date")
+        
+        service = self._get_service(tenant_id, service_id)
+        staff_members = self._get_staff_members(tenant_id, service_id, staff_id)
+        days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        
+        day_windows = {}
+        if staff_members:
+            day_windows = MaterializedAvailabilityService().get_day_windows(
+                tenant_id, [staff.resource_id for staff in staff_members], start_date, end_date
             )
-        ).first()
         
-        if active_hold:
-            return False
+        counts = count_slots(
+            [day_windows.get((staff.resource_id, day)) for staff in staff_members for day in days],
+            timedelta(minutes=service.duration_min),
+            timedelta(minutes=self.default_slot_duration)
+        ).reshape(len(staff_members), len(days))
+        totals = counts.sum(axis=0)
         
-        return True
+        return {
+            "service_id": str(service.id),
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "staff": [
+                {"staff_id": str(staff.id), "staff_name": staff.display_name}
+                for staff in staff_members
+            ],
+            "days": [
+                {
+                    "date": day.isoformat(),
+                    "slots": int(totals[day_index]),
+                    "available": bool(totals[day_index]),
+                    "staff": {
+                        str(staff.id): int(counts[staff_index, day_index])
+                        for staff_index, staff in enumerate(staff_members)
+                        if counts[staff_index, day_index]
+                    }
+                }
+                for day_index, day in enumerate(days)
+            ]
+        }
     
-    def _deduplicate_slots(self, slots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate slots based on start_at time."""
-        seen = set()
-        unique_slots = []
+    @staticmethod
+    def _staff_day_slots(order: int, staff: StaffProfile, windows: Optional[Dict[str, Any]],
+                         duration: timedelta, step: timedelta, after: datetime):
+        """Yield one staff member's slots for a day as heap-mergeable tuples."""
+        for slot_start, slot_end in iter_slots(windows, duration, step):
+            if slot_start >= after:
+                yield slot_start, slot_end, order, staff
+    
+    def _get_service(self, tenant_id: uuid.UUID, service_id: uuid.UUID) -> Service:
+        """Load an active service or raise ValueError."""
+        service = Service.query.filter_by(
+            tenant_id=tenant_id,
+            id=service_id,
+            deleted_at=None
+        ).first()
         
-        for slot in slots:
-            key = (slot['start_at'], slot['end_at'])
-            if key not in seen:
-                seen.add(key)
-                unique_slots.append(slot)
+        if not service:
+            raise ValueError("Service not found")
+        
+        return service
+    
+    def _get_staff_members(self, tenant_id: uuid.UUID, service_id: uuid.UUID,
+                           staff_id: Optional[uuid.UUID]) -> List[StaffProfile]:
+        """Load the requested staff member, or every active staff assigned to the service."""
+        if staff_id:
+            staff_member = StaffProfile.query.filter_by(
+                tenant_id=tenant_id,
+                id=staff_id,
+                is_active=True
+            ).first()
+            if not staff_member:
+                raise ValueError("Staff member not found")
+            return [staff_member]
         
-        return unique_slots
+        # Staff are assigned to services through their resource
+        assigned_resources = db.session.query(ServiceResource.resource_id).filter(
+            and_(
+                ServiceResource.tenant_id == tenant_id,
+                ServiceResource.service_id == service_id
+            )
+        )
+        return StaffProfile.query.filter(
+            and_(
+                StaffProfile.tenant_id == tenant_id,
+                StaffProfile.is_active == True,
+                StaffProfile.resource_id.in_(assigned_resources)
+            )
+        ).order_by(StaffProfile.display_name).all()
+    
+    @staticmethod
+    def _slot_dict(staff: StaffProfile, service: Service, slot_start: datetime,
+                   slot_end: datetime) -> Dict[str, Any]:
+        """Serialize a slot for API responses."""
+        return {
+            "start_at": slot_start.isoformat(),
+            "end_at": slot_end.isoformat(),
+            "date": slot_start.date().isoformat(),
+            "weekday": slot_start.isoweekday(),
+            "staff_id": str(staff.id),
+            "staff_name": staff.display_name,
+            "service_id": str(service.id),
+            "service_name": service.name,
+            "duration_minutes": service.duration_min,
+            "price_cents": service.price_cents
+        }
+    
+    def _is_slot_available(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, 
+                           start_at: datetime, end_at: datetime) -> bool:
+        """Check if a time slot is available (no conflicting bookings or active holds)."""
+        occupancy_index = OccupancyIndex.load(tenant_id, [resource_id], start_at, end_at)
+        return occupancy_index.is_free(resource_id, start_at, end_at)
     
     def validate_booking_availability(self, tenant_id: uuid.UUID, service_id: uuid.UUID, 
                                     staff_id: uuid.UUID, start_at: datetime, 
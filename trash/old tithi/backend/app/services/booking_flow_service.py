@@ -20,6 +20,9 @@ from ..models.team import TeamMember, TeamMemberAvailability, ServiceCategory, T
 from ..models.promotions import GiftCard, Coupon, CouponUsage
 from ..models.financial import Payment
 from ..services.financial import PaymentService
+from ..services.occupancy import OccupancyIndex
+from ..services.cache import AvailabilityCacheService
+from ..services.availability_materialized import MaterializedAvailabilityService
 from ..middleware.error_handler import TithiError
 
 logger = logging.getLogger(__name__)
@@ -148,75 +151,13 @@ class BookingFlowService:
             List of available time slots
         """
         try:
-            service = Service.query.filter_by(
-                id=service_id, 
-                tenant_id=tenant_id, 
-                active=True
-            ).first()
-            
-            if not service:
-                raise TithiError(
-                    message="Service not found",
-                    code="TITHI_SERVICE_NOT_FOUND",
-                    status_code=404
+            return [
+                slot
+                for _, day_slots in self.iter_availability_by_day(
+                    tenant_id, service_id, start_date, end_date, team_member_id
                 )
-            
-            # Get team members who can perform this service
-            if team_member_id:
-                team_members = [TeamMember.query.get(team_member_id)]
-            else:
-                team_members = service.team_assignments
-                team_members = [tm.team_member for tm in team_members if tm.team_member.is_active]
-            
-            available_slots = []
-            
-            # Check availability for each day in the range
-            current_date = start_date.date()
-            end_date_only = end_date.date()
-            
-            while current_date <= end_date_only:
-                day_of_week = current_date.weekday() + 1  # Monday = 1, Sunday = 7
-                if day_of_week == 7:
-                    day_of_week = 0  # Convert Sunday to 0
-                
-                # Get availability for this day
-                for team_member in team_members:
-                    availability = TeamMemberAvailability.query.filter_by(
-                        tenant_id=tenant_id,
-                        team_member_id=team_member.id,
-                        day_of_week=day_of_week,
-                        is_available=True
-                    ).all()
-                    
-                    for avail in availability:
-                        # Generate time slots for this availability period
-                        slots = self._generate_time_slots(
-                            current_date, 
-                            avail.start_time, 
-                            avail.end_time,
-                            service.duration_min
-                        )
-                        
-                        for slot in slots:
-                            # Check if slot is not in the past
-                            if slot['start_time'] > datetime.now():
-                                available_slots.append({
-                                    'start_time': slot['start_time'].isoformat(),
-                                    'end_time': slot['end_time'].isoformat(),
-                                    'team_member_id': str(team_member.id),
-                                    'team_member_name': team_member.name,
-                                    'service_id': str(service.id),
-                                    'service_name': service.name,
-                                    'duration_minutes': service.duration_min,
-                                    'price_cents': service.price_cents
-                                })
-                
-                current_date += timedelta(days=1)
-            
-            # Sort by start time
-            available_slots.sort(key=lambda x: x['start_time'])
-            
-            return available_slots
+                for slot in day_slots
+            ]
             
         except Exception as e:
             logger.error(f"Failed to check availability: {str(e)}")
@@ -225,6 +166,121 @@ class BookingFlowService:
                 code="TITHI_AVAILABILITY_ERROR"
             )
     
+    def iter_availability_by_day(self, tenant_id: str, service_id: str,
+                                 start_date: datetime, end_date: datetime,
+                                 team_member_id: Optional[str] = None,
+                                 chunk_days: Optional[int] = None):
+        """
+        Return an iterator of (date, slots) pairs for a service, one per day.
+        
+        The service and team members are resolved before iteration starts so
+        a missing service is reported before any streamed output. Bookings and
+        holds are loaded per chunk of `chunk_days` (the whole range at once
+        when omitted), keeping memory flat for long streamed ranges.
+        """
+        service = Service.query.filter_by(
+            id=service_id, 
+            tenant_id=tenant_id, 
+            active=True
+        ).first()
+        
+        if not service:
+            raise TithiError(
+                message="Service not found",
+                code="TITHI_SERVICE_NOT_FOUND",
+                status_code=404
+            )
+        
+        # Get team members who can perform this service in one query
+        team_member_query = TeamMember.query.filter(
+            TeamMember.tenant_id == tenant_id,
+            TeamMember.is_active == True,
+            TeamMember.deleted_at.is_(None)
+        )
+        if team_member_id:
+            team_member_query = team_member_query.filter(TeamMember.id == team_member_id)
+        else:
+            team_member_query = team_member_query.join(
+                TeamMemberService, TeamMemberService.team_member_id == TeamMember.id
+            ).filter(TeamMemberService.service_id == service.id)
+        team_members = team_member_query.order_by(TeamMember.name).all()
+        
+        return self._iter_day_slots(tenant_id, service, team_members, start_date, end_date, chunk_days)
+    
+    def _iter_day_slots(self, tenant_id: str, service: Service, team_members: List[TeamMember],
+                        start_date: datetime, end_date: datetime, chunk_days: Optional[int]):
+        """Generate per-day slot lists for resolved team members."""
+        # Past days never yield slots, so start the range at today
+        now = datetime.now()
+        current_date = max(start_date.date(), now.date())
+        end_date_only = end_date.date()
+        
+        if not team_members or current_date > end_date_only:
+            return
+        
+        # Load every weekly availability row for these team members at once
+        hours_by_member: Dict[Tuple[Any, int], List[TeamMemberAvailability]] = {}
+        for avail in TeamMemberAvailability.query.filter(
+            TeamMemberAvailability.tenant_id == tenant_id,
+            TeamMemberAvailability.team_member_id.in_([team_member.id for team_member in team_members]),
+            TeamMemberAvailability.is_available == True
+        ).all():
+            hours_by_member.setdefault((avail.team_member_id, avail.day_of_week), []).append(avail)
+        
+        duration = timedelta(minutes=service.duration_min)
+        step = timedelta(minutes=30)
+        chunk = timedelta(days=(chunk_days or (end_date_only - current_date).days + 1) - 1)
+        
+        while current_date <= end_date_only:
+            chunk_end = min(current_date + chunk, end_date_only)
+            
+            # Bookings created by this flow use the team member id as resource id
+            occupancy_index = OccupancyIndex.load(
+                tenant_id,
+                [team_member.id for team_member in team_members],
+                datetime.combine(current_date, datetime.min.time()),
+                datetime.combine(chunk_end + timedelta(days=1), datetime.min.time())
+            )
+            
+            while current_date <= chunk_end:
+                day_of_week = (current_date.weekday() + 1) % 7  # 0=Sunday, 6=Saturday
+                
+                # Collect compact (start, order, end) tuples; dicts are built after sorting
+                compact_slots = []
+                for order, team_member in enumerate(team_members):
+                    occupancy = occupancy_index.for_resource(team_member.id)
+                    
+                    for avail in hours_by_member.get((team_member.id, day_of_week), []):
+                        slot_start = datetime.combine(current_date, avail.start_time)
+                        window_end = datetime.combine(current_date, avail.end_time)
+                        
+                        # Jump straight to the first grid slot after now
+                        if slot_start <= now:
+                            slot_start += step * ((now - slot_start) // step + 1)
+                        
+                        while slot_start + duration <= window_end:
+                            slot_end = slot_start + duration
+                            if occupancy.is_free(slot_start, slot_end):
+                                compact_slots.append((slot_start, order, slot_end))
+                            slot_start += step
+                
+                compact_slots.sort()
+                yield current_date, [
+                    {
+                        'start_time': slot_start.isoformat(),
+                        'end_time': slot_end.isoformat(),
+                        'team_member_id': str(team_members[order].id),
+                        'team_member_name': team_members[order].name,
+                        'service_id': str(service.id),
+                        'service_name': service.name,
+                        'duration_minutes': service.duration_min,
+                        'price_cents': service.price_cents
+                    }
+                    for slot_start, order, slot_end in compact_slots
+                ]
+                
+                current_date += timedelta(days=1)
+    
     def create_booking(self, tenant_id: str, booking_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new booking with customer information and payment.
@@ -335,8 +391,16 @@ class BookingFlowService:
             booking.status = 'pending'
             booking.payment_status = 'pending'
             
+            # Precomputed availability for the booked day(s) is dropped with the booking
+            MaterializedAvailabilityService().mark_stale(
+                tenant_id, booking.resource_id, booking.start_at, booking.end_at
+            )
             self.db.session.commit()
             
+            AvailabilityCacheService().invalidate_availability_range(
+                tenant_id, booking.resource_id, booking.start_at, booking.end_at
+            )
+            
             # Send confirmation notifications
             self._send_booking_confirmation(booking)
             
@@ -508,20 +572,3 @@ class BookingFlowService:
         # This would integrate with notification service
         # For now, just log the confirmation
         logger.info(f"Booking confirmation sent for booking {booking.id}")
-    
-    def _generate_time_slots(self, date, start_time, end_time, duration_minutes):
-        """Generate time slots for a given availability period."""
-        slots = []
-        current_time = datetime.combine(date, start_time)
-        end_datetime = datetime.combine(date, end_time)
-        
-        while current_time + timedelta(minutes=duration_minutes) <= end_datetime:
-            slots.append({
-                'start_time': current_time,
-                'end_time': current_time + timedelta(minutes=duration_minutes)
-            })
-            current_time += timedelta(minutes=30)  # 30-minute intervals
-        
-        return slots
-
-
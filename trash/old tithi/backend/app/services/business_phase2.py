@@ -9,12 +9,15 @@ This module contains comprehensive business logic services for Phase 2:
 """
 
 import uuid
+import json
+import base64
 import logging
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from datetime import datetime, timedelta, timezone, time
-from sqlalchemy import and_, or_, func, text
+from sqlalchemy import and_, or_, func, text, insert, update, tuple_
 from sqlalchemy.orm import joinedload
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from flask import current_app
 from ..extensions import db
 from ..models.business import (
     Customer, Service, Resource, Booking, BookingItem, ServiceResource, CustomerMetrics,
@@ -25,6 +28,9 @@ from ..models.audit import AuditLog, EventOutbox
 from ..models.financial import PaymentMethod, Payment
 from ..models.onboarding import BusinessPolicy
 from .cache import AvailabilityCacheService, BookingHoldCacheService, WaitlistCacheService
+from .occupancy import OccupancyIndex, ResourceOccupancy
+
+logger = logging.getLogger(__name__)
 
 
 class BusinessConfig:
@@ -38,6 +44,27 @@ class BusinessConfig:
     MIN_BOOKING_DURATION_MINUTES = 15
     MAX_BOOKING_DURATION_HOURS = 8
     
+    # Hold expiry (Redis TTLs are whole seconds and may fire slightly early)
+    HOLD_EXPIRY_GRACE_SECONDS = 5
+    
+    # Waiting customers notified per freed slot
+    WAITLIST_MATCH_LIMIT = 3
+    
+    # Booking list page sizes (keyset pagination) and export batch size
+    DEFAULT_BOOKING_PAGE_SIZE = 50
+    MAX_BOOKING_PAGE_SIZE = 200
+    BOOKING_EXPORT_BATCH_SIZE = 500
+    
+    # Longest recurring series create_booking_series accepts
+    MAX_SERIES_OCCURRENCES = 104
+    
+    # Bookings per transaction in bulk admin actions
+    BULK_ACTION_CHUNK_SIZE = 200
+    
+    # Database constraints create_booking relies on (migrations 0008, 0046)
+    BOOKING_OVERLAP_CONSTRAINT = "bookings_excl_resource_time"
+    BOOKING_IDEMPOTENCY_CONSTRAINT = "bookings_idempotency_uniq"
+    
     # Retry settings
     MAX_RETRY_ATTEMPTS = 3
     RETRY_DELAY_SECONDS = 1
@@ -58,6 +85,11 @@ class DatabaseError(Exception):
     pass
 
 
+class BookingConflictError(ValueError):
+    """Raised when a booking overlaps an active booking on the same resource."""
+    pass
+
+
 class BaseService:
     """Base service class with common functionality."""
     
@@ -110,9 +142,9 @@ class BaseService:
             db.session.rollback()
             raise BusinessLogicError(f"Operation failed: {str(e)}")
     
-    def _emit_event(self, tenant_id: uuid.UUID, event_type: str, payload: Dict[str, Any]) -> None:
-        """Emit an event to the outbox for reliable delivery."""
-        outbox_event = EventOutbox(
+    def _outbox_event(self, tenant_id: uuid.UUID, event_type: str, payload: Dict[str, Any]) -> EventOutbox:
+        """Build an outbox row for the caller to write in its own transaction."""
+        return EventOutbox(
             id=uuid.uuid4(),
             tenant_id=tenant_id,
             event_code=event_type,
@@ -122,6 +154,10 @@ class BaseService:
             max_attempts=self.config.MAX_RETRY_ATTEMPTS,
             ready_at=datetime.utcnow()
         )
+    
+    def _emit_event(self, tenant_id: uuid.UUID, event_type: str, payload: Dict[str, Any]) -> None:
+        """Emit an event to the outbox for reliable delivery."""
+        outbox_event = self._outbox_event(tenant_id, event_type, payload)
         db.session.add(outbox_event)
         db.session.commit()
         logging.getLogger(__name__).info(
@@ -133,6 +169,10 @@ class BaseService:
             },
         )
     
+    def _catalog_changed(self, tenant_id: uuid.UUID, catalog: str) -> None:
+        """Move the cache generations (and so the ETags) of a tenant's services or staff."""
+        AvailabilityCacheService().invalidate_catalog(tenant_id, catalog)
+    
     def _log_audit(self, tenant_id: uuid.UUID, table_name: str, record_id: uuid.UUID, 
                    operation: str, user_id: uuid.UUID, old_values: Dict[str, Any] = None, 
                    new_values: Dict[str, Any] = None) -> None:
@@ -196,6 +236,7 @@ class ServiceService(BaseService):
             return service
         
         result = self._safe_db_operation(_create_service)
+        self._catalog_changed(tenant_id, "services")
         
         # Log audit trail
         self._log_audit(tenant_id, "services", service.id, "CREATE", user_id, 
@@ -266,6 +307,7 @@ class ServiceService(BaseService):
             return service
         
         result = self._safe_db_operation(_update_service)
+        self._catalog_changed(tenant_id, "services")
         
         # Log audit trail
         new_values = {k: v for k, v in update_data.items() if k in old_values}
@@ -299,6 +341,7 @@ class ServiceService(BaseService):
             return True
         
         result = self._safe_db_operation(_delete_service)
+        self._catalog_changed(tenant_id, "services")
         
         # Log audit trail
         self._log_audit(tenant_id, "services", service.id, "DELETE", user_id, 
@@ -355,6 +398,7 @@ class ServiceService(BaseService):
             return service_resource
         
         service_resource = self._safe_db_operation(_assign_staff)
+        self._catalog_changed(tenant_id, "services")
         
         # Log audit trail
         self._log_audit(tenant_id, "service_resources", service_resource.id, "CREATE", user_id, 
@@ -379,12 +423,21 @@ class AvailabilityService(BaseService):
     def calculate_availability(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, 
                              start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """Calculate real-time availability from schedules, exceptions, and existing bookings."""
-        # Check Redis cache first
-        date_str = start_date.date().isoformat()
-        cached_availability = self.availability_cache.get_availability(tenant_id, resource_id, date_str)
-        if cached_availability:
-            return cached_availability
-        
+        # Entries are cached per date so a booking change only invalidates the
+        # days it touches; concurrent misses on a range compute it only once
+        day_count = (end_date.date() - start_date.date()).days + 1
+        dates = [(start_date.date() + timedelta(days=offset)).isoformat() for offset in range(day_count)]
+        days = self.availability_cache.get_or_compute_many(
+            self.availability_cache.availability_keys(tenant_id, [(resource_id, date_str) for date_str in dates]),
+            lambda: self._compute_availability_days(tenant_id, resource_id, start_date, end_date, dates),
+            self.availability_cache.default_ttl
+        )
+        return [slot for day_slots in days for slot in day_slots]
+    
+    def _compute_availability_days(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                                   start_date: datetime, end_date: datetime,
+                                   dates: List[str]) -> List[List[Dict[str, Any]]]:
+        """Compute availability for [start_date, end_date] as one slot list per date in dates."""
         # Get resource timezone
         resource = Resource.query.filter_by(tenant_id=tenant_id, id=resource_id).first()
         if not resource:
@@ -400,7 +453,7 @@ class AvailabilityService(BaseService):
         
         if not staff_profile:
             # If no staff profile, use default business hours
-            return self._get_default_availability(start_date, end_date, resource_tz)
+            return self._slots_by_date(self._get_default_availability(start_date, end_date, resource_tz), dates)
         
         # Get work schedules
         schedules = WorkSchedule.query.filter(
@@ -415,26 +468,29 @@ class AvailabilityService(BaseService):
             )
         ).all()
         
-        # Get existing bookings
-        bookings = Booking.query.filter(
-            and_(
-                Booking.tenant_id == tenant_id,
-                Booking.resource_id == resource_id,
-                Booking.status.in_(['pending', 'confirmed', 'checked_in']),
-                Booking.start_at < end_date,
-                Booking.end_at > start_date
-            )
-        ).all()
+        # Load existing bookings and active holds for whole days into the occupancy index
+        occupancy = OccupancyIndex.load(
+            tenant_id,
+            [resource_id],
+            datetime.combine(start_date.date(), time.min),
+            datetime.combine(end_date.date() + timedelta(days=1), time.min)
+        ).for_resource(resource_id)
         
         # Calculate availability slots
         slots = self._generate_availability_slots(
-            start_date, end_date, schedules, bookings, resource_tz
+            start_date, end_date, schedules, occupancy, resource_tz
         )
         
-        # Cache the result in Redis
-        self.availability_cache.set_availability(tenant_id, resource_id, date_str, slots)
-        
-        return slots
+        return self._slots_by_date(slots, dates)
+    
+    @staticmethod
+    def _slots_by_date(slots: List[Dict[str, Any]], dates: List[str]) -> List[List[Dict[str, Any]]]:
+        slots_by_date = {date_str: [] for date_str in dates}
+        for slot in slots:
+            day_slots = slots_by_date.get(slot['start_at'][:10])
+            if day_slots is not None:
+                day_slots.append(slot)
+        return [slots_by_date[date_str] for date_str in dates]
     
     def get_available_slots(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, 
                            start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
@@ -464,75 +520,254 @@ class AvailabilityService(BaseService):
         # Use unified validation that checks StaffAvailability
         return unified_service._is_slot_available(tenant_id, resource_id, start_at, end_at)
     
+    def _invalidate_hold_availability(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                                      start_at: datetime, end_at: datetime) -> None:
+        """Invalidate precomputed, then cached, availability for the dates a hold covers."""
+        from .availability_materialized import MaterializedAvailabilityService
+        materialized = MaterializedAvailabilityService()
+        materialized.drop_stale(tenant_id, {resource_id: materialized.interval_dates(start_at, end_at)})
+        self.availability_cache.invalidate_availability_range(tenant_id, resource_id, start_at, end_at)
+    
+    def _invalidate_holds_availability(self, tenant_id: uuid.UUID,
+                                       intervals: List[Tuple[uuid.UUID, datetime, datetime]]) -> None:
+        """Invalidate availability for many released (resource_id, start_at, end_at) at once, grouped by resource."""
+        from .availability_materialized import MaterializedAvailabilityService
+        resource_dates = MaterializedAvailabilityService.group_dates(intervals)
+        MaterializedAvailabilityService().drop_stale(tenant_id, resource_dates)
+        self.availability_cache.invalidate_availability_dates(tenant_id, resource_dates)
+    
     def create_booking_hold(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, 
                            service_id: uuid.UUID, start_at: datetime, end_at: datetime, 
                            ttl_minutes: int = 15) -> BookingHold:
-        """Create a temporary booking hold with TTL."""
-        # Validate slot availability
+        """
+        Create a temporary booking hold with TTL.
+        
+        The time range is claimed atomically in Redis, so concurrent checkouts
+        for overlapping ranges cannot both succeed; the database row is then
+        written behind by a worker. Without Redis the hold is inserted
+        synchronously as before.
+        """
+        # Validate slot availability against bookings and persisted holds
         if not self.is_time_available(tenant_id, resource_id, start_at, end_at):
             raise BusinessLogicError("Time slot is not available")
         
         # Generate unique hold key
         hold_key = f"{tenant_id}_{resource_id}_{start_at.isoformat()}_{uuid.uuid4().hex[:8]}"
+        hold_until = datetime.utcnow() + timedelta(minutes=ttl_minutes)
+        
+        hold = BookingHold(
+            id=uuid.uuid4(),
+            tenant_id=tenant_id,
+            resource_id=resource_id,
+            service_id=service_id,
+            start_at=start_at,
+            end_at=end_at,
+            hold_until=hold_until,
+            hold_key=hold_key
+        )
         
         # Create hold data for cache
         hold_data = {
+            'id': str(hold.id),
             'resource_id': str(resource_id),
             'service_id': str(service_id),
             'start_at': start_at.isoformat(),
             'end_at': end_at.isoformat(),
-            'hold_until': (datetime.now() + timedelta(minutes=ttl_minutes)).isoformat(),
-            'created_at': datetime.now().isoformat()
+            'hold_until': hold_until.isoformat(),
+            'created_at': datetime.utcnow().isoformat()
         }
         
-        # Store in Redis cache
-        self.hold_cache.create_hold(tenant_id, hold_key, hold_data, ttl_minutes * 60)
+        # Claim the range in Redis; None means Redis is unavailable
+        claimed = self.hold_cache.claim_slot(
+            tenant_id, resource_id, hold_key, start_at, end_at, hold_until, hold_data
+        )
+        if claimed is False:
+            raise BusinessLogicError("Time slot is not available")
+        
+        if claimed:
+            try:
+                from ..jobs.booking_holds import persist_booking_hold
+                persist_booking_hold.delay(str(tenant_id), hold_key)
+                return hold
+            except Exception as e:
+                # Broker unavailable: keep the claim and persist inline instead
+                logger.warning(f"Failed to enqueue hold persistence, writing inline: {str(e)}")
+        else:
+            self.hold_cache.create_hold(tenant_id, hold_key, hold_data, ttl_minutes * 60)
+        
+        try:
+            db.session.add(hold)
+            db.session.commit()
+            self.hold_cache.mark_hold_persisted(tenant_id, hold_key)
+            
+            # Invalidate availability cache for the held dates only
+            self._invalidate_hold_availability(tenant_id, resource_id, start_at, end_at)
+            
+            return hold
+            
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            # Remove from cache on database failure
+            self.hold_cache.release_slot(tenant_id, hold_key)
+            raise DatabaseError(f"Failed to create booking hold: {str(e)}")
+    
+    def persist_booking_hold(self, tenant_id: uuid.UUID, hold_key: str) -> Optional[BookingHold]:
+        """
+        Write a Redis-claimed hold to the database.
+        
+        Idempotent: holds already written are returned as-is, and holds that
+        were released or lapsed before persistence are skipped.
+        """
+        hold = BookingHold.query.filter_by(tenant_id=tenant_id, hold_key=hold_key).first()
+        if hold:
+            self.hold_cache.mark_hold_persisted(tenant_id, hold_key)
+            return hold
+        
+        hold_data = self.hold_cache.get_hold(tenant_id, hold_key)
+        if not hold_data:
+            self.hold_cache.mark_hold_persisted(tenant_id, hold_key)
+            return None
         
-        # Create hold
         hold = BookingHold(
+            id=uuid.UUID(hold_data['id']),
             tenant_id=tenant_id,
-            resource_id=resource_id,
-            service_id=service_id,
-            start_at=start_at,
-            end_at=end_at,
-            hold_until=datetime.now() + timedelta(minutes=ttl_minutes),
+            resource_id=uuid.UUID(hold_data['resource_id']),
+            service_id=uuid.UUID(hold_data['service_id']) if hold_data.get('service_id') else None,
+            start_at=datetime.fromisoformat(hold_data['start_at']),
+            end_at=datetime.fromisoformat(hold_data['end_at']),
+            hold_until=datetime.fromisoformat(hold_data['hold_until']),
             hold_key=hold_key
         )
         
         try:
             db.session.add(hold)
             db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            # A concurrent writer may have won the unique hold key
+            existing = BookingHold.query.filter_by(tenant_id=tenant_id, hold_key=hold_key).first()
+            if not existing:
+                raise DatabaseError(f"Failed to persist booking hold: {str(e)}")
+            hold = existing
+        
+        self.hold_cache.mark_hold_persisted(tenant_id, hold_key)
+        self._invalidate_hold_availability(tenant_id, hold.resource_id, hold.start_at, hold.end_at)
+        return hold
+    
+    def reconcile_booking_holds(self, older_than_seconds: int = 60) -> Dict[str, int]:
+        """Persist claimed holds whose write-behind never completed."""
+        pending = self.hold_cache.get_pending_holds(older_than_seconds)
+        persisted = 0
+        failed = 0
+        
+        for hold_data in pending:
+            try:
+                if self.persist_booking_hold(uuid.UUID(hold_data['tenant_id']), hold_data['hold_key']):
+                    persisted += 1
+            except DatabaseError as e:
+                failed += 1
+                logger.error(f"Failed to reconcile booking hold {hold_data['hold_key']}: {str(e)}")
+        
+        return {'pending': len(pending), 'persisted': persisted, 'failed': failed}
+    
+    def sweep_expired_holds(self, batch_size: int = 500, max_batches: int = 100) -> Dict[str, int]:
+        """
+        Delete expired holds in bounded batches.
+        
+        Each batch selects a chunk of expired rows, deletes them by id and
+        commits, so the sweep never holds long locks on booking_holds. Each
+        batch then invalidates availability once per tenant, for just the
+        dates its deleted holds covered on each resource.
+        """
+        now = datetime.utcnow()
+        deleted = 0
+        batches = 0
+        
+        while batches < max_batches:
+            expired = db.session.query(
+                BookingHold.id, BookingHold.tenant_id, BookingHold.resource_id,
+                BookingHold.start_at, BookingHold.end_at
+            ).filter(
+                BookingHold.hold_until <= now
+            ).order_by(BookingHold.hold_until).limit(batch_size).all()
+            
+            if not expired:
+                break
+            
+            try:
+                db.session.query(BookingHold).filter(
+                    BookingHold.id.in_([row.id for row in expired])
+                ).delete(synchronize_session=False)
+                db.session.commit()
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                raise DatabaseError(f"Failed to sweep expired holds: {str(e)}")
             
-            # Invalidate availability cache
-            self.availability_cache.invalidate_availability(tenant_id, resource_id)
+            intervals_by_tenant = {}
+            for row in expired:
+                intervals_by_tenant.setdefault(row.tenant_id, []).append((row.resource_id, row.start_at, row.end_at))
+            for tenant_id, intervals in intervals_by_tenant.items():
+                self._invalidate_holds_availability(tenant_id, intervals)
             
-            return hold
+            for row in expired:
+                self.notify_waitlist_for_freed_slot(row.tenant_id, row.resource_id, row.start_at, row.end_at)
             
+            deleted += len(expired)
+            batches += 1
+            if len(expired) < batch_size:
+                break
+        
+        return {'deleted': deleted, 'batches': batches}
+    
+    def release_expired_hold(self, tenant_id: uuid.UUID, hold_key: str) -> bool:
+        """
+        Delete a hold whose Redis TTL has fired.
+        
+        Only rows at (or within a few seconds of) their hold_until are removed,
+        since Redis TTLs are whole seconds and may fire marginally early.
+        """
+        hold = BookingHold.query.filter(
+            and_(
+                BookingHold.tenant_id == tenant_id,
+                BookingHold.hold_key == hold_key,
+                BookingHold.hold_until <= datetime.utcnow() + timedelta(seconds=self.config.HOLD_EXPIRY_GRACE_SECONDS)
+            )
+        ).first()
+        
+        if not hold:
+            return False
+        
+        try:
+            db.session.delete(hold)
+            db.session.commit()
         except SQLAlchemyError as e:
             db.session.rollback()
-            # Remove from cache on database failure
-            self.hold_cache.release_hold(tenant_id, hold_key)
-            raise DatabaseError(f"Failed to create booking hold: {str(e)}")
+            raise DatabaseError(f"Failed to release expired hold: {str(e)}")
+        
+        self._invalidate_hold_availability(tenant_id, hold.resource_id, hold.start_at, hold.end_at)
+        self.notify_waitlist_for_freed_slot(tenant_id, hold.resource_id, hold.start_at, hold.end_at)
+        return True
     
     def release_booking_hold(self, tenant_id: uuid.UUID, hold_key: str) -> bool:
         """Release a booking hold."""
+        # Drop the Redis claim first so the range is bookable immediately
+        released = self.hold_cache.release_slot(tenant_id, hold_key)
+        
         hold = BookingHold.query.filter_by(
             tenant_id=tenant_id,
             hold_key=hold_key
         ).first()
         
         if not hold:
-            return False
-        
-        # Remove from Redis cache
-        self.hold_cache.release_hold(tenant_id, hold_key)
+            # Claimed but not yet written behind; the worker will skip it
+            return released is not None
         
         try:
             db.session.delete(hold)
             db.session.commit()
             
-            # Invalidate availability cache
-            self.availability_cache.invalidate_availability(tenant_id, hold.resource_id)
+            # Invalidate availability cache for the released dates only
+            self._invalidate_hold_availability(tenant_id, hold.resource_id, hold.start_at, hold.end_at)
             
             return True
             
@@ -569,16 +804,134 @@ class AvailabilityService(BaseService):
             db.session.add(waitlist_entry)
             db.session.commit()
             
+            # Index by resource and preferred window for slot matching
+            self.waitlist_cache.index_waitlist_entry(tenant_id, waitlist_entry)
+            
             return waitlist_entry
             
         except SQLAlchemyError as e:
             db.session.rollback()
             raise DatabaseError(f"Failed to add to waitlist: {str(e)}")
     
+    def match_waitlist(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                       start_at: datetime, end_at: datetime,
+                       limit: Optional[int] = None) -> List[WaitlistEntry]:
+        """
+        Notify the best waiting customers about a freed slot.
+        
+        Nothing is notified unless the slot is actually free: a hold that
+        became a booking, or a range still covered by another booking or
+        hold, is not offered. Candidates whose preferred window contains the
+        slot are read from the Redis waitlist index (falling back to an
+        indexed database query), the top entries by priority and age are
+        marked notified, and a NOTIFY_WAITLIST_SLOT_AVAILABLE event is queued
+        for each in one commit.
+        """
+        if start_at <= datetime.now():
+            return []
+        
+        occupancy = OccupancyIndex.load(tenant_id, [resource_id], start_at, end_at)
+        if not occupancy.is_free(resource_id, start_at, end_at):
+            return []
+        
+        limit = limit or self.config.WAITLIST_MATCH_LIMIT
+        candidate_ids = self.waitlist_cache.find_waitlist_candidates(
+            tenant_id, resource_id, start_at, end_at, limit
+        )
+        
+        if candidate_ids is None:
+            entries = WaitlistEntry.query.filter(
+                and_(
+                    WaitlistEntry.tenant_id == tenant_id,
+                    WaitlistEntry.resource_id == resource_id,
+                    WaitlistEntry.status == 'waiting',
+                    or_(WaitlistEntry.preferred_start_at.is_(None), WaitlistEntry.preferred_start_at <= start_at),
+                    or_(WaitlistEntry.preferred_end_at.is_(None), WaitlistEntry.preferred_end_at >= end_at),
+                    or_(WaitlistEntry.expires_at.is_(None), WaitlistEntry.expires_at > datetime.now())
+                )
+            ).order_by(WaitlistEntry.priority.desc(), WaitlistEntry.created_at).limit(limit).all()
+            # The index is missing or incomplete; rebuild it so later slots use it
+            if self.waitlist_cache.redis_client:
+                self.rebuild_waitlist_index(tenant_id, resource_id)
+        elif candidate_ids:
+            rank = {entry_id: position for position, entry_id in enumerate(candidate_ids)}
+            entries = WaitlistEntry.query.filter(
+                and_(
+                    WaitlistEntry.tenant_id == tenant_id,
+                    WaitlistEntry.id.in_([uuid.UUID(entry_id) for entry_id in candidate_ids]),
+                    WaitlistEntry.status == 'waiting'
+                )
+            ).all()
+            entries.sort(key=lambda entry: rank[str(entry.id)])
+        else:
+            return []
+        
+        if not entries:
+            return []
+        
+        notified_at = datetime.utcnow()
+        try:
+            for entry in entries:
+                entry.status = 'notified'
+                entry.notified_at = notified_at
+                db.session.add(EventOutbox(
+                    id=uuid.uuid4(),
+                    tenant_id=tenant_id,
+                    event_code="NOTIFY_WAITLIST_SLOT_AVAILABLE",
+                    payload={
+                        'waitlist_entry_id': str(entry.id),
+                        'customer_id': str(entry.customer_id),
+                        'resource_id': str(resource_id),
+                        'service_id': str(entry.service_id) if entry.service_id else None,
+                        'start_at': start_at.isoformat(),
+                        'end_at': end_at.isoformat()
+                    },
+                    status="ready",
+                    attempts=0,
+                    max_attempts=self.config.MAX_RETRY_ATTEMPTS,
+                    ready_at=notified_at
+                ))
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseError(f"Failed to notify waitlist: {str(e)}")
+        
+        self.waitlist_cache.unindex_waitlist_entries(tenant_id, entries)
+        logger.info("Waitlist matched freed slot", extra={
+            'tenant_id': str(tenant_id),
+            'resource_id': str(resource_id),
+            'notified': len(entries)
+        })
+        return entries
+    
+    def rebuild_waitlist_index(self, tenant_id: uuid.UUID, resource_id: uuid.UUID) -> int:
+        """Index a resource's waiting entries from the database; returns how many were indexed."""
+        entries = WaitlistEntry.query.filter(
+            and_(
+                WaitlistEntry.tenant_id == tenant_id,
+                WaitlistEntry.resource_id == resource_id,
+                WaitlistEntry.status == 'waiting',
+                or_(WaitlistEntry.expires_at.is_(None), WaitlistEntry.expires_at > datetime.now())
+            )
+        ).all()
+        
+        if not self.waitlist_cache.rebuild_waitlist_index(tenant_id, resource_id, entries):
+            return 0
+        return len(entries)
+    
+    def notify_waitlist_for_freed_slot(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                                       start_at: datetime, end_at: datetime) -> int:
+        """Match a freed slot against the waitlist without failing the caller."""
+        try:
+            return len(self.match_waitlist(tenant_id, resource_id, start_at, end_at))
+        except Exception as e:
+            logger.error(f"Failed to match waitlist for freed slot: {str(e)}")
+            return 0
+    
     def _generate_availability_slots(self, start_date: datetime, end_date: datetime, 
-                                   schedules: List[WorkSchedule], bookings: List[Booking], 
+                                   schedules: List[WorkSchedule], occupancy: ResourceOccupancy, 
                                    resource_tz: timezone) -> List[Dict[str, Any]]:
-        """Generate availability slots based on schedules and existing bookings."""
+        """Generate availability slots based on schedules and resource occupancy."""
         slots = []
         current_date = start_date.date()
         end_date_only = end_date.date()
@@ -589,12 +942,9 @@ class AvailabilityService(BaseService):
                            s.start_date <= current_date and 
                            (s.end_date is None or s.end_date >= current_date)]
             
-            # Get bookings for this date
-            day_bookings = [b for b in bookings if b.start_at.date() == current_date]
-            
             # Generate slots for this day
             day_slots = self._generate_day_slots(
-                current_date, day_schedules, day_bookings, resource_tz
+                current_date, day_schedules, occupancy, resource_tz
             )
             slots.extend(day_slots)
             
@@ -603,7 +953,7 @@ class AvailabilityService(BaseService):
         return slots
     
     def _generate_day_slots(self, date: datetime.date, schedules: List[WorkSchedule], 
-                          bookings: List[Booking], resource_tz: timezone) -> List[Dict[str, Any]]:
+                          occupancy: ResourceOccupancy, resource_tz: timezone) -> List[Dict[str, Any]]:
         """Generate availability slots for a specific day."""
         slots = []
         
@@ -627,11 +977,8 @@ class AvailabilityService(BaseService):
                 slot_start = datetime.combine(date, datetime.min.time().replace(hour=current_hour))
                 slot_end = slot_start + timedelta(hours=1)
                 
-                # Check if slot conflicts with existing bookings
-                is_available = not any(
-                    b.start_at < slot_end and b.end_at > slot_start
-                    for b in bookings
-                )
+                # Check if slot conflicts with existing bookings or holds
+                is_available = occupancy.is_free(slot_start, slot_end)
                 
                 slots.append({
                     'start_at': slot_start.isoformat(),
@@ -694,8 +1041,65 @@ class AvailabilityService(BaseService):
 
     def get_availability_summary(self, tenant_id: uuid.UUID, start_date: datetime, 
                                end_date: datetime, staff_ids: List[uuid.UUID] = None) -> Dict[str, Any]:
-        """Get availability summary for a date range."""
-        # Implementation to calculate availability summary
+        """
+        Get availability summary for a date range.
+        
+        Weekly rule hours and booking counts are aggregated per staff member
+        in one grouped statement, and the result is cached per tenant, range
+        and staff filter until any availability for the tenant changes.
+        """
+        return self.availability_cache.get_or_compute(
+            self.availability_cache.summary_key(
+                tenant_id, start_date.isoformat(), end_date.isoformat(), staff_ids
+            ),
+            lambda: self._compute_availability_summary(tenant_id, start_date, end_date, staff_ids),
+            self.availability_cache.default_ttl
+        )
+    
+    def _compute_availability_summary(self, tenant_id: uuid.UUID, start_date: datetime,
+                                      end_date: datetime, staff_ids: Optional[List[uuid.UUID]]) -> Dict[str, Any]:
+        def seconds_of_day(column):
+            return (func.extract('hour', column) * 3600 + func.extract('minute', column) * 60 +
+                    func.extract('second', column))
+        
+        rules = db.session.query(
+            StaffAvailability.staff_profile_id.label('staff_profile_id'),
+            func.sum(
+                seconds_of_day(StaffAvailability.end_time) - seconds_of_day(StaffAvailability.start_time)
+            ).label('rule_seconds'),
+            func.count(StaffAvailability.id).label('rule_count')
+        ).filter(
+            StaffAvailability.tenant_id == tenant_id,
+            StaffAvailability.is_active == True
+        ).group_by(StaffAvailability.staff_profile_id).subquery()
+        
+        bookings = db.session.query(
+            Booking.resource_id.label('resource_id'),
+            func.count(Booking.id).label('bookings_count')
+        ).filter(
+            Booking.tenant_id == tenant_id,
+            Booking.start_at >= start_date,
+            Booking.start_at <= end_date,
+            Booking.status.in_(['confirmed', 'checked_in'])
+        ).group_by(Booking.resource_id).subquery()
+        
+        query = db.session.query(
+            StaffProfile.id,
+            StaffProfile.display_name,
+            func.coalesce(rules.c.rule_seconds, 0),
+            func.coalesce(rules.c.rule_count, 0),
+            func.coalesce(bookings.c.bookings_count, 0)
+        ).outerjoin(
+            rules, rules.c.staff_profile_id == StaffProfile.id
+        ).outerjoin(
+            bookings, bookings.c.resource_id == StaffProfile.resource_id
+        ).filter(StaffProfile.tenant_id == tenant_id)
+        
+        if staff_ids:
+            query = query.filter(StaffProfile.id.in_(staff_ids))
+        else:
+            query = query.filter(StaffProfile.is_active == True)
+        
         summary = {
             "total_hours": 0,
             "available_slots": 0,
@@ -703,57 +1107,18 @@ class AvailabilityService(BaseService):
             "staff_summary": []
         }
         
-        # Get staff profiles
-        if staff_ids:
-            staff_profiles = StaffProfile.query.filter(
-                StaffProfile.tenant_id == tenant_id,
-                StaffProfile.id.in_(staff_ids)
-            ).all()
-        else:
-            staff_profiles = StaffProfile.query.filter_by(
-                tenant_id=tenant_id,
-                is_active=True
-            ).all()
-        
-        # Calculate summary for each staff member
-        for staff in staff_profiles:
-            # Get availability rules for this staff
-            availability_rules = StaffAvailability.query.filter_by(
-                tenant_id=tenant_id,
-                staff_profile_id=staff.id,
-                is_active=True
-            ).all()
-            
-            # Calculate total hours
-            total_hours = 0
-            for rule in availability_rules:
-                start_time = rule.start_time
-                end_time = rule.end_time
-                hours = (datetime.combine(datetime.min.date(), end_time) - 
-                        datetime.combine(datetime.min.date(), start_time)).total_seconds() / 3600
-                total_hours += hours
-            
-            # Get bookings for this staff in the date range
-            bookings = Booking.query.filter(
-                and_(
-                    Booking.tenant_id == tenant_id,
-                    Booking.resource_id == staff.resource_id,
-                    Booking.start_at >= start_date,
-                    Booking.start_at <= end_date,
-                    Booking.status.in_(['confirmed', 'checked_in'])
-                )
-            ).count()
-            
+        for staff_id, display_name, rule_seconds, rule_count, bookings_count in query.order_by(StaffProfile.display_name).all():
+            total_hours = float(rule_seconds) / 3600
             summary["staff_summary"].append({
-                "staff_id": str(staff.id),
-                "staff_name": staff.display_name,
+                "staff_id": str(staff_id),
+                "staff_name": display_name,
                 "total_hours": total_hours,
-                "days_available": len(availability_rules),
-                "bookings_count": bookings
+                "days_available": int(rule_count),
+                "bookings_count": int(bookings_count)
             })
             
             summary["total_hours"] += total_hours
-            summary["booked_slots"] += bookings
+            summary["booked_slots"] += int(bookings_count)
         
         return summary
     
@@ -850,6 +1215,7 @@ class StaffService(BaseService):
         try:
             db.session.add(staff_profile)
             db.session.commit()
+            self._catalog_changed(tenant_id, "staff")
             
             # Log assignment history
             self._log_assignment_change(
@@ -906,6 +1272,7 @@ class StaffService(BaseService):
         
         try:
             db.session.commit()
+            self._catalog_changed(tenant_id, "staff")
             
             # Log assignment history
             new_values = {k: v for k, v in updates.items() if k in old_values}
@@ -951,6 +1318,7 @@ class StaffService(BaseService):
             
             db.session.delete(staff_profile)
             db.session.commit()
+            self._catalog_changed(tenant_id, "staff")
             
             return True
             
@@ -1102,6 +1470,12 @@ class StaffService(BaseService):
 class StaffAvailabilityService(BaseService):
     """Service for staff availability management (Task 4.2)."""
     
+    def _working_hours_changed(self, tenant_id: uuid.UUID, staff_profile: StaffProfile) -> None:
+        """Drop precomputed availability for a staff member's resource."""
+        from .availability_materialized import MaterializedAvailabilityService
+        MaterializedAvailabilityService().drop_stale(tenant_id, {staff_profile.resource_id: None})
+        AvailabilityCacheService().invalidate_availability(tenant_id, staff_profile.resource_id)
+    
     def create_availability(self, tenant_id: uuid.UUID, staff_profile_id: uuid.UUID, 
                           availability_data: Dict[str, Any], user_id: uuid.UUID) -> StaffAvailability:
         """Create or update staff availability for a specific weekday."""
@@ -1162,10 +1536,12 @@ class StaffAvailabilityService(BaseService):
             
             try:
                 db.session.commit()
-                return existing_availability
             except SQLAlchemyError as e:
                 db.session.rollback()
                 raise DatabaseError(f"Failed to update staff availability: {str(e)}")
+            
+            self._working_hours_changed(tenant_id, staff_profile)
+            return existing_availability
         else:
             # Create new availability
             availability = StaffAvailability(
@@ -1181,6 +1557,7 @@ class StaffAvailabilityService(BaseService):
             try:
                 db.session.add(availability)
                 db.session.commit()
+                self._working_hours_changed(tenant_id, staff_profile)
                 
                 # Log audit
                 self._log_audit(
@@ -1240,13 +1617,21 @@ class StaffAvailabilityService(BaseService):
             new_values=None
         )
         
+        staff_profile = StaffProfile.query.filter_by(
+            tenant_id=tenant_id,
+            id=staff_profile_id
+        ).first()
+        
         try:
             db.session.delete(availability)
             db.session.commit()
-            return True
         except SQLAlchemyError as e:
             db.session.rollback()
             raise DatabaseError(f"Failed to delete staff availability: {str(e)}")
+        
+        if staff_profile:
+            self._working_hours_changed(tenant_id, staff_profile)
+        return True
     
     def get_available_slots(self, tenant_id: uuid.UUID, staff_profile_id: uuid.UUID, 
                           start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
@@ -1260,71 +1645,195 @@ class StaffAvailabilityService(BaseService):
         if not staff_profile:
             raise ValueError("Staff profile not found")
         
-        # Get all availability for this staff member
-        availability_records = self.get_staff_availability(tenant_id, staff_profile_id)
-        
-        if not availability_records:
-            return []
+        # Read precomputed free windows, computing missing days live
+        from .availability_materialized import MaterializedAvailabilityService, iter_slots
+        day_windows = MaterializedAvailabilityService().get_day_windows(
+            tenant_id, [staff_profile.resource_id], start_date.date(), end_date.date()
+        )
+        timezone_str = staff_profile.resource.tz if staff_profile.resource else 'UTC'
         
-        # Convert availability to time slots for the date range
+        # Create 30-minute slots (configurable) inside free windows
+        slot_duration = timedelta(minutes=30)
         slots = []
         current_date = start_date.date()
         end_date_only = end_date.date()
         
         while current_date <= end_date_only:
-            weekday = current_date.isoweekday()  # 1=Monday, 7=Sunday
-            
-            # Find availability for this weekday
-            availability = next(
-                (av for av in availability_records if av.weekday == weekday), 
-                None
-            )
+            windows = day_windows.get((staff_profile.resource_id, current_date))
             
-            if availability:
-                # Create time slots for this day
-                day_slots = self._create_day_slots(
-                    current_date, 
-                    availability.start_time, 
-                    availability.end_time,
-                    staff_profile.resource.tz if staff_profile.resource else 'UTC'
-                )
-                slots.extend(day_slots)
+            for slot_start, slot_end in iter_slots(windows, slot_duration, slot_duration):
+                slots.append({
+                    "start_at": slot_start.isoformat(),
+                    "end_at": slot_end.isoformat(),
+                    "date": current_date.isoformat(),
+                    "weekday": current_date.isoweekday(),
+                    "timezone": timezone_str
+                })
             
             current_date += timedelta(days=1)
         
         return slots
+
+
+class BookingService(BaseService):
+    """Service for booking lifecycle management (Module G)."""
     
-    def _create_day_slots(self, date: datetime.date, start_time: time, end_time: time, 
-                         timezone_str: str) -> List[Dict[str, Any]]:
-        """Create time slots for a specific day."""
-        slots = []
+    def __init__(self):
+        super().__init__()
+        self.availability_cache = AvailabilityCacheService()
+    
+    def _invalidate_booking_availability(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                                         start_at: datetime, end_at: datetime) -> None:
+        """
+        Invalidate cached and precomputed availability for the dates a committed booking change touched.
+        
+        The precomputed rows are dropped, and the drop committed, before the
+        cache generations move, so no reader can cache a dropped row under
+        the new generation.
+        """
+        from .availability_materialized import MaterializedAvailabilityService
+        materialized = MaterializedAvailabilityService()
+        materialized.drop_stale(tenant_id, {resource_id: materialized.interval_dates(start_at, end_at)})
+        self.availability_cache.invalidate_availability_range(tenant_id, resource_id, start_at, end_at)
+    
+    def _invalidate_bookings_availability(self, tenant_id: uuid.UUID,
+                                          intervals: List[Tuple[uuid.UUID, datetime, datetime]]) -> None:
+        """Invalidate availability for many (resource_id, start_at, end_at) at once, grouped by resource."""
+        from .availability_materialized import MaterializedAvailabilityService
+        resource_dates = MaterializedAvailabilityService.group_dates(intervals)
+        MaterializedAvailabilityService().drop_stale(tenant_id, resource_dates)
+        self.availability_cache.invalidate_availability_dates(tenant_id, resource_dates)
+    
+    def _stage_metrics_delta(self, tenant_id: uuid.UUID, booking: Booking, previous_status: str) -> None:
+        """Add the customer metrics delta of a status transition to the current transaction."""
+        from .customer_metrics import CustomerMetricsService
+        metrics_delta = CustomerMetricsService().delta_event(tenant_id, booking, previous_status)
+        if metrics_delta is not None:
+            db.session.add(metrics_delta)
+    
+    def _overlap_enforced_by_database(self) -> bool:
+        """Whether the bookings exclusion constraint, not a query, rejects overlaps."""
+        mode = current_app.config.get('BOOKING_OVERLAP_ENFORCEMENT', 'auto')
+        if mode == 'auto':
+            return db.engine.dialect.name == 'postgresql'
+        return mode == 'constraint'
+    
+    def _find_idempotent_booking(self, tenant_id: uuid.UUID, client_generated_id: str) -> Optional[Booking]:
+        """Return the booking already created under client_generated_id, if any."""
+        existing_booking = Booking.query.filter_by(
+            tenant_id=tenant_id,
+            client_generated_id=client_generated_id
+        ).first()
         
-        # Convert date and times to datetime objects
-        start_datetime = datetime.combine(date, start_time)
-        end_datetime = datetime.combine(date, end_time)
+        if existing_booking:
+            logger.info("Idempotent booking creation - returning existing booking", extra={
+                'tenant_id': str(tenant_id),
+                'booking_id': str(existing_booking.id),
+                'client_generated_id': client_generated_id,
+                'event_type': 'BOOKING_IDEMPOTENT_RETURN',
+                'service_id': (existing_booking.service_snapshot or {}).get('service_id'),
+                'customer_id': str(existing_booking.customer_id)
+            })
         
-        # Create 30-minute slots (configurable)
-        slot_duration = timedelta(minutes=30)
-        current_slot = start_datetime
+        return existing_booking
+    
+    def _check_bookable(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                        start_at: datetime, end_at: datetime) -> None:
+        """
+        Check working hours and active holds for a booking in a single query.
+        
+        Overlapping bookings are left to the exclusion constraint; holds live
+        in their own table, so they are checked here as in the query path.
+        """
+        held = db.session.query(BookingHold.id).filter(
+            BookingHold.tenant_id == tenant_id,
+            BookingHold.resource_id == resource_id,
+            BookingHold.hold_until > datetime.utcnow(),
+            BookingHold.start_at < end_at,
+            BookingHold.end_at > start_at
+        ).exists()
+        
+        row = db.session.query(
+            StaffAvailability.start_time, StaffAvailability.end_time, held.label('held')
+        ).select_from(StaffProfile).outerjoin(
+            StaffAvailability,
+            and_(
+                StaffAvailability.tenant_id == tenant_id,
+                StaffAvailability.staff_profile_id == StaffProfile.id,
+                StaffAvailability.weekday == start_at.isoweekday(),
+                StaffAvailability.is_active == True
+            )
+        ).filter(
+            StaffProfile.tenant_id == tenant_id,
+            StaffProfile.resource_id == resource_id,
+            StaffProfile.is_active == True
+        ).first()
         
-        while current_slot + slot_duration <= end_datetime:
-            slots.append({
-                "start_at": current_slot.isoformat(),
-                "end_at": (current_slot + slot_duration).isoformat(),
-                "date": date.isoformat(),
-                "weekday": date.isoweekday(),
-                "timezone": timezone_str
-            })
-            current_slot += slot_duration
+        if not row:
+            raise ValueError("Staff member not found or inactive")
         
-        return slots
-
-
-class BookingService(BaseService):
-    """Service for booking lifecycle management (Module G)."""
+        if row.start_time is None or row.held:
+            raise ValueError("Selected time is not available or outside staff availability")
+        
+        booking_date = start_at.date()
+        if (start_at < datetime.combine(booking_date, row.start_time, tzinfo=start_at.tzinfo) or
+                end_at > datetime.combine(booking_date, row.end_time, tzinfo=end_at.tzinfo)):
+            raise ValueError("Selected time is not available or outside staff availability")
+    
+    def _insert_booking_optimistically(self, tenant_id: uuid.UUID, booking: Booking,
+                                       *related: db.Model) -> Tuple[Booking, bool]:
+        """
+        Insert a booking in one write and let database constraints arbitrate.
+        
+        The exclusion constraint rejects overlaps atomically, even between
+        concurrent requests, and the idempotency constraint turns a replayed
+        client_generated_id into a lookup of the stored booking. Rows in
+        related (e.g. outbox events) are written, and the precomputed
+        availability of the booked dates dropped, in the same transaction.
+        
+        Returns:
+            The booking and whether this call created it
+        """
+        from .availability_materialized import MaterializedAvailabilityService
+        
+        client_generated_id = booking.client_generated_id
+        self._check_bookable(tenant_id, booking.resource_id, booking.start_at, booking.end_at)
+        
+        db.session.add_all([booking, *related])
+        try:
+            # The drop's autoflush is what writes the booking, so conflicts surface here too
+            MaterializedAvailabilityService().mark_stale(
+                tenant_id, booking.resource_id, booking.start_at, booking.end_at
+            )
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            constraint_name = getattr(getattr(e.orig, 'diag', None), 'constraint_name', None)
+            
+            if constraint_name == self.config.BOOKING_OVERLAP_CONSTRAINT:
+                raise BookingConflictError("Booking time conflicts with existing booking")
+            
+            if constraint_name == self.config.BOOKING_IDEMPOTENCY_CONSTRAINT:
+                existing_booking = self._find_idempotent_booking(tenant_id, client_generated_id)
+                if existing_booking:
+                    return existing_booking, False
+            
+            raise DatabaseError(f"Database operation failed: {str(e)}")
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseError(f"Database operation failed: {str(e)}")
+        
+        return booking, True
     
     def create_booking(self, tenant_id: uuid.UUID, booking_data: Dict[str, Any], user_id: uuid.UUID) -> Booking:
-        """Create a new booking with validation."""
+        """
+        Create a new booking with validation.
+        
+        When the database enforces overlaps (PostgreSQL by default, see
+        BOOKING_OVERLAP_ENFORCEMENT) the booking is inserted optimistically
+        after a single read; overlap and idempotency constraint violations
+        become a BookingConflictError or the stored booking.
+        """
         # Handle customer creation/upsert if customer data is provided instead of customer_id
         customer_id = booking_data.get('customer_id')
         if not customer_id and 'customer' in booking_data:
@@ -1373,78 +1882,84 @@ class BookingService(BaseService):
             # Generate idempotency key if not provided
             client_generated_id = f"booking_{tenant_id}_{uuid.uuid4()}"
         
-        # Check for existing booking with same idempotency key
-        existing_booking = Booking.query.filter_by(
-            tenant_id=tenant_id,
-            client_generated_id=client_generated_id
-        ).first()
-        
-        if existing_booking:
-            logger.info("Idempotent booking creation - returning existing booking", extra={
-                'tenant_id': str(tenant_id),
-                'booking_id': str(existing_booking.id),
-                'client_generated_id': client_generated_id,
-                'event_type': 'BOOKING_IDEMPOTENT_RETURN',
-                'service_id': str(service.id),
-                'customer_id': str(booking_data.get('customer_id', ''))
-            })
-            return existing_booking
-        
-        # Check for overlapping bookings first
-        existing_booking = Booking.query.filter(
-            and_(
-                Booking.tenant_id == tenant_id,
-                Booking.resource_id == booking_data['resource_id'],
-                Booking.status.in_(['confirmed', 'checked_in']),
-                or_(
-                    and_(Booking.start_at < end_at, Booking.end_at > start_at)
-                )
-            )
-        ).first()
-        
-        if existing_booking:
-            raise ValueError("Booking time conflicts with existing booking")
-        
-        # Enhanced availability validation using unified service
-        from .availability_unified import UnifiedAvailabilityService
-        unified_availability = UnifiedAvailabilityService()
-        
-        # Get staff profile for validation
-        staff_profile = StaffProfile.query.filter_by(
+        booking = Booking(
+            id=uuid.uuid4(),
             tenant_id=tenant_id,
+            customer_id=customer_id,
             resource_id=booking_data['resource_id'],
-            is_active=True
-        ).first()
-        
-        if not staff_profile:
-            raise ValueError("Staff member not found or inactive")
+            client_generated_id=client_generated_id,
+            service_snapshot=service_snapshot,
+            start_at=start_at,
+            end_at=end_at,
+            booking_tz=booking_data.get('booking_tz', 'UTC'),
+            status='pending',
+            attendee_count=booking_data.get('attendee_count', 1)
+        )
         
-        # Validate booking is within staff availability + service duration + buffers
-        if not unified_availability.validate_booking_availability(
-            tenant_id, booking_data['service_id'], staff_profile.id, start_at, end_at
-        ):
-            raise ValueError("Selected time is not available or outside staff availability")
+        # The creation event and the customer metrics delta commit with the booking
+        from .customer_metrics import CustomerMetricsService
+        from .availability_materialized import MaterializedAvailabilityService
+        metrics_delta = CustomerMetricsService().delta_event(tenant_id, booking)
+        created_event = self._outbox_event(tenant_id, "BOOKING_CREATED", {
+            "booking_id": str(booking.id),
+            "customer_id": str(booking.customer_id),
+            "service_id": service_snapshot['service_id'],
+            "resource_id": str(booking.resource_id),
+            "start_at": start_at.isoformat(),
+            "end_at": end_at.isoformat(),
+            "status": booking.status
+        })
         
-        def _create_booking():
-            # Create booking
-            booking = Booking(
-                id=uuid.uuid4(),
+        if self._overlap_enforced_by_database():
+            result, created = self._insert_booking_optimistically(tenant_id, booking, metrics_delta, created_event)
+            if not created:
+                return result
+        else:
+            existing_booking = self._find_idempotent_booking(tenant_id, client_generated_id)
+            if existing_booking:
+                return existing_booking
+            
+            # Check for overlapping bookings first
+            existing_booking = Booking.query.filter(
+                and_(
+                    Booking.tenant_id == tenant_id,
+                    Booking.resource_id == booking_data['resource_id'],
+                    Booking.status.in_(['confirmed', 'checked_in']),
+                    or_(
+                        and_(Booking.start_at < end_at, Booking.end_at > start_at)
+                    )
+                )
+            ).first()
+            
+            if existing_booking:
+                raise BookingConflictError("Booking time conflicts with existing booking")
+            
+            # Enhanced availability validation using unified service
+            from .availability_unified import UnifiedAvailabilityService
+            unified_availability = UnifiedAvailabilityService()
+            
+            # Get staff profile for validation
+            staff_profile = StaffProfile.query.filter_by(
                 tenant_id=tenant_id,
-                customer_id=customer_id,
                 resource_id=booking_data['resource_id'],
-                client_generated_id=client_generated_id or str(uuid.uuid4()),
-                service_snapshot=service_snapshot,
-                start_at=start_at,
-                end_at=end_at,
-                booking_tz=booking_data.get('booking_tz', 'UTC'),
-                status='pending',
-                attendee_count=booking_data.get('attendee_count', 1)
-            )
+                is_active=True
+            ).first()
             
-            db.session.add(booking)
-            return booking
-        
-        result = self._safe_db_operation(_create_booking)
+            if not staff_profile:
+                raise ValueError("Staff member not found or inactive")
+            
+            # Validate booking is within staff availability + service duration + buffers
+            if not unified_availability.validate_booking_availability(
+                tenant_id, booking_data['service_id'], staff_profile.id, start_at, end_at
+            ):
+                raise ValueError("Selected time is not available or outside staff availability")
+            
+            def _create_booking():
+                db.session.add_all([booking, metrics_delta, created_event])
+                MaterializedAvailabilityService().mark_stale(tenant_id, booking.resource_id, start_at, end_at)
+                return booking
+            
+            result = self._safe_db_operation(_create_booking)
         
         # Log booking creation with structured data
         logger.info("Booking created successfully", extra={
@@ -1461,68 +1976,185 @@ class BookingService(BaseService):
             'amount_cents': result.service_snapshot.get('price_cents', 0)
         })
         
-        # Update customer metrics
-        self._update_customer_metrics(tenant_id, result.customer_id, result)
-        
-        # Emit outbox event for booking creation
-        self._emit_event(tenant_id, "BOOKING_CREATED", {
-            "booking_id": str(result.id),
-            "customer_id": str(result.customer_id),
-            "service_id": result.service_snapshot.get('service_id'),
-            "resource_id": str(result.resource_id),
-            "start_at": result.start_at.isoformat(),
-            "end_at": result.end_at.isoformat(),
-            "status": result.status
-        })
+        # Precomputed rows were dropped in the booking's transaction; only the cache remains
+        self.availability_cache.invalidate_availability_range(tenant_id, result.resource_id, result.start_at, result.end_at)
         
         return result
     
-    def _update_customer_metrics(self, tenant_id: uuid.UUID, customer_id: uuid.UUID, booking: Booking):
-        """Update customer metrics after booking creation."""
+    def create_booking_series(self, tenant_id: uuid.UUID, series_data: Dict[str, Any],
+                              user_id: uuid.UUID) -> Dict[str, Any]:
+        """
+        Create a recurring series of bookings from a recurrence rule.
+        
+        series_data carries the create_booking fields for the first
+        occurrence (customer_id, service_id, resource_id, start_at and
+        optionally end_at, defaulting to the service duration) plus rrule
+        (see app.services.recurrence) and skip_conflicts.
+        
+        Every occurrence is checked in memory against the staff member's
+        weekly hours and one occupancy index of bookings and holds loaded for
+        the whole span. Occurrences that fail are returned as conflicts. The
+        series is all-or-nothing unless skip_conflicts is set, in which case
+        the free occurrences are still booked. Everything created is inserted
+        in one transaction; if a concurrent booking wins a slot in the
+        meantime the whole series is rolled back with a BookingConflictError.
+        
+        A replayed client_generated_id returns the stored series.
+        
+        Returns:
+            Dict with series_id, bookings (created or replayed), conflicts
+            ([{'start_at', 'end_at', 'reason'}]) and created
+        """
+        from .recurrence import expand_rrule
+        from .customer_metrics import CustomerMetricsService
+        
+        self._validate_required_fields(series_data, ['customer_id', 'service_id', 'resource_id', 'start_at', 'rrule'])
+        customer_id = self._validate_uuid(series_data['customer_id'], 'customer_id')
+        resource_id = self._validate_uuid(series_data['resource_id'], 'resource_id')
+        
+        service = Service.query.filter_by(
+            tenant_id=tenant_id,
+            id=self._validate_uuid(series_data['service_id'], 'service_id'),
+            deleted_at=None
+        ).first()
+        if not service:
+            raise ValueError("Service not found")
+        
         try:
-            # Get or create customer metrics
-            metrics = CustomerMetrics.query.filter_by(
+            first_start = self._naive_utc(datetime.fromisoformat(series_data['start_at'].replace('Z', '+00:00')))
+            if series_data.get('end_at'):
+                first_end = self._naive_utc(datetime.fromisoformat(series_data['end_at'].replace('Z', '+00:00')))
+            else:
+                first_end = first_start + timedelta(minutes=service.duration_min)
+        except ValueError as e:
+            raise ValueError(f"Invalid datetime format: {str(e)}")
+        self._validate_datetime_range(first_start, first_end)
+        
+        client_generated_id = series_data.get('client_generated_id') or uuid.uuid4().hex
+        series_id = uuid.uuid5(uuid.NAMESPACE_URL, f"tithi:booking-series:{tenant_id}:{client_generated_id}")
+        existing = Booking.query.filter_by(tenant_id=tenant_id, series_id=series_id).order_by(Booking.start_at).all()
+        if existing:
+            return {'series_id': series_id, 'bookings': existing, 'conflicts': [], 'created': False}
+        
+        duration = first_end - first_start
+        starts = expand_rrule(series_data['rrule'], first_start, self.config.MAX_SERIES_OCCURRENCES)
+        if not starts:
+            raise ValueError("Recurrence rule produces no occurrences")
+        
+        staff_profile = StaffProfile.query.filter_by(
+            tenant_id=tenant_id, resource_id=resource_id, is_active=True
+        ).first()
+        if not staff_profile:
+            raise ValueError("Staff member not found or inactive")
+        
+        working_hours = {}
+        for availability in StaffAvailability.query.filter_by(
+            tenant_id=tenant_id, staff_profile_id=staff_profile.id, is_active=True
+        ).all():
+            working_hours[availability.weekday] = (availability.start_time, availability.end_time)
+        
+        occupancy = OccupancyIndex.load(tenant_id, [resource_id], starts[0], starts[-1] + duration)
+        
+        free, conflicts = [], []
+        for start_at in starts:
+            end_at = start_at + duration
+            hours = working_hours.get(start_at.isoweekday())
+            if (not hours or start_at.time() < hours[0] or end_at.date() != start_at.date()
+                    or end_at.time() > hours[1]):
+                reason = 'outside_staff_availability'
+            elif not occupancy.is_free(resource_id, start_at, end_at):
+                reason = 'conflict'
+            else:
+                free.append((start_at, end_at))
+                continue
+            conflicts.append({'start_at': start_at, 'end_at': end_at, 'reason': reason})
+        
+        if not free or (conflicts and not series_data.get('skip_conflicts')):
+            return {'series_id': series_id, 'bookings': [], 'conflicts': conflicts, 'created': False}
+        
+        service_snapshot = {
+            'service_id': str(service.id),
+            'name': service.name,
+            'duration_min': service.duration_min,
+            'price_cents': service.price_cents,
+            'category': service.category
+        }
+        metrics = CustomerMetricsService()
+        bookings, events = [], []
+        for index, (start_at, end_at) in enumerate(free):
+            booking = Booking(
+                id=uuid.uuid4(),
                 tenant_id=tenant_id,
-                customer_id=customer_id
-            ).first()
-            
-            if not metrics:
-                metrics = CustomerMetrics(
-                    id=uuid.uuid4(),
-                    tenant_id=tenant_id,
-                    customer_id=customer_id,
-                    bookings_count=0,
-                    revenue_cents=0,
-                    first_booking_at=None,
-                    last_booking_at=None
-                )
-                db.session.add(metrics)
-            
-            # Update metrics
-            metrics.bookings_count += 1
-            metrics.last_booking_at = booking.start_at
-            
-            # Set first booking timestamp if not set
-            if not metrics.first_booking_at:
-                metrics.first_booking_at = booking.start_at
-            
-            # Update revenue if booking is confirmed
-            if booking.status == 'confirmed':
-                service_price = booking.service_snapshot.get('price_cents', 0)
-                metrics.revenue_cents += service_price
-            
+                customer_id=customer_id,
+                resource_id=resource_id,
+                client_generated_id=f"{client_generated_id}:{index}",
+                service_snapshot=service_snapshot,
+                start_at=start_at,
+                end_at=end_at,
+                booking_tz=series_data.get('booking_tz', 'UTC'),
+                status='pending',
+                attendee_count=series_data.get('attendee_count', 1),
+                series_id=series_id
+            )
+            bookings.append(booking)
+            events.append(metrics.delta_event(tenant_id, booking))
+            events.append(EventOutbox(
+                id=uuid.uuid4(),
+                tenant_id=tenant_id,
+                event_code="BOOKING_CREATED",
+                payload={
+                    "booking_id": str(booking.id),
+                    "customer_id": str(customer_id),
+                    "service_id": service_snapshot['service_id'],
+                    "resource_id": str(resource_id),
+                    "start_at": start_at.isoformat(),
+                    "end_at": end_at.isoformat(),
+                    "status": booking.status,
+                    "series_id": str(series_id)
+                },
+                status="ready",
+                max_attempts=self.config.MAX_RETRY_ATTEMPTS,
+                ready_at=datetime.utcnow()
+            ))
+        
+        db.session.add_all(bookings + events)
+        try:
             db.session.commit()
-            
-            logger.info("Customer metrics updated", extra={
-                'tenant_id': tenant_id,
-                'customer_id': str(customer_id),
-                'bookings_count': metrics.bookings_count,
-                'revenue_cents': metrics.revenue_cents
-            })
-            
+        except IntegrityError as e:
+            db.session.rollback()
+            constraint_name = getattr(getattr(e.orig, 'diag', None), 'constraint_name', None)
+            if constraint_name == self.config.BOOKING_OVERLAP_CONSTRAINT:
+                raise BookingConflictError("A series occurrence conflicts with a booking made meanwhile")
+            raise DatabaseError(f"Database operation failed: {str(e)}")
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseError(f"Database operation failed: {str(e)}")
+        
+        logger.info("Booking series created", extra={
+            'tenant_id': str(tenant_id),
+            'series_id': str(series_id),
+            'customer_id': str(customer_id),
+            'resource_id': str(resource_id),
+            'bookings': len(bookings),
+            'conflicts': len(conflicts),
+            'event_type': 'BOOKING_SERIES_CREATED'
+        })
+        
+        try:
+            self._invalidate_bookings_availability(
+                tenant_id, [(resource_id, start_at, end_at) for start_at, end_at in free]
+            )
         except Exception as e:
-            logger.error(f"Error updating customer metrics: {str(e)}")
-            # Don't fail booking creation for metrics errors
+            logger.error(f"Failed to invalidate availability for series {series_id}: {str(e)}")
+        
+        return {'series_id': series_id, 'bookings': bookings, 'conflicts': conflicts, 'created': True}
+    
+    @staticmethod
+    def _naive_utc(value: datetime) -> datetime:
+        """Naive UTC datetime, the form booking times are compared in."""
+        if value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
     
     def confirm_booking(self, tenant_id: uuid.UUID, booking_id: uuid.UUID, user_id: uuid.UUID, require_payment: bool = False) -> bool:
         """Confirm a pending booking."""
@@ -1541,6 +2173,7 @@ class BookingService(BaseService):
         def _confirm_booking():
             booking.status = 'confirmed'
             booking.updated_at = datetime.utcnow()
+            self._stage_metrics_delta(tenant_id, booking, 'pending')
             return True
         
         result = self._safe_db_operation(_confirm_booking)
@@ -1557,8 +2190,16 @@ class BookingService(BaseService):
         })
         
         # Send immediate confirmation notification
+        self._send_confirmation_notification(tenant_id, booking.id, booking)
+        
+        return result
+    
+    def _send_confirmation_notification(self, tenant_id: uuid.UUID, booking_id: uuid.UUID,
+                                        booking: Optional[Booking] = None) -> None:
+        """Send the booking confirmation notification; failures never fail the confirmation."""
         try:
             from .notification_service import NotificationService
+            booking = booking or self.get_booking(tenant_id, booking_id)
             notification_service = NotificationService()
             notification_result = notification_service.send_booking_notification(booking, "booking_confirmed")
             
@@ -1568,8 +2209,6 @@ class BookingService(BaseService):
         except Exception as e:
             # Log error but don't fail the confirmation
             print(f"Error sending confirmation notification: {str(e)}")
-        
-        return result
     
     def _get_customer_payment_method(self, tenant_id: uuid.UUID, customer_id: uuid.UUID) -> Optional[PaymentMethod]:
         """Get customer's default payment method."""
@@ -1606,7 +2245,12 @@ class BookingService(BaseService):
     def _calculate_cancellation_fee(self, tenant_id: uuid.UUID, booking: Booking) -> int:
         """Calculate cancellation fee from BusinessPolicy based on timing."""
         policy = BusinessPolicy.query.filter_by(tenant_id=tenant_id).first()
-        
+        return self._cancellation_fee_for(policy, booking.start_at, booking.canceled_at, booking.service_snapshot)
+    
+    @staticmethod
+    def _cancellation_fee_for(policy: Optional[BusinessPolicy], start_at: Optional[datetime],
+                              canceled_at: Optional[datetime], service_snapshot: Any) -> int:
+        """Cancellation fee for a booking under an already loaded policy."""
         if not policy:
             # Default to 0 if no policy
             return 0
@@ -1614,11 +2258,11 @@ class BookingService(BaseService):
         # For now, return 0 - cancellation fees are typically based on timing
         # which would need more complex logic. Frontend expects fee from policies.
         # If cancellation_hours_required is not met, charge fee
-        if booking.canceled_at and booking.start_at:
-            hours_before = (booking.start_at - booking.canceled_at).total_seconds() / 3600
+        if canceled_at and start_at:
+            hours_before = (start_at - canceled_at).total_seconds() / 3600
             if hours_before < policy.cancellation_hours_required:
                 # Charge cancellation fee - using same logic as no-show for now
-                booking_amount = booking.service_snapshot.get('price_cents', 0) if isinstance(booking.service_snapshot, dict) else 0
+                booking_amount = service_snapshot.get('price_cents', 0) if isinstance(service_snapshot, dict) else 0
                 # Default 10% cancellation fee if policy doesn't specify
                 return int(booking_amount * 0.10)
         
@@ -1716,9 +2360,14 @@ class BookingService(BaseService):
             booking.status = 'canceled'
             booking.canceled_at = datetime.utcnow()
             booking.updated_at = datetime.utcnow()
+            self._stage_metrics_delta(tenant_id, booking, old_status)
             return booking
         
         result = self._safe_db_operation(_cancel_booking)
+        self._invalidate_booking_availability(tenant_id, booking.resource_id, booking.start_at, booking.end_at)
+        AvailabilityService().notify_waitlist_for_freed_slot(
+            tenant_id, booking.resource_id, booking.start_at, booking.end_at
+        )
         
         # Calculate and charge cancellation fee if applicable
         try:
@@ -1765,6 +2414,8 @@ class BookingService(BaseService):
         if not availability_service.is_time_available(tenant_id, booking.resource_id, new_start, new_end):
             raise ValueError("New time slot is not available")
         
+        old_start, old_end = booking.start_at, booking.end_at
+        
         def _reschedule_booking():
             booking.start_at = new_start
             booking.end_at = new_end
@@ -1773,6 +2424,8 @@ class BookingService(BaseService):
             return booking
         
         result = self._safe_db_operation(_reschedule_booking)
+        self._invalidate_booking_availability(tenant_id, booking.resource_id, old_start, old_end)
+        self._invalidate_booking_availability(tenant_id, booking.resource_id, new_start, new_end)
         
         return result
     
@@ -1785,13 +2438,17 @@ class BookingService(BaseService):
         if booking.status not in ['confirmed', 'checked_in', 'pending']:
             raise ValueError("Only confirmed, checked-in, or pending bookings can be marked as no-show")
         
+        old_status = booking.status
+        
         def _mark_no_show():
             booking.status = 'no_show'
             booking.no_show_flag = True
             booking.updated_at = datetime.utcnow()
+            self._stage_metrics_delta(tenant_id, booking, old_status)
             return booking
         
         result = self._safe_db_operation(_mark_no_show)
+        self._invalidate_booking_availability(tenant_id, booking.resource_id, booking.start_at, booking.end_at)
         
         # Calculate and charge no-show fee if applicable
         try:
@@ -1823,12 +2480,16 @@ class BookingService(BaseService):
         if booking.status not in ['confirmed', 'checked_in', 'pending']:
             raise ValueError("Only confirmed, checked-in, or pending bookings can be completed")
         
+        old_status = booking.status
+        
         def _complete_booking():
             booking.status = 'completed'
             booking.updated_at = datetime.utcnow()
+            self._stage_metrics_delta(tenant_id, booking, old_status)
             return booking
         
         result = self._safe_db_operation(_complete_booking)
+        self._invalidate_booking_availability(tenant_id, booking.resource_id, booking.start_at, booking.end_at)
         
         # Charge full booking amount
         try:
@@ -1893,6 +2554,11 @@ class BookingService(BaseService):
     def get_bookings(self, tenant_id: uuid.UUID, status: Optional[str] = None, 
                     start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[Booking]:
         """Get bookings for a tenant with optional filters."""
+        return self._bookings_query(tenant_id, status, start_date, end_date).all()
+    
+    def _bookings_query(self, tenant_id: uuid.UUID, status: Optional[str],
+                        start_date: Optional[datetime], end_date: Optional[datetime]):
+        """Filtered bookings in (start_at, id) order, the order of the keyset indexes (migration 0047)."""
         query = Booking.query.filter_by(tenant_id=tenant_id)
         
         if status:
@@ -1904,7 +2570,95 @@ class BookingService(BaseService):
         if end_date:
             query = query.filter(Booking.start_at <= end_date)
         
-        return query.order_by(Booking.start_at).all()
+        return query.order_by(Booking.start_at, Booking.id)
+    
+    @staticmethod
+    def encode_booking_cursor(booking: Booking) -> str:
+        """Opaque cursor pointing just past booking in (start_at, id) order."""
+        position = json.dumps([booking.start_at.isoformat(), str(booking.id)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_booking_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+        """Decode a cursor from encode_booking_cursor; raises ValueError if malformed."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            start_at, booking_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return datetime.fromisoformat(start_at), uuid.UUID(booking_id)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+    
+    def list_bookings_page(self, tenant_id: uuid.UUID, status: Optional[str] = None,
+                           start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                           cursor: Optional[str] = None,
+                           limit: Optional[int] = None) -> Tuple[List[Booking], Optional[str]]:
+        """
+        One page of bookings after cursor, and the cursor for the next page.
+        
+        Seeks with a (start_at, id) row comparison instead of OFFSET, so the
+        cost of a page depends on its size, not on how many bookings precede
+        it. The next cursor is None on the last page.
+        """
+        limit = min(max(limit or self.config.DEFAULT_BOOKING_PAGE_SIZE, 1), self.config.MAX_BOOKING_PAGE_SIZE)
+        query = self._bookings_query(tenant_id, status, start_date, end_date)
+        
+        if cursor:
+            after_start, after_id = self.decode_booking_cursor(cursor)
+            query = query.filter(tuple_(Booking.start_at, Booking.id) > tuple_(after_start, after_id))
+        
+        # One extra row tells whether another page exists without counting
+        bookings = query.limit(limit + 1).all()
+        if len(bookings) <= limit:
+            return bookings, None
+        
+        bookings = bookings[:limit]
+        return bookings, self.encode_booking_cursor(bookings[-1])
+    
+    def iter_bookings(self, tenant_id: uuid.UUID, status: Optional[str] = None,
+                      start_date: Optional[datetime] = None,
+                      end_date: Optional[datetime] = None) -> Iterator[Booking]:
+        """
+        Yield every matching booking for exports, one keyset page at a time.
+        
+        Each page is expunged once yielded so the session never holds more
+        than one batch, however long the tenant's history.
+        """
+        cursor = None
+        while True:
+            bookings, cursor = self.list_bookings_page(
+                tenant_id, status, start_date, end_date, cursor,
+                self.config.BOOKING_EXPORT_BATCH_SIZE
+            )
+            for booking in bookings:
+                yield booking
+                db.session.expunge(booking)
+            if cursor is None:
+                return
+    
+    def estimate_bookings_count(self, tenant_id: uuid.UUID, status: Optional[str] = None,
+                                start_date: Optional[datetime] = None,
+                                end_date: Optional[datetime] = None) -> int:
+        """
+        Approximate number of matching bookings.
+        
+        On PostgreSQL this is the planner's row estimate for the filtered
+        query, read from EXPLAIN without scanning the rows. Other databases
+        (tests) get an exact count.
+        """
+        query = self._bookings_query(tenant_id, status, start_date, end_date).order_by(None)
+        
+        if db.engine.dialect.name != 'postgresql':
+            return query.count()
+        
+        statement = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+        try:
+            plan = db.session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}").scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except (SQLAlchemyError, KeyError, IndexError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to estimate booking count for tenant {tenant_id}: {str(e)}")
+            return query.count()
     
     def get_status_precedence(self, status: str) -> int:
         """Get status precedence for sorting."""
@@ -1978,9 +2732,15 @@ class BookingService(BaseService):
                     setattr(booking, field, value)
             
             booking.updated_at = datetime.utcnow()
+            if booking.status != old_values['status']:
+                self._stage_metrics_delta(tenant_id, booking, old_values['status'])
             return booking
         
+        old_start, old_end = booking.start_at, booking.end_at
         result = self._safe_db_operation(_update_booking)
+        self._invalidate_booking_availability(tenant_id, booking.resource_id, old_start, old_end)
+        if (booking.start_at, booking.end_at) != (old_start, old_end):
+            self._invalidate_booking_availability(tenant_id, booking.resource_id, booking.start_at, booking.end_at)
         
         # Log audit trail
         self._log_audit(tenant_id, "booking", booking.id, "UPDATE", admin_user_id, 
@@ -1992,9 +2752,29 @@ class BookingService(BaseService):
         
         return result
 
+    # Statuses each set-based bulk action may move a booking out of
+    BULK_STATUS_TRANSITIONS = {
+        'confirm': (('pending',), 'confirmed', "Only pending bookings can be confirmed"),
+        'cancel': (('pending', 'confirmed', 'checked_in', 'no_show', 'failed'), 'canceled',
+                   "Cannot cancel booking in current status"),
+    }
+    
     def bulk_action_bookings(self, tenant_id: uuid.UUID, booking_ids: List[str], 
                            action: str, action_data: Dict[str, Any], admin_user_id: uuid.UUID) -> Dict[str, Any]:
-        """Perform bulk actions on bookings (confirm, cancel, reschedule, message)."""
+        """
+        Perform bulk actions on bookings (confirm, cancel, reschedule, message).
+        
+        Confirm and cancel are set-based: every target is loaded in one query
+        and validated in memory, then each chunk of BULK_ACTION_CHUNK_SIZE
+        bookings is updated with one UPDATE and its outbox events and audit
+        rows are bulk inserted, in one transaction per chunk. Reschedule needs
+        a per-booking availability check and message is read-only, so both
+        still go booking by booking. The per-booking report is the same either
+        way.
+        """
+        if action in self.BULK_STATUS_TRANSITIONS:
+            return self._bulk_transition_bookings(tenant_id, booking_ids, action, action_data, admin_user_id)
+        
         results = {
             'successful': [],
             'failed': [],
@@ -2005,12 +2785,7 @@ class BookingService(BaseService):
             try:
                 booking_id = uuid.UUID(booking_id_str)
                 
-                if action == 'confirm':
-                    booking = self.confirm_booking(tenant_id, booking_id, admin_user_id)
-                elif action == 'cancel':
-                    reason = action_data.get('reason', 'Admin cancellation')
-                    booking = self.cancel_booking(tenant_id, booking_id, admin_user_id, reason)
-                elif action == 'reschedule':
+                if action == 'reschedule':
                     new_start = action_data.get('new_start_at')
                     new_end = action_data.get('new_end_at')
                     if not new_start or not new_end:
@@ -2043,6 +2818,199 @@ class BookingService(BaseService):
                 })
         
         return results
+    
+    def _bulk_transition_bookings(self, tenant_id: uuid.UUID, booking_ids: List[str], action: str,
+                                  action_data: Dict[str, Any], admin_user_id: uuid.UUID) -> Dict[str, Any]:
+        """Apply a status transition to many bookings with set-based writes."""
+        from_statuses, to_status, invalid_status_error = self.BULK_STATUS_TRANSITIONS[action]
+        results = {
+            'successful': [],
+            'failed': [],
+            'total_processed': len(booking_ids)
+        }
+        
+        target_ids = []
+        seen = set()
+        for booking_id_str in booking_ids:
+            try:
+                booking_id = uuid.UUID(str(booking_id_str))
+            except ValueError:
+                results['failed'].append({'booking_id': booking_id_str, 'error': 'Invalid booking ID'})
+                continue
+            if booking_id in seen:
+                results['failed'].append({'booking_id': booking_id_str, 'error': 'Duplicate booking ID'})
+                continue
+            seen.add(booking_id)
+            target_ids.append(booking_id)
+        
+        bookings = {
+            booking.id: booking for booking in Booking.query.filter(
+                Booking.tenant_id == tenant_id,
+                Booking.id.in_(target_ids)
+            ).all()
+        } if target_ids else {}
+        
+        valid = []
+        for booking_id in target_ids:
+            booking = bookings.get(booking_id)
+            if not booking:
+                results['failed'].append({'booking_id': str(booking_id), 'error': 'Booking not found'})
+            elif booking.status not in from_statuses:
+                results['failed'].append({'booking_id': str(booking_id), 'error': invalid_status_error})
+            else:
+                # Plain values survive the commits that expire ORM instances
+                valid.append({
+                    'id': booking.id,
+                    'customer_id': booking.customer_id,
+                    'resource_id': booking.resource_id,
+                    'start_at': booking.start_at,
+                    'end_at': booking.end_at,
+                    'service_snapshot': booking.service_snapshot or {},
+                    'old_status': booking.status
+                })
+        
+        chunk_size = self.config.BULK_ACTION_CHUNK_SIZE
+        for offset in range(0, len(valid), chunk_size):
+            chunk = valid[offset:offset + chunk_size]
+            try:
+                applied = self._apply_bulk_transition(tenant_id, chunk, action, to_status, from_statuses,
+                                                      action_data, admin_user_id)
+            except (SQLAlchemyError, DatabaseError) as e:
+                results['failed'].extend({'booking_id': str(row['id']), 'error': str(e)} for row in chunk)
+                continue
+            
+            for row in chunk:
+                if row['id'] in applied:
+                    results['successful'].append({'booking_id': str(row['id']), 'status': to_status})
+                else:
+                    results['failed'].append({
+                        'booking_id': str(row['id']),
+                        'error': 'Booking status changed concurrently'
+                    })
+            
+            try:
+                self._after_bulk_transition(tenant_id, [row for row in chunk if row['id'] in applied], action)
+            except Exception as e:
+                logger.error(f"Bulk {action} side effects failed for tenant {tenant_id}: {str(e)}")
+        
+        return results
+    
+    def _apply_bulk_transition(self, tenant_id: uuid.UUID, chunk: List[Dict[str, Any]], action: str,
+                               to_status: str, from_statuses: Tuple[str, ...],
+                               action_data: Dict[str, Any], admin_user_id: uuid.UUID) -> set:
+        """
+        Update one chunk of bookings and write its outbox and audit rows in one transaction.
+        
+        The status guard in the UPDATE means a booking changed since it was
+        loaded is skipped rather than overwritten; only the returned ids count.
+        """
+        from .customer_metrics import CustomerMetricsService
+        
+        now = datetime.utcnow()
+        values = {'status': to_status, 'updated_at': now}
+        if to_status == 'canceled':
+            values['canceled_at'] = now
+        
+        try:
+            applied = set(db.session.execute(
+                update(Booking)
+                .where(
+                    Booking.tenant_id == tenant_id,
+                    Booking.id.in_([row['id'] for row in chunk]),
+                    Booking.status.in_(from_statuses)
+                )
+                .values(**values)
+                .returning(Booking.id)
+                .execution_options(synchronize_session=False)
+            ).scalars())
+            
+            applied_rows = [row for row in chunk if row['id'] in applied]
+            if applied_rows:
+                event_code = "BOOKING_CONFIRMED" if action == 'confirm' else "BOOKING_CANCELLED"
+                outbox_rows = [{
+                    'id': uuid.uuid4(),
+                    'tenant_id': tenant_id,
+                    'event_code': event_code,
+                    'payload': {
+                        "booking_id": str(row['id']),
+                        "customer_id": str(row['customer_id']),
+                        "service_id": row['service_snapshot'].get('service_id'),
+                        "resource_id": str(row['resource_id']),
+                        "start_at": row['start_at'].isoformat(),
+                        "end_at": row['end_at'].isoformat(),
+                        "status": to_status
+                    },
+                    'status': 'ready',
+                    'attempts': 0,
+                    'max_attempts': self.config.MAX_RETRY_ATTEMPTS,
+                    'ready_at': now
+                } for row in applied_rows]
+                
+                # Customer metric deltas ride in the same executemany as the events
+                metrics = CustomerMetricsService()
+                outbox_rows.extend(
+                    metrics.delta_row(tenant_id, payload) for payload in (
+                        metrics.delta_payload(row['customer_id'], row['start_at'], row['service_snapshot'],
+                                              to_status, row['old_status'])
+                        for row in applied_rows
+                    ) if payload is not None
+                )
+                db.session.execute(insert(EventOutbox), outbox_rows)
+                
+                new_data = {"status": to_status}
+                if to_status == 'canceled':
+                    new_data.update(canceled_at=now.isoformat(), reason=action_data.get('reason', 'Admin cancellation'))
+                db.session.execute(insert(AuditLog), [{
+                    'id': uuid.uuid4(),
+                    'tenant_id': tenant_id,
+                    'table_name': "booking",
+                    'record_id': row['id'],
+                    'operation': "UPDATE",
+                    'user_id': admin_user_id,
+                    'old_data': {"status": row['old_status']},
+                    'new_data': new_data
+                } for row in applied_rows])
+            
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseError(f"Bulk {action} failed: {str(e)}")
+        
+        for row in chunk:
+            if row['id'] in applied:
+                row['canceled_at'] = values.get('canceled_at')
+        
+        return applied
+    
+    def _after_bulk_transition(self, tenant_id: uuid.UUID, rows: List[Dict[str, Any]], action: str) -> None:
+        """Post-commit side effects of a bulk transition; failures never undo it."""
+        if not rows:
+            return
+        
+        if action == 'confirm':
+            for row in rows:
+                self._send_confirmation_notification(tenant_id, row['id'])
+            return
+        
+        self._invalidate_bookings_availability(
+            tenant_id, [(row['resource_id'], row['start_at'], row['end_at']) for row in rows]
+        )
+        
+        availability_service = AvailabilityService()
+        policy = BusinessPolicy.query.filter_by(tenant_id=tenant_id).first()
+        for row in rows:
+            availability_service.notify_waitlist_for_freed_slot(
+                tenant_id, row['resource_id'], row['start_at'], row['end_at']
+            )
+            
+            cancellation_fee = self._cancellation_fee_for(
+                policy, row['start_at'], row['canceled_at'], row['service_snapshot']
+            )
+            if cancellation_fee > 0:
+                try:
+                    self._charge_booking_payment(tenant_id, row['id'], cancellation_fee, fee_type='cancellation')
+                except Exception as e:
+                    logger.error(f"Failed to charge cancellation fee for booking {row['id']}: {str(e)}")
 
     def send_customer_message(self, tenant_id: uuid.UUID, booking_id: uuid.UUID, 
                             message: str, admin_user_id: uuid.UUID) -> Dict[str, Any]:
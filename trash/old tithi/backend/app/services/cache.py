@@ -8,77 +8,274 @@ Features:
 - Availability caching with TTL
 - Distributed locking for concurrent operations
 - Cache invalidation strategies
-- Fallback to in-memory cache when Redis unavailable
+- Bounded, process-wide in-memory tier (LocalCache) used as a read-through
+  L1 for versioned keys and as the fallback when Redis is unavailable
+- Stampede protection for computed values: single-flight recomputation and
+  probabilistic early refresh (get_or_compute)
+- Header-tagged value encoding with compression for large values (cache_codec)
 """
 
 import json
+import math
 import uuid
 import time
+import heapq
+import random
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
-from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from threading import Event, Lock
+
+from flask import current_app, has_app_context
 
 from app.extensions import get_redis
 from app.middleware.error_handler import TithiError
+from app.services.cache_codec import CacheCodec, PLAIN_JSON_CODEC, get_cache_codec
+
+
+_MISSING = object()
+
+# Marks values written by get_or_compute, which carry their compute time and
+# expiry so hot keys can be refreshed early
+COMPUTED_MARKER = "__computed__"
+
+# Recomputations in flight in this process, by lock key
+_inflight: Dict[str, Event] = {}
+_inflight_lock = Lock()
+
+
+class _EncodedValue:
+    """A local-tier entry kept as JSON text until first read, so writes serialize once."""
+    
+    __slots__ = ('text', 'codec')
+    
+    def __init__(self, text: str, codec: CacheCodec):
+        self.text = text
+        self.codec = codec
+
+
+class LocalCache:
+    """
+    Bounded in-memory cache shared by every CacheService in the process.
+    
+    Entries are kept in least-recently-used order under both an entry count
+    and a byte budget, and each carries its own expiry. Entry sizes are the
+    length of the value's JSON serialization, so the budget tracks payload
+    size rather than exact interpreter overhead. Values are shared between
+    callers and must be treated as read-only.
+    
+    Generation counters and fallback locks live beside the LRU rather than in
+    it: evicting a counter would rewind a generation and could resurrect
+    entries cached under an older one.
+    """
+    
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._counters = {}
+        self._locks = {}  # key -> (value, expires_at)
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a live entry, refreshing its recency, or default."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+        
+        value = entry[0]
+        if isinstance(value, _EncodedValue):
+            # Decode outside the lock; keep the result unless the entry was replaced meanwhile
+            decoded = value.codec.loads(value.text)
+            with self._lock:
+                current = self._entries.get(key)
+                if current is not None and current[0] is value:
+                    self._entries[key] = (decoded, current[1], current[2])
+            return decoded
+        return value
+    
+    def set(self, key: str, value: Any, ttl_seconds: float, size: int) -> bool:
+        """Store an entry for ttl_seconds, evicting the least recently used to stay in budget."""
+        with self._lock:
+            self._remove(key)
+            if ttl_seconds <= 0 or size > self.max_bytes:
+                return False
+            self._entries[key] = (value, time.monotonic() + ttl_seconds, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+        return True
+    
+    def delete(self, key: str) -> bool:
+        """Drop an entry; returns whether one was present."""
+        with self._lock:
+            return self._remove(key)
+    
+    def clear(self) -> None:
+        """Drop every entry, counter and lock, and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+            self._locks.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+    
+    def get_counters(self, keys: List[str]) -> List[int]:
+        with self._lock:
+            return [self._counters.get(key, 0) for key in keys]
+    
+    def increment_counters(self, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._counters[key] = self._counters.get(key, 0) + 1
+    
+    def acquire_lock(self, key: str, value: str, ttl_seconds: float) -> bool:
+        """Take an in-process lock unless a live one is held."""
+        now = time.monotonic()
+        with self._lock:
+            held = self._locks.get(key)
+            if held is not None and held[1] > now:
+                return False
+            self._locks[key] = (value, now + ttl_seconds)
+            return True
+    
+    def release_lock(self, key: str, value: str) -> bool:
+        with self._lock:
+            held = self._locks.get(key)
+            if held is None or held[0] != value:
+                return False
+            del self._locks[key]
+            return True
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss, eviction and expiry counts plus current occupancy."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+    
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+
+_local_cache: Optional[LocalCache] = None
+_local_cache_lock = Lock()
+
+
+def get_local_cache() -> LocalCache:
+    """Return the process-wide LocalCache, sized from CACHE_LOCAL_* config on first use."""
+    global _local_cache
+    if _local_cache is None:
+        with _local_cache_lock:
+            if _local_cache is None:
+                config = current_app.config if has_app_context() else {}
+                _local_cache = LocalCache(
+                    max_entries=int(config.get('CACHE_LOCAL_MAX_ENTRIES', 10000)),
+                    max_bytes=int(config.get('CACHE_LOCAL_MAX_BYTES', 64 * 1024 * 1024))
+                )
+    return _local_cache
 
 
 class CacheService:
     """Service for managing Redis-based caching operations."""
     
+    # Serve reads from the process-wide LocalCache even while Redis is up.
+    # Only safe where a key changes whenever its data does (generation-
+    # versioned keys): a delete issued by another process never reaches this
+    # process's tier. Other services use the tier only as a Redis fallback.
+    local_read_through = False
+    
+    # XFetch weight for early refresh; above 1 favours refreshing earlier
+    early_refresh_beta = 1.0
+    
+    # Codec for values written by set(); None uses the configured codec
+    value_codec: Optional[CacheCodec] = None
+    
     def __init__(self):
         """Initialize cache service."""
         self.redis_client = get_redis()
-        self._memory_cache = {}
-        self._memory_cache_lock = Lock()
-        self._memory_cache_ttl = {}
+        self.local_cache = get_local_cache()
+        self.codec = self.value_codec or get_cache_codec()
     
     def _get_cache_key(self, prefix: str, *args) -> str:
         """Generate cache key from prefix and arguments."""
         key_parts = [prefix] + [str(arg) for arg in args]
         return ":".join(key_parts)
     
-    def _is_memory_cache_valid(self, key: str, ttl_seconds: int) -> bool:
-        """Check if memory cache entry is still valid."""
-        if key not in self._memory_cache_ttl:
-            return False
-        
-        return time.time() - self._memory_cache_ttl[key] < ttl_seconds
-    
     def get(self, key: str, default: Any = None) -> Any:
-        """Get value from cache (Redis or memory fallback)."""
-        # Try Redis first
-        if self.redis_client:
-            try:
-                value = self.redis_client.get(key)
-                if value is not None:
-                    return json.loads(value)
-            except Exception:
-                pass  # Fall back to memory cache
+        """Get value from cache (local tier, then Redis, or local fallback)."""
+        if self.local_read_through or not self.redis_client:
+            value = self.local_cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if not self.redis_client:
+                return default
+        
+        try:
+            if self.local_read_through:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.pttl(key)
+                serialized_value, ttl_ms = pipe.execute()
+            else:
+                serialized_value = self.redis_client.get(key)
+        except Exception:
+            # Redis is unreachable; serve whatever this process still holds
+            return default if self.local_read_through else self.local_cache.get(key, default)
         
-        # Fall back to memory cache
-        with self._memory_cache_lock:
-            if key in self._memory_cache and self._is_memory_cache_valid(key, 300):  # 5 min default TTL
-                return self._memory_cache[key]
+        if serialized_value is None:
+            return default
         
-        return default
+        value, size = self.codec.decode_with_size(serialized_value)
+        if self.local_read_through and ttl_ms and ttl_ms > 0:
+            self.local_cache.set(key, value, ttl_ms / 1000, size)
+        return value
     
     def set(self, key: str, value: Any, ttl_seconds: int = 300) -> bool:
-        """Set value in cache (Redis and memory fallback)."""
+        """Set value in cache (Redis and the local tier)."""
         success = False
+        frame, text = self.codec.encode(value)
         
         # Try Redis first
         if self.redis_client:
             try:
-                serialized_value = json.dumps(value, default=str)
-                self.redis_client.setex(key, ttl_seconds, serialized_value)
+                self.redis_client.setex(key, ttl_seconds, frame)
                 success = True
             except Exception:
-                pass  # Fall back to memory cache
+                pass  # Fall back to the local tier
         
-        # Always update memory cache as fallback
-        with self._memory_cache_lock:
-            self._memory_cache[key] = value
-            self._memory_cache_ttl[key] = time.time()
+        # Always update the local tier; it decodes the JSON on first read so
+        # both tiers return the same shapes
+        self.local_cache.set(key, _EncodedValue(text, self.codec), ttl_seconds, len(text))
         
         return success
     
@@ -94,54 +291,178 @@ class CacheService:
             except Exception:
                 pass
         
-        # Remove from memory cache
-        with self._memory_cache_lock:
-            self._memory_cache.pop(key, None)
-            self._memory_cache_ttl.pop(key, None)
+        self.local_cache.delete(key)
+        
+        return success
+    
+    def get_many(self, keys: List[str], default: Any = None) -> List[Any]:
+        """
+        Get several values in order with at most one Redis round trip.
+        
+        Read-through services answer what they can from the local tier and
+        fetch only the rest from Redis.
+        """
+        values = [_MISSING] * len(keys)
+        if self.local_read_through or not self.redis_client:
+            values = [self.local_cache.get(key, _MISSING) for key in keys]
+            if not self.redis_client:
+                return [default if value is _MISSING else value for value in values]
+        
+        pending = [index for index, value in enumerate(values) if value is _MISSING]
+        if not pending:
+            return values
+        
+        pending_keys = [keys[index] for index in pending]
+        try:
+            if self.local_read_through:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.mget(pending_keys)
+                for key in pending_keys:
+                    pipe.pttl(key)
+                results = pipe.execute()
+                frames, ttls = results[0], results[1:]
+            else:
+                frames, ttls = self.redis_client.mget(pending_keys), [None] * len(pending_keys)
+        except Exception:
+            # Redis is unreachable; serve whatever this process still holds
+            if not self.local_read_through:
+                values = [self.local_cache.get(key, _MISSING) for key in keys]
+            return [default if value is _MISSING else value for value in values]
+        
+        for index, key, frame, ttl_ms in zip(pending, pending_keys, frames, ttls):
+            if frame is None:
+                values[index] = default
+                continue
+            value, size = self.codec.decode_with_size(frame)
+            if self.local_read_through and ttl_ms and ttl_ms > 0:
+                self.local_cache.set(key, value, ttl_ms / 1000, size)
+            values[index] = value
+        
+        return values
+    
+    def set_many(self, items: Dict[str, Any], ttl_seconds: int = 300) -> bool:
+        """Set several values with one pipelined Redis round trip."""
+        if not items:
+            return True
+        
+        success = False
+        encoded = {key: self.codec.encode(value) for key, value in items.items()}
+        
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, (frame, _) in encoded.items():
+                    pipe.setex(key, ttl_seconds, frame)
+                pipe.execute()
+                success = True
+            except Exception:
+                pass  # Fall back to the local tier
+        
+        for key, (_, text) in encoded.items():
+            self.local_cache.set(key, _EncodedValue(text, self.codec), ttl_seconds, len(text))
+        
+        return success
+    
+    def delete_many(self, keys: List[str]) -> bool:
+        """Delete several values with one Redis round trip."""
+        if not keys:
+            return True
+        
+        success = False
+        
+        if self.redis_client:
+            try:
+                self.redis_client.delete(*keys)
+                success = True
+            except Exception:
+                pass
+        
+        for key in keys:
+            self.local_cache.delete(key)
         
         return success
     
     def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern."""
+        """Delete all keys matching pattern.
+        
+        Uses incremental SCAN rather than KEYS so Redis is never blocked by a
+        full keyspace walk. Prefer generation counters for hot invalidation paths.
+        """
         deleted_count = 0
         
         # Try Redis first
         if self.redis_client:
             try:
-                keys = self.redis_client.keys(pattern)
-                if keys:
-                    deleted_count = self.redis_client.delete(*keys)
+                batch = []
+                for key in self.redis_client.scan_iter(match=pattern, count=500):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        deleted_count += self.redis_client.delete(*batch)
+                        batch = []
+                if batch:
+                    deleted_count += self.redis_client.delete(*batch)
             except Exception:
                 pass
         
-        # Remove from memory cache (exact match only)
-        with self._memory_cache_lock:
-            keys_to_remove = [k for k in self._memory_cache.keys() if k == pattern]
-            for key in keys_to_remove:
-                self._memory_cache.pop(key, None)
-                self._memory_cache_ttl.pop(key, None)
-                deleted_count += 1
+        # Remove from the local tier (exact match only)
+        if self.local_cache.delete(pattern):
+            deleted_count += 1
         
         return deleted_count
     
+    def get_counters(self, keys: List[str]) -> List[int]:
+        """Get integer counters for several keys in one round trip (missing keys are 0)."""
+        if self.redis_client:
+            try:
+                return [int(value or 0) for value in self.redis_client.mget(keys)]
+            except Exception:
+                pass  # Fall back to local counters
+        
+        return self.local_cache.get_counters(keys)
+    
+    def increment_counters(self, keys: List[str], ttl_seconds: int = None, seed: int = 0) -> bool:
+        """
+        Atomically increment several counters, refreshing their TTL.
+        
+        Counters missing from Redis start from seed rather than 0.
+        """
+        success = False
+        
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key in keys:
+                    if seed:
+                        pipe.set(key, seed, nx=True, ex=ttl_seconds)
+                    pipe.incr(key)
+                    if ttl_seconds:
+                        pipe.expire(key, ttl_seconds)
+                pipe.execute()
+                success = True
+            except Exception:
+                pass  # Fall back to local counters
+        
+        # Always bump local counters so the fallback path is invalidated too
+        self.local_cache.increment_counters(keys)
+        
+        return success
+    
     def acquire_lock(self, lock_key: str, ttl_seconds: int = 30) -> Optional[str]:
         """Acquire distributed lock."""
         lock_value = str(uuid.uuid4())
         
-        # Try Redis first
+        # Try Redis first; a lock held elsewhere is a definitive answer
         if self.redis_client:
             try:
                 if self.redis_client.set(lock_key, lock_value, nx=True, ex=ttl_seconds):
                     return lock_value
+                return None
             except Exception:
                 pass
         
-        # Fall back to memory-based locking (not truly distributed)
-        with self._memory_cache_lock:
-            if lock_key not in self._memory_cache:
-                self._memory_cache[lock_key] = lock_value
-                self._memory_cache_ttl[lock_key] = time.time()
-                return lock_value
+        # Fall back to an in-process lock (not truly distributed)
+        if self.local_cache.acquire_lock(lock_key, lock_value, ttl_seconds):
+            return lock_value
         
         return None
     
@@ -163,84 +484,540 @@ class CacheService:
             except Exception:
                 pass
         
-        # Fall back to memory cache
-        with self._memory_cache_lock:
-            if self._memory_cache.get(lock_key) == lock_value:
-                self._memory_cache.pop(lock_key, None)
-                self._memory_cache_ttl.pop(lock_key, None)
-                return True
+        # Fall back to the in-process lock
+        return self.local_cache.release_lock(lock_key, lock_value)
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl_seconds: int = 300,
+                       lock_ttl_seconds: int = 30) -> Any:
+        """
+        Return the cached value for key, computing and caching it on a miss.
+        
+        Concurrent misses on the same key run compute once: one caller per
+        process, and one process via a Redis lock, recomputes while the
+        others wait for its result. Hot keys are refreshed early by a single
+        caller, with a probability that rises as expiry nears and with the
+        cost of the last computation, while everyone else keeps reading the
+        cached value.
+        """
+        return self.get_or_compute_many(
+            [key], lambda: [compute()], ttl_seconds, lock_ttl_seconds=lock_ttl_seconds
+        )[0]
+    
+    def get_or_compute_many(self, keys: List[str], compute: Callable[[], List[Any]],
+                            ttl_seconds: int = 300, lock_key: Optional[str] = None,
+                            lock_ttl_seconds: int = 30) -> List[Any]:
+        """
+        get_or_compute for values produced together, e.g. one entry per day of a range.
         
-        return False
+        compute returns one value per key, in order. Any missing key
+        recomputes them all under one single-flight lock.
+        """
+        entries = self.get_many(keys, _MISSING)
+        present = all(entry is not _MISSING for entry in entries)
+        if present and not any(self._refresh_due(entry) for entry in entries):
+            return [self._computed_value(entry) for entry in entries]
+        
+        if lock_key is None:
+            lock_key = f"{keys[0]}:compute" if len(keys) == 1 else (
+                "tithi:compute:" + hashlib.sha1("|".join(keys).encode()).hexdigest()
+            )
+        
+        # With every value present this is an early refresh: nobody waits,
+        # and callers that lose the race keep serving the current values
+        with self.single_flight(lock_key, wait=not present, lock_ttl_seconds=lock_ttl_seconds) as leader:
+            if not leader:
+                if present:
+                    return [self._computed_value(entry) for entry in entries]
+                entries = self.get_many(keys, _MISSING)
+                if all(entry is not _MISSING for entry in entries):
+                    return [self._computed_value(entry) for entry in entries]
+                # The other caller failed or timed out; compute without it
+            
+            started = time.monotonic()
+            values = compute()
+            delta = time.monotonic() - started
+            self.set_many({
+                key: self._computed_entry(value, ttl_seconds, delta) for key, value in zip(keys, values)
+            }, ttl_seconds)
+            return values
+    
+    @contextmanager
+    def single_flight(self, lock_key: str, wait: bool = True, lock_ttl_seconds: int = 30,
+                      wait_seconds: Optional[float] = None):
+        """
+        Elect one caller, across threads and processes, to run a computation.
+        
+        Yields True for the caller that should compute. Others get False,
+        after waiting up to wait_seconds (default lock_ttl_seconds) for the
+        computation to finish when wait is set, and should re-read the cache.
+        """
+        wait_seconds = lock_ttl_seconds if wait_seconds is None else wait_seconds
+        
+        with _inflight_lock:
+            inflight = _inflight.get(lock_key)
+            if inflight is None:
+                inflight = _inflight[lock_key] = Event()
+                local_leader = True
+            else:
+                local_leader = False
+        
+        if not local_leader:
+            if wait:
+                inflight.wait(wait_seconds)
+            yield False
+            return
+        
+        try:
+            lock_value = self.acquire_lock(lock_key, lock_ttl_seconds)
+            if lock_value is None:
+                if wait:
+                    self._wait_for_lock_release(lock_key, wait_seconds)
+                yield False
+            else:
+                try:
+                    yield True
+                finally:
+                    self.release_lock(lock_key, lock_value)
+        finally:
+            with _inflight_lock:
+                _inflight.pop(lock_key, None)
+            inflight.set()
+    
+    def _wait_for_lock_release(self, lock_key: str, wait_seconds: float) -> None:
+        """Poll until another process releases lock_key or wait_seconds pass."""
+        deadline = time.monotonic() + wait_seconds
+        while time.monotonic() < deadline:
+            try:
+                if not self.redis_client.exists(lock_key):
+                    return
+            except Exception:
+                return
+            time.sleep(0.05)
+    
+    def _refresh_due(self, entry: Any) -> bool:
+        """XFetch: refresh before expiry with probability growing with compute cost."""
+        if not (isinstance(entry, dict) and entry.get(COMPUTED_MARKER)):
+            return False
+        delta = entry.get('delta') or 0
+        if delta <= 0:
+            return False
+        # 1 - random() lies in (0, 1], so the log is finite
+        jitter = -delta * self.early_refresh_beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= entry['expires_at']
+    
+    @staticmethod
+    def _computed_entry(value: Any, ttl_seconds: int, delta: float) -> Dict[str, Any]:
+        return {
+            COMPUTED_MARKER: 1,
+            'value': value,
+            'delta': delta,
+            'expires_at': time.time() + ttl_seconds
+        }
+    
+    @staticmethod
+    def _computed_value(entry: Any) -> Any:
+        """Unwrap a get_or_compute entry; plain values pass through unchanged."""
+        if isinstance(entry, dict) and entry.get(COMPUTED_MARKER):
+            return entry['value']
+        return entry
 
 
 class AvailabilityCacheService(CacheService):
-    """Specialized cache service for availability calculations."""
+    """
+    Specialized cache service for availability calculations.
+    
+    Entries are namespaced by generation counters at tenant, resource and date
+    level. Invalidation increments the relevant counter so stale entries are
+    simply never read again and expire on their own TTL; no keyspace scan is
+    needed. Because a change always moves the key, entries are also served
+    from the process-wide local tier without consulting Redis.
+    """
+    
+    local_read_through = True
     
     def __init__(self):
         """Initialize availability cache service."""
         super().__init__()
         self.cache_prefix = "tithi:availability"
+        self.windows_prefix = "tithi:availability:windows"
+        self.generation_prefix = "tithi:availability:gen"
         self.default_ttl = 300  # 5 minutes
+        # Generation counters must outlive any cached entry they version
+        self.generation_ttl = 7 * 24 * 3600
     
-    def get_availability(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, date: str) -> Optional[Dict]:
-        """Get cached availability for resource on specific date."""
-        key = self._get_cache_key(
+    @staticmethod
+    def _generation_seed() -> int:
+        """
+        Starting value for a new generation counter: the current time in ms.
+        
+        Counters expire after generation_ttl; starting each one from its
+        creation time keeps a recreated counter from repeating values (and
+        ETags) handed out before it expired.
+        """
+        return int(time.time() * 1000)
+    
+    def increment_counters(self, keys: List[str], ttl_seconds: int = None, seed: int = 0) -> bool:
+        return super().increment_counters(keys, ttl_seconds, seed or self._generation_seed())
+    
+    def _generation_keys(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, date: str) -> List[str]:
+        """Generation counter keys covering an entry, from widest to narrowest."""
+        return [
+            self._get_cache_key(self.generation_prefix, str(tenant_id)),
+            self._get_cache_key(self.generation_prefix, str(tenant_id), str(resource_id)),
+            self._get_cache_key(self.generation_prefix, str(tenant_id), str(resource_id), date),
+        ]
+    
+    def get_generation(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, date: str) -> str:
+        """Return the current generation tag for a resource and date."""
+        generations = self.get_counters(self._generation_keys(tenant_id, resource_id, date))
+        return ".".join(str(generation) for generation in generations)
+    
+    def availability_key(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, date: str) -> str:
+        """Build the versioned cache key for a resource and date."""
+        return self._get_cache_key(
             self.cache_prefix, 
             str(tenant_id), 
             str(resource_id), 
-            date
+            date,
+            f"v{self.get_generation(tenant_id, resource_id, date)}"
         )
-        return self.get(key)
+    
+    def availability_keys(self, tenant_id: uuid.UUID, resource_dates: List[Tuple[uuid.UUID, str]],
+                          prefix: Optional[str] = None) -> List[str]:
+        """Versioned keys for many (resource, date) pairs, reading every generation in one round trip."""
+        generation_keys = sorted({
+            key
+            for resource_id, date in resource_dates
+            for key in self._generation_keys(tenant_id, resource_id, date)
+        })
+        generations = dict(zip(generation_keys, self.get_counters(generation_keys)))
+        return [
+            self._get_cache_key(
+                prefix or self.cache_prefix,
+                str(tenant_id),
+                str(resource_id),
+                date,
+                "v" + ".".join(
+                    str(generations[key]) for key in self._generation_keys(tenant_id, resource_id, date)
+                )
+            )
+            for resource_id, date in resource_dates
+        ]
+    
+    def get_availability(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, date: str) -> Optional[Dict]:
+        """Get cached availability for resource on specific date."""
+        return self._computed_value(self.get(self.availability_key(tenant_id, resource_id, date)))
     
     def set_availability(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, 
                         date: str, availability_data: Dict, ttl_seconds: int = None) -> bool:
         """Cache availability data for resource on specific date."""
-        key = self._get_cache_key(
-            self.cache_prefix, 
-            str(tenant_id), 
-            str(resource_id), 
-            date
-        )
+        key = self.availability_key(tenant_id, resource_id, date)
         ttl = ttl_seconds or self.default_ttl
         return self.set(key, availability_data, ttl)
     
+    def get_day_windows_many(self, tenant_id: uuid.UUID,
+                             resource_dates: List[Tuple[uuid.UUID, str]]) -> Tuple[List[str], List[Optional[Dict]]]:
+        """
+        Cached free windows for many (resource, date) pairs in two round trips.
+        
+        Returns the versioned keys alongside the values so callers can store
+        what they compute under the generations they read.
+        """
+        keys = self.availability_keys(tenant_id, resource_dates, prefix=self.windows_prefix)
+        return keys, self.get_many(keys)
+    
+    def _summary_generation_key(self, tenant_id: uuid.UUID) -> str:
+        return self._get_cache_key(self.generation_prefix, "summary", str(tenant_id))
+    
+    def summary_key(self, tenant_id: uuid.UUID, start_date: str, end_date: str,
+                     staff_ids: Optional[List[uuid.UUID]] = None) -> str:
+        """Build the versioned summary key; any availability change for the tenant bumps it."""
+        generations = self.get_counters([
+            self._get_cache_key(self.generation_prefix, str(tenant_id)),
+            self._summary_generation_key(tenant_id),
+        ])
+        staff_part = ",".join(sorted(str(staff_id) for staff_id in staff_ids)) if staff_ids else "all"
+        return self._get_cache_key(
+            self.cache_prefix,
+            "summary",
+            str(tenant_id),
+            start_date,
+            end_date,
+            staff_part,
+            f"v{'.'.join(str(generation) for generation in generations)}"
+        )
+    
+    def get_summary(self, tenant_id: uuid.UUID, start_date: str, end_date: str,
+                    staff_ids: Optional[List[uuid.UUID]] = None) -> Optional[Dict]:
+        """Get a cached availability summary for a tenant and date range."""
+        return self._computed_value(self.get(self.summary_key(tenant_id, start_date, end_date, staff_ids)))
+    
+    def set_summary(self, tenant_id: uuid.UUID, start_date: str, end_date: str,
+                    summary: Dict, staff_ids: Optional[List[uuid.UUID]] = None,
+                    ttl_seconds: int = None) -> bool:
+        """Cache an availability summary for a tenant and date range."""
+        key = self.summary_key(tenant_id, start_date, end_date, staff_ids)
+        return self.set(key, summary, ttl_seconds or self.default_ttl)
+    
     def invalidate_availability(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, 
                                date: str = None) -> int:
-        """Invalidate availability cache for resource."""
+        """Invalidate availability cache for a resource on one date, or all dates."""
         if date:
-            # Invalidate specific date
-            key = self._get_cache_key(
-                self.cache_prefix, 
-                str(tenant_id), 
-                str(resource_id), 
-                date
-            )
-            return 1 if self.delete(key) else 0
+            key = self._get_cache_key(self.generation_prefix, str(tenant_id), str(resource_id), date)
         else:
-            # Invalidate all dates for resource
-            pattern = self._get_cache_key(
-                self.cache_prefix, 
-                str(tenant_id), 
-                str(resource_id), 
-                "*"
+            key = self._get_cache_key(self.generation_prefix, str(tenant_id), str(resource_id))
+        self.increment_counters([key, self._summary_generation_key(tenant_id)], self.generation_ttl)
+        return 1
+    
+    def invalidate_availability_range(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                                      start_at: datetime, end_at: datetime) -> int:
+        """Invalidate every date touched by [start_at, end_at) for a resource."""
+        keys = []
+        current_date = start_at.date()
+        # An interval ending exactly at midnight does not touch the next day
+        last_date = (end_at - timedelta(microseconds=1)).date() if end_at > start_at else start_at.date()
+        
+        while current_date <= last_date:
+            keys.append(self._get_cache_key(
+                self.generation_prefix, str(tenant_id), str(resource_id), current_date.isoformat()
+            ))
+            current_date += timedelta(days=1)
+        
+        # Tenant summaries aggregate every resource, so any change stales them
+        self.increment_counters(keys + [self._summary_generation_key(tenant_id)], self.generation_ttl)
+        return len(keys)
+    
+    def invalidate_availability_dates(self, tenant_id: uuid.UUID,
+                                      resource_dates: Dict[uuid.UUID, Any]) -> int:
+        """Invalidate many resource dates, e.g. after a bulk action, in one round trip."""
+        keys = [
+            self._get_cache_key(
+                self.generation_prefix, str(tenant_id), str(resource_id), day.isoformat()
             )
-            return self.delete_pattern(pattern)
+            for resource_id, dates in resource_dates.items()
+            for day in sorted(dates)
+        ]
+        if keys:
+            self.increment_counters(keys + [self._summary_generation_key(tenant_id)], self.generation_ttl)
+        return len(keys)
     
     def invalidate_tenant_availability(self, tenant_id: uuid.UUID) -> int:
         """Invalidate all availability cache for tenant."""
-        pattern = self._get_cache_key(self.cache_prefix, str(tenant_id), "*")
-        return self.delete_pattern(pattern)
+        self.increment_counters(
+            [self._get_cache_key(self.generation_prefix, str(tenant_id))], self.generation_ttl
+        )
+        return 1
+    
+    def _catalog_generation_key(self, tenant_id: uuid.UUID, catalog: str) -> str:
+        return self._get_cache_key(self.generation_prefix, "catalog", catalog, str(tenant_id))
+    
+    def invalidate_catalog(self, tenant_id: uuid.UUID, catalog: str) -> int:
+        """
+        Bump a tenant's "services" or "staff" catalog generation.
+        
+        Slots embed service and staff details, so the tenant's availability
+        and summary generations move with it.
+        """
+        self.increment_counters([
+            self._catalog_generation_key(tenant_id, catalog),
+            self._get_cache_key(self.generation_prefix, str(tenant_id)),
+            self._summary_generation_key(tenant_id),
+        ], self.generation_ttl)
+        return 1
+    
+    def get_etag(self, tenant_id: uuid.UUID, variant: str, catalogs: List[str] = (),
+                 resource_ids: List[uuid.UUID] = (), dates: List[str] = ()) -> Optional[str]:
+        """
+        Build an entity tag from generation counters alone, in one round trip.
+        
+        The tag covers the tenant generation, the named catalogs and, for each
+        resource, its resource and per-date generations, so any mutation that
+        invalidates cached availability also changes the tag. variant
+        distinguishes representations of the same data (path, query, format).
+        
+        Returns None without Redis: the in-process fallback counters only see
+        this process's invalidations, so no tag is safer than a stale one.
+        """
+        if not self.redis_client:
+            return None
+        
+        keys = [self._get_cache_key(self.generation_prefix, str(tenant_id))]
+        keys.extend(self._catalog_generation_key(tenant_id, catalog) for catalog in catalogs)
+        for resource_id in resource_ids:
+            keys.append(self._get_cache_key(self.generation_prefix, str(tenant_id), str(resource_id)))
+            keys.extend(
+                self._get_cache_key(self.generation_prefix, str(tenant_id), str(resource_id), date)
+                for date in dates
+            )
+        
+        try:
+            values = self.redis_client.mget(keys)
+            missing = [key for key, value in zip(keys, values) if value is None]
+            if missing:
+                # A missing counter reads as 0, as it did before it first
+                # existed; seed it so an expired counter cannot revive old tags
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key in missing:
+                    pipe.set(key, self._generation_seed(), nx=True, ex=self.generation_ttl)
+                pipe.execute()
+                values = self.redis_client.mget(keys)
+            generations = [int(value or 0) for value in values]
+        except Exception:
+            return None
+        
+        tag_source = "|".join(
+            [str(tenant_id), variant] + [str(resource_id) for resource_id in resource_ids] +
+            [str(generation) for generation in generations]
+        )
+        return hashlib.sha1(tag_source.encode()).hexdigest()
 
 
 class BookingHoldCacheService(CacheService):
     """Specialized cache service for booking holds."""
     
+    # The slot scripts decode hold payloads with cjson
+    value_codec = PLAIN_JSON_CODEC
+    
+    # Claims [start, end) on a resource if no live hold overlaps it. Intervals
+    # live in a per-resource sorted set scored by start; each member carries
+    # "end|expires|hold_key" so lapsed holds are pruned while scanning.
+    CLAIM_SLOT_SCRIPT = """
+    local slot_start = tonumber(ARGV[1])
+    local now = tonumber(ARGV[3])
+    local entries = redis.call("zrangebyscore", KEYS[1], "-inf", "(" .. ARGV[2])
+    for _, entry in ipairs(entries) do
+        local entry_end, entry_expires = string.match(entry, "^([^|]+)|([^|]+)|")
+        if tonumber(entry_expires) <= now then
+            redis.call("zrem", KEYS[1], entry)
+        elseif tonumber(entry_end) > slot_start then
+            return 0
+        end
+    end
+    redis.call("zadd", KEYS[1], slot_start, ARGV[4])
+    if redis.call("ttl", KEYS[1]) < tonumber(ARGV[6]) then
+        redis.call("expire", KEYS[1], ARGV[6])
+    end
+    redis.call("set", KEYS[2], ARGV[5], "EX", ARGV[6])
+    redis.call("zadd", KEYS[3], now, KEYS[2])
+    return 1
+    """
+    
+    # Removes a claim, its payload and its pending-persistence marker together
+    RELEASE_SLOT_SCRIPT = """
+    local payload = redis.call("get", KEYS[1])
+    if not payload then
+        redis.call("zrem", KEYS[2], KEYS[1])
+        return false
+    end
+    local hold = cjson.decode(payload)
+    redis.call("zrem", hold["slot_key"], hold["slot_member"])
+    redis.call("del", KEYS[1])
+    redis.call("zrem", KEYS[2], KEYS[1])
+    return payload
+    """
+    
     def __init__(self):
         """Initialize booking hold cache service."""
         super().__init__()
         self.hold_prefix = "tithi:hold"
+        self.slots_prefix = "tithi:hold:slots"
+        self.pending_key = "tithi:hold:pending"
         self.default_ttl = 900  # 15 minutes
     
+    def claim_slot(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, hold_key: str,
+                   start_at: datetime, end_at: datetime, hold_until: datetime,
+                   hold_data: Dict) -> Optional[bool]:
+        """
+        Atomically claim a resource time range for a hold.
+        
+        Returns True when claimed, False when a live hold overlaps, and None
+        when Redis is unavailable so the caller can fall back to the database.
+        """
+        if not self.redis_client:
+            return None
+        
+        slot_key = self._get_cache_key(self.slots_prefix, str(tenant_id), str(resource_id))
+        # hold_until is naive UTC, so its epoch expiry is taken as an offset from now
+        hold_seconds = (hold_until - datetime.utcnow()).total_seconds()
+        slot_member = f"{end_at.timestamp()}|{time.time() + hold_seconds}|{hold_key}"
+        payload = {
+            **hold_data,
+            'tenant_id': str(tenant_id),
+            'resource_id': str(resource_id),
+            'hold_key': hold_key,
+            'slot_key': slot_key,
+            'slot_member': slot_member
+        }
+        ttl_seconds = max(int(hold_seconds), 1)
+        
+        try:
+            result = self.redis_client.eval(
+                self.CLAIM_SLOT_SCRIPT, 3,
+                slot_key,
+                self._get_cache_key(self.hold_prefix, str(tenant_id), hold_key),
+                self.pending_key,
+                start_at.timestamp(), end_at.timestamp(), time.time(),
+                slot_member, json.dumps(payload, default=str), ttl_seconds
+            )
+        except Exception:
+            return None
+        
+        return result == 1
+    
+    def release_slot(self, tenant_id: uuid.UUID, hold_key: str) -> Optional[Dict]:
+        """Release a claimed slot; returns the hold payload if one was held."""
+        key = self._get_cache_key(self.hold_prefix, str(tenant_id), hold_key)
+        
+        if self.redis_client:
+            try:
+                payload = self.redis_client.eval(
+                    self.RELEASE_SLOT_SCRIPT, 2, key, self.pending_key
+                )
+                self.local_cache.delete(key)
+                return json.loads(payload) if payload else None
+            except Exception:
+                pass
+        
+        payload = self.get(key)
+        self.delete(key)
+        return payload
+    
+    def get_pending_holds(self, older_than_seconds: int = 0, limit: int = 500) -> List[Dict]:
+        """Return claimed holds whose database row has not been confirmed yet."""
+        if not self.redis_client:
+            return []
+        
+        try:
+            keys = self.redis_client.zrangebyscore(
+                self.pending_key, "-inf", time.time() - older_than_seconds, start=0, num=limit
+            )
+            if not keys:
+                return []
+            
+            pending = []
+            for key, payload in zip(keys, self.redis_client.mget(keys)):
+                if payload is None:
+                    # Hold lapsed before it was persisted; nothing left to write
+                    self.redis_client.zrem(self.pending_key, key)
+                    continue
+                pending.append(json.loads(payload))
+            return pending
+        except Exception:
+            return []
+    
+    def mark_hold_persisted(self, tenant_id: uuid.UUID, hold_key: str) -> bool:
+        """Clear the pending-persistence marker once the database row exists."""
+        if not self.redis_client:
+            return False
+        
+        try:
+            self.redis_client.zrem(
+                self.pending_key, self._get_cache_key(self.hold_prefix, str(tenant_id), hold_key)
+            )
+            return True
+        except Exception:
+            return False
+    
     def create_hold(self, tenant_id: uuid.UUID, hold_key: str, hold_data: Dict, 
                    ttl_seconds: int = None) -> bool:
         """Create booking hold in cache."""
@@ -277,14 +1054,199 @@ class BookingHoldCacheService(CacheService):
 
 
 class WaitlistCacheService(CacheService):
-    """Specialized cache service for waitlist management."""
+    """
+    Specialized cache service for waitlist management.
+    
+    Waiting entries are indexed per resource in sorted sets scored by the
+    start of their preferred window, so a freed slot is matched with a range
+    read instead of a scan of the whole waitlist. Entries with both window
+    ends live in a "bounded" set alongside the longest indexed window, which
+    bounds how far before the slot the range read must start; entries missing
+    either end live in a smaller "open" set. Members encode
+    "priority|created|window_end|expires|entry_id" so candidates are filtered
+    and ranked without touching the database.
+    
+    The maximum window length key doubles as the index's completeness
+    marker. Only rebuild_waitlist_index creates it, after indexing every
+    waiting entry of the resource. Until it exists (a new deployment, or an
+    evicted or expired index) lookups return None and callers use the
+    database.
+    """
+    
+    # Adds an entry and raises the tracked maximum window length if needed;
+    # leaves a missing marker alone, since the index is not complete yet
+    INDEX_ENTRY_SCRIPT = """
+    redis.call("zadd", KEYS[1], ARGV[1], ARGV[2])
+    redis.call("expire", KEYS[1], ARGV[4])
+    local current = redis.call("get", KEYS[2])
+    if current then
+        if tonumber(ARGV[3]) > tonumber(current) then
+            redis.call("set", KEYS[2], ARGV[3])
+        end
+        redis.call("expire", KEYS[2], ARGV[4])
+    end
+    return 1
+    """
+    
+    # Marks an index complete, keeping the larger of the stored and rebuilt
+    # maximum window lengths
+    MARK_INDEXED_SCRIPT = """
+    local current = tonumber(redis.call("get", KEYS[1]) or "0")
+    if tonumber(ARGV[1]) > current then
+        current = tonumber(ARGV[1])
+    end
+    redis.call("set", KEYS[1], current, "EX", ARGV[2])
+    return 1
+    """
     
     def __init__(self):
         """Initialize waitlist cache service."""
         super().__init__()
         self.waitlist_prefix = "tithi:waitlist"
         self.notification_prefix = "tithi:waitlist:notification"
+        self.index_prefix = "tithi:waitlist:idx"
         self.default_ttl = 3600  # 1 hour
+        # Index keys outlive the 30-day waitlist entry expiry
+        self.index_ttl = 31 * 24 * 3600
+    
+    def _index_keys(self, tenant_id: uuid.UUID, resource_id: uuid.UUID) -> Dict[str, str]:
+        return {
+            name: self._get_cache_key(self.index_prefix, name, str(tenant_id), str(resource_id))
+            for name in ('bounded', 'open', 'maxlen')
+        }
+    
+    @staticmethod
+    def _index_member(entry: Any) -> str:
+        """Encode a waitlist entry as an index member (deterministic, so it can be removed)."""
+        window_end = entry.preferred_end_at.timestamp() if entry.preferred_end_at else 'inf'
+        expires = entry.expires_at.timestamp() if entry.expires_at else 'inf'
+        created = entry.created_at.timestamp() if entry.created_at else 0
+        return f"{entry.priority or 0}|{created}|{window_end}|{expires}|{entry.id}"
+    
+    def index_waitlist_entry(self, tenant_id: uuid.UUID, entry: Any) -> bool:
+        """Index a waiting entry by resource and preferred window."""
+        if not self.redis_client:
+            return False
+        
+        keys = self._index_keys(tenant_id, entry.resource_id)
+        bounded = entry.preferred_start_at is not None and entry.preferred_end_at is not None
+        score = entry.preferred_start_at.timestamp() if entry.preferred_start_at else 0
+        window_length = (entry.preferred_end_at - entry.preferred_start_at).total_seconds() if bounded else 0
+        
+        try:
+            self.redis_client.eval(
+                self.INDEX_ENTRY_SCRIPT, 2,
+                keys['bounded'] if bounded else keys['open'], keys['maxlen'],
+                score, self._index_member(entry), window_length, self.index_ttl
+            )
+            return True
+        except Exception:
+            return False
+    
+    def rebuild_waitlist_index(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                               entries: List[Any]) -> bool:
+        """
+        Index every waiting entry of a resource and mark its index complete.
+        
+        Members are added rather than replaced, so entries indexed while the
+        rebuild runs are kept; members of entries that stopped waiting are
+        skipped by the database read that follows every lookup.
+        """
+        if not self.redis_client:
+            return False
+        
+        keys = self._index_keys(tenant_id, resource_id)
+        bounded, open_ended = {}, {}
+        max_length = 0
+        for entry in entries:
+            if entry.preferred_start_at is not None and entry.preferred_end_at is not None:
+                bounded[self._index_member(entry)] = entry.preferred_start_at.timestamp()
+                max_length = max(max_length, (entry.preferred_end_at - entry.preferred_start_at).total_seconds())
+            else:
+                score = entry.preferred_start_at.timestamp() if entry.preferred_start_at else 0
+                open_ended[self._index_member(entry)] = score
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, members in ((keys['bounded'], bounded), (keys['open'], open_ended)):
+                if members:
+                    pipe.zadd(key, members)
+                    pipe.expire(key, self.index_ttl)
+            pipe.eval(self.MARK_INDEXED_SCRIPT, 1, keys['maxlen'], max_length, self.index_ttl)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+    
+    def unindex_waitlist_entries(self, tenant_id: uuid.UUID, entries: List[Any]) -> bool:
+        """Remove entries from the index once they are notified, booked or cancelled."""
+        if not self.redis_client or not entries:
+            return False
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for entry in entries:
+                keys = self._index_keys(tenant_id, entry.resource_id)
+                member = self._index_member(entry)
+                pipe.zrem(keys['bounded'], member)
+                pipe.zrem(keys['open'], member)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+    
+    def find_waitlist_candidates(self, tenant_id: uuid.UUID, resource_id: uuid.UUID,
+                                 start_at: datetime, end_at: datetime,
+                                 limit: int) -> Optional[List[str]]:
+        """
+        Return ids of the best waiting entries whose window contains [start_at, end_at).
+        
+        Ranked by priority, then age. Returns None when Redis is unavailable or
+        the resource's index is not complete, so callers fall back to the
+        database.
+        """
+        if not self.redis_client:
+            return None
+        
+        keys = self._index_keys(tenant_id, resource_id)
+        slot_start = start_at.timestamp()
+        slot_end = end_at.timestamp()
+        now = time.time()
+        
+        try:
+            max_length = self.redis_client.get(keys['maxlen'])
+            if max_length is None:
+                return None
+            max_length = float(max_length)
+            pipe = self.redis_client.pipeline(transaction=False)
+            # A containing window starts at or before the slot, and no earlier
+            # than the longest indexed window allows
+            pipe.zrangebyscore(keys['bounded'], slot_start - max_length, slot_start)
+            pipe.zrangebyscore(keys['open'], '-inf', slot_start)
+            bounded_members, open_members = pipe.execute()
+        except Exception:
+            return None
+        
+        candidates = []
+        lapsed = []
+        for key, members in ((keys['bounded'], bounded_members), (keys['open'], open_members)):
+            for member in members:
+                priority, created, window_end, expires, entry_id = member.split('|')
+                if float(expires) <= now:
+                    lapsed.append((key, member))
+                elif float(window_end) >= slot_end:
+                    candidates.append((-int(priority), float(created), entry_id))
+        
+        if lapsed:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, member in lapsed:
+                    pipe.zrem(key, member)
+                pipe.execute()
+            except Exception:
+                pass
+        
+        return [entry_id for _, _, entry_id in heapq.nsmallest(limit, candidates)]
     
     def add_to_waitlist_cache(self, tenant_id: uuid.UUID, resource_id: uuid.UUID, 
                             waitlist_data: Dict) -> bool:
@@ -295,8 +1257,8 @@ class WaitlistCacheService(CacheService):
             str(resource_id)
         )
         
-        # Get existing waitlist
-        waitlist = self.get(key, [])
+        # Get existing waitlist (copied; cached values are shared)
+        waitlist = list(self.get(key, []))
         waitlist.append(waitlist_data)
         
         # Sort by priority and created_at
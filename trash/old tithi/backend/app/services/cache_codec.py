@@ -0,0 +1,142 @@
+"""
+Cache Value Codec
+
+Encodes values cached in Redis behind a one-character header naming the
+format, so the JSON library and compression can change without flushing
+the cache:
+
+    (none)  plain JSON, as written before headers existed
+    J       JSON text
+    Z       zlib-compressed JSON, base64 encoded
+
+Values whose JSON is at least CACHE_COMPRESS_MIN_BYTES long are compressed.
+The shared Redis client decodes responses to str, so compressed frames are
+stored as base64 text. No JSON document starts with "J" or "Z", so
+header-less entries stay readable.
+
+CACHE_CODEC selects the JSON library: "json" (standard library) or
+"orjson" when it is installed. Both write the same text. Datetimes, dates
+and times become ISO 8601 strings, UUIDs and Decimals become plain strings.
+"""
+
+import json
+import uuid
+import zlib
+import base64
+from datetime import date, datetime, time
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+JSON_HEADER = "J"
+ZLIB_HEADER = "Z"
+
+
+def _json_default(value: Any) -> Any:
+    """Encode the non-JSON types cached values commonly carry."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+class CacheCodec:
+    """Encodes and decodes cached values, recording the format in a header."""
+
+    def __init__(self, library: str = "json", compress_min_bytes: int = 4096,
+                 compress_level: int = 1, headers: bool = True):
+        """
+        Args:
+            library: "json" or "orjson"
+            compress_min_bytes: Compress JSON at least this long; 0 disables compression
+            compress_level: zlib level; low levels favour speed
+            headers: Write header-less plain JSON, for values read by Lua scripts
+        """
+        if library == "orjson":
+            import orjson
+            self._orjson = orjson
+        elif library == "json":
+            self._orjson = None
+        else:
+            raise ValueError(f"Unsupported cache codec: {library}")
+
+        self.library = library
+        self.compress_min_bytes = compress_min_bytes if headers else 0
+        self.compress_level = compress_level
+        self.headers = headers
+
+    def dumps(self, value: Any) -> str:
+        """Serialize a value to JSON text."""
+        if self._orjson is not None:
+            return self._orjson.dumps(
+                value, default=_json_default, option=self._orjson.OPT_NON_STR_KEYS
+            ).decode()
+        return json.dumps(value, default=_json_default, separators=(',', ':'))
+
+    def loads(self, text: Any) -> Any:
+        if self._orjson is not None:
+            return self._orjson.loads(text)
+        return json.loads(text)
+
+    def encode(self, value: Any) -> Tuple[str, str]:
+        """
+        Encode a value for Redis.
+
+        Returns:
+            (frame to store, JSON text); loads(text) is the value as it will
+            read back, and len(text) its size
+        """
+        text = self.dumps(value)
+
+        if not self.headers:
+            return text, text
+
+        if self.compress_min_bytes and len(text) >= self.compress_min_bytes:
+            compressed = zlib.compress(text.encode(), self.compress_level)
+            return ZLIB_HEADER + base64.b64encode(compressed).decode('ascii'), text
+
+        return JSON_HEADER + text, text
+
+    def decode(self, frame: Any) -> Any:
+        """Decode a frame written by encode, or a header-less JSON entry."""
+        return self.decode_with_size(frame)[0]
+
+    def decode_with_size(self, frame: Any) -> Tuple[Any, int]:
+        """Decode a frame and report its JSON length."""
+        if isinstance(frame, bytes):
+            frame = frame.decode()
+
+        header = frame[:1]
+        if header == ZLIB_HEADER:
+            text = zlib.decompress(base64.b64decode(frame[1:]))
+        elif header == JSON_HEADER:
+            text = frame[1:]
+        else:
+            text = frame
+        return self.loads(text), len(text)
+
+
+# Hold payloads are decoded by Lua scripts, so they stay plain JSON
+PLAIN_JSON_CODEC = CacheCodec(headers=False)
+
+_cache_codec: Optional[CacheCodec] = None
+_cache_codec_lock = Lock()
+
+
+def get_cache_codec() -> CacheCodec:
+    """Return the process-wide codec configured by CACHE_CODEC and CACHE_COMPRESS_MIN_BYTES."""
+    global _cache_codec
+    if _cache_codec is None:
+        with _cache_codec_lock:
+            if _cache_codec is None:
+                config = current_app.config if has_app_context() else {}
+                _cache_codec = CacheCodec(
+                    library=config.get('CACHE_CODEC', 'json'),
+                    compress_min_bytes=int(config.get('CACHE_COMPRESS_MIN_BYTES', 4096))
+                )
+    return _cache_codec
@@ -0,0 +1,325 @@
+"""
+Customer Metrics Service
+
+Maintains the customer_metrics read model off the booking request path.
+Booking creation and every booking status transition add a
+CUSTOMER_METRICS_DELTA outbox row in their own transaction; a worker claims
+ready deltas in batches, coalesces them per customer and applies each batch
+as one executemany of relative UPDATEs (total_bookings_count =
+total_bookings_count + n), so repeat customers never serialize booking
+requests on their metrics row.
+
+Delta payloads carry the difference between what the booking contributed
+before and after the write (a new booking contributed nothing before):
+
+    {"customer_id": "...", "bookings": 1, "spend_cents": 0, "no_shows": 0,
+     "canceled": 0, "booked_at": "2030-01-07T09:00:00"}
+
+rebuild() recomputes every row from bookings with one aggregate query and is
+the authority whenever the incremental counters are in doubt.
+"""
+
+import uuid
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, case, delete, func, insert, or_, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..extensions import db
+from ..models.audit import EventOutbox
+from ..models.business import Booking, CustomerMetrics
+from .business_phase2 import BaseService, DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+CUSTOMER_METRICS_EVENT = "CUSTOMER_METRICS_DELTA"
+
+# Booking statuses whose service price counts towards total_spend_cents
+SPEND_STATUSES = ('confirmed', 'checked_in', 'completed')
+
+
+class CustomerMetricsService(BaseService):
+    """Deferred maintenance and full rebuilds of customer_metrics."""
+
+    # Outbox deltas claimed per worker transaction
+    DELTA_BATCH_SIZE = 1000
+
+    def delta_event(self, tenant_id: uuid.UUID, booking: Booking,
+                    previous_status: Optional[str] = None) -> Optional[EventOutbox]:
+        """
+        Outbox row recording how a write changed a booking's contribution to its customer's metrics.
+
+        previous_status is None for a new booking. Returns None when the
+        transition changes nothing (e.g. confirmed to checked_in). The caller
+        adds the row to the session so it commits, or rolls back, with the
+        booking itself.
+        """
+        payload = self.delta_payload(
+            booking.customer_id, booking.start_at, booking.service_snapshot, booking.status, previous_status
+        )
+        if payload is None:
+            return None
+        return EventOutbox(**self.delta_row(tenant_id, payload))
+
+    def delta_payload(self, customer_id: uuid.UUID, start_at: datetime, service_snapshot: Optional[Dict],
+                      status: str, previous_status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Delta payload for a booking moving from previous_status (None when new) to status."""
+        price_cents = (service_snapshot or {}).get('price_cents') or 0
+        after = self._contribution(status, price_cents)
+        before = self._contribution(previous_status, price_cents) if previous_status else (0, 0, 0)
+        spend_cents, no_shows, canceled = (new - old for new, old in zip(after, before))
+        bookings = 0 if previous_status else 1
+
+        if not (bookings or spend_cents or no_shows or canceled):
+            return None
+        return {
+            "customer_id": str(customer_id),
+            "bookings": bookings,
+            "spend_cents": spend_cents,
+            "no_shows": no_shows,
+            "canceled": canceled,
+            "booked_at": start_at.isoformat()
+        }
+
+    def delta_row(self, tenant_id: uuid.UUID, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Outbox column values for a delta payload, for bulk inserts."""
+        return {
+            'id': uuid.uuid4(),
+            'tenant_id': tenant_id,
+            'event_code': CUSTOMER_METRICS_EVENT,
+            'payload': payload,
+            'status': "ready",
+            'attempts': 0,
+            'max_attempts': self.config.MAX_RETRY_ATTEMPTS,
+            'ready_at': datetime.utcnow()
+        }
+
+    @staticmethod
+    def _contribution(status: str, price_cents: int) -> Tuple[int, int, int]:
+        """(spend_cents, no_shows, canceled) a booking in status adds to its customer's metrics."""
+        return (
+            price_cents if status in SPEND_STATUSES else 0,
+            int(status == 'no_show'),
+            int(status == 'canceled')
+        )
+
+    def apply_pending_deltas(self, batch_size: Optional[int] = None) -> int:
+        """
+        Claim a batch of ready deltas and fold them into customer_metrics.
+
+        The claim, the counter updates and marking the events delivered share
+        one transaction, so a failed batch is retried whole on the next run.
+        SKIP LOCKED lets concurrent workers claim disjoint batches on
+        PostgreSQL.
+
+        Returns:
+            Number of delta events applied
+        """
+        now = datetime.utcnow()
+        events = (
+            EventOutbox.query
+            .filter(
+                EventOutbox.event_code == CUSTOMER_METRICS_EVENT,
+                EventOutbox.status == "ready",
+                EventOutbox.ready_at <= now
+            )
+            .order_by(EventOutbox.ready_at)
+            .limit(batch_size or self.DELTA_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not events:
+            return 0
+
+        event_ids = [event.id for event in events]
+        deltas = self._coalesce(events)
+
+        try:
+            self._ensure_rows(list(deltas))
+            db.session.execute(
+                update(CustomerMetrics.__table__)
+                .where(and_(
+                    CustomerMetrics.tenant_id == bindparam('b_tenant_id'),
+                    CustomerMetrics.customer_id == bindparam('b_customer_id')
+                ))
+                .values(
+                    total_bookings_count=CustomerMetrics.total_bookings_count + bindparam('b_bookings'),
+                    total_spend_cents=CustomerMetrics.total_spend_cents + bindparam('b_spend_cents'),
+                    no_show_count=CustomerMetrics.no_show_count + bindparam('b_no_shows'),
+                    canceled_count=CustomerMetrics.canceled_count + bindparam('b_canceled'),
+                    first_booking_at=case(
+                        (or_(CustomerMetrics.first_booking_at.is_(None),
+                             CustomerMetrics.first_booking_at > bindparam('b_first_at')),
+                         bindparam('b_first_at')),
+                        else_=CustomerMetrics.first_booking_at
+                    ),
+                    last_booking_at=case(
+                        (or_(CustomerMetrics.last_booking_at.is_(None),
+                             CustomerMetrics.last_booking_at < bindparam('b_last_at')),
+                         bindparam('b_last_at')),
+                        else_=CustomerMetrics.last_booking_at
+                    ),
+                    updated_at=now
+                ),
+                [
+                    {
+                        'b_tenant_id': tenant_id,
+                        'b_customer_id': customer_id,
+                        **delta
+                    }
+                    for (tenant_id, customer_id), delta in deltas.items()
+                ]
+            )
+            db.session.execute(
+                update(EventOutbox)
+                .where(EventOutbox.id.in_(event_ids))
+                .values(status="delivered", delivered_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseError(f"Failed to apply customer metric deltas: {str(e)}")
+
+        logger.info("Customer metric deltas applied", extra={
+            'events': len(event_ids),
+            'customers': len(deltas)
+        })
+        return len(event_ids)
+
+    def rebuild(self, tenant_id: Optional[uuid.UUID] = None) -> int:
+        """
+        Recompute customer_metrics from bookings with one aggregate query.
+
+        Replaces the rows of every customer in scope (one tenant, or all),
+        and retires the ready deltas the aggregate already covers. Those ids
+        are read first and in the same REPEATABLE READ snapshot as the
+        aggregate, so a delta committed while the rebuild runs describes a
+        booking the aggregate did not see and stays ready for the worker.
+        Call it outside any open transaction.
+
+        Returns:
+            Number of customer rows written
+        """
+        if db.engine.dialect.name == 'postgresql':
+            db.session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+
+        delta_ids = self._ready_delta_ids(tenant_id)
+
+        price = Booking.service_snapshot['price_cents'].as_integer()
+        query = db.session.query(
+            Booking.tenant_id,
+            Booking.customer_id,
+            func.count(Booking.id),
+            func.coalesce(func.sum(case((Booking.status.in_(SPEND_STATUSES), price), else_=0)), 0),
+            func.min(Booking.start_at),
+            func.max(Booking.start_at),
+            func.count(case((Booking.status == 'no_show', 1))),
+            func.count(case((Booking.status == 'canceled', 1)))
+        ).group_by(Booking.tenant_id, Booking.customer_id)
+        if tenant_id:
+            query = query.filter(Booking.tenant_id == tenant_id)
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                'id': uuid.uuid4(),
+                'tenant_id': row_tenant_id,
+                'customer_id': customer_id,
+                'total_bookings_count': bookings_count,
+                'total_spend_cents': int(spend_cents),
+                'first_booking_at': first_booking_at,
+                'last_booking_at': last_booking_at,
+                'no_show_count': no_show_count,
+                'canceled_count': canceled_count,
+                'created_at': now,
+                'updated_at': now
+            }
+            for (row_tenant_id, customer_id, bookings_count, spend_cents, first_booking_at,
+                 last_booking_at, no_show_count, canceled_count) in query.all()
+        ]
+
+        metrics_scope = [CustomerMetrics.tenant_id == tenant_id] if tenant_id else []
+
+        try:
+            db.session.execute(delete(CustomerMetrics).where(*metrics_scope))
+            if rows:
+                db.session.execute(insert(CustomerMetrics), rows)
+            if delta_ids:
+                db.session.execute(
+                    update(EventOutbox)
+                    .where(EventOutbox.id.in_(delta_ids), EventOutbox.status == "ready")
+                    .values(status="delivered", delivered_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseError(f"Failed to rebuild customer metrics: {str(e)}")
+
+        logger.info("Customer metrics rebuilt", extra={
+            'tenant_id': str(tenant_id) if tenant_id else None,
+            'customers': len(rows)
+        })
+        return len(rows)
+
+    @staticmethod
+    def _ready_delta_ids(tenant_id: Optional[uuid.UUID]) -> List[uuid.UUID]:
+        """Ids of the ready deltas in scope of a rebuild."""
+        query = db.session.query(EventOutbox.id).filter(
+            EventOutbox.event_code == CUSTOMER_METRICS_EVENT,
+            EventOutbox.status == "ready"
+        )
+        if tenant_id:
+            query = query.filter(EventOutbox.tenant_id == tenant_id)
+        return [delta_id for delta_id, in query.all()]
+
+    @staticmethod
+    def _coalesce(events: List[EventOutbox]) -> Dict[Tuple[uuid.UUID, uuid.UUID], Dict[str, Any]]:
+        """Sum a batch of deltas into one set of bind values per customer."""
+        deltas = {}
+        for event in events:
+            payload = event.payload or {}
+            booked_at = datetime.fromisoformat(payload['booked_at'])
+            key = (event.tenant_id, uuid.UUID(payload['customer_id']))
+            delta = deltas.setdefault(key, {
+                'b_bookings': 0,
+                'b_spend_cents': 0,
+                'b_no_shows': 0,
+                'b_canceled': 0,
+                'b_first_at': booked_at,
+                'b_last_at': booked_at
+            })
+            delta['b_bookings'] += payload.get('bookings', 0)
+            delta['b_spend_cents'] += payload.get('spend_cents', 0)
+            delta['b_no_shows'] += payload.get('no_shows', 0)
+            delta['b_canceled'] += payload.get('canceled', 0)
+            delta['b_first_at'] = min(delta['b_first_at'], booked_at)
+            delta['b_last_at'] = max(delta['b_last_at'], booked_at)
+        return deltas
+
+    @staticmethod
+    def _ensure_rows(keys: List[Tuple[uuid.UUID, uuid.UUID]]) -> None:
+        """Insert zeroed metrics rows for customers in the batch that have none yet."""
+        existing = set(
+            db.session.query(CustomerMetrics.tenant_id, CustomerMetrics.customer_id)
+            .filter(tuple_(CustomerMetrics.tenant_id, CustomerMetrics.customer_id).in_(keys))
+            .all()
+        )
+        missing = [key for key in keys if key not in existing]
+        if missing:
+            db.session.execute(insert(CustomerMetrics), [
+                {
+                    'id': uuid.uuid4(),
+                    'tenant_id': tenant_id,
+                    'customer_id': customer_id,
+                    'total_bookings_count': 0,
+                    'total_spend_cents': 0,
+                    'no_show_count': 0,
+                    'canceled_count': 0
+                }
+                for tenant_id, customer_id in missing
+            ])
@@ -0,0 +1,172 @@
+"""
+Occupancy Index
+
+Shared per-resource occupancy used by every availability path. Bookings and
+active holds are folded into sorted, disjoint busy intervals per resource so a
+conflict check is a single binary search instead of a scan over bookings.
+"""
+
+import uuid
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_
+
+from ..extensions import db
+from ..models.business import Booking, BookingHold
+
+
+# Booking statuses that occupy a resource
+ACTIVE_BOOKING_STATUSES = ('pending', 'confirmed', 'checked_in')
+
+
+class ResourceOccupancy:
+    """Sorted, disjoint busy intervals for a single resource."""
+
+    __slots__ = ('_starts', '_ends')
+
+    def __init__(self):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+
+    def add(self, start_at: datetime, end_at: datetime) -> None:
+        """Mark [start_at, end_at) busy, merging overlapping or touching intervals."""
+        if end_at <= start_at:
+            return
+
+        # Intervals ending before start_at and starting after end_at are untouched
+        first = bisect_left(self._ends, start_at)
+        last = bisect_right(self._starts, end_at)
+
+        if first < last:
+            start_at = min(start_at, self._starts[first])
+            end_at = max(end_at, self._ends[last - 1])
+
+        self._starts[first:last] = [start_at]
+        self._ends[first:last] = [end_at]
+
+    def is_free(self, start_at: datetime, end_at: datetime) -> bool:
+        """Return True if [start_at, end_at) overlaps no busy interval (O(log n))."""
+        # First interval that ends after start_at is the only candidate overlap
+        index = bisect_right(self._ends, start_at)
+        return index == len(self._ends) or self._starts[index] >= end_at
+
+    def intervals(self) -> List[Tuple[datetime, datetime]]:
+        """Return busy intervals as (start, end) tuples sorted by start."""
+        return list(zip(self._starts, self._ends))
+
+    def free_windows(self, window_start: datetime, window_end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Return the free gaps inside [window_start, window_end)."""
+        windows = []
+        cursor = window_start
+        index = bisect_right(self._ends, window_start)
+
+        while index < len(self._starts) and self._starts[index] < window_end:
+            if self._starts[index] > cursor:
+                windows.append((cursor, self._starts[index]))
+            cursor = max(cursor, self._ends[index])
+            index += 1
+
+        if cursor < window_end:
+            windows.append((cursor, window_end))
+
+        return windows
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+
+class OccupancyIndex:
+    """Occupancy for a set of resources over a loaded time range."""
+
+    def __init__(self):
+        self._resources: Dict[uuid.UUID, ResourceOccupancy] = {}
+        # Earliest hold expiry per (resource, day): occupancy derived from
+        # holds stops being accurate at that instant
+        self._hold_expiry: Dict[Tuple[uuid.UUID, date], datetime] = {}
+
+    @classmethod
+    def load(cls, tenant_id: uuid.UUID, resource_ids: Iterable[uuid.UUID],
+             range_start: datetime, range_end: datetime,
+             include_holds: bool = True) -> 'OccupancyIndex':
+        """
+        Build an index from active bookings and unexpired holds.
+
+        Issues one query against bookings and one against booking holds
+        regardless of how many resources or days are requested.
+        """
+        index = cls()
+        resource_ids = list(resource_ids)
+        if not resource_ids:
+            return index
+
+        bookings = db.session.query(
+            Booking.resource_id, Booking.start_at, Booking.end_at
+        ).filter(
+            and_(
+                Booking.tenant_id == tenant_id,
+                Booking.resource_id.in_(resource_ids),
+                Booking.status.in_(ACTIVE_BOOKING_STATUSES),
+                Booking.start_at < range_end,
+                Booking.end_at > range_start
+            )
+        ).all()
+
+        for resource_id, start_at, end_at in bookings:
+            index.add(resource_id, start_at, end_at)
+
+        if include_holds:
+            holds = db.session.query(
+                BookingHold.resource_id, BookingHold.start_at, BookingHold.end_at, BookingHold.hold_until
+            ).filter(
+                and_(
+                    BookingHold.tenant_id == tenant_id,
+                    BookingHold.resource_id.in_(resource_ids),
+                    BookingHold.hold_until > datetime.utcnow(),
+                    BookingHold.start_at < range_end,
+                    BookingHold.end_at > range_start
+                )
+            ).all()
+
+            for resource_id, start_at, end_at, hold_until in holds:
+                index.add(resource_id, start_at, end_at)
+                index._track_hold_expiry(resource_id, start_at, end_at, hold_until)
+
+        return index
+
+    def add(self, resource_id: uuid.UUID, start_at: datetime, end_at: datetime) -> None:
+        """Mark a resource busy for [start_at, end_at)."""
+        occupancy = self._resources.get(resource_id)
+        if occupancy is None:
+            occupancy = self._resources[resource_id] = ResourceOccupancy()
+        occupancy.add(start_at, end_at)
+
+    def _track_hold_expiry(self, resource_id: uuid.UUID, start_at: datetime,
+                           end_at: datetime, hold_until: datetime) -> None:
+        """Remember the earliest hold expiry for every day a hold covers."""
+        day = start_at.date()
+        while day <= (end_at - timedelta(microseconds=1)).date():
+            key = (resource_id, day)
+            if key not in self._hold_expiry or hold_until < self._hold_expiry[key]:
+                self._hold_expiry[key] = hold_until
+            day += timedelta(days=1)
+
+    def hold_expiry(self, resource_id: uuid.UUID, day: date) -> Optional[datetime]:
+        """Return when the earliest hold on a resource's day lapses, if any."""
+        return self._hold_expiry.get((resource_id, day))
+
+    def for_resource(self, resource_id: uuid.UUID) -> ResourceOccupancy:
+        """Return the occupancy of a resource (empty if it has no busy time)."""
+        occupancy = self._resources.get(resource_id)
+        return occupancy if occupancy is not None else ResourceOccupancy()
+
+    def is_free(self, resource_id: uuid.UUID, start_at: datetime, end_at: datetime) -> bool:
+        """Return True if the resource is free for [start_at, end_at)."""
+        occupancy = self._resources.get(resource_id)
+        return occupancy is None or occupancy.is_free(start_at, end_at)
+
+    def intervals(self, resource_id: uuid.UUID) -> List[Tuple[datetime, datetime]]:
+        """Return busy intervals for a resource sorted by start."""
+        occupancy = self._resources.get(resource_id)
+        return occupancy.intervals() if occupancy else []
@@ -19,6 +19,7 @@ from ..models.onboarding import BusinessBranding
 from ..models.promotions import GiftCard, Coupon
 from ..models.notifications import NotificationTemplate
 from ..models.business import Service, Customer
+from .cache import AvailabilityCacheService
 from ..middleware.error_handler import TithiError
 
 logger = logging.getLogger(__name__)
@@ -379,6 +380,7 @@ class OnboardingService:
             tenant.status = 'services_setup'
             
             self.db.session.commit()
+            AvailabilityCacheService().invalidate_catalog(tenant_id, "services")
             
             logger.info(f"Services and categories created for tenant {tenant_id}", extra={
                 'category_count': len(created_categories),
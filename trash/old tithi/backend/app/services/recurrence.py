@@ -0,0 +1,150 @@
+"""
+Recurrence Rules
+
+Expansion of the RFC 5545 RRULE subset used for recurring booking series:
+
+    FREQ=DAILY|WEEKLY|MONTHLY   required
+    INTERVAL=n                  default 1
+    COUNT=n | UNTIL=...         exactly one is required
+    BYDAY=MO,WE,...             WEEKLY only; defaults to the first occurrence's weekday
+
+A leading "RRULE:" is accepted. UNTIL may be a date (20300301) or a
+date-time (20300301T170000, optional trailing Z) and is inclusive. MONTHLY
+repeats on the first occurrence's day of the month and skips months that
+do not have it, as RFC 5545 does.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+WEEKDAY_CODES = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+
+
+def parse_rrule(rule: str) -> Dict[str, object]:
+    """Parse an RRULE string into its parts; raises ValueError if unsupported or invalid."""
+    if not rule or not isinstance(rule, str):
+        raise ValueError("Recurrence rule is required")
+
+    body = rule.strip()
+    if body.upper().startswith('RRULE:'):
+        body = body[len('RRULE:'):]
+
+    parts = {}
+    for part in body.split(';'):
+        if not part:
+            continue
+        key, separator, value = part.partition('=')
+        if not separator or not value:
+            raise ValueError(f"Invalid recurrence rule part: {part}")
+        parts[key.strip().upper()] = value.strip().upper()
+
+    unsupported = set(parts) - {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'BYDAY'}
+    if unsupported:
+        raise ValueError(f"Unsupported recurrence rule parts: {', '.join(sorted(unsupported))}")
+
+    freq = parts.get('FREQ')
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+
+    if ('COUNT' in parts) == ('UNTIL' in parts):
+        raise ValueError("Recurrence rule needs exactly one of COUNT or UNTIL")
+
+    parsed = {'freq': freq, 'interval': _positive_int(parts.get('INTERVAL', '1'), 'INTERVAL'),
+              'count': None, 'until': None, 'byday': None}
+
+    if 'COUNT' in parts:
+        parsed['count'] = _positive_int(parts['COUNT'], 'COUNT')
+    else:
+        parsed['until'] = _parse_until(parts['UNTIL'])
+
+    if 'BYDAY' in parts:
+        if freq != 'WEEKLY':
+            raise ValueError("BYDAY is only supported with FREQ=WEEKLY")
+        try:
+            parsed['byday'] = sorted({WEEKDAY_CODES[code.strip()] for code in parts['BYDAY'].split(',')})
+        except KeyError as e:
+            raise ValueError(f"Invalid BYDAY weekday: {e.args[0]}")
+
+    return parsed
+
+
+def expand_rrule(rule: str, dtstart: datetime, max_occurrences: int) -> List[datetime]:
+    """
+    Return the occurrence start times of rule, beginning with dtstart.
+
+    dtstart is always the first occurrence. Raises ValueError when the rule
+    is invalid or would produce more than max_occurrences occurrences.
+    """
+    parsed = parse_rrule(rule)
+    count: Optional[int] = parsed['count']
+    until: Optional[datetime] = parsed['until']
+    interval: int = parsed['interval']
+
+    if count is not None and count > max_occurrences:
+        raise ValueError(f"A series can have at most {max_occurrences} occurrences")
+
+    occurrences = []
+    for candidate in _candidates(parsed['freq'], interval, parsed['byday'], dtstart):
+        if until is not None and candidate > until:
+            break
+        if len(occurrences) == max_occurrences:
+            raise ValueError(f"A series can have at most {max_occurrences} occurrences")
+        occurrences.append(candidate)
+        if count is not None and len(occurrences) == count:
+            break
+
+    return occurrences
+
+
+def _candidates(freq: str, interval: int, byday: Optional[List[int]], dtstart: datetime):
+    """Yield candidate occurrences in order, starting with dtstart."""
+    if freq == 'DAILY':
+        current = dtstart
+        while True:
+            yield current
+            current += timedelta(days=interval)
+
+    elif freq == 'WEEKLY':
+        weekdays = byday or [dtstart.weekday()]
+        week_start = dtstart - timedelta(days=dtstart.weekday())
+        yield dtstart
+        while True:
+            for weekday in weekdays:
+                candidate = week_start + timedelta(days=weekday)
+                if candidate > dtstart:
+                    yield candidate
+            week_start += timedelta(weeks=interval)
+
+    else:
+        months = 0
+        while True:
+            month_index = dtstart.month - 1 + months
+            try:
+                yield dtstart.replace(year=dtstart.year + month_index // 12, month=month_index % 12 + 1)
+            except ValueError:
+                # This month has no such day (e.g. the 31st)
+                pass
+            months += interval
+
+
+def _positive_int(value: str, name: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a positive integer")
+    if number < 1:
+        raise ValueError(f"{name} must be a positive integer")
+    return number
+
+
+def _parse_until(value: str) -> datetime:
+    value = value.rstrip('Z')
+    for fmt in ('%Y%m%dT%H%M%S', '%Y%m%d'):
+        try:
+            until = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        # A bare date includes the whole day
+        return until.replace(hour=23, minute=59, second=59) if fmt == '%Y%m%d' else until
+    raise ValueError(f"Invalid UNTIL: {value}")
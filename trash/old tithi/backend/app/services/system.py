@@ -14,6 +14,7 @@ from ..models.system import Theme, Branding
 from ..models.core import Tenant
 from ..exceptions import TithiError
 from ..jobs.outbox_worker import emit_event
+from .cache import CacheService
 
 
 class ThemeService:
@@ -31,8 +32,15 @@ class ThemeService:
 class BrandingService:
     """Service for branding-related business logic."""
     
+    # Branding is read on every page and email render; updates drop the entry
+    BRANDING_CACHE_TTL = 300
+    
     def __init__(self):
         self.max_file_size = 2 * 1024 * 1024  # 2MB limit per task requirements
+        self.cache = CacheService()
+    
+    def _branding_cache_key(self, tenant_id: uuid.UUID) -> str:
+        return f"tithi:branding:{tenant_id}"
     
     def create_branding(self, branding_data: Dict[str, Any]) -> Branding:
         """Create new branding."""
@@ -43,6 +51,14 @@ class BrandingService:
     
     def get_tenant_branding(self, tenant_id: uuid.UUID) -> Dict[str, Any]:
         """Get current branding settings for a tenant."""
+        return self.cache.get_or_compute(
+            self._branding_cache_key(tenant_id),
+            lambda: self._load_tenant_branding(tenant_id),
+            self.BRANDING_CACHE_TTL
+        )
+    
+    def _load_tenant_branding(self, tenant_id: uuid.UUID) -> Dict[str, Any]:
+        """Build branding settings for a tenant from the tenant, theme and branding rows."""
         try:
             # Get tenant info
             tenant = Tenant.query.get(tenant_id)
@@ -151,6 +167,7 @@ class BrandingService:
             theme.theme_json = theme_json
             
             db.session.commit()
+            self.cache.delete(self._branding_cache_key(tenant_id))
             
             # Emit observability hook
             emit_event(
@@ -228,6 +245,7 @@ class BrandingService:
                 branding.logo_url = logo_url
             
             db.session.commit()
+            self.cache.delete(self._branding_cache_key(tenant_id))
             
             # Emit observability hook
             emit_event(
@@ -301,6 +319,7 @@ class BrandingService:
             theme.theme_json = theme_json
             
             db.session.commit()
+            self.cache.delete(self._branding_cache_key(tenant_id))
             
             # Emit observability hook
             emit_event(
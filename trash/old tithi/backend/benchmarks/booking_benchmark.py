@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Booking Path Benchmarks
+
+Measures the real slot search, hold creation and booking creation paths
+(UnifiedAvailabilityService.get_available_slots,
+AvailabilityService.create_booking_hold and BookingService.create_booking)
+against a local SQLite file or PostgreSQL database filled by
+seed_dev.generate_synthetic_tenants.
+
+Every scenario runs a fixed number of operations at each requested
+concurrency level; each operation gets its own app context and session, as
+a request would. Reported per scenario and concurrency: throughput,
+p50/p95/p99/max latency, mean and max SQL statements per operation, and
+error counts by exception type. Results are written as JSON so runs can be
+diffed to track regressions.
+
+Usage:
+    python benchmarks/booking_benchmark.py
+    python benchmarks/booking_benchmark.py --database-url postgresql://localhost/tithi_bench \\
+        --concurrency 1,8,32 --operations 400 --output bench.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SCENARIOS = ('slot_search', 'hold_creation', 'booking_creation')
+
+
+class QueryCounter:
+    """Count SQL statements issued by the current thread."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self) -> None:
+        self._local.count = 0
+
+    @property
+    def count(self) -> int:
+        return getattr(self._local, 'count', 0)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: List[Dict[str, Any]], wall_seconds: float) -> Dict[str, Any]:
+    """Aggregate per-operation samples into the reported statistics."""
+    latencies = sorted(sample['ms'] for sample in samples)
+    queries = [sample['queries'] for sample in samples]
+    errors: Dict[str, int] = {}
+    for sample in samples:
+        if sample['error']:
+            errors[sample['error']] = errors.get(sample['error'], 0) + 1
+
+    return {
+        'operations': len(samples),
+        'succeeded': len(samples) - sum(errors.values()),
+        'errors': errors,
+        'wall_seconds': round(wall_seconds, 4),
+        'throughput_ops_per_sec': round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(latencies[-1], 3) if latencies else 0.0,
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0
+        },
+        'queries_per_op': {
+            'mean': round(sum(queries) / len(queries), 2) if queries else 0.0,
+            'max': max(queries) if queries else 0
+        }
+    }
+
+
+class BookingBenchmark:
+    """Plan and run benchmark operations against generated tenants."""
+
+    def __init__(self, app, tenants: List[Dict[str, Any]], seed: int = 42, future_days: int = 14):
+        self.app = app
+        self.tenants = tenants
+        self.rng = random.Random(seed)
+        self.counter = QueryCounter()
+        # Writes go to days after the generated future bookings, so they start out free
+        self.first_free_day = (datetime.utcnow() + timedelta(days=future_days + 1)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self._free_slots = self._plan_free_slots()
+        self._slots_lock = threading.Lock()
+
+    def _plan_free_slots(self) -> List[Dict[str, Any]]:
+        """Distinct one-hour shift slots on free days, shuffled so writes spread across staff."""
+        slots = []
+        for tenant in self.tenants:
+            for member in tenant['staff']:
+                for day_offset in range(60):
+                    day = self.first_free_day + timedelta(days=day_offset)
+                    if day.isoweekday() not in member['weekdays']:
+                        continue
+                    for hour in range(member['start_hour'], member['end_hour']):
+                        slots.append({'tenant': tenant, 'member': member, 'start_at': day.replace(hour=hour)})
+        self.rng.shuffle(slots)
+        return slots
+
+    def _take_free_slot(self) -> Dict[str, Any]:
+        with self._slots_lock:
+            if not self._free_slots:
+                raise RuntimeError("Benchmark ran out of free slots; lower --operations")
+            return self._free_slots.pop()
+
+    def plan(self, scenario: str, operations: int) -> List[Callable[[], Any]]:
+        """Build the operations for a scenario up front so planning is not timed."""
+        return [getattr(self, f"_plan_{scenario}")() for _ in range(operations)]
+
+    def _plan_slot_search(self) -> Callable[[], Any]:
+        from app.services.availability_unified import UnifiedAvailabilityService
+
+        tenant = self.rng.choice(self.tenants)
+        member = self.rng.choice(tenant['staff'])
+        service_id = self.rng.choice(member['service_ids'])
+        staff_id = member['staff_id'] if self.rng.random() < 0.5 else None
+        start_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) + \
+            timedelta(days=self.rng.randrange(0, 7))
+
+        return lambda: UnifiedAvailabilityService().get_available_slots(
+            tenant['tenant_id'], service_id, staff_id, start_date, start_date + timedelta(days=6)
+        )
+
+    def _plan_hold_creation(self) -> Callable[[], Any]:
+        from app.services.business_phase2 import AvailabilityService
+
+        slot = self._take_free_slot()
+        member = slot['member']
+
+        return lambda: AvailabilityService().create_booking_hold(
+            slot['tenant']['tenant_id'], member['resource_id'], member['service_ids'][0],
+            slot['start_at'], slot['start_at'] + timedelta(minutes=30)
+        )
+
+    def _plan_booking_creation(self) -> Callable[[], Any]:
+        from app.services.business_phase2 import BookingService
+
+        slot = self._take_free_slot()
+        tenant = slot['tenant']
+        member = slot['member']
+        booking_data = {
+            'customer_id': self.rng.choice(tenant['customer_ids']),
+            'service_id': member['service_ids'][0],
+            'resource_id': member['resource_id'],
+            'start_at': slot['start_at'].isoformat(),
+            'end_at': (slot['start_at'] + timedelta(minutes=30)).isoformat(),
+            'client_generated_id': uuid.uuid4().hex
+        }
+
+        return lambda: BookingService().create_booking(tenant['tenant_id'], booking_data, uuid.uuid4())
+
+    def _run_one(self, operation: Callable[[], Any]) -> Dict[str, Any]:
+        from app.extensions import db
+
+        error = None
+        with self.app.app_context():
+            self.counter.reset()
+            started = time.perf_counter()
+            try:
+                operation()
+            except Exception as e:
+                error = type(e).__name__
+                db.session.rollback()
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            queries = self.counter.count
+        return {'ms': elapsed_ms, 'queries': queries, 'error': error}
+
+    def run(self, scenario: str, operations: int, concurrency: int) -> Dict[str, Any]:
+        """Run operations of one scenario with concurrency worker threads."""
+        from sqlalchemy import event
+        from app.extensions import db
+
+        planned = self.plan(scenario, operations)
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", self.counter.before_cursor_execute)
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                samples = list(pool.map(self._run_one, planned))
+            wall_seconds = time.perf_counter() - started
+        finally:
+            event.remove(engine, "before_cursor_execute", self.counter.before_cursor_execute)
+
+        return summarize(samples, wall_seconds)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark slot search, holds and booking creation")
+    parser.add_argument('--database-url', default=None,
+                        help='Database to benchmark (default: a fresh SQLite file in a temp dir)')
+    parser.add_argument('--create-schema', action='store_true',
+                        help='Run db.create_all() first (always done for the default SQLite file)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated scenarios to run')
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma-separated worker counts')
+    parser.add_argument('--operations', type=int, default=200, help='Operations per scenario and concurrency')
+    parser.add_argument('--warmup', type=int, default=20, help='Untimed operations before each scenario')
+    parser.add_argument('--tenants', type=int, default=2)
+    parser.add_argument('--staff', type=int, default=6, help='Staff per tenant')
+    parser.add_argument('--customers', type=int, default=300, help='Customers per tenant')
+    parser.add_argument('--history-days', type=int, default=90)
+    parser.add_argument('--future-days', type=int, default=14)
+    parser.add_argument('--bookings-per-day', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--celery-eager', action='store_true',
+                        help='Run Celery tasks inline; use when no broker is running, or every '
+                             'enqueue waits out a connection timeout')
+    parser.add_argument('--output', default='benchmark-results.json', help='Where to write JSON results')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    args = parse_args(argv)
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    concurrency_levels = [int(level) for level in args.concurrency.split(',')]
+
+    database_url = args.database_url
+    create_schema = args.create_schema
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='tithi-bench-'), 'bench.db')}"
+        create_schema = True
+    # Config classes read DATABASE_URL at import time
+    os.environ['DATABASE_URL'] = database_url
+
+    from app import create_app
+    from app.extensions import db
+    from seed_dev import generate_synthetic_tenants
+
+    app = create_app('testing')
+    if args.celery_eager:
+        from app.extensions import celery
+        celery.conf.task_always_eager = True
+
+    with app.app_context():
+        if create_schema:
+            db.create_all()
+        dialect = db.engine.dialect.name
+        tenants = generate_synthetic_tenants(
+            num_tenants=args.tenants, staff_per_tenant=args.staff, customers_per_tenant=args.customers,
+            history_days=args.history_days, future_days=args.future_days,
+            bookings_per_staff_day=args.bookings_per_day, seed=args.seed
+        )
+
+    benchmark = BookingBenchmark(app, tenants, seed=args.seed, future_days=args.future_days)
+    results: Dict[str, Any] = {}
+    for scenario in scenarios:
+        if args.warmup:
+            benchmark.run(scenario, args.warmup, 1)
+        results[scenario] = {}
+        for concurrency in concurrency_levels:
+            stats = benchmark.run(scenario, args.operations, concurrency)
+            results[scenario][str(concurrency)] = stats
+            print(f"{scenario:<18} c={concurrency:<3} {stats['throughput_ops_per_sec']:>9.1f} ops/s  "
+                  f"p50={stats['latency_ms']['p50']:.1f}ms p95={stats['latency_ms']['p95']:.1f}ms "
+                  f"p99={stats['latency_ms']['p99']:.1f}ms  q/op={stats['queries_per_op']['mean']:.1f}  "
+                  f"errors={sum(stats['errors'].values())}")
+
+    report = {
+        'meta': {
+            'started_at': datetime.utcnow().isoformat() + 'Z',
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': dialect,
+            'redis': _redis_available(app),
+            'celery_eager': args.celery_eager,
+            'dataset': {
+                'tenants': args.tenants, 'staff_per_tenant': args.staff,
+                'customers_per_tenant': args.customers, 'history_days': args.history_days,
+                'future_days': args.future_days, 'bookings_per_staff_day': args.bookings_per_day,
+                'bookings': sum(tenant['bookings'] for tenant in tenants), 'seed': args.seed
+            },
+            'operations': args.operations,
+            'warmup': args.warmup
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return report
+
+
+def _redis_available(app) -> bool:
+    from app.extensions import get_redis
+
+    with app.app_context():
+        return get_redis() is not None
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+BEGIN;
+
+-- Migration: 0046_booking_time_range_exclusion.sql
+-- Purpose: Store each booking's time as a tstzrange and enforce per-resource
+--          non-overlap of active bookings with a GiST exclusion constraint on it,
+--          so BookingService.create_booking can insert optimistically
+-- Date: 2025-01-27
+-- Author: System
+-- Note: This migration is designed to be re-runnable (idempotent)
+
+-- ============================================================================
+-- 1) btree_gist lets uuid equality share a GiST index with range overlap
+-- ============================================================================
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- ============================================================================
+-- 2) Stored half-open time range, kept in step with start_at/end_at by Postgres
+-- ============================================================================
+
+-- Adding a stored generated column rewrites the table once
+ALTER TABLE public.bookings
+ADD COLUMN IF NOT EXISTS time_range tstzrange
+GENERATED ALWAYS AS (tstzrange(start_at, end_at, '[)')) STORED;
+
+-- ============================================================================
+-- 3) Rebuild the overlap exclusion constraint on the stored range
+-- ============================================================================
+
+-- Same statuses as 0019: completed, canceled, no_show and failed never block.
+-- The application maps violations of this constraint (SQLSTATE 23P01) to a
+-- booking conflict, so the name must stay bookings_excl_resource_time.
+ALTER TABLE public.bookings DROP CONSTRAINT IF EXISTS bookings_excl_resource_time;
+
+ALTER TABLE public.bookings
+ADD CONSTRAINT bookings_excl_resource_time
+EXCLUDE USING gist (
+    resource_id WITH =,
+    time_range WITH &&
+)
+WHERE (
+    status IN ('pending', 'confirmed', 'checked_in')
+    AND resource_id IS NOT NULL
+);
+
+-- ============================================================================
+-- 4) Idempotent replays are detected through this unique constraint
+-- ============================================================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'bookings_idempotency_uniq'
+    ) AND NOT EXISTS (
+        SELECT 1 FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relname = 'bookings_idempotency_uniq'
+        AND n.nspname = 'public'
+    ) THEN
+        ALTER TABLE public.bookings
+        ADD CONSTRAINT bookings_idempotency_uniq
+        UNIQUE (tenant_id, client_generated_id);
+    END IF;
+END $$;
+
+-- ============================================================================
+-- VALIDATION
+-- ============================================================================
+
+DO $$
+DECLARE
+    constraint_def text;
+BEGIN
+    SELECT pg_get_constraintdef(c.oid) INTO constraint_def
+    FROM pg_constraint c
+    JOIN pg_class t ON c.conrelid = t.oid
+    JOIN pg_namespace n ON t.relnamespace = n.oid
+    WHERE t.relname = 'bookings'
+      AND n.nspname = 'public'
+      AND c.conname = 'bookings_excl_resource_time';
+
+    IF constraint_def IS NULL OR constraint_def NOT LIKE '%time_range%' THEN
+        RAISE EXCEPTION 'Booking overlap constraint was not rebuilt on time_range';
+    END IF;
+
+    RAISE NOTICE 'Booking overlap constraint: %', constraint_def;
+END $$;
+
+COMMIT;
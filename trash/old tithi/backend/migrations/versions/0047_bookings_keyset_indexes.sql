@@ -0,0 +1,45 @@
+BEGIN;
+
+-- Migration: 0047_bookings_keyset_indexes.sql
+-- Purpose: Composite indexes matching the (start_at, id) keyset used by
+--          BookingService.list_bookings_page, so each page is an index range
+--          scan whose cost depends on the page size, not the tenant's history
+-- Date: 2025-01-27
+-- Author: System
+-- Note: This migration is designed to be re-runnable (idempotent)
+
+-- ============================================================================
+-- 1) Unfiltered listing: WHERE tenant_id = ? AND (start_at, id) > (?, ?)
+-- ============================================================================
+
+-- bookings_tenant_start_desc_idx (0017) lacks id, so ties on start_at force
+-- a sort of every booking sharing the cursor's timestamp
+CREATE INDEX IF NOT EXISTS bookings_tenant_start_id_idx
+    ON bookings (tenant_id, start_at, id);
+
+-- ============================================================================
+-- 2) Status-filtered listing: WHERE tenant_id = ? AND status = ? AND (start_at, id) > (?, ?)
+-- ============================================================================
+
+-- Not partial: listings filter on any status, including completed and canceled
+CREATE INDEX IF NOT EXISTS bookings_tenant_status_start_id_idx
+    ON bookings (tenant_id, status, start_at, id);
+
+-- ============================================================================
+-- VALIDATION
+-- ============================================================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = 'public' AND indexname = 'bookings_tenant_start_id_idx'
+    ) OR NOT EXISTS (
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = 'public' AND indexname = 'bookings_tenant_status_start_id_idx'
+    ) THEN
+        RAISE EXCEPTION 'Booking keyset indexes were not created';
+    END IF;
+END $$;
+
+COMMIT;
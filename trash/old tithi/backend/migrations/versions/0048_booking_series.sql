@@ -0,0 +1,42 @@
+BEGIN;
+
+-- Migration: 0048_booking_series.sql
+-- Purpose: Link bookings created together by BookingService.create_booking_series
+--          (recurring appointments) through a shared series_id
+-- Date: 2025-01-27
+-- Author: System
+-- Note: This migration is designed to be re-runnable (idempotent)
+
+-- ============================================================================
+-- 1) Series id, null for bookings created one at a time
+-- ============================================================================
+
+ALTER TABLE public.bookings
+ADD COLUMN IF NOT EXISTS series_id uuid;
+
+COMMENT ON COLUMN public.bookings.series_id IS
+    'Shared by the occurrences of a recurring series; derived from the tenant and the series client_generated_id so replays find the stored series';
+
+-- ============================================================================
+-- 2) Series lookups (idempotent replays, listing a series)
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS bookings_tenant_series_start_idx
+    ON bookings (tenant_id, series_id, start_at)
+    WHERE series_id IS NOT NULL;
+
+-- ============================================================================
+-- VALIDATION
+-- ============================================================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'bookings' AND column_name = 'series_id'
+    ) THEN
+        RAISE EXCEPTION 'bookings.series_id was not added';
+    END IF;
+END $$;
+
+COMMIT;
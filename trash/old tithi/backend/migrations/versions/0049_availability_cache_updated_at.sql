@@ -0,0 +1,63 @@
+BEGIN;
+
+-- Migration: 0049_availability_cache_updated_at.sql
+-- Purpose: Add the updated_at column that AvailabilityCache inherits from
+--          BaseModel. MaterializedAvailabilityService stamps it with the drop
+--          time of emptied rows and the snapshot time of refreshed ones, and a
+--          refresh skips rows stamped after its snapshot
+-- Date: 2025-01-27
+-- Author: System
+-- Note: This migration is designed to be re-runnable (idempotent)
+
+-- ============================================================================
+-- 1) updated_at, set by the application rather than by touch_updated_at()
+-- ============================================================================
+
+-- Deliberately no touch_updated_at trigger: refreshes write their snapshot
+-- time, which is earlier than the time of the UPDATE itself
+ALTER TABLE public.availability_cache
+    ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+
+-- ============================================================================
+-- 2) Lookup index for drops and refreshes
+-- ============================================================================
+
+-- Drops and refreshes select (and lock) rows by tenant_id, resource_id and a
+-- date list; slot reads add a date range. All of them are prefix scans of
+-- availability_cache_resource_date_uniq (0025), which is ensured here because
+-- the per-column indexes from 0025 cannot serve the combined lookup. Nothing
+-- filters on updated_at, so it needs no index.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'availability_cache_resource_date_uniq'
+    ) THEN
+        ALTER TABLE public.availability_cache
+        ADD CONSTRAINT availability_cache_resource_date_uniq
+        UNIQUE (tenant_id, resource_id, date);
+    END IF;
+END $$;
+
+-- ============================================================================
+-- VALIDATION
+-- ============================================================================
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'availability_cache' AND column_name = 'updated_at'
+    ) THEN
+        RAISE EXCEPTION 'availability_cache.updated_at was not added';
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'availability_cache_resource_date_uniq'
+    ) THEN
+        RAISE EXCEPTION 'availability_cache_resource_date_uniq is missing';
+    END IF;
+END $$;
+
+COMMIT;
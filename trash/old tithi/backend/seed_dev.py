@@ -8,15 +8,23 @@ This script creates minimal seed data for E2E testing:
 - Availability for next 7 days (10:00-16:00 weekdays)
 - 1 customer
 
+With --synthetic it instead generates tenants sized like real businesses
+(staff with weekly schedules, a service catalog, customers and months of
+booking history) for benchmarks; see generate_synthetic_tenants.
+
 Usage:
     python seed_dev.py
+    python seed_dev.py --synthetic --tenants 3 --staff 8 --customers 500 --history-days 180
 """
 
 import os
 import sys
 import uuid
-from datetime import datetime, timedelta
-from sqlalchemy import create_engine, text
+import random
+import argparse
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, List
+from sqlalchemy import create_engine, insert, text
 from sqlalchemy.orm import sessionmaker
 
 # Add the app directory to the path
@@ -24,8 +32,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 
 from app import create_app
 from app.extensions import db
-from app.models.core import Tenant, User, Membership
-from app.models.business import Customer, Service, Resource, Booking
+from app.models.core import Tenant, User, Membership, MembershipRole
+from app.models.business import (
+    Customer, Service, Resource, Booking, ServiceResource, StaffProfile, StaffAvailability
+)
 from app.models.system import Theme
 from app.models.availability import AvailabilityRule, AvailabilityException
 
@@ -169,5 +179,190 @@ def create_seed_data():
         print(f"   - Admin user: {user.email}")
 
 
+# Catalog every synthetic tenant offers: (slug, name, duration_min, price_cents)
+SYNTHETIC_SERVICES = [
+    ('cut', 'Haircut', 30, 4500),
+    ('cut-and-style', 'Cut & Style', 45, 6500),
+    ('color', 'Color', 60, 9500),
+    ('highlights', 'Highlights', 90, 14000),
+    ('blowout', 'Blowout', 30, 3500),
+    ('treatment', 'Conditioning Treatment', 45, 5500),
+]
+
+# Status mix of past bookings; anything still ahead is confirmed or pending
+SYNTHETIC_PAST_STATUSES = [('completed', 0.82), ('canceled', 0.10), ('no_show', 0.05), ('confirmed', 0.03)]
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    """A version 4 UUID drawn from rng, so generated ids are reproducible."""
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def generate_synthetic_tenants(num_tenants: int = 1, staff_per_tenant: int = 5,
+                               customers_per_tenant: int = 200, history_days: int = 90,
+                               future_days: int = 14, bookings_per_staff_day: int = 4,
+                               seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate tenants with realistic staff, availability, customers and bookings.
+
+    Must run inside an app context. The same arguments and seed always
+    produce the same data, so benchmark runs are comparable. Each staff
+    member works 5-6 days a week on an 8 hour shift; bookings start on the
+    hour inside shifts and never overlap, with past bookings mostly
+    completed and upcoming ones confirmed or pending. Days after
+    future_days are left free for benchmark writes.
+
+    Returns:
+        One summary per tenant: ids of its services, staff and customers and
+        each staff member's weekdays (1=Monday) and shift hours
+    """
+    rng = random.Random(seed)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    summaries = []
+
+    for tenant_index in range(num_tenants):
+        tenant_id = _uuid(rng)
+        slug = f"bench-{seed}-{tenant_index}"
+        rows = {model: [] for model in (
+            Tenant, User, Membership, Resource, StaffProfile, StaffAvailability,
+            Service, ServiceResource, Customer, Booking
+        )}
+        rows[Tenant].append({'id': tenant_id, 'slug': slug, 'name': f"Bench Salon {tenant_index}"})
+
+        services = []
+        for service_slug, name, duration_min, price_cents in SYNTHETIC_SERVICES:
+            service = {
+                'id': _uuid(rng), 'tenant_id': tenant_id, 'slug': service_slug,
+                'name': name, 'duration_min': duration_min, 'price_cents': price_cents, 'active': True
+            }
+            rows[Service].append(service)
+            services.append(service)
+
+        services_by_id = {service['id']: service for service in services}
+
+        staff = []
+        for staff_index in range(staff_per_tenant):
+            user_id, membership_id, resource_id, staff_id = (_uuid(rng) for _ in range(4))
+            display_name = f"Stylist {staff_index + 1}"
+            start_hour = rng.choice([8, 9, 10])
+            weekdays = sorted(rng.sample(range(1, 8), rng.choice([5, 6])))
+            rows[User].append({'id': user_id, 'email': f"{slug}-staff{staff_index}@example.com",
+                               'display_name': display_name})
+            rows[Membership].append({'id': membership_id, 'tenant_id': tenant_id, 'user_id': user_id,
+                                     'role': MembershipRole.STAFF})
+            rows[Resource].append({'id': resource_id, 'tenant_id': tenant_id, 'type': 'staff', 'tz': 'UTC',
+                                   'capacity': 1, 'name': display_name, 'is_active': True})
+            rows[StaffProfile].append({'id': staff_id, 'tenant_id': tenant_id, 'membership_id': membership_id,
+                                       'resource_id': resource_id, 'display_name': display_name,
+                                       'is_active': True})
+            for weekday in weekdays:
+                rows[StaffAvailability].append({
+                    'id': _uuid(rng), 'tenant_id': tenant_id,
+                    'staff_profile_id': staff_id, 'weekday': weekday,
+                    'start_time': time(start_hour), 'end_time': time(start_hour + 8), 'is_active': True
+                })
+            # Everyone does cuts; each stylist also offers a random half of the rest
+            offered = services[:1] + rng.sample(services[1:], len(services[1:]) // 2)
+            for service in offered:
+                rows[ServiceResource].append({'id': _uuid(rng), 'tenant_id': tenant_id,
+                                              'service_id': service['id'], 'resource_id': resource_id})
+            staff.append({'staff_id': staff_id, 'resource_id': resource_id, 'weekdays': weekdays,
+                          'start_hour': start_hour, 'end_hour': start_hour + 8,
+                          'service_ids': [service['id'] for service in offered]})
+
+        customer_ids = [_uuid(rng) for _ in range(customers_per_tenant)]
+        rows[Customer].extend(
+            {'id': customer_id, 'tenant_id': tenant_id, 'email': f"{slug}-customer{index}@example.com",
+             'display_name': f"Customer {index}"}
+            for index, customer_id in enumerate(customer_ids)
+        )
+        # A few regulars account for most visits
+        customer_weights = [1.0 / (rank + 1) for rank in range(customers_per_tenant)]
+
+        statuses, status_weights = zip(*SYNTHETIC_PAST_STATUSES)
+        for day_offset in range(-history_days, future_days):
+            day = today + timedelta(days=day_offset)
+            for member in staff:
+                if day.isoweekday() not in member['weekdays']:
+                    continue
+                for hour in sorted(rng.sample(range(member['start_hour'], member['end_hour']),
+                                              min(bookings_per_staff_day, 8))):
+                    service = services_by_id[rng.choice(member['service_ids'])]
+                    start_at = day.replace(hour=hour)
+                    # One booking per hour slot, so longer services are capped at the hour
+                    end_at = start_at + timedelta(minutes=min(service['duration_min'], 60))
+                    if day_offset < 0:
+                        status = rng.choices(statuses, status_weights)[0]
+                    else:
+                        status = rng.choice(['confirmed', 'confirmed', 'confirmed', 'pending'])
+                    rows[Booking].append({
+                        'id': _uuid(rng), 'tenant_id': tenant_id,
+                        'customer_id': rng.choices(customer_ids, customer_weights)[0],
+                        'resource_id': member['resource_id'],
+                        'client_generated_id': _uuid(rng).hex,
+                        'service_snapshot': {'service_id': str(service['id']), 'name': service['name'],
+                                             'duration_min': service['duration_min'],
+                                             'price_cents': service['price_cents']},
+                        'start_at': start_at, 'end_at': end_at, 'booking_tz': 'UTC', 'status': status,
+                        'canceled_at': start_at - timedelta(days=1) if status == 'canceled' else None,
+                        'no_show_flag': status == 'no_show', 'attendee_count': 1
+                    })
+
+        for model, model_rows in rows.items():
+            if model_rows:
+                db.session.execute(insert(model), model_rows)
+        db.session.commit()
+
+        summaries.append({
+            'tenant_id': tenant_id,
+            'slug': slug,
+            'service_ids': [service['id'] for service in services],
+            'staff': staff,
+            'customer_ids': customer_ids,
+            'bookings': len(rows[Booking])
+        })
+
+    return summaries
+
+
+def create_synthetic_data(args: argparse.Namespace) -> None:
+    """Generate synthetic tenants into the development database."""
+    app = create_app('development')
+
+    with app.app_context():
+        db.create_all()
+
+        if Tenant.query.filter(Tenant.slug.like(f"bench-{args.seed}-%")).first():
+            print(f"✅ Synthetic data for seed {args.seed} already exists")
+            return
+
+        print("🌱 Generating synthetic tenants...")
+        summaries = generate_synthetic_tenants(
+            num_tenants=args.tenants, staff_per_tenant=args.staff, customers_per_tenant=args.customers,
+            history_days=args.history_days, future_days=args.future_days,
+            bookings_per_staff_day=args.bookings_per_day, seed=args.seed
+        )
+        for summary in summaries:
+            print(f"   - {summary['slug']}: {len(summary['staff'])} staff, "
+                  f"{len(summary['customer_ids'])} customers, {summary['bookings']} bookings")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create development seed data")
+    parser.add_argument('--synthetic', action='store_true', help='Generate synthetic benchmark tenants')
+    parser.add_argument('--tenants', type=int, default=1)
+    parser.add_argument('--staff', type=int, default=5, help='Staff per tenant')
+    parser.add_argument('--customers', type=int, default=200, help='Customers per tenant')
+    parser.add_argument('--history-days', type=int, default=90)
+    parser.add_argument('--future-days', type=int, default=14)
+    parser.add_argument('--bookings-per-day', type=int, default=4, help='Bookings per staff member per day')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args(argv)
+
+
 if __name__ == '__main__':
-    create_seed_data()
+    args = parse_args()
+    if args.synthetic:
+        create_synthetic_data(args)
+    else:
+        create_seed_data()
@@ -327,7 +327,7 @@ class TestBookingHolds:
         assert hold.start_at == start_time
         assert hold.end_at == end_time
         assert hold.hold_key is not None
-        assert hold.hold_until > datetime.now()
+        assert hold.hold_until > datetime.utcnow()
 
     def test_create_booking_hold_unavailable_time(self, app, test_tenant, test_resource, test_service, test_customer, availability_service):
         """Test creating booking hold for unavailable time."""
@@ -12,6 +12,7 @@ from flask import Flask
 from app import create_app
 from app.extensions import db
 from app.models.core import Tenant, User, Membership
+from app.models.audit import EventOutbox
 from app.models.business import Service, Resource, Booking, Customer
 from app.services.business import BookingService, AvailabilityService
 
@@ -729,10 +730,9 @@ class TestBookingBusinessLogic:
                 # Confirm booking
                 booking_service.confirm_booking(tenant.id, booking.id, owner.id)
                 
-                # Check events were emitted
-                assert len(events_emitted) >= 2
+                # Check events were emitted; the creation event commits with the booking itself
                 event_types = [event[0] for event in events_emitted]
-                assert "BOOKING_CREATED" in event_types
+                assert EventOutbox.query.filter_by(event_code="BOOKING_CREATED").count() == 1
                 assert "BOOKING_CONFIRMED" in event_types
                 
             finally:
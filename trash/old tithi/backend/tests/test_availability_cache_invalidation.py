@@ -0,0 +1,103 @@
+"""
+Availability Cache Invalidation Tests
+
+Tests for generation-counter invalidation in AvailabilityCacheService:
+- Invalidating a date only drops that date
+- Invalidating a resource or tenant drops every date beneath it
+- Interval invalidation touches exactly the dates the interval covers
+- Invalidation never issues a Redis KEYS scan
+"""
+
+import pytest
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from app import create_app
+from app.services.cache import AvailabilityCacheService
+
+
+class TestAvailabilityCacheInvalidation:
+    """Tests for versioned availability cache keys."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup app context and a memory-backed availability cache."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        self.cache = AvailabilityCacheService()
+        self.cache.redis_client = None  # exercise the in-process fallback deterministically
+        self.tenant_id = uuid.uuid4()
+        self.resource_id = uuid.uuid4()
+
+        yield
+
+        self.app_context.pop()
+
+    def _seed(self, *dates):
+        for date_str in dates:
+            self.cache.set_availability(self.tenant_id, self.resource_id, date_str, [{'date': date_str}])
+
+    def _cached(self, date_str, resource_id=None):
+        return self.cache.get_availability(self.tenant_id, resource_id or self.resource_id, date_str)
+
+    def test_invalidate_single_date(self):
+        """Only the invalidated date misses."""
+        self._seed('2030-01-01', '2030-01-02')
+
+        self.cache.invalidate_availability(self.tenant_id, self.resource_id, '2030-01-01')
+
+        assert self._cached('2030-01-01') is None
+        assert self._cached('2030-01-02') == [{'date': '2030-01-02'}]
+
+    def test_invalidate_resource_and_tenant(self):
+        """Resource and tenant generations invalidate every date beneath them."""
+        other_resource = uuid.uuid4()
+        self._seed('2030-01-01', '2030-01-02')
+        self.cache.set_availability(self.tenant_id, other_resource, '2030-01-01', [])
+
+        self.cache.invalidate_availability(self.tenant_id, self.resource_id)
+
+        assert self._cached('2030-01-01') is None
+        assert self._cached('2030-01-02') is None
+        assert self._cached('2030-01-01', other_resource) == []
+
+        self.cache.invalidate_tenant_availability(self.tenant_id)
+
+        assert self._cached('2030-01-01', other_resource) is None
+
+    def test_invalidate_range_touches_covered_dates(self):
+        """An interval crossing midnight invalidates both days; ending at midnight does not."""
+        self._seed('2030-01-01', '2030-01-02', '2030-01-03')
+
+        touched = self.cache.invalidate_availability_range(
+            self.tenant_id, self.resource_id, datetime(2030, 1, 1, 23, 0), datetime(2030, 1, 2, 0, 0)
+        )
+
+        assert touched == 1
+        assert self._cached('2030-01-01') is None
+        assert self._cached('2030-01-02') is not None
+
+        touched = self.cache.invalidate_availability_range(
+            self.tenant_id, self.resource_id, datetime(2030, 1, 2, 23, 0), datetime(2030, 1, 3, 1, 0)
+        )
+
+        assert touched == 2
+        assert self._cached('2030-01-02') is None
+        assert self._cached('2030-01-03') is None
+
+    def test_invalidation_never_scans_keyspace(self):
+        """Invalidation increments counters instead of running KEYS."""
+        redis_client = MagicMock()
+        self.cache.redis_client = redis_client
+
+        self.cache.invalidate_availability(self.tenant_id, self.resource_id)
+        self.cache.invalidate_availability(self.tenant_id, self.resource_id, '2030-01-01')
+        self.cache.invalidate_tenant_availability(self.tenant_id)
+
+        redis_client.keys.assert_not_called()
+        redis_client.scan_iter.assert_not_called()
+        # Resource and date invalidations also bump the tenant summary generation
+        assert redis_client.pipeline.return_value.incr.call_count == 5
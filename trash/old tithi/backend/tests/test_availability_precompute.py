@@ -0,0 +1,258 @@
+"""
+Availability Precompute Tests
+
+Tests for materialized availability in the availability_cache table:
+- The precompute job writes one row per resource and day
+- Slot reads use precomputed rows and match live computation
+- Booking changes drop only the touched dates, in the caller's transaction,
+  and queue a refresh once it commits
+- Rows built from holds expire when the hold lapses, whatever the server's timezone
+- Dropped rows are read live, committed before the cache moves, and not
+  overwritten by a refresh that started before the drop
+"""
+
+import pytest
+import uuid
+from datetime import datetime, date, time, timedelta
+from time import tzset
+from unittest.mock import patch
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant, User, Membership
+from app.models.business import (
+    Customer, Service, Resource, Booking, BookingHold, StaffProfile, StaffAvailability, AvailabilityCache
+)
+from app.services.availability_materialized import MaterializedAvailabilityService, DROPPED
+from app.services.availability_unified import UnifiedAvailabilityService
+from app.services.business_phase2 import BookingService
+from app.jobs.availability_precompute import refresh_availability_dates
+
+
+class TestAvailabilityPrecompute:
+    """Tests for precomputed availability windows."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup tenant, staff with weekly hours, a service and a customer."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant = Tenant(id=uuid.uuid4(), slug="precompute-tenant", name="Precompute Tenant")
+        db.session.add(self.tenant)
+
+        self.user = User(id=uuid.uuid4(), email="precompute@example.com", display_name="Owner")
+        db.session.add(self.user)
+
+        self.membership = Membership(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, user_id=self.user.id, role="owner"
+        )
+        db.session.add(self.membership)
+
+        self.resource = Resource(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, type="staff", tz="UTC",
+            capacity=1, name="Stylist"
+        )
+        db.session.add(self.resource)
+
+        self.staff = StaffProfile(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, membership_id=self.membership.id,
+            resource_id=self.resource.id, display_name="Stylist", is_active=True
+        )
+        db.session.add(self.staff)
+
+        for weekday in range(1, 8):
+            db.session.add(StaffAvailability(
+                tenant_id=self.tenant.id, staff_profile_id=self.staff.id, weekday=weekday,
+                start_time=time(9, 0), end_time=time(17, 0), is_active=True
+            ))
+
+        self.service = Service(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, slug="cut", name="Cut",
+            duration_min=60, price_cents=5000
+        )
+        db.session.add(self.service)
+
+        self.customer = Customer(id=uuid.uuid4(), tenant_id=self.tenant.id, email="c@example.com")
+        db.session.add(self.customer)
+        db.session.commit()
+
+        self.materialized = MaterializedAvailabilityService()
+        self.day = date.today() + timedelta(days=3)
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_booking(self, start_hour: int, end_hour: int):
+        booking = Booking(
+            tenant_id=self.tenant.id, customer_id=self.customer.id, resource_id=self.resource.id,
+            client_generated_id=str(uuid.uuid4()), service_snapshot={},
+            start_at=datetime.combine(self.day, time(start_hour, 0)),
+            end_at=datetime.combine(self.day, time(end_hour, 0)),
+            booking_tz="UTC", status="confirmed"
+        )
+        db.session.add(booking)
+        db.session.commit()
+        return booking
+
+    def _rows(self):
+        return AvailabilityCache.query.filter_by(tenant_id=self.tenant.id, resource_id=self.resource.id).all()
+
+    def _live_rows(self):
+        return [row for row in self._rows() if row.availability_slots != DROPPED]
+
+    def _slots(self):
+        start_dt = datetime.combine(self.day, time.min)
+        return UnifiedAvailabilityService().get_available_slots(
+            self.tenant.id, self.service.id, self.staff.id, start_dt, start_dt
+        )
+
+    def test_precompute_writes_row_per_day(self):
+        """The periodic job writes one row per active resource and day."""
+        result = self.materialized.precompute(days_ahead=5)
+
+        assert result['rows_written'] == 5
+        assert len(self._rows()) == 5
+
+    def test_precomputed_slots_match_live(self):
+        """Slots read from precomputed rows equal slots computed live."""
+        self._add_booking(10, 11)
+        live_slots = self._slots()
+
+        self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day])
+        db.session.query(Booking).delete()
+        db.session.commit()
+
+        # The stale row still reflects the deleted booking, proving the read used it
+        assert self._slots() == live_slots
+
+    def test_mark_stale_drops_touched_dates_and_queues_refresh(self):
+        """A booking change removes only its dates and enqueues a refresh."""
+        other_day = self.day + timedelta(days=1)
+        self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day, other_day])
+
+        with patch.object(refresh_availability_dates, 'delay') as delay:
+            self.materialized.mark_stale(
+                self.tenant.id, self.resource.id,
+                datetime.combine(self.day, time(10, 0)), datetime.combine(self.day, time(11, 0))
+            )
+            delay.assert_not_called()
+            db.session.commit()
+
+        assert [row.date for row in self._live_rows()] == [other_day]
+        delay.assert_called_once_with(str(self.tenant.id), str(self.resource.id), [self.day.isoformat()])
+
+    def test_mark_stale_rolls_back_with_caller(self):
+        """The drop belongs to the caller's transaction; a rollback keeps the rows and queues nothing."""
+        self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day])
+
+        with patch.object(refresh_availability_dates, 'delay') as delay:
+            self.materialized.mark_stale(
+                self.tenant.id, self.resource.id,
+                datetime.combine(self.day, time(10, 0)), datetime.combine(self.day, time(11, 0))
+            )
+            db.session.rollback()
+            db.session.commit()
+
+        assert [row.date for row in self._live_rows()] == [self.day]
+        delay.assert_not_called()
+
+    def test_rows_built_from_holds_expire_with_hold(self):
+        """A row that includes a hold expires when the hold does."""
+        hold_until = datetime.utcnow() + timedelta(minutes=10)
+        db.session.add(BookingHold(
+            tenant_id=self.tenant.id, resource_id=self.resource.id, service_id=self.service.id,
+            start_at=datetime.combine(self.day, time(14, 0)), end_at=datetime.combine(self.day, time(15, 0)),
+            hold_until=hold_until, hold_key=uuid.uuid4().hex
+        ))
+        db.session.commit()
+
+        self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day])
+
+        assert self._rows()[0].expires_at == hold_until
+
+    def test_hold_expiry_ignores_server_timezone(self, monkeypatch):
+        """Live holds count as busy on a server ahead of UTC."""
+        hold_until = datetime.utcnow() + timedelta(minutes=10)
+        db.session.add(BookingHold(
+            tenant_id=self.tenant.id, resource_id=self.resource.id, service_id=self.service.id,
+            start_at=datetime.combine(self.day, time(14, 0)), end_at=datetime.combine(self.day, time(15, 0)),
+            hold_until=hold_until, hold_key=uuid.uuid4().hex
+        ))
+        db.session.commit()
+
+        monkeypatch.setenv('TZ', 'Asia/Kolkata')
+        tzset()
+        try:
+            self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day])
+        finally:
+            monkeypatch.undo()
+            tzset()
+
+        row = self._rows()[0]
+        assert row.expires_at == hold_until
+        assert row.availability_slots['free'] == [
+            [datetime.combine(self.day, time(9, 0)).isoformat(), datetime.combine(self.day, time(14, 0)).isoformat()],
+            [datetime.combine(self.day, time(15, 0)).isoformat(), datetime.combine(self.day, time(17, 0)).isoformat()]
+        ]
+
+    def test_dropped_rows_read_live(self):
+        """A dropped row is treated as missing until its refresh lands."""
+        self._add_booking(10, 11)
+        self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day])
+        db.session.query(Booking).delete()
+        self.materialized.mark_stale(
+            self.tenant.id, self.resource.id,
+            datetime.combine(self.day, time(10, 0)), datetime.combine(self.day, time(11, 0))
+        )
+        db.session.commit()
+
+        windows = self.materialized.get_day_windows(self.tenant.id, [self.resource.id], self.day, self.day)
+
+        assert windows[(self.resource.id, self.day)]['free'] == [[
+            datetime.combine(self.day, time(9, 0)).isoformat(), datetime.combine(self.day, time(17, 0)).isoformat()
+        ]]
+
+    def test_drop_commits_before_cache_generations_move(self):
+        """Booking invalidation commits the drop before bumping the cache generations."""
+        self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day])
+        bookings = BookingService()
+        seen = []
+
+        def bump(*args):
+            seen.append((db.session().in_transaction(), len(self._live_rows())))
+
+        with patch.object(bookings.availability_cache, 'invalidate_availability_range', side_effect=bump):
+            bookings._invalidate_booking_availability(
+                self.tenant.id, self.resource.id,
+                datetime.combine(self.day, time(10, 0)), datetime.combine(self.day, time(11, 0))
+            )
+
+        assert seen == [(False, 0)]
+
+    def test_refresh_skips_rows_dropped_after_its_snapshot(self):
+        """Rows dropped while a refresh computes, with or without an existing row, are left for the next refresh."""
+        other_day = self.day + timedelta(days=1)
+        self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day])
+        compute = self.materialized._compute
+
+        def drop_during_compute(*args):
+            result = compute(*args)
+            for day in (self.day, other_day):
+                self.materialized.mark_dates_stale(self.tenant.id, self.resource.id, [day])
+            db.session.commit()
+            return result
+
+        with patch.object(self.materialized, '_compute', side_effect=drop_during_compute):
+            written = self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day, other_day])
+
+        assert written == 0
+        assert self._live_rows() == []
+        assert self.materialized.refresh_dates(self.tenant.id, [self.resource.id], [self.day, other_day]) == 2
+        assert len(self._live_rows()) == 2
@@ -0,0 +1,193 @@
+"""
+Availability Slot Engine Tests
+
+Tests for the set-based slot engine in UnifiedAvailabilityService:
+- Bookings and holds are bulk-loaded once per request
+- Query count does not grow with the number of candidate slots
+- Busy intervals are excluded exactly as the per-slot check did
+- Day-by-day streaming yields the same slots as the full listing
+"""
+
+import pytest
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, date, time, timedelta
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant, User, Membership
+from app.models.business import (
+    Customer, Service, Resource, Booking, BookingHold, StaffProfile, StaffAvailability
+)
+from app.services.availability_unified import UnifiedAvailabilityService
+from app.services.cache import get_local_cache
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed against the test engine."""
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _before_cursor_execute)
+
+
+class TestAvailabilitySlotEngine:
+    """Tests for bulk-loaded slot generation."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup tenant, staff, weekly availability and a service."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant = Tenant(id=uuid.uuid4(), slug="slot-engine-tenant", name="Slot Engine Tenant")
+        db.session.add(self.tenant)
+
+        self.user = User(id=uuid.uuid4(), email="slot-engine@example.com", display_name="Owner")
+        db.session.add(self.user)
+
+        self.membership = Membership(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, user_id=self.user.id, role="owner"
+        )
+        db.session.add(self.membership)
+
+        self.resource = Resource(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, type="staff", tz="UTC",
+            capacity=1, name="Stylist"
+        )
+        db.session.add(self.resource)
+
+        self.staff = StaffProfile(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, membership_id=self.membership.id,
+            resource_id=self.resource.id, display_name="Stylist", is_active=True
+        )
+        db.session.add(self.staff)
+
+        for weekday in range(1, 8):
+            db.session.add(StaffAvailability(
+                tenant_id=self.tenant.id, staff_profile_id=self.staff.id, weekday=weekday,
+                start_time=time(9, 0), end_time=time(17, 0), is_active=True
+            ))
+
+        self.service = Service(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, slug="cut", name="Cut",
+            duration_min=60, price_cents=5000
+        )
+        db.session.add(self.service)
+
+        self.customer = Customer(id=uuid.uuid4(), tenant_id=self.tenant.id, email="c@example.com")
+        db.session.add(self.customer)
+        db.session.commit()
+
+        self.service_under_test = UnifiedAvailabilityService()
+        self.start_day = date.today() + timedelta(days=7)
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _get_slots(self, days: int):
+        # Start cold so every search measures the database path
+        get_local_cache().clear()
+        start_dt = datetime.combine(self.start_day, time.min)
+        end_dt = datetime.combine(self.start_day + timedelta(days=days - 1), time.min)
+        return self.service_under_test.get_available_slots(
+            self.tenant.id, self.service.id, self.staff.id, start_dt, end_dt
+        )
+
+    def _add_booking(self, start_at: datetime, end_at: datetime, status: str = "confirmed"):
+        db.session.add(Booking(
+            tenant_id=self.tenant.id, customer_id=self.customer.id, resource_id=self.resource.id,
+            client_generated_id=str(uuid.uuid4()), service_snapshot={}, start_at=start_at,
+            end_at=end_at, booking_tz="UTC", status=status
+        ))
+        db.session.commit()
+
+    def test_query_count_independent_of_range(self):
+        """A 14-day search issues the same number of queries as a 1-day search."""
+        self._get_slots(1)  # warm up expired fixture attributes
+
+        with count_queries() as one_day:
+            one_day_slots = self._get_slots(1)
+
+        with count_queries() as two_weeks:
+            two_week_slots = self._get_slots(14)
+
+        assert len(two_week_slots) == 14 * len(one_day_slots)
+        assert len(two_weeks) == len(one_day)
+
+    def test_query_count_independent_of_bookings(self):
+        """Adding bookings does not add queries."""
+        with count_queries() as baseline:
+            self._get_slots(14)
+
+        for offset in range(10):
+            day = self.start_day + timedelta(days=offset)
+            self._add_booking(datetime.combine(day, time(10, 0)), datetime.combine(day, time(11, 0)))
+
+        with count_queries() as with_bookings:
+            self._get_slots(14)
+
+        assert len(with_bookings) == len(baseline)
+
+    def test_bookings_and_holds_block_overlapping_slots(self):
+        """Slots overlapping active bookings or holds are excluded."""
+        day = self.start_day
+        self._add_booking(datetime.combine(day, time(10, 0)), datetime.combine(day, time(11, 0)))
+        db.session.add(BookingHold(
+            tenant_id=self.tenant.id, resource_id=self.resource.id, service_id=self.service.id,
+            start_at=datetime.combine(day, time(14, 0)), end_at=datetime.combine(day, time(15, 0)),
+            hold_until=datetime.utcnow() + timedelta(days=30), hold_key=uuid.uuid4().hex
+        ))
+        db.session.commit()
+
+        starts = {slot['start_at'] for slot in self._get_slots(1)}
+
+        blocked = ["09:30", "10:00", "10:30", "13:30", "14:00", "14:30"]
+        for hhmm in blocked:
+            assert datetime.combine(day, time.fromisoformat(hhmm)).isoformat() not in starts
+
+        open_starts = ["09:00", "11:00", "13:00", "15:00", "16:00"]
+        for hhmm in open_starts:
+            assert datetime.combine(day, time.fromisoformat(hhmm)).isoformat() in starts
+
+    def test_inactive_bookings_do_not_block(self):
+        """Canceled and completed bookings leave slots open."""
+        day = self.start_day
+        self._add_booking(datetime.combine(day, time(10, 0)), datetime.combine(day, time(11, 0)), status="canceled")
+        self._add_booking(datetime.combine(day, time(14, 0)), datetime.combine(day, time(15, 0)), status="completed")
+
+        starts = {slot['start_at'] for slot in self._get_slots(1)}
+
+        assert datetime.combine(day, time(10, 0)).isoformat() in starts
+        assert datetime.combine(day, time(14, 0)).isoformat() in starts
+
+    def test_streamed_days_match_full_listing(self):
+        """Chunked per-day iteration yields every day, in order, with identical slots."""
+        self._add_booking(
+            datetime.combine(self.start_day + timedelta(days=8), time(10, 0)),
+            datetime.combine(self.start_day + timedelta(days=8), time(11, 0))
+        )
+        start_dt = datetime.combine(self.start_day, time.min)
+        end_dt = datetime.combine(self.start_day + timedelta(days=9), time.min)
+
+        days = list(self.service_under_test.iter_available_slots_by_day(
+            self.tenant.id, self.service.id, self.staff.id, start_dt, end_dt, chunk_days=3
+        ))
+
+        assert [day for day, _ in days] == [self.start_day + timedelta(days=offset) for offset in range(10)]
+        assert [slot for _, slots in days for slot in slots] == self._get_slots(10)
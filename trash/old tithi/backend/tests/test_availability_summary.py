@@ -0,0 +1,132 @@
+"""
+Availability Summary Tests
+
+Tests for the aggregated availability summary in AvailabilityService:
+- Rule hours and booking counts per staff match their source rows
+- The summary is one SQL statement regardless of staff count
+- Cached summaries are dropped when a booking changes availability
+"""
+
+import pytest
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant, User, Membership
+from app.models.business import Customer, Resource, Booking, StaffProfile, StaffAvailability
+from app.services.business_phase2 import AvailabilityService
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed against the test engine."""
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _before_cursor_execute)
+
+
+class TestAvailabilitySummary:
+    """Tests for the grouped availability summary."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup a tenant with several staff, weekly rules and bookings."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant = Tenant(id=uuid.uuid4(), slug="summary-tenant", name="Summary Tenant")
+        self.customer = Customer(id=uuid.uuid4(), tenant_id=self.tenant.id, email="c@example.com")
+        db.session.add_all([self.tenant, self.customer])
+
+        self.staff = []
+        for index in range(3):
+            user = User(id=uuid.uuid4(), email=f"summary{index}@example.com", display_name=f"Staff {index}")
+            membership = Membership(id=uuid.uuid4(), tenant_id=self.tenant.id, user_id=user.id, role="staff")
+            resource = Resource(
+                id=uuid.uuid4(), tenant_id=self.tenant.id, type="staff", tz="UTC",
+                capacity=1, name=f"Staff {index}"
+            )
+            staff = StaffProfile(
+                id=uuid.uuid4(), tenant_id=self.tenant.id, membership_id=membership.id,
+                resource_id=resource.id, display_name=f"Staff {index}", is_active=True
+            )
+            db.session.add_all([user, membership, resource, staff])
+            # Staff n works n + 1 weekdays of 9:00-17:30
+            for weekday in range(1, index + 2):
+                db.session.add(StaffAvailability(
+                    tenant_id=self.tenant.id, staff_profile_id=staff.id, weekday=weekday,
+                    start_time=time(9, 0), end_time=time(17, 30), is_active=True
+                ))
+            self.staff.append(staff)
+        db.session.commit()
+
+        self.availability = AvailabilityService()
+        self.availability.availability_cache.redis_client = None
+        self.tenant_id = self.tenant.id
+        self.start = datetime(2030, 1, 1)
+        self.end = datetime(2030, 1, 31)
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _book(self, staff, day, status="confirmed"):
+        start_at = datetime(2030, 1, day, 10, 0)
+        booking = Booking(
+            tenant_id=self.tenant.id, customer_id=self.customer.id, resource_id=staff.resource_id,
+            client_generated_id=str(uuid.uuid4()), service_snapshot={},
+            start_at=start_at, end_at=start_at + timedelta(hours=1), booking_tz="UTC", status=status
+        )
+        db.session.add(booking)
+        db.session.commit()
+        return booking
+
+    def test_aggregates_hours_and_bookings_in_one_statement(self):
+        """Per-staff hours and booking counts come from a single grouped query."""
+        self._book(self.staff[0], 2)
+        self._book(self.staff[0], 3)
+        self._book(self.staff[2], 4)
+        self._book(self.staff[2], 5, status="canceled")
+
+        with count_queries() as statements:
+            summary = self.availability.get_availability_summary(self.tenant_id, self.start, self.end)
+
+        assert len(statements) == 1
+        by_name = {entry['staff_name']: entry for entry in summary['staff_summary']}
+        assert [by_name[f"Staff {index}"]['total_hours'] for index in range(3)] == [8.5, 17.0, 25.5]
+        assert [by_name[f"Staff {index}"]['days_available'] for index in range(3)] == [1, 2, 3]
+        assert [by_name[f"Staff {index}"]['bookings_count'] for index in range(3)] == [2, 0, 1]
+        assert summary['total_hours'] == 51.0
+        assert summary['booked_slots'] == 3
+
+    def test_cached_summary_is_invalidated_by_booking_changes(self):
+        """A second read is served from cache until a booking invalidates it."""
+        self.availability.get_availability_summary(self.tenant_id, self.start, self.end)
+
+        with count_queries() as statements:
+            self.availability.get_availability_summary(self.tenant_id, self.start, self.end)
+        assert statements == []
+
+        booking = self._book(self.staff[1], 6)
+        self.availability.availability_cache.invalidate_availability_range(
+            self.tenant.id, booking.resource_id, booking.start_at, booking.end_at
+        )
+
+        summary = self.availability.get_availability_summary(self.tenant_id, self.start, self.end)
+        assert summary['booked_slots'] == 1
@@ -0,0 +1,185 @@
+"""
+Booking Flow Availability Tests
+
+Tests for BookingFlowService.check_availability and the availability endpoint:
+- The query count does not grow with the number of days or team members
+- Results match the former per-day, per-member computation
+- The NDJSON branch streams one line per day with the same slots
+"""
+
+import json
+import pytest
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, date, time, timedelta
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant
+from app.models.business import Service, Customer, Booking
+from app.models.team import TeamMember, TeamMemberAvailability, TeamMemberService
+from app.blueprints.booking_flow_api import booking_flow_bp
+from app.services.booking_flow_service import BookingFlowService
+from app.services.occupancy import OccupancyIndex
+
+
+@contextmanager
+def record_statements():
+    """Record SQL statements issued against the database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestBookingFlowAvailability:
+    """Tests for batched booking flow availability."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup a service, three team members with differing weekly hours and one booking."""
+        self.app = create_app('testing')
+        self.app.register_blueprint(booking_flow_bp)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant_id = uuid.uuid4()
+        self.service_id = uuid.uuid4()
+        self.customer_id = uuid.uuid4()
+        db.session.add_all([
+            Tenant(id=self.tenant_id, slug="flow-tenant", name="Flow Tenant"),
+            Service(
+                id=self.service_id, tenant_id=self.tenant_id, slug="cut", name="Cut",
+                duration_min=60, price_cents=5000, active=True
+            ),
+            Customer(id=self.customer_id, tenant_id=self.tenant_id, email="c@example.com"),
+        ])
+
+        self.team_member_ids = []
+        for index, (opens, closes) in enumerate([(9, 17), (12, 20), (8, 11)]):
+            team_member = TeamMember(
+                id=uuid.uuid4(), tenant_id=self.tenant_id, name=f"Member {index}", is_active=True
+            )
+            db.session.add(team_member)
+            db.session.add(TeamMemberService(
+                tenant_id=self.tenant_id, team_member_id=team_member.id, service_id=self.service_id
+            ))
+            for day_of_week in range(7):
+                if (day_of_week + index) % 4 == 0:
+                    continue
+                db.session.add(TeamMemberAvailability(
+                    tenant_id=self.tenant_id, team_member_id=team_member.id, day_of_week=day_of_week,
+                    start_time=time(opens, 0), end_time=time(closes, 0), is_available=True
+                ))
+            self.team_member_ids.append(team_member.id)
+
+        self.first_day = date.today() + timedelta(days=1)
+        booked_at = datetime.combine(self.first_day, time(12, 0))
+        db.session.add(Booking(
+            tenant_id=self.tenant_id, customer_id=self.customer_id, resource_id=self.team_member_ids[0],
+            client_generated_id=uuid.uuid4().hex, service_snapshot={},
+            start_at=booked_at, end_at=booked_at + timedelta(hours=1), booking_tz="UTC", status="confirmed"
+        ))
+        db.session.commit()
+
+        self.flow = BookingFlowService()
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _range(self, days: int):
+        start_date = datetime.combine(self.first_day, time.min)
+        return start_date, start_date + timedelta(days=days - 1)
+
+    def _per_day_slots(self, start_date: datetime, end_date: datetime):
+        """The former computation: one availability query per team member per day."""
+        service = Service.query.get(self.service_id)
+        team_members = [TeamMember.query.get(team_member_id) for team_member_id in self.team_member_ids]
+        occupancy_index = OccupancyIndex.load(
+            self.tenant_id, self.team_member_ids, start_date,
+            datetime.combine(end_date.date() + timedelta(days=1), time.min)
+        )
+        duration = timedelta(minutes=service.duration_min)
+
+        slots = []
+        current_date = start_date.date()
+        while current_date <= end_date.date():
+            day_of_week = (current_date.weekday() + 1) % 7
+            for team_member in team_members:
+                occupancy = occupancy_index.for_resource(team_member.id)
+                for avail in TeamMemberAvailability.query.filter_by(
+                    tenant_id=self.tenant_id, team_member_id=team_member.id,
+                    day_of_week=day_of_week, is_available=True
+                ).all():
+                    slot_start = datetime.combine(current_date, avail.start_time)
+                    window_end = datetime.combine(current_date, avail.end_time)
+                    while slot_start + duration <= window_end:
+                        if slot_start > datetime.now() and occupancy.is_free(slot_start, slot_start + duration):
+                            slots.append((slot_start.isoformat(), str(team_member.id)))
+                        slot_start += timedelta(minutes=30)
+            current_date += timedelta(days=1)
+        return sorted(slots)
+
+    def _check(self, days: int):
+        return self.flow.check_availability(self.tenant_id, self.service_id, *self._range(days))
+
+    def test_query_count_independent_of_range_and_team(self):
+        """A week and a single day cost the same fixed number of queries."""
+        with record_statements() as one_day:
+            self._check(1)
+        with record_statements() as two_weeks:
+            self._check(14)
+
+        assert len(one_day) == len(two_weeks) == 5
+
+    def test_matches_per_day_computation(self):
+        """Batched results equal the per-day, per-member computation, in start time order."""
+        slots = self._check(14)
+
+        assert slots
+        assert sorted((slot['start_time'], slot['team_member_id']) for slot in slots) == \
+            self._per_day_slots(*self._range(14))
+        assert [slot['start_time'] for slot in slots] == sorted(slot['start_time'] for slot in slots)
+        booked = datetime.combine(self.first_day, time(12, 0)).isoformat()
+        assert (booked, str(self.team_member_ids[0])) not in {
+            (slot['start_time'], slot['team_member_id']) for slot in slots
+        }
+
+    @pytest.mark.parametrize("body, headers", [
+        ({'stream': True}, {}),
+        ({}, {'Accept': 'application/x-ndjson'}),
+    ])
+    def test_ndjson_streams_one_line_per_day(self, body, headers):
+        """The streamed days carry the same slots as the JSON response, then a summary line."""
+        start_date, end_date = self._range(10)
+        payload = {
+            'tenant_id': str(self.tenant_id),
+            'service_id': str(self.service_id),
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+        }
+        client = self.app.test_client()
+
+        streamed = client.post('/booking/availability', json={**payload, **body}, headers=headers)
+        plain = client.post('/booking/availability', json=payload).get_json()['data']
+
+        assert streamed.mimetype == "application/x-ndjson"
+        lines = [json.loads(line) for line in streamed.get_data(as_text=True).splitlines()]
+        assert [line['date'] for line in lines[:-1]] == [
+            (self.first_day + timedelta(days=offset)).isoformat() for offset in range(10)
+        ]
+        assert [slot for line in lines[:-1] for slot in line['slots']] == plain['available_slots']
+        assert lines[-1] == {'done': True, 'total_slots': plain['total_slots']}
@@ -0,0 +1,190 @@
+"""
+Booking Hold Reservation Tests
+
+Tests for Redis-claimed booking holds with database write-behind:
+- A claimed hold is queued for persistence instead of committed inline
+- An overlapping claim is rejected without touching the database
+- Without Redis the hold is inserted synchronously
+- Write-behind persistence is idempotent and skips released holds
+- Expired holds are swept in batches and released on Redis expiry events
+- A sweep batch invalidates each resource's dates once
+"""
+
+import pytest
+import uuid
+import redis
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant, User, Membership
+from app.models.business import Service, Resource, BookingHold, StaffProfile
+from app.services.business_phase2 import AvailabilityService, BusinessLogicError
+from app.services.availability_materialized import MaterializedAvailabilityService
+from app.jobs.booking_holds import persist_booking_hold, HoldExpiryListener
+
+
+class TestBookingHoldReservation:
+    """Tests for atomic hold reservation and write-behind."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup tenant, a staffed resource and a service."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant = Tenant(id=uuid.uuid4(), slug="hold-tenant", name="Hold Tenant")
+        self.user = User(id=uuid.uuid4(), email="holds@example.com", display_name="Owner")
+        self.membership = Membership(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, user_id=self.user.id, role="owner"
+        )
+        self.resource = Resource(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, type="staff", tz="UTC",
+            capacity=1, name="Stylist"
+        )
+        self.staff = StaffProfile(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, membership_id=self.membership.id,
+            resource_id=self.resource.id, display_name="Stylist", is_active=True
+        )
+        self.service = Service(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, slug="cut", name="Cut",
+            duration_min=60, price_cents=5000
+        )
+        db.session.add_all([self.tenant, self.user, self.membership, self.resource, self.staff, self.service])
+        db.session.commit()
+
+        self.availability = AvailabilityService()
+        self.availability.hold_cache.redis_client = None
+        self.start_at = datetime.now().replace(microsecond=0) + timedelta(days=2)
+        self.end_at = self.start_at + timedelta(hours=1)
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _create_hold(self):
+        return self.availability.create_booking_hold(
+            self.tenant.id, self.resource.id, self.service.id, self.start_at, self.end_at
+        )
+
+    def test_claimed_hold_is_written_behind(self):
+        """A successful claim queues persistence and skips the inline commit."""
+        with patch.object(self.availability.hold_cache, 'claim_slot', return_value=True), \
+                patch.object(persist_booking_hold, 'delay') as delay:
+            hold = self._create_hold()
+
+        delay.assert_called_once_with(str(self.tenant.id), hold.hold_key)
+        assert hold.id is not None
+        assert BookingHold.query.count() == 0
+
+    def test_overlapping_claim_is_rejected(self):
+        """A range already claimed in Redis raises before anything is written."""
+        with patch.object(self.availability.hold_cache, 'claim_slot', return_value=False), \
+                patch.object(persist_booking_hold, 'delay') as delay:
+            with pytest.raises(BusinessLogicError):
+                self._create_hold()
+
+        delay.assert_not_called()
+        assert BookingHold.query.count() == 0
+
+    def test_without_redis_hold_is_inserted_synchronously(self):
+        """With Redis unavailable the hold row is committed inline."""
+        hold = self._create_hold()
+
+        assert BookingHold.query.filter_by(hold_key=hold.hold_key).count() == 1
+
+    def test_persist_is_idempotent_and_skips_released_holds(self):
+        """Write-behind inserts once, and does nothing after a release."""
+        with patch.object(self.availability.hold_cache, 'claim_slot', return_value=True), \
+                patch.object(persist_booking_hold, 'delay'):
+            hold = self._create_hold()
+        self.availability.hold_cache.create_hold(self.tenant.id, hold.hold_key, {
+            'id': str(hold.id),
+            'resource_id': str(self.resource.id),
+            'service_id': str(self.service.id),
+            'start_at': self.start_at.isoformat(),
+            'end_at': self.end_at.isoformat(),
+            'hold_until': hold.hold_until.isoformat()
+        })
+
+        first = self.availability.persist_booking_hold(self.tenant.id, hold.hold_key)
+        second = self.availability.persist_booking_hold(self.tenant.id, hold.hold_key)
+
+        assert first.id == second.id == hold.id
+        assert BookingHold.query.count() == 1
+
+        assert self.availability.release_booking_hold(self.tenant.id, hold.hold_key)
+        assert self.availability.persist_booking_hold(self.tenant.id, hold.hold_key) is None
+        assert BookingHold.query.count() == 0
+
+    def _add_expired_hold(self, hold_key: str, expired_minutes: int = 30):
+        now = datetime.utcnow()
+        hold = BookingHold(
+            tenant_id=self.tenant.id, resource_id=self.resource.id, service_id=self.service.id,
+            start_at=now - timedelta(hours=2), end_at=now - timedelta(hours=1),
+            hold_until=now - timedelta(minutes=expired_minutes), hold_key=hold_key
+        )
+        db.session.add(hold)
+        db.session.commit()
+        return hold
+
+    def test_sweep_deletes_expired_holds_in_batches(self):
+        """Only expired holds are deleted, batch by batch, each batch invalidating its dates once."""
+        for index in range(3):
+            self._add_expired_hold(f"expired-{index}")
+        live = self._create_hold()
+
+        with patch.object(self.availability, '_invalidate_holds_availability') as invalidate:
+            result = self.availability.sweep_expired_holds(batch_size=2)
+
+        assert result == {'deleted': 3, 'batches': 2}
+        assert invalidate.call_count == 2
+        assert [len(call.args[1]) for call in invalidate.call_args_list] == [2, 1]
+        assert [hold.hold_key for hold in BookingHold.query.all()] == [live.hold_key]
+
+    def test_sweep_groups_invalidation_by_resource(self):
+        """Holds on one resource cost one cache and one precomputed-row invalidation per batch."""
+        holds = [self._add_expired_hold(f"expired-{index}") for index in range(3)]
+        expected = MaterializedAvailabilityService.group_dates(
+            [(hold.resource_id, hold.start_at, hold.end_at) for hold in holds]
+        )
+
+        with patch.object(self.availability.availability_cache, 'invalidate_availability_dates') as invalidate, \
+                patch.object(MaterializedAvailabilityService, 'drop_stale') as drop_stale:
+            self.availability.sweep_expired_holds()
+
+        invalidate.assert_called_once_with(self.tenant.id, expected)
+        drop_stale.assert_called_once_with(self.tenant.id, expected)
+
+    def test_expiry_event_releases_hold_row(self):
+        """An expired payload key releases its row; bookkeeping keys are ignored."""
+        hold = self._add_expired_hold(f"{self.tenant.id}_{self.resource.id}_2030-01-01T09:00:00_abcd1234", 0)
+        listener = HoldExpiryListener(redis_client=object())
+
+        assert not listener.handle_expired_key(f"tithi:hold:slots:{self.tenant.id}:{self.resource.id}")
+        assert not listener.handle_expired_key("tithi:hold:pending")
+        assert listener.handle_expired_key(f"tithi:hold:{self.tenant.id}:{hold.hold_key}")
+        assert BookingHold.query.count() == 0
+
+    def test_listener_survives_idle_timeouts(self):
+        """A socket timeout on an idle subscription is not fatal to the listener."""
+        hold = self._add_expired_hold(f"{self.tenant.id}_{self.resource.id}_2030-01-01T09:00:00_abcd1234", 0)
+        redis_client = MagicMock()
+        pubsub = redis_client.pubsub.return_value
+        pubsub.get_message.side_effect = [
+            redis.TimeoutError("Timeout reading from socket"),
+            None,
+            {'type': 'pmessage', 'data': f"tithi:hold:{self.tenant.id}:{hold.hold_key}"},
+            KeyboardInterrupt,
+        ]
+
+        with pytest.raises(KeyboardInterrupt):
+            HoldExpiryListener(redis_client=redis_client).run()
+
+        assert BookingHold.query.count() == 0
@@ -0,0 +1,130 @@
+"""
+Booking Keyset Pagination Tests
+
+Tests for cursor-based booking listing in BookingService:
+- Pages walk every booking exactly once in (start_at, id) order, even across ties
+- Pages seek past the cursor instead of using OFFSET
+- Malformed cursors are rejected
+- Exports iterate every booking in batches
+"""
+
+import pytest
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant
+from app.models.business import Customer, Resource, Booking
+from app.services.business_phase2 import BookingService
+
+
+@contextmanager
+def record_statements():
+    """Record SQL statements issued against the database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestBookingKeysetPagination:
+    """Tests for keyset-paginated booking listings."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup a tenant with eleven bookings, several sharing a start time."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant_id = uuid.uuid4()
+        resource_id = uuid.uuid4()
+        customer_id = uuid.uuid4()
+        db.session.add_all([
+            Tenant(id=self.tenant_id, slug="keyset-tenant", name="Keyset Tenant"),
+            Resource(id=resource_id, tenant_id=self.tenant_id, type="staff", tz="UTC", capacity=1, name="Staff"),
+            Customer(id=customer_id, tenant_id=self.tenant_id, email="c@example.com"),
+        ])
+        day = datetime(2030, 1, 7, 9, 0)
+        for index in range(11):
+            # Three bookings per hour exercise the id tiebreak
+            start_at = day + timedelta(hours=index // 3)
+            db.session.add(Booking(
+                id=uuid.uuid4(), tenant_id=self.tenant_id, customer_id=customer_id, resource_id=resource_id,
+                client_generated_id=uuid.uuid4().hex, service_snapshot={},
+                start_at=start_at, end_at=start_at + timedelta(hours=1), booking_tz="UTC",
+                status='canceled' if index % 4 == 0 else 'confirmed'
+            ))
+        db.session.commit()
+
+        self.bookings = BookingService()
+        self.expected = [
+            booking.id for booking in
+            sorted(Booking.query.all(), key=lambda booking: (booking.start_at, booking.id))
+        ]
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _walk(self, limit, **filters):
+        seen, cursor, pages = [], None, 0
+        while True:
+            page, cursor = self.bookings.list_bookings_page(self.tenant_id, cursor=cursor, limit=limit, **filters)
+            assert len(page) <= limit
+            seen.extend(booking.id for booking in page)
+            pages += 1
+            if cursor is None:
+                return seen, pages
+
+    def test_pages_cover_every_booking_once(self):
+        """Walking the cursors visits each booking once, in order, across start_at ties."""
+        seen, pages = self._walk(4)
+
+        assert seen == self.expected
+        assert pages == 3
+
+    def test_filters_apply_to_every_page(self):
+        """Status filters hold across pages."""
+        seen, _ = self._walk(2, status='confirmed')
+
+        assert len(seen) == 8
+        assert all(Booking.query.get(booking_id).status == 'confirmed' for booking_id in seen)
+
+    def test_page_seeks_without_offset(self):
+        """A later page is one query that seeks past the cursor rather than skipping rows."""
+        _, cursor = self.bookings.list_bookings_page(self.tenant_id, limit=5)
+
+        with record_statements() as statements:
+            page, _ = self.bookings.list_bookings_page(self.tenant_id, cursor=cursor, limit=5)
+
+        assert [booking.id for booking in page] == self.expected[5:10]
+        assert len(statements) == 1
+        assert "(bookings.start_at, bookings.id) > (" in statements[0]
+
+    def test_malformed_cursor_rejected(self):
+        """Cursors that do not decode raise ValueError."""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            self.bookings.list_bookings_page(self.tenant_id, cursor="not-a-cursor")
+
+    def test_iter_bookings_and_estimate(self):
+        """Exports yield every booking; the estimate matches the count off PostgreSQL."""
+        self.bookings.config.BOOKING_EXPORT_BATCH_SIZE = 3
+
+        assert [booking.id for booking in self.bookings.iter_bookings(self.tenant_id)] == self.expected
+        assert self.bookings.estimate_bookings_count(self.tenant_id) == 11
+        assert self.bookings.estimate_bookings_count(self.tenant_id, status='canceled') == 3
@@ -0,0 +1,180 @@
+"""
+Booking Overlap Constraint Tests
+
+Tests for create_booking when the database enforces booking overlaps:
+- Only one read runs before the optimistic insert
+- Exclusion constraint violations become booking conflicts
+- Idempotency constraint violations return the stored booking
+- Working hours and active holds are still checked
+- The booking, its outbox rows and the stale availability drop share one commit
+"""
+
+import pytest
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant, User, Membership
+from app.models.audit import EventOutbox
+from app.models.business import (
+    Customer, Service, Resource, Booking, BookingHold, StaffProfile, StaffAvailability
+)
+from app.services.business_phase2 import BookingService, BookingConflictError
+
+
+@contextmanager
+def record_statements():
+    """Record SQL statements issued against the database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def constraint_violation(constraint_name: str) -> IntegrityError:
+    """An IntegrityError shaped like psycopg2's for a named constraint."""
+    orig = Exception(f'violates constraint "{constraint_name}"')
+    orig.diag = SimpleNamespace(constraint_name=constraint_name)
+    return IntegrityError("INSERT INTO bookings", {}, orig)
+
+
+class TestBookingOverlapConstraint:
+    """Tests for optimistic booking inserts."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup a staff member working 9-17 every day, a service and a customer."""
+        self.app = create_app('testing')
+        self.app.config['BOOKING_OVERLAP_ENFORCEMENT'] = 'constraint'
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant_id = uuid.uuid4()
+        self.resource_id = uuid.uuid4()
+        self.service_id = uuid.uuid4()
+        self.customer_id = uuid.uuid4()
+        user = User(id=uuid.uuid4(), email="constraint@example.com", display_name="Staff")
+        membership = Membership(id=uuid.uuid4(), tenant_id=self.tenant_id, user_id=user.id, role="staff")
+        staff = StaffProfile(
+            id=uuid.uuid4(), tenant_id=self.tenant_id, membership_id=membership.id,
+            resource_id=self.resource_id, display_name="Staff", is_active=True
+        )
+        db.session.add_all([
+            Tenant(id=self.tenant_id, slug="constraint-tenant", name="Constraint Tenant"),
+            user,
+            membership,
+            Resource(
+                id=self.resource_id, tenant_id=self.tenant_id, type="staff", tz="UTC",
+                capacity=1, name="Staff"
+            ),
+            staff,
+            Service(
+                id=self.service_id, tenant_id=self.tenant_id, slug="cut", name="Cut",
+                duration_min=60, price_cents=5000
+            ),
+            Customer(id=self.customer_id, tenant_id=self.tenant_id, email="c@example.com"),
+        ])
+        for weekday in range(1, 8):
+            db.session.add(StaffAvailability(
+                tenant_id=self.tenant_id, staff_profile_id=staff.id, weekday=weekday,
+                start_time=time(9, 0), end_time=time(17, 0), is_active=True
+            ))
+        db.session.commit()
+
+        self.bookings = BookingService()
+        self.day = datetime(2030, 1, 7)
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _booking_data(self, start_hour: int, client_generated_id: str = None):
+        start_at = self.day.replace(hour=start_hour)
+        return {
+            'customer_id': self.customer_id,
+            'service_id': self.service_id,
+            'resource_id': self.resource_id,
+            'start_at': start_at.isoformat(),
+            'end_at': (start_at + timedelta(hours=1)).isoformat(),
+            'client_generated_id': client_generated_id or str(uuid.uuid4()),
+        }
+
+    def _create(self, data):
+        with patch.object(BookingService, '_invalidate_booking_availability'):
+            return self.bookings.create_booking(self.tenant_id, data, uuid.uuid4())
+
+    def test_single_read_before_insert(self):
+        """The service lookup and one bookability check are the only reads before the insert."""
+        with record_statements() as statements:
+            booking = self._create(self._booking_data(10))
+
+        insert_at = next(
+            index for index, statement in enumerate(statements)
+            if statement.startswith("INSERT INTO bookings")
+        )
+        assert len([s for s in statements[:insert_at] if s.startswith("SELECT")]) == 2
+        assert Booking.query.get(booking.id) is not None
+
+    def test_exclusion_violation_is_conflict(self):
+        """An overlap rejected by the database surfaces as a booking conflict."""
+        with patch.object(db.session, 'commit', side_effect=constraint_violation("bookings_excl_resource_time")):
+            with pytest.raises(BookingConflictError, match="conflicts with existing booking"):
+                self._create(self._booking_data(10))
+
+        assert Booking.query.count() == 0
+        assert EventOutbox.query.count() == 0
+
+    def test_idempotency_violation_returns_stored_booking(self):
+        """A replayed client_generated_id returns the booking stored under it."""
+        stored = self._create(self._booking_data(10, client_generated_id="replay-1"))
+        stored_id = stored.id
+
+        with patch.object(db.session, 'commit', side_effect=constraint_violation("bookings_idempotency_uniq")):
+            replayed = self._create(self._booking_data(10, client_generated_id="replay-1"))
+
+        assert replayed.id == stored_id
+
+    def test_outside_working_hours_rejected(self):
+        """Working hours are still enforced before inserting."""
+        with pytest.raises(ValueError, match="outside staff availability"):
+            self._create(self._booking_data(17))
+
+    def test_active_hold_blocks_booking(self):
+        """Holds are not covered by the constraint, so they are checked explicitly."""
+        db.session.add(BookingHold(
+            tenant_id=self.tenant_id, resource_id=self.resource_id, service_id=self.service_id,
+            start_at=self.day.replace(hour=10, minute=30), end_at=self.day.replace(hour=11, minute=30),
+            hold_until=datetime.utcnow() + timedelta(minutes=10), hold_key=uuid.uuid4().hex
+        ))
+        db.session.commit()
+
+        with pytest.raises(ValueError, match="not available"):
+            self._create(self._booking_data(10))
+
+    def test_booking_and_events_commit_together(self):
+        """The creation event is written in the booking's transaction, not emitted after it."""
+        with patch.object(db.session, 'commit', wraps=db.session.commit) as commit, \
+                patch.object(BookingService, '_emit_event') as emit_event:
+            booking = self._create(self._booking_data(10))
+
+        assert commit.call_count == 1
+        emit_event.assert_not_called()
+        created = EventOutbox.query.filter_by(event_code="BOOKING_CREATED").one()
+        assert created.payload['booking_id'] == str(booking.id)
@@ -0,0 +1,228 @@
+"""
+Booking Series Tests
+
+Tests for recurring booking series:
+- RRULE expansion for daily, weekly and monthly rules
+- Occurrences are checked against one occupancy load, not per occurrence
+- Conflicts are reported; the series is all-or-nothing unless skip_conflicts
+- Replays return the stored series
+"""
+
+import pytest
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from unittest.mock import patch
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant, User, Membership
+from app.models.audit import EventOutbox
+from app.models.business import Customer, Service, Resource, Booking, StaffProfile, StaffAvailability
+from app.services.business_phase2 import BookingService
+from app.services.recurrence import expand_rrule
+
+
+@contextmanager
+def record_statements():
+    """Record SQL statements issued against the database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestRecurrenceRules:
+    """Tests for RRULE expansion."""
+
+    def test_weekly_byday_with_count(self):
+        """BYDAY spreads occurrences over the week; COUNT includes the first one."""
+        starts = expand_rrule("RRULE:FREQ=WEEKLY;BYDAY=MO,TH;COUNT=5", datetime(2030, 1, 7, 10), 100)
+
+        assert starts == [
+            datetime(2030, 1, 7, 10), datetime(2030, 1, 10, 10), datetime(2030, 1, 14, 10),
+            datetime(2030, 1, 17, 10), datetime(2030, 1, 21, 10),
+        ]
+
+    def test_interval_and_until(self):
+        """INTERVAL skips periods and a date UNTIL includes that whole day."""
+        starts = expand_rrule("FREQ=WEEKLY;INTERVAL=2;UNTIL=20300204", datetime(2030, 1, 7, 10), 100)
+
+        assert starts == [datetime(2030, 1, 7, 10), datetime(2030, 1, 21, 10), datetime(2030, 2, 4, 10)]
+
+    def test_monthly_skips_short_months(self):
+        """A monthly rule on the 31st skips months without one."""
+        starts = expand_rrule("FREQ=MONTHLY;COUNT=3", datetime(2030, 1, 31, 9), 100)
+
+        assert starts == [datetime(2030, 1, 31, 9), datetime(2030, 3, 31, 9), datetime(2030, 5, 31, 9)]
+
+    @pytest.mark.parametrize("rule", [
+        "FREQ=YEARLY;COUNT=2",
+        "FREQ=WEEKLY",
+        "FREQ=WEEKLY;COUNT=2;UNTIL=20300101",
+        "FREQ=DAILY;BYDAY=MO;COUNT=2",
+        "FREQ=WEEKLY;BYDAY=XX;COUNT=2",
+        "FREQ=DAILY;COUNT=0",
+        "FREQ=DAILY;COUNT=500",
+    ])
+    def test_invalid_rules_rejected(self, rule):
+        """Unsupported, open-ended and oversized rules raise ValueError."""
+        with pytest.raises(ValueError):
+            expand_rrule(rule, datetime(2030, 1, 7, 10), 104)
+
+
+class TestBookingSeries:
+    """Tests for BookingService.create_booking_series."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup a staff member working 9-17 on weekdays, a service and a customer."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant_id = uuid.uuid4()
+        self.resource_id = uuid.uuid4()
+        self.service_id = uuid.uuid4()
+        self.customer_id = uuid.uuid4()
+        user = User(id=uuid.uuid4(), email="series@example.com", display_name="Staff")
+        membership = Membership(id=uuid.uuid4(), tenant_id=self.tenant_id, user_id=user.id, role="staff")
+        staff = StaffProfile(
+            id=uuid.uuid4(), tenant_id=self.tenant_id, membership_id=membership.id,
+            resource_id=self.resource_id, display_name="Staff", is_active=True
+        )
+        db.session.add_all([
+            Tenant(id=self.tenant_id, slug="series-tenant", name="Series Tenant"),
+            user,
+            membership,
+            Resource(
+                id=self.resource_id, tenant_id=self.tenant_id, type="staff", tz="UTC",
+                capacity=1, name="Staff"
+            ),
+            staff,
+            Service(
+                id=self.service_id, tenant_id=self.tenant_id, slug="cut", name="Cut",
+                duration_min=60, price_cents=5000
+            ),
+            Customer(id=self.customer_id, tenant_id=self.tenant_id, email="c@example.com"),
+        ])
+        for weekday in range(1, 6):
+            db.session.add(StaffAvailability(
+                tenant_id=self.tenant_id, staff_profile_id=staff.id, weekday=weekday,
+                start_time=time(9, 0), end_time=time(17, 0), is_active=True
+            ))
+        db.session.commit()
+
+        self.bookings = BookingService()
+        # A Monday
+        self.first_start = datetime(2030, 1, 7, 10, 0)
+
+        with patch.object(BookingService, '_invalidate_bookings_availability'):
+            yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _series(self, rrule, **extra):
+        return self.bookings.create_booking_series(self.tenant_id, {
+            'customer_id': str(self.customer_id),
+            'service_id': str(self.service_id),
+            'resource_id': str(self.resource_id),
+            'start_at': self.first_start.isoformat(),
+            'rrule': rrule,
+            **extra
+        }, uuid.uuid4())
+
+    def _book(self, start_at):
+        db.session.add(Booking(
+            id=uuid.uuid4(), tenant_id=self.tenant_id, customer_id=self.customer_id,
+            resource_id=self.resource_id, client_generated_id=uuid.uuid4().hex, service_snapshot={},
+            start_at=start_at, end_at=start_at + timedelta(hours=1), booking_tz="UTC", status='confirmed'
+        ))
+        db.session.commit()
+
+    def test_series_created_in_one_transaction(self):
+        """A free weekly series is booked whole, with outbox events for each booking."""
+        result = self._series("FREQ=WEEKLY;COUNT=8")
+
+        assert result['created'] is True
+        assert result['conflicts'] == []
+        assert [b.start_at for b in result['bookings']] == [
+            self.first_start + timedelta(weeks=week) for week in range(8)
+        ]
+        assert Booking.query.filter_by(series_id=result['series_id']).count() == 8
+        assert all(b.end_at - b.start_at == timedelta(minutes=60) for b in result['bookings'])
+        assert EventOutbox.query.filter_by(event_code="BOOKING_CREATED").count() == 8
+
+    def test_reads_do_not_grow_with_occurrences(self):
+        """Validation reads are the same for a short and a long series."""
+        with record_statements() as short:
+            self._series("FREQ=WEEKLY;COUNT=2", client_generated_id="short")
+        with record_statements() as long:
+            self._series("FREQ=WEEKLY;COUNT=20", client_generated_id="long")
+
+        def reads(statements):
+            return len([s for s in statements if s.startswith("SELECT")])
+
+        assert reads(short) == reads(long)
+
+    def test_conflicts_block_series_by_default(self):
+        """An occupied or off-hours occurrence is reported and nothing is booked."""
+        self._book(self.first_start + timedelta(weeks=2, minutes=30))
+
+        result = self._series("FREQ=DAILY;COUNT=7")
+
+        assert result['created'] is False
+        assert result['bookings'] == []
+        assert [(c['start_at'].day, c['reason']) for c in result['conflicts']] == [
+            (12, 'outside_staff_availability'), (13, 'outside_staff_availability'),
+        ]
+        assert Booking.query.filter(Booking.series_id.isnot(None)).count() == 0
+
+        result = self._series("FREQ=WEEKLY;COUNT=4", client_generated_id="weekly")
+
+        assert result['conflicts'] == [{
+            'start_at': self.first_start + timedelta(weeks=2),
+            'end_at': self.first_start + timedelta(weeks=2, hours=1),
+            'reason': 'conflict'
+        }]
+
+    def test_rule_without_occurrences_rejected(self):
+        """An UNTIL before the first start is a validation error, not a server error."""
+        with pytest.raises(ValueError, match="no occurrences"):
+            self._series("FREQ=WEEKLY;UNTIL=20291231")
+
+        assert Booking.query.count() == 0
+
+    def test_skip_conflicts_books_free_occurrences(self):
+        """With skip_conflicts the free occurrences are booked and the rest reported."""
+        self._book(self.first_start + timedelta(weeks=1))
+
+        result = self._series("FREQ=WEEKLY;COUNT=4", skip_conflicts=True)
+
+        assert result['created'] is True
+        assert len(result['bookings']) == 3
+        assert [c['start_at'] for c in result['conflicts']] == [self.first_start + timedelta(weeks=1)]
+
+    def test_replay_returns_stored_series(self):
+        """The same client_generated_id returns the stored bookings without booking again."""
+        first = self._series("FREQ=WEEKLY;COUNT=3", client_generated_id="replay")
+        series_id = first['series_id']
+
+        replay = self._series("FREQ=WEEKLY;COUNT=3", client_generated_id="replay")
+
+        assert replay['created'] is False
+        assert replay['series_id'] == series_id
+        assert len(replay['bookings']) == 3
+        assert Booking.query.count() == 3
@@ -0,0 +1,170 @@
+"""
+Bulk Booking Action Tests
+
+Tests for set-based bulk confirm and cancel in BookingService:
+- Every booking gets a success or failure entry in the report
+- Each chunk is one UPDATE plus one bulk insert each for outbox and audit rows
+- Outbox events and audit rows are written for applied bookings only
+- A booking changed after it was loaded is reported, not overwritten
+"""
+
+import pytest
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant
+from app.models.business import Customer, Resource, Booking
+from app.models.audit import AuditLog, EventOutbox
+from app.services.business_phase2 import BookingService
+
+
+@contextmanager
+def record_statements():
+    """Record SQL statements issued against the database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestBulkBookingActions:
+    """Tests for chunked set-based bulk booking actions."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup a tenant with one resource, one customer and a few bookings."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant_id = uuid.uuid4()
+        self.resource_id = uuid.uuid4()
+        self.customer_id = uuid.uuid4()
+        db.session.add_all([
+            Tenant(id=self.tenant_id, slug="bulk-tenant", name="Bulk Tenant"),
+            Resource(
+                id=self.resource_id, tenant_id=self.tenant_id, type="staff", tz="UTC",
+                capacity=1, name="Staff"
+            ),
+            Customer(id=self.customer_id, tenant_id=self.tenant_id, email="c@example.com"),
+        ])
+        db.session.commit()
+
+        self.bookings = BookingService()
+        self.admin_id = uuid.uuid4()
+
+        with patch.object(BookingService, '_after_bulk_transition'):
+            yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_bookings(self, statuses):
+        start_at = datetime(2030, 1, 7, 9, 0)
+        ids = []
+        for index, status in enumerate(statuses):
+            booking = Booking(
+                id=uuid.uuid4(), tenant_id=self.tenant_id, customer_id=self.customer_id,
+                resource_id=self.resource_id, client_generated_id=uuid.uuid4().hex,
+                service_snapshot={'service_id': str(uuid.uuid4()), 'price_cents': 5000},
+                start_at=start_at + timedelta(hours=index),
+                end_at=start_at + timedelta(hours=index + 1),
+                booking_tz="UTC", status=status
+            )
+            db.session.add(booking)
+            ids.append(booking.id)
+        db.session.commit()
+        return [str(booking_id) for booking_id in ids]
+
+    def test_report_covers_every_booking(self):
+        """Valid bookings succeed; missing, invalid and wrong-status ones fail with a reason."""
+        pending, confirmed = self._add_bookings(['pending', 'confirmed'])
+        missing = str(uuid.uuid4())
+
+        results = self.bookings.bulk_action_bookings(
+            self.tenant_id, [pending, confirmed, missing, 'not-a-uuid', pending], 'confirm', {}, self.admin_id
+        )
+
+        assert results['total_processed'] == 5
+        assert results['successful'] == [{'booking_id': pending, 'status': 'confirmed'}]
+        errors = {(entry['booking_id'], entry['error']) for entry in results['failed']}
+        assert errors == {
+            (confirmed, "Only pending bookings can be confirmed"),
+            (missing, "Booking not found"),
+            ('not-a-uuid', "Invalid booking ID"),
+            (pending, "Duplicate booking ID"),
+        }
+        assert Booking.query.get(uuid.UUID(pending)).status == 'confirmed'
+
+    def test_one_update_per_chunk(self):
+        """Each chunk runs one UPDATE and bulk inserts its outbox and audit rows."""
+        booking_ids = self._add_bookings(['pending'] * 5)
+        self.bookings.config.BULK_ACTION_CHUNK_SIZE = 2
+
+        with record_statements() as statements:
+            results = self.bookings.bulk_action_bookings(
+                self.tenant_id, booking_ids, 'cancel', {'reason': 'Closed'}, self.admin_id
+            )
+
+        assert len(results['successful']) == 5
+        assert len([s for s in statements if s.startswith("UPDATE bookings")]) == 3
+        assert len([s for s in statements if s.startswith("SELECT")]) == 1
+        assert len([s for s in statements if s.startswith("INSERT INTO events_outbox")]) == 3
+        assert len([s for s in statements if s.startswith("INSERT INTO audit_logs")]) == 3
+
+    def test_outbox_and_audit_rows_written(self):
+        """Applied bookings get a cancellation event and an audit row with old and new status."""
+        booking_id, = self._add_bookings(['confirmed'])
+
+        self.bookings.bulk_action_bookings(
+            self.tenant_id, [booking_id], 'cancel', {'reason': 'Closed'}, self.admin_id
+        )
+
+        booking = Booking.query.get(uuid.UUID(booking_id))
+        assert booking.status == 'canceled'
+        assert booking.canceled_at is not None
+
+        outbox = EventOutbox.query.filter_by(event_code="BOOKING_CANCELLED").one()
+        assert outbox.payload['booking_id'] == booking_id
+
+        audit = AuditLog.query.one()
+        assert audit.record_id == uuid.UUID(booking_id)
+        assert audit.old_data == {"status": "confirmed"}
+        assert audit.new_data['status'] == "canceled"
+        assert audit.new_data['reason'] == "Closed"
+
+    def test_concurrent_change_is_reported(self):
+        """A booking whose status moved after loading is left alone and reported."""
+        booking_id, = self._add_bookings(['pending'])
+        real_apply = BookingService._apply_bulk_transition
+
+        def cancel_first(service, tenant_id, chunk, *args):
+            db.session.execute(
+                Booking.__table__.update().values(status='canceled')
+            )
+            return real_apply(service, tenant_id, chunk, *args)
+
+        with patch.object(BookingService, '_apply_bulk_transition', cancel_first):
+            results = self.bookings.bulk_action_bookings(
+                self.tenant_id, [booking_id], 'confirm', {}, self.admin_id
+            )
+
+        assert results['successful'] == []
+        assert results['failed'] == [{'booking_id': booking_id, 'error': 'Booking status changed concurrently'}]
+        assert EventOutbox.query.count() == 0
+        assert AuditLog.query.count() == 0
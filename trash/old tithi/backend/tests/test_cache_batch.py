@@ -0,0 +1,179 @@
+"""
+Batched Cache Access Tests
+
+Tests for multi-key cache operations:
+- get_many/set_many/delete_many use one Redis round trip
+- Read-through services only fetch keys missing from the local tier
+- Versioned availability keys for many pairs read generations once
+- Day windows for a range and several resources come from one cache read
+"""
+
+import pytest
+import uuid
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+from unittest.mock import MagicMock
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant, User, Membership
+from app.models.business import Resource, StaffProfile, StaffAvailability
+from app.services.availability_materialized import MaterializedAvailabilityService
+from app.services.cache import CacheService, AvailabilityCacheService, get_local_cache
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed against the test engine."""
+    statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _before_cursor_execute)
+
+
+class TestBatchedCacheOperations:
+    """Tests for get_many, set_many and delete_many."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup an app context and an empty local tier."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        get_local_cache().clear()
+
+        yield
+
+        get_local_cache().clear()
+        self.app_context.pop()
+
+    def test_get_many_single_mget(self):
+        """Values come back in key order from one MGET, with default for misses."""
+        cache = CacheService()
+        cache.redis_client = MagicMock()
+        cache.redis_client.mget.return_value = ['J{"a":1}', None, '[1,2]']
+
+        assert cache.get_many(['k1', 'k2', 'k3'], default='none') == [{'a': 1}, 'none', [1, 2]]
+        cache.redis_client.mget.assert_called_once_with(['k1', 'k2', 'k3'])
+        cache.redis_client.get.assert_not_called()
+
+    def test_read_through_fetches_only_local_misses(self):
+        """Versioned keys already in the local tier are not requested from Redis."""
+        cache = AvailabilityCacheService()
+        cache.redis_client = MagicMock()
+        pipe = cache.redis_client.pipeline.return_value
+        get_local_cache().set('k1', 'local', 60, 7)
+        pipe.execute.return_value = [['J"remote"'], 60000]
+
+        assert cache.get_many(['k1', 'k2']) == ['local', 'remote']
+        pipe.mget.assert_called_once_with(['k2'])
+        assert get_local_cache().get('k2') == 'remote'
+
+    def test_set_and_delete_many_one_round_trip(self):
+        """Writes are pipelined and deletes issued as one command."""
+        cache = CacheService()
+        cache.redis_client = MagicMock()
+        pipe = cache.redis_client.pipeline.return_value
+
+        cache.set_many({'k1': 1, 'k2': 2}, 60)
+        cache.delete_many(['k1', 'k2'])
+
+        assert pipe.setex.call_count == 2
+        pipe.execute.assert_called_once()
+        cache.redis_client.delete.assert_called_once_with('k1', 'k2')
+        assert get_local_cache().get('k1') is None
+
+    def test_availability_keys_read_generations_once(self):
+        """Keys for many resources and dates share one generation lookup."""
+        cache = AvailabilityCacheService()
+        cache.redis_client = MagicMock()
+        cache.redis_client.mget.side_effect = lambda keys: ['2'] * len(keys)
+        tenant_id = uuid.uuid4()
+        pairs = [(uuid.uuid4(), f'2030-01-{day:02d}') for day in range(1, 8) for _ in range(3)]
+
+        keys = cache.availability_keys(tenant_id, pairs)
+
+        assert cache.redis_client.mget.call_count == 1
+        assert keys[0] == cache.availability_key(tenant_id, *pairs[0])
+
+
+class TestDayWindowCache:
+    """Tests for cached day windows in MaterializedAvailabilityService."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup two staff members working every day."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        get_local_cache().clear()
+
+        db.create_all()
+
+        self.tenant_id = uuid.uuid4()
+        self.resource_ids = []
+        db.session.add(Tenant(id=self.tenant_id, slug="windows-tenant", name="Windows Tenant"))
+        for index in range(2):
+            user = User(id=uuid.uuid4(), email=f"staff{index}@example.com", display_name="Staff")
+            membership = Membership(id=uuid.uuid4(), tenant_id=self.tenant_id, user_id=user.id, role="staff")
+            resource = Resource(
+                id=uuid.uuid4(), tenant_id=self.tenant_id, type="staff", tz="UTC", capacity=1, name="Staff"
+            )
+            staff = StaffProfile(
+                id=uuid.uuid4(), tenant_id=self.tenant_id, membership_id=membership.id,
+                resource_id=resource.id, display_name="Staff", is_active=True
+            )
+            db.session.add_all([user, membership, resource, staff])
+            for weekday in range(1, 8):
+                db.session.add(StaffAvailability(
+                    tenant_id=self.tenant_id, staff_profile_id=staff.id, weekday=weekday,
+                    start_time=time(9, 0), end_time=time(17, 0), is_active=True
+                ))
+            self.resource_ids.append(resource.id)
+        db.session.commit()
+
+        self.materialized = MaterializedAvailabilityService()
+        self.start_day = date(2030, 1, 7)
+        self.end_day = self.start_day + timedelta(days=13)
+
+        yield
+
+        get_local_cache().clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _windows(self):
+        return self.materialized.get_day_windows(self.tenant_id, self.resource_ids, self.start_day, self.end_day)
+
+    def test_cached_range_needs_no_queries(self):
+        """A repeated range for all resources is answered from the cache."""
+        first = self._windows()
+
+        with count_queries() as statements:
+            second = self._windows()
+
+        assert len(second) == 2 * 14
+        assert second == first
+        assert statements == []
+
+    def test_invalidated_date_is_reloaded(self):
+        """Bumping one resource date's generation sends the range back to the database."""
+        self._windows()
+        AvailabilityCacheService().invalidate_availability(
+            self.tenant_id, self.resource_ids[0], self.start_day.isoformat()
+        )
+
+        with count_queries() as statements:
+            windows = self._windows()
+
+        assert statements
+        assert len(windows) == 2 * 14
@@ -0,0 +1,142 @@
+"""
+Cache Codec Tests
+
+Tests for cached value encoding:
+- Frames carry a header and round-trip
+- Large values are compressed, small ones are not
+- Entries written before headers existed stay readable
+- Non-JSON types encode consistently across JSON libraries
+"""
+
+import json
+import pytest
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from app import create_app
+from app.services.cache import CacheService, BookingHoldCacheService, get_local_cache
+from app.services.cache_codec import CacheCodec
+
+
+SLOTS = [
+    {'start_at': f'2030-01-07T{hour:02d}:{minute:02d}:00', 'end_at': f'2030-01-07T{hour:02d}:{minute + 15:02d}:00',
+     'resource_id': '7f1d7b1e-0000-0000-0000-000000000000', 'available': True}
+    for hour in range(9, 17) for minute in (0, 15, 30)
+]
+
+
+class TestCacheCodec:
+    """Tests for CacheCodec."""
+
+    def test_small_values_are_tagged_json(self):
+        """Values under the threshold are stored as JSON behind a header."""
+        codec = CacheCodec(compress_min_bytes=4096)
+
+        frame, text = codec.encode({'a': 1})
+
+        assert frame == 'J{"a":1}'
+        assert text == '{"a":1}'
+        assert codec.decode(frame) == {'a': 1}
+
+    def test_large_values_are_compressed(self):
+        """Values over the threshold are compressed and round-trip."""
+        codec = CacheCodec(compress_min_bytes=1024)
+
+        frame, text = codec.encode(SLOTS)
+
+        assert frame.startswith('Z')
+        assert len(frame) < len(text) / 2
+        assert codec.decode_with_size(frame) == (SLOTS, len(text))
+
+    def test_legacy_entries_readable(self):
+        """Header-less JSON written before codecs existed still decodes."""
+        codec = CacheCodec()
+
+        assert codec.decode(json.dumps(SLOTS)) == SLOTS
+        assert codec.decode('"text"') == 'text'
+        assert codec.decode(b'{"a": 1}') == {'a': 1}
+
+    def test_non_json_types(self):
+        """Datetimes become ISO strings; UUIDs and Decimals plain strings."""
+        codec = CacheCodec()
+        value_id = uuid.uuid4()
+
+        frame, _ = codec.encode({
+            'at': datetime(2030, 1, 7, 9, 30), 'id': value_id, 'amount': Decimal('12.50')
+        })
+
+        assert codec.decode(frame) == {'at': '2030-01-07T09:30:00', 'id': str(value_id), 'amount': '12.50'}
+
+    def test_orjson_writes_same_values(self):
+        """orjson frames decode to the same values as the standard library's."""
+        pytest.importorskip('orjson')
+        fast = CacheCodec(library='orjson', compress_min_bytes=1024)
+        standard = CacheCodec(compress_min_bytes=1024)
+        value = {'slots': SLOTS, 'at': datetime(2030, 1, 7, 9, 30), 'id': uuid.uuid4()}
+
+        assert fast.encode(value)[1] == standard.encode(value)[1]
+        assert standard.decode(fast.encode(value)[0]) == fast.decode(standard.encode(value)[0])
+
+    def test_encode_serializes_once(self):
+        """Encoding a value does not parse it back."""
+        codec = CacheCodec(compress_min_bytes=1024)
+        codec.loads = MagicMock()
+
+        codec.encode(SLOTS)
+        codec.encode({'a': 1})
+
+        codec.loads.assert_not_called()
+
+    def test_unknown_codec_rejected(self):
+        """Only the supported JSON libraries can be configured."""
+        with pytest.raises(ValueError):
+            CacheCodec(library='pickle')
+
+
+class TestCacheServiceCodec:
+    """Tests for codecs on CacheService."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup an app context and an empty local tier."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        get_local_cache().clear()
+
+        yield
+
+        get_local_cache().clear()
+        self.app_context.pop()
+
+    def test_set_writes_frame(self):
+        """set() stores the encoded frame in Redis."""
+        cache = CacheService()
+        cache.redis_client = MagicMock()
+
+        cache.set('tithi:test:key', {'a': 1}, 60)
+
+        cache.redis_client.setex.assert_called_once_with('tithi:test:key', 60, 'J{"a":1}')
+
+    def test_local_tier_decodes_writes_once(self):
+        """The local tier parses a written value on first read and keeps the result."""
+        cache = CacheService()
+        cache.redis_client = None
+        value_id = uuid.uuid4()
+
+        cache.set('tithi:test:key', {'id': value_id, 'slots': (1, 2)}, 60)
+        first = cache.get('tithi:test:key')
+
+        assert first == {'id': str(value_id), 'slots': [1, 2]}
+        assert cache.get('tithi:test:key') is first
+
+    def test_hold_payloads_stay_plain_json(self):
+        """Hold payloads are read by Lua scripts, so they carry no header."""
+        holds = BookingHoldCacheService()
+        holds.redis_client = MagicMock()
+
+        holds.create_hold(uuid.uuid4(), 'hold-1', {'a': 1}, 60)
+
+        assert holds.redis_client.setex.call_args[0][2] == '{"a":1}'
@@ -0,0 +1,111 @@
+"""
+Cache Stampede Protection Tests
+
+Tests for CacheService.get_or_compute:
+- Concurrent misses on one key compute it once
+- Hot keys are refreshed early by one caller while others read the cached value
+- Values produced together are computed and cached together
+- A Redis lock held by another process is respected
+"""
+
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from app import create_app
+from app.services.cache import CacheService, COMPUTED_MARKER, get_local_cache
+
+
+class TestCacheStampede:
+    """Tests for single-flight recomputation and early refresh."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup an app context and a Redis-less cache over an empty local tier."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        get_local_cache().clear()
+
+        self.cache = CacheService()
+        self.cache.redis_client = None
+
+        yield
+
+        get_local_cache().clear()
+        self.app_context.pop()
+
+    def test_concurrent_misses_compute_once(self):
+        """Threads missing the same key wait for one computation."""
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'slots': 3}
+
+        def read():
+            cache = CacheService()
+            cache.redis_client = None
+            results.append(cache.get_or_compute('tithi:test:hot', compute, ttl_seconds=60))
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [{'slots': 3}] * 8
+
+    def test_fresh_entry_is_not_recomputed(self):
+        """Far from expiry the cached value is returned without computing."""
+        self.cache.get_or_compute('tithi:test:key', lambda: 1, ttl_seconds=60)
+        compute = MagicMock(return_value=2)
+
+        assert self.cache.get_or_compute('tithi:test:key', compute, ttl_seconds=60) == 1
+        compute.assert_not_called()
+
+    def test_early_refresh_near_expiry(self):
+        """An expensive entry close to expiry is refreshed before it lapses."""
+        self.cache.set('tithi:test:key', {
+            COMPUTED_MARKER: 1, 'value': 'old', 'delta': 2.0, 'expires_at': time.time() + 1
+        }, 60)
+
+        # random() = 0.9 gives an early-refresh window of about 4.6 s
+        with patch('app.services.cache.random.random', return_value=0.9):
+            assert self.cache.get_or_compute('tithi:test:key', lambda: 'new', ttl_seconds=60) == 'new'
+
+    def test_refresh_in_progress_serves_current_value(self):
+        """While another caller refreshes, the current value is returned at once."""
+        self.cache.set('tithi:test:key', {
+            COMPUTED_MARKER: 1, 'value': 'old', 'delta': 2.0, 'expires_at': time.time() + 1
+        }, 60)
+        compute = MagicMock(return_value='new')
+
+        with self.cache.single_flight('tithi:test:key:compute') as leader:
+            assert leader
+            with patch('app.services.cache.random.random', return_value=0.9):
+                assert self.cache.get_or_compute('tithi:test:key', compute, ttl_seconds=60) == 'old'
+
+        compute.assert_not_called()
+
+    def test_values_computed_together(self):
+        """Missing any key recomputes the group once and caches every value."""
+        compute = MagicMock(return_value=[[1], [2]])
+        keys = ['tithi:test:day:1', 'tithi:test:day:2']
+
+        assert self.cache.get_or_compute_many(keys, compute, ttl_seconds=60) == [[1], [2]]
+        assert self.cache.get_or_compute_many(keys, compute, ttl_seconds=60) == [[1], [2]]
+
+        compute.assert_called_once()
+
+    def test_remote_lock_respected(self):
+        """A lock refused by Redis is not taken locally instead."""
+        redis_client = MagicMock()
+        redis_client.set.return_value = None
+        self.cache.redis_client = redis_client
+
+        assert self.cache.acquire_lock('tithi:test:lock') is None
@@ -0,0 +1,207 @@
+"""
+Conditional GET Tests
+
+Tests for ETags derived from availability and catalog generation counters:
+- A matching If-None-Match is answered with 304 without building the body
+- Booking, schedule, service and staff mutations change the tag
+- Changes outside the requested range leave the tag alone
+- Without Redis no tag is issued
+"""
+
+import pytest
+import uuid
+from datetime import datetime, date, timedelta
+from unittest.mock import MagicMock, patch
+
+from flask import g, jsonify
+
+from app import create_app
+from app.extensions import db
+from app.middleware.conditional_get import conditional_response
+from app.models.core import Tenant, User, Membership
+from app.models.business import Service, Resource, ServiceResource, StaffProfile
+from app.services.availability_unified import UnifiedAvailabilityService
+from app.services.business_phase2 import ServiceService, StaffService
+from app.services.cache import AvailabilityCacheService
+
+
+class CounterRedis:
+    """Just enough of a Redis client for generation counters."""
+
+    def __init__(self):
+        self.values = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+
+    def set(self, key, value, nx=False, ex=None):
+        if not (nx and key in self.values):
+            self.values[key] = value
+
+    def expire(self, key, seconds):
+        pass
+
+    def execute(self):
+        pass
+
+
+class TestConditionalGet:
+    """Tests for generation-counter ETags."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup a tenant with one staff member assigned to a service."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant_id = uuid.uuid4()
+        self.service_id = uuid.uuid4()
+        self.staff_id = uuid.uuid4()
+        self.resource_id = uuid.uuid4()
+        user = User(id=uuid.uuid4(), email="etag@example.com", display_name="Staff")
+        membership = Membership(id=uuid.uuid4(), tenant_id=self.tenant_id, user_id=user.id, role="staff")
+        db.session.add_all([
+            Tenant(id=self.tenant_id, slug="etag-tenant", name="ETag Tenant"),
+            user,
+            membership,
+            Service(
+                id=self.service_id, tenant_id=self.tenant_id, slug="cut", name="Cut",
+                duration_min=60, price_cents=5000
+            ),
+            Resource(
+                id=self.resource_id, tenant_id=self.tenant_id, type="staff", tz="UTC",
+                capacity=1, name="Staff"
+            ),
+            StaffProfile(
+                id=self.staff_id, tenant_id=self.tenant_id, membership_id=membership.id,
+                resource_id=self.resource_id, display_name="Staff", is_active=True
+            ),
+            ServiceResource(tenant_id=self.tenant_id, service_id=self.service_id, resource_id=self.resource_id),
+        ])
+        db.session.commit()
+
+        self.redis = CounterRedis()
+        with patch('app.services.cache.get_redis', return_value=self.redis):
+            yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _availability_etag(self, start_day=None, end_day=None):
+        start_day = start_day or date(2030, 1, 7)
+        return UnifiedAvailabilityService().get_availability_etag(
+            self.tenant_id, self.service_id, None, start_day, end_day or start_day + timedelta(days=6),
+            "/api/v1/availability"
+        )
+
+    def test_matching_tag_skips_build(self):
+        """A client holding the current tag gets 304 and the body is never built."""
+        etag = self._availability_etag()
+        build = MagicMock(return_value=(jsonify({"slots": []}), 200))
+
+        with self.app.test_request_context(headers={'If-None-Match': f'"{etag}"'}):
+            response = conditional_response(etag, build)
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == f'"{etag}"'
+        build.assert_not_called()
+
+        with self.app.test_request_context(headers={'If-None-Match': '"stale"'}):
+            response = conditional_response(etag, build)
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] == f'"{etag}"'
+        build.assert_called_once()
+
+    def test_booking_in_range_changes_tag(self):
+        """A booking inside the range changes the tag; one outside does not."""
+        etag = self._availability_etag()
+        cache = AvailabilityCacheService()
+
+        cache.invalidate_availability_range(
+            self.tenant_id, self.resource_id, datetime(2030, 2, 1, 10, 0), datetime(2030, 2, 1, 11, 0)
+        )
+        assert self._availability_etag() == etag
+
+        cache.invalidate_availability_range(
+            self.tenant_id, self.resource_id, datetime(2030, 1, 9, 10, 0), datetime(2030, 1, 9, 11, 0)
+        )
+        assert self._availability_etag() != etag
+
+    def test_expired_generations_do_not_revive_tags(self):
+        """Counters recreated after expiring start from a new value, so old tags never match."""
+        with patch('app.services.cache.time.time', return_value=1_900_000_000.0):
+            first = self._availability_etag()
+            AvailabilityCacheService().invalidate_availability(self.tenant_id, self.resource_id, '2030-01-08')
+            second = self._availability_etag()
+
+        # Every counter expires after a quiet week
+        self.redis.values.clear()
+
+        with patch('app.services.cache.time.time', return_value=1_900_700_000.0):
+            third = self._availability_etag()
+            assert self._availability_etag() == third
+
+        assert len({first, second, third}) == 3
+
+    def test_slots_response_varies_on_accept(self):
+        """JSON and NDJSON share a URL, so shared caches must key on Accept."""
+        from app.blueprints.api_v1 import get_availability_slots
+
+        query = (
+            f"/api/v1/availability/{self.resource_id}/slots?service_id={self.service_id}"
+            "&start_date=2030-01-07&end_date=2030-01-08"
+        )
+        for accept in ('application/json', 'application/x-ndjson'):
+            with self.app.test_request_context(query, headers={'Accept': accept}):
+                g.tenant_id = self.tenant_id
+                response = get_availability_slots(str(self.resource_id))
+
+            assert 'Accept' in response.vary
+            assert response.headers['ETag']
+
+    def test_schedule_change_changes_tag(self):
+        """Working-hour changes bump the resource generation."""
+        etag = self._availability_etag()
+
+        AvailabilityCacheService().invalidate_availability(self.tenant_id, self.resource_id)
+
+        assert self._availability_etag() != etag
+
+    def test_catalog_mutations_change_tags(self):
+        """Service and staff updates move both the catalog and the availability tags."""
+        availability_etag = self._availability_etag()
+        cache = AvailabilityCacheService()
+        services_etag = cache.get_etag(self.tenant_id, "/services", catalogs=["services"])
+
+        with patch.object(ServiceService, '_log_audit'):
+            ServiceService().update_service(self.tenant_id, self.service_id, {"price_cents": 6000}, uuid.uuid4())
+
+        assert cache.get_etag(self.tenant_id, "/services", catalogs=["services"]) != services_etag
+        assert self._availability_etag() != availability_etag
+
+        staff_etag = cache.get_etag(self.tenant_id, "/staff", catalogs=["staff"])
+        StaffService().update_staff_profile(self.tenant_id, self.staff_id, {"bio": "Colourist"}, uuid.uuid4())
+
+        assert cache.get_etag(self.tenant_id, "/staff", catalogs=["staff"]) != staff_etag
+
+    def test_no_tag_without_redis(self):
+        """Without Redis the response is always built and carries no ETag."""
+        with patch('app.services.cache.get_redis', return_value=None):
+            assert self._availability_etag() is None
+
+            with self.app.test_request_context(headers={'If-None-Match': '*'}):
+                response = conditional_response(None, lambda: (jsonify({"slots": []}), 200))
+
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers
@@ -0,0 +1,280 @@
+"""
+Customer Metrics Delta Tests
+
+Tests for deferred customer_metrics maintenance:
+- Creating a booking writes a metrics delta to the outbox, not the metrics row
+- Deltas are coalesced per customer and applied with one relative UPDATE
+- Applied deltas are marked delivered and never applied twice
+- Status transitions write deltas that keep spend, cancellations and no-shows current
+- A rebuild recomputes metrics from bookings and retires only the deltas it covers
+- The delta jobs are registered with the worker and beat
+"""
+
+import pytest
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from unittest.mock import patch
+
+from sqlalchemy import event, insert
+
+from app import create_app
+from app.extensions import db, celery, init_celery
+from app.models.core import Tenant, User, Membership
+from app.models.audit import EventOutbox
+from app.models.business import (
+    Customer, CustomerMetrics, Service, Resource, Booking, StaffProfile, StaffAvailability
+)
+from app.services.business_phase2 import BookingService
+from app.services.customer_metrics import CustomerMetricsService, CUSTOMER_METRICS_EVENT
+
+
+@contextmanager
+def record_statements():
+    """Record SQL statements issued against the database."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestCustomerMetricsDeltas:
+    """Tests for outbox-driven customer metrics."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup a bookable staff member, a service and two customers."""
+        self.app = create_app('testing')
+        self.app.config['BOOKING_OVERLAP_ENFORCEMENT'] = 'constraint'
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant_id = uuid.uuid4()
+        self.resource_id = uuid.uuid4()
+        self.service_id = uuid.uuid4()
+        self.customer_id = uuid.uuid4()
+        self.other_customer_id = uuid.uuid4()
+        user = User(id=uuid.uuid4(), email="metrics@example.com", display_name="Staff")
+        membership = Membership(id=uuid.uuid4(), tenant_id=self.tenant_id, user_id=user.id, role="staff")
+        staff = StaffProfile(
+            id=uuid.uuid4(), tenant_id=self.tenant_id, membership_id=membership.id,
+            resource_id=self.resource_id, display_name="Staff", is_active=True
+        )
+        db.session.add_all([
+            Tenant(id=self.tenant_id, slug="metrics-tenant", name="Metrics Tenant"),
+            user,
+            membership,
+            Resource(
+                id=self.resource_id, tenant_id=self.tenant_id, type="staff", tz="UTC",
+                capacity=1, name="Staff"
+            ),
+            staff,
+            Service(
+                id=self.service_id, tenant_id=self.tenant_id, slug="cut", name="Cut",
+                duration_min=60, price_cents=5000
+            ),
+            Customer(id=self.customer_id, tenant_id=self.tenant_id, email="a@example.com"),
+            Customer(id=self.other_customer_id, tenant_id=self.tenant_id, email="b@example.com"),
+        ])
+        for weekday in range(1, 8):
+            db.session.add(StaffAvailability(
+                tenant_id=self.tenant_id, staff_profile_id=staff.id, weekday=weekday,
+                start_time=time(9, 0), end_time=time(17, 0), is_active=True
+            ))
+        db.session.commit()
+
+        self.metrics = CustomerMetricsService()
+        self.day = datetime(2030, 1, 7)
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_booking(self, customer_id, start_hour, status='confirmed', day_offset=0):
+        start_at = self.day.replace(hour=start_hour) + timedelta(days=day_offset)
+        booking = Booking(
+            id=uuid.uuid4(), tenant_id=self.tenant_id, customer_id=customer_id,
+            resource_id=self.resource_id, client_generated_id=uuid.uuid4().hex,
+            service_snapshot={'service_id': str(self.service_id), 'price_cents': 5000},
+            start_at=start_at, end_at=start_at + timedelta(hours=1), booking_tz="UTC", status=status
+        )
+        db.session.add_all([booking, self.metrics.delta_event(self.tenant_id, booking)])
+        db.session.commit()
+        return booking
+
+    def _metrics_for(self, customer_id):
+        return CustomerMetrics.query.filter_by(tenant_id=self.tenant_id, customer_id=customer_id).one()
+
+    def test_create_booking_defers_metrics(self):
+        """The booking commits with a delta event; the metrics row is left to the worker."""
+        start_at = self.day.replace(hour=10)
+        with patch.object(BookingService, '_invalidate_booking_availability'):
+            booking = BookingService().create_booking(self.tenant_id, {
+                'customer_id': self.customer_id,
+                'service_id': self.service_id,
+                'resource_id': self.resource_id,
+                'start_at': start_at.isoformat(),
+                'end_at': (start_at + timedelta(hours=1)).isoformat(),
+            }, uuid.uuid4())
+
+        delta = EventOutbox.query.filter_by(event_code=CUSTOMER_METRICS_EVENT).one()
+        assert delta.payload['customer_id'] == str(booking.customer_id)
+        assert delta.payload['bookings'] == 1
+        assert CustomerMetrics.query.count() == 0
+
+    def test_deltas_coalesced_into_one_update(self):
+        """Several deltas per customer become one executemany UPDATE for the batch."""
+        self._add_booking(self.customer_id, 10, day_offset=1)
+        self._add_booking(self.customer_id, 9)
+        self._add_booking(self.customer_id, 11, status='pending', day_offset=2)
+        self._add_booking(self.other_customer_id, 12)
+
+        with record_statements() as statements:
+            applied = self.metrics.apply_pending_deltas()
+
+        assert applied == 4
+        assert len([s for s in statements if s.startswith("UPDATE customer_metrics")]) == 1
+
+        metrics = self._metrics_for(self.customer_id)
+        assert metrics.total_bookings_count == 3
+        assert metrics.total_spend_cents == 10000
+        assert metrics.first_booking_at == self.day.replace(hour=9)
+        assert metrics.last_booking_at == self.day.replace(hour=11) + timedelta(days=2)
+        assert self._metrics_for(self.other_customer_id).total_bookings_count == 1
+
+    def test_deltas_applied_once_and_relative(self):
+        """Delivered deltas are not reapplied; later deltas add to the existing row."""
+        self._add_booking(self.customer_id, 10)
+        self.metrics.apply_pending_deltas()
+
+        assert self.metrics.apply_pending_deltas() == 0
+        assert EventOutbox.query.filter_by(event_code=CUSTOMER_METRICS_EVENT, status="ready").count() == 0
+
+        self._add_booking(self.customer_id, 14)
+        self.metrics.apply_pending_deltas()
+
+        metrics = self._metrics_for(self.customer_id)
+        assert metrics.total_bookings_count == 2
+        assert metrics.last_booking_at == self.day.replace(hour=14)
+
+    def test_rebuild_from_bookings(self):
+        """A rebuild recomputes every counter and retires the deltas it already covers."""
+        self._add_booking(self.customer_id, 9)
+        self._add_booking(self.customer_id, 10, status='completed')
+        self._add_booking(self.customer_id, 11, status='canceled')
+        self._add_booking(self.customer_id, 12, status='no_show')
+
+        with record_statements() as statements:
+            customers = self.metrics.rebuild(self.tenant_id)
+
+        assert customers == 1
+        assert len([s for s in statements if s.startswith("SELECT")]) == 2
+
+        metrics = self._metrics_for(self.customer_id)
+        assert metrics.total_bookings_count == 4
+        assert metrics.total_spend_cents == 10000
+        assert metrics.canceled_count == 1
+        assert metrics.no_show_count == 1
+        assert metrics.first_booking_at == self.day.replace(hour=9)
+        assert metrics.last_booking_at == self.day.replace(hour=12)
+        assert self.metrics.apply_pending_deltas() == 0
+
+    def _snapshot(self, customer_id):
+        metrics = self._metrics_for(customer_id)
+        return (metrics.total_bookings_count, metrics.total_spend_cents, metrics.canceled_count,
+                metrics.no_show_count, metrics.first_booking_at, metrics.last_booking_at)
+
+    def test_status_transitions_emit_deltas(self):
+        """Applied transition deltas leave the same metrics a rebuild computes."""
+        service = BookingService()
+        pending = self._add_booking(self.customer_id, 9, status='pending')
+        canceled = self._add_booking(self.customer_id, 10)
+        no_show = self._add_booking(self.customer_id, 11)
+        completed = self._add_booking(self.customer_id, 12, status='pending')
+
+        with patch.object(BookingService, '_invalidate_booking_availability'), \
+                patch.object(BookingService, '_log_audit'), \
+                patch('app.services.business_phase2.AvailabilityService.notify_waitlist_for_freed_slot'), \
+                patch.object(BookingService, '_calculate_cancellation_fee', return_value=0):
+            service.confirm_booking(self.tenant_id, pending.id, uuid.uuid4())
+            service.cancel_booking(self.tenant_id, canceled.id, uuid.uuid4())
+            service.mark_no_show(self.tenant_id, no_show.id, uuid.uuid4())
+            service.complete_booking(self.tenant_id, completed.id, uuid.uuid4())
+        self.metrics.apply_pending_deltas()
+        incremental = self._snapshot(self.customer_id)
+
+        self.metrics.rebuild(self.tenant_id)
+
+        assert incremental == self._snapshot(self.customer_id)
+        assert incremental[:4] == (4, 10000, 1, 1)
+
+    def test_bulk_cancel_emits_deltas(self):
+        """Set-based cancellations write one delta per booking in the chunk's transaction."""
+        first = self._add_booking(self.customer_id, 9)
+        second = self._add_booking(self.other_customer_id, 10, status='pending')
+        self.metrics.apply_pending_deltas()
+
+        with patch.object(BookingService, '_after_bulk_transition'):
+            results = BookingService().bulk_action_bookings(
+                self.tenant_id, [str(first.id), str(second.id)], 'cancel', {}, uuid.uuid4()
+            )
+
+        assert len(results['successful']) == 2
+        assert self.metrics.apply_pending_deltas() == 2
+        assert self._snapshot(self.customer_id)[:4] == (1, 0, 1, 0)
+        assert self._snapshot(self.other_customer_id)[:4] == (1, 0, 1, 0)
+
+    def test_transition_without_metric_change_emits_nothing(self):
+        """Moving between two statuses that count the same writes no delta."""
+        booking = self._add_booking(self.customer_id, 9)
+
+        assert self.metrics.delta_event(self.tenant_id, booking, 'checked_in') is None
+        assert self.metrics.delta_payload(
+            booking.customer_id, booking.start_at, booking.service_snapshot, 'canceled', 'confirmed'
+        ) == {
+            'customer_id': str(self.customer_id), 'bookings': 0, 'spend_cents': -5000,
+            'no_shows': 0, 'canceled': 1, 'booked_at': booking.start_at.isoformat()
+        }
+
+    def test_rebuild_keeps_deltas_outside_its_snapshot(self):
+        """A delta committed after the rebuild read its snapshot stays ready."""
+        self._add_booking(self.customer_id, 9)
+        late_payload = self.metrics.delta_payload(
+            self.customer_id, self.day.replace(hour=15), {'price_cents': 5000}, 'confirmed'
+        )
+        ready_delta_ids = CustomerMetricsService._ready_delta_ids
+
+        def delta_committed_concurrently(tenant_id):
+            delta_ids = ready_delta_ids(tenant_id)
+            db.session.execute(insert(EventOutbox), [self.metrics.delta_row(self.tenant_id, late_payload)])
+            return delta_ids
+
+        with patch.object(CustomerMetricsService, '_ready_delta_ids', side_effect=delta_committed_concurrently):
+            self.metrics.rebuild(self.tenant_id)
+
+        assert self.metrics.apply_pending_deltas() == 1
+        metrics = self._metrics_for(self.customer_id)
+        assert metrics.total_bookings_count == 2
+        assert metrics.last_booking_at == self.day.replace(hour=15)
+
+    def test_jobs_registered_with_worker_and_beat(self):
+        """The worker's configured imports register the delta tasks and their beat entry."""
+        init_celery(self.app)
+        assert 'app.jobs.customer_metrics' in celery.conf.imports
+
+        celery.loader.import_default_modules()
+
+        assert 'app.jobs.customer_metrics.apply_customer_metric_deltas' in celery.tasks
+        assert 'app.jobs.customer_metrics.rebuild_customer_metrics' in celery.tasks
+        assert celery.conf.beat_schedule['apply-customer-metric-deltas']['task'] == \
+            'app.jobs.customer_metrics.apply_customer_metric_deltas'
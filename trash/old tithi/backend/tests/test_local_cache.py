@@ -0,0 +1,150 @@
+"""
+Local Cache Tier Tests
+
+Tests for the process-wide in-memory cache tier:
+- Entries honour the TTL they were set with
+- Entry-count and byte budgets evict the least recently used entries
+- Hit, miss, eviction and expiry counters
+- CacheService instances share the tier; versioned keys read through it
+"""
+
+import json
+import pytest
+import uuid
+from unittest.mock import MagicMock, patch
+
+from app import create_app
+from app.services.cache import (
+    LocalCache, CacheService, AvailabilityCacheService, BookingHoldCacheService, get_local_cache
+)
+
+
+class TestLocalCache:
+    """Tests for LocalCache."""
+
+    def test_per_key_ttl(self):
+        """Each entry expires on its own TTL."""
+        cache = LocalCache()
+        with patch('app.services.cache.time.monotonic', return_value=1000.0):
+            cache.set('short', 1, 5, 1)
+            cache.set('long', 2, 600, 1)
+
+        with patch('app.services.cache.time.monotonic', return_value=1010.0):
+            assert cache.get('short') is None
+            assert cache.get('long') == 2
+
+        stats = cache.stats()
+        assert stats['expirations'] == 1
+        assert stats['entries'] == 1
+
+    def test_evicts_least_recently_used(self):
+        """Past the entry budget the least recently read entry goes first."""
+        cache = LocalCache(max_entries=2)
+        cache.set('a', 1, 60, 1)
+        cache.set('b', 2, 60, 1)
+        cache.get('a')
+        cache.set('c', 3, 60, 1)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.stats()['evictions'] == 1
+
+    def test_byte_budget(self):
+        """The byte budget bounds the tier; oversized values are not stored."""
+        cache = LocalCache(max_bytes=100)
+        cache.set('a', 'x', 60, 40)
+        cache.set('b', 'y', 60, 40)
+        cache.set('c', 'z', 60, 40)
+
+        assert cache.stats()['bytes'] == 80
+        assert cache.get('a') is None
+
+        assert cache.set('huge', 'w', 60, 101) is False
+        assert cache.get('huge') is None
+
+    def test_hit_and_miss_counters(self):
+        """Reads are counted as hits or misses."""
+        cache = LocalCache()
+        cache.set('a', 1, 60, 1)
+        cache.get('a')
+        cache.get('a')
+        cache.get('missing')
+
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses']) == (2, 1)
+
+
+class TestCacheServiceLocalTier:
+    """Tests for CacheService on top of the shared local tier."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup an app context and an empty local tier."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        get_local_cache().clear()
+
+        yield
+
+        get_local_cache().clear()
+        self.app_context.pop()
+
+    def test_fallback_shared_and_ttl_correct(self):
+        """Without Redis, instances share entries and the TTL passed to set applies."""
+        writer = CacheService()
+        writer.redis_client = None
+        reader = CacheService()
+        reader.redis_client = None
+
+        with patch('app.services.cache.time.monotonic', return_value=1000.0):
+            writer.set('tithi:test:key', {'a': 1}, ttl_seconds=10)
+            assert reader.get('tithi:test:key') == {'a': 1}
+
+        with patch('app.services.cache.time.monotonic', return_value=1011.0):
+            assert reader.get('tithi:test:key') is None
+
+    def test_fallback_locks_expire(self):
+        """In-process locks are shared and lapse after their TTL."""
+        cache = CacheService()
+        cache.redis_client = None
+
+        with patch('app.services.cache.time.monotonic', return_value=1000.0):
+            token = cache.acquire_lock('tithi:test:lock', ttl_seconds=30)
+            assert token
+            other = CacheService()
+            other.redis_client = None
+            assert other.acquire_lock('tithi:test:lock', ttl_seconds=30) is None
+
+        with patch('app.services.cache.time.monotonic', return_value=1031.0):
+            assert other.acquire_lock('tithi:test:lock', ttl_seconds=30)
+
+    def test_versioned_keys_read_through(self):
+        """Availability reads hit Redis once, then the local tier until the TTL."""
+        redis_client = MagicMock()
+        redis_client.mget.return_value = [None, None, None]
+        pipe = redis_client.pipeline.return_value
+        pipe.execute.return_value = [json.dumps([{'slot': 1}]), 60000]
+        cache = AvailabilityCacheService()
+        cache.redis_client = redis_client
+        tenant_id, resource_id = uuid.uuid4(), uuid.uuid4()
+
+        assert cache.get_availability(tenant_id, resource_id, '2030-01-07') == [{'slot': 1}]
+        assert cache.get_availability(tenant_id, resource_id, '2030-01-07') == [{'slot': 1}]
+
+        assert pipe.get.call_count == 1
+        assert get_local_cache().stats()['hits'] == 1
+
+    def test_unversioned_keys_consult_redis(self):
+        """Holds are always read from Redis so a release elsewhere is seen at once."""
+        redis_client = MagicMock()
+        redis_client.get.return_value = None
+        holds = BookingHoldCacheService()
+        holds.redis_client = redis_client
+        tenant_id = uuid.uuid4()
+
+        holds.create_hold(tenant_id, 'hold-1', {'resource_id': 'r'})
+
+        assert holds.get_hold(tenant_id, 'hold-1') is None
+        redis_client.get.assert_called_once()
@@ -0,0 +1,169 @@
+"""
+Next Available Slots Tests
+
+Tests for the lazy first-N slot search in UnifiedAvailabilityService:
+- Results match the head of the full slot listing
+- Staff are resolved through service_resources and merged in start order
+- The search stops reading days once enough slots are found
+- Month heatmap counts agree with the slot listing
+- The compact encoding decodes back to the slot listing
+"""
+
+import pytest
+import uuid
+from datetime import datetime, date, time, timedelta
+from unittest.mock import patch
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant, User, Membership
+from app.models.business import (
+    Customer, Service, Resource, Booking, ServiceResource, StaffProfile, StaffAvailability
+)
+from app.services.availability_materialized import MaterializedAvailabilityService
+from app.services.availability_unified import UnifiedAvailabilityService, expand_compact_slots
+
+
+class TestNextAvailableSlots:
+    """Tests for the first-N available slot search."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup tenant, two staff linked to a service, and a customer."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant = Tenant(id=uuid.uuid4(), slug="next-slots-tenant", name="Next Slots Tenant")
+        db.session.add(self.tenant)
+
+        self.service = Service(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, slug="cut", name="Cut",
+            duration_min=60, price_cents=5000
+        )
+        db.session.add(self.service)
+
+        self.staff = []
+        for index, start_hour in enumerate((9, 13)):
+            user = User(id=uuid.uuid4(), email=f"staff{index}@example.com", display_name=f"Staff {index}")
+            membership = Membership(id=uuid.uuid4(), tenant_id=self.tenant.id, user_id=user.id, role="staff")
+            resource = Resource(
+                id=uuid.uuid4(), tenant_id=self.tenant.id, type="staff", tz="UTC",
+                capacity=1, name=f"Staff {index}"
+            )
+            staff = StaffProfile(
+                id=uuid.uuid4(), tenant_id=self.tenant.id, membership_id=membership.id,
+                resource_id=resource.id, display_name=f"Staff {index}", is_active=True
+            )
+            db.session.add_all([user, membership, resource, staff])
+            db.session.add(ServiceResource(
+                tenant_id=self.tenant.id, service_id=self.service.id, resource_id=resource.id
+            ))
+            for weekday in range(1, 8):
+                db.session.add(StaffAvailability(
+                    tenant_id=self.tenant.id, staff_profile_id=staff.id, weekday=weekday,
+                    start_time=time(start_hour, 0), end_time=time(start_hour + 4, 0), is_active=True
+                ))
+            self.staff.append(staff)
+
+        self.customer = Customer(id=uuid.uuid4(), tenant_id=self.tenant.id, email="c@example.com")
+        db.session.add(self.customer)
+        db.session.commit()
+
+        self.service_obj = UnifiedAvailabilityService()
+        self.day = date.today() + timedelta(days=3)
+        self.after = datetime.combine(self.day, time.min)
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_matches_head_of_full_listing(self):
+        """The first N results equal the first N slots of the full listing."""
+        staff = self.staff[0]
+        db.session.add(Booking(
+            tenant_id=self.tenant.id, customer_id=self.customer.id, resource_id=staff.resource_id,
+            client_generated_id=str(uuid.uuid4()), service_snapshot={},
+            start_at=datetime.combine(self.day, time(10, 0)), end_at=datetime.combine(self.day, time(11, 0)),
+            booking_tz="UTC", status="confirmed"
+        ))
+        db.session.commit()
+
+        full = self.service_obj.get_available_slots(
+            self.tenant.id, self.service.id, staff.id, self.after, self.after + timedelta(days=1)
+        )
+        head = self.service_obj.find_next_available_slots(
+            self.tenant.id, self.service.id, self.after, limit=3, staff_id=staff.id
+        )
+
+        assert head == full[:3]
+
+    def test_merges_staff_in_start_order(self):
+        """Slots from every linked staff member come back in start order."""
+        slots = self.service_obj.find_next_available_slots(
+            self.tenant.id, self.service.id, datetime.combine(self.day, time(13, 0)), limit=4
+        )
+
+        starts = [slot['start_at'] for slot in slots]
+        assert starts == sorted(starts)
+        assert {slot['staff_id'] for slot in slots} == {str(self.staff[1].id)}
+
+        slots = self.service_obj.find_next_available_slots(
+            self.tenant.id, self.service.id, self.after, limit=40
+        )
+        assert {slot['staff_id'] for slot in slots} == {str(staff.id) for staff in self.staff}
+
+    def test_stops_after_first_day_when_satisfied(self):
+        """A limit met on the first day reads only that day."""
+        with patch.object(
+            MaterializedAvailabilityService, 'get_day_windows',
+            autospec=True, side_effect=MaterializedAvailabilityService.get_day_windows
+        ) as get_day_windows:
+            slots = self.service_obj.find_next_available_slots(
+                self.tenant.id, self.service.id, self.after, limit=2
+            )
+
+        assert len(slots) == 2
+        assert get_day_windows.call_count == 1
+
+    def test_heatmap_counts_match_slot_listing(self):
+        """Per-day and per-staff heatmap counts equal the number of listed slots."""
+        staff = self.staff[0]
+        db.session.add(Booking(
+            tenant_id=self.tenant.id, customer_id=self.customer.id, resource_id=staff.resource_id,
+            client_generated_id=str(uuid.uuid4()), service_snapshot={},
+            start_at=datetime.combine(self.day, time(10, 15)), end_at=datetime.combine(self.day, time(11, 0)),
+            booking_tz="UTC", status="confirmed"
+        ))
+        db.session.commit()
+
+        end_day = self.day + timedelta(days=1)
+        heatmap = self.service_obj.get_availability_heatmap(self.tenant.id, self.service.id, self.day, end_day)
+
+        for day_entry in heatmap['days']:
+            for member in self.staff:
+                day_start = datetime.fromisoformat(day_entry['date'])
+                listed = self.service_obj.get_available_slots(
+                    self.tenant.id, self.service.id, member.id, day_start, day_start
+                )
+                assert day_entry['staff'].get(str(member.id), 0) == len(listed)
+            assert day_entry['slots'] == sum(day_entry['staff'].values())
+            assert day_entry['available'] == (day_entry['slots'] > 0)
+
+    def test_compact_encoding_round_trips(self):
+        """Decoding the compact payload reproduces the full slot listing."""
+        start_dt = datetime.combine(self.day, time.min)
+        end_dt = start_dt + timedelta(days=2)
+
+        compact = self.service_obj.get_available_slots_compact(
+            self.tenant.id, self.service.id, None, start_dt, end_dt
+        )
+        slots = self.service_obj.get_available_slots(self.tenant.id, self.service.id, None, start_dt, end_dt)
+
+        assert len(compact['staff']) == 2
+        assert all(len(day['starts']) == 2 for day in compact['days'])
+        assert expand_compact_slots(compact) == slots
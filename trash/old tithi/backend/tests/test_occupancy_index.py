@@ -0,0 +1,82 @@
+"""
+Occupancy Index Tests
+
+Tests for the shared per-resource occupancy index:
+- Overlapping and touching intervals are merged
+- Conflict checks treat intervals as half-open
+- Free windows are the complement of busy time
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+from app.services.occupancy import OccupancyIndex, ResourceOccupancy
+
+
+BASE = datetime(2030, 1, 1, 9, 0)
+
+
+def at(minutes: int) -> datetime:
+    return BASE + timedelta(minutes=minutes)
+
+
+class TestResourceOccupancy:
+    """Tests for a single resource's busy intervals."""
+
+    def test_merges_overlapping_and_touching_intervals(self):
+        """Overlapping and touching intervals collapse into disjoint ones."""
+        occupancy = ResourceOccupancy()
+        occupancy.add(at(120), at(180))
+        occupancy.add(at(0), at(60))
+        occupancy.add(at(30), at(90))
+        occupancy.add(at(180), at(240))
+
+        assert occupancy.intervals() == [(at(0), at(90)), (at(120), at(240))]
+
+    def test_add_spanning_interval_absorbs_existing(self):
+        """An interval covering several busy blocks replaces them."""
+        occupancy = ResourceOccupancy()
+        occupancy.add(at(0), at(10))
+        occupancy.add(at(20), at(30))
+        occupancy.add(at(40), at(50))
+        occupancy.add(at(5), at(45))
+
+        assert occupancy.intervals() == [(at(0), at(50))]
+
+    def test_is_free_is_half_open(self):
+        """Slots ending at a busy start or starting at a busy end are free."""
+        occupancy = ResourceOccupancy()
+        occupancy.add(at(60), at(120))
+
+        assert occupancy.is_free(at(0), at(60))
+        assert occupancy.is_free(at(120), at(180))
+        assert not occupancy.is_free(at(30), at(90))
+        assert not occupancy.is_free(at(90), at(150))
+        assert not occupancy.is_free(at(70), at(80))
+        assert not occupancy.is_free(at(0), at(180))
+
+    def test_free_windows(self):
+        """Free windows are the gaps between busy intervals inside a window."""
+        occupancy = ResourceOccupancy()
+        occupancy.add(at(-30), at(30))
+        occupancy.add(at(120), at(180))
+
+        assert occupancy.free_windows(at(0), at(240)) == [
+            (at(30), at(120)),
+            (at(180), at(240)),
+        ]
+
+
+class TestOccupancyIndex:
+    """Tests for the multi-resource index."""
+
+    def test_resources_are_independent(self):
+        """Busy time on one resource does not block another."""
+        busy, other = uuid.uuid4(), uuid.uuid4()
+        index = OccupancyIndex()
+        index.add(busy, at(0), at(60))
+
+        assert not index.is_free(busy, at(0), at(30))
+        assert index.is_free(other, at(0), at(30))
+        assert index.intervals(other) == []
+        assert len(index.for_resource(other)) == 0
@@ -33,12 +33,10 @@ class TestRateLimitingTask112:
         app.config['REDIS_URL'] = 'redis://localhost:6379/15'  # Use test database
         
         # Mock Redis client for testing
-        with patch('app.middleware.rate_limit_middleware.redis.from_url') as mock_redis:
-            mock_client = MagicMock()
-            mock_client.ping.return_value = True
-            mock_client.pipeline.return_value = MagicMock()
-            mock_redis.return_value = mock_client
-            
+        mock_client = MagicMock()
+        mock_client.ping.return_value = True
+        mock_client.pipeline.return_value = MagicMock()
+        with patch('app.extensions.redis_client', mock_client):
             yield app
     
     @pytest.fixture
@@ -419,12 +417,10 @@ class TestRateLimitingIntegration:
         app.config['TESTING'] = True
         
         # Mock Redis client
-        with patch('app.middleware.rate_limit_middleware.redis.from_url') as mock_redis:
-            mock_client = MagicMock()
-            mock_client.ping.return_value = True
-            mock_client.pipeline.return_value = MagicMock()
-            mock_redis.return_value = mock_client
-            
+        mock_client = MagicMock()
+        mock_client.ping.return_value = True
+        mock_client.pipeline.return_value = MagicMock()
+        with patch('app.extensions.redis_client', mock_client):
             yield app
     
     def test_rate_limiting_middleware_integration(self, app_with_rate_limiting):
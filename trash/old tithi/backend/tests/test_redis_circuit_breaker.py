@@ -0,0 +1,159 @@
+"""
+Redis Circuit Breaker Tests
+
+Tests for the shared Redis client's circuit breaker:
+- The circuit opens after consecutive connection failures
+- One probe is let through after the reset period; its outcome closes or reopens
+- Command errors do not count as failures
+- While open, clients, pipelines and the cache fall back without contacting Redis
+- The rate limiter uses the shared client
+"""
+
+import pytest
+import redis
+from unittest.mock import MagicMock, patch
+
+from app import create_app
+from app.redis_breaker import (
+    RedisCircuitBreaker, CircuitBreakerRedis, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+)
+from app.middleware.rate_limit_middleware import RateLimitMiddleware
+from app.services.cache import CacheService, get_local_cache
+
+
+def _failing_command():
+    raise redis.ConnectionError("connection refused")
+
+
+class TestRedisCircuitBreaker:
+    """Tests for RedisCircuitBreaker state transitions."""
+
+    def _trip(self, breaker):
+        for _ in range(breaker.failure_threshold):
+            with pytest.raises(redis.ConnectionError):
+                breaker.call(_failing_command)
+
+    def test_opens_after_threshold(self):
+        """Consecutive connection failures open the circuit; calls then fail at once."""
+        breaker = RedisCircuitBreaker(failure_threshold=3, reset_seconds=5)
+        breaker.call(lambda: 'ok')
+        self._trip(breaker)
+        command = MagicMock()
+
+        with pytest.raises(CircuitOpenError):
+            breaker.call(command)
+
+        command.assert_not_called()
+        stats = breaker.stats()
+        assert (stats['state'], stats['trips'], stats['short_circuited']) == (OPEN, 1, 1)
+
+    def test_success_resets_failure_count(self):
+        """Failures must be consecutive to open the circuit."""
+        breaker = RedisCircuitBreaker(failure_threshold=2)
+        with pytest.raises(redis.ConnectionError):
+            breaker.call(_failing_command)
+        breaker.call(lambda: 'ok')
+        with pytest.raises(redis.ConnectionError):
+            breaker.call(_failing_command)
+
+        assert breaker.state == CLOSED
+
+    def test_half_open_probe_closes_circuit(self):
+        """After the reset period one probe runs; others keep failing fast until it succeeds."""
+        breaker = RedisCircuitBreaker(failure_threshold=1, reset_seconds=5)
+        with patch('app.redis_breaker.time.monotonic', return_value=1000.0):
+            self._trip(breaker)
+
+        with patch('app.redis_breaker.time.monotonic', return_value=1006.0):
+            assert breaker.allow() is True
+            assert breaker.state == HALF_OPEN
+            assert breaker.allow() is False
+            breaker.record_success()
+
+        assert breaker.state == CLOSED
+        assert breaker.call(lambda: 'ok') == 'ok'
+
+    def test_failed_probe_reopens_circuit(self):
+        """A failed probe opens the circuit for another reset period."""
+        breaker = RedisCircuitBreaker(failure_threshold=3, reset_seconds=5)
+        with patch('app.redis_breaker.time.monotonic', return_value=1000.0):
+            self._trip(breaker)
+
+        with patch('app.redis_breaker.time.monotonic', return_value=1006.0):
+            with pytest.raises(redis.ConnectionError):
+                breaker.call(_failing_command)
+            assert breaker.state == OPEN
+
+        with patch('app.redis_breaker.time.monotonic', return_value=1010.0):
+            with pytest.raises(CircuitOpenError):
+                breaker.call(lambda: 'ok')
+
+    def test_command_errors_are_not_failures(self):
+        """A server error reply means Redis is reachable."""
+        breaker = RedisCircuitBreaker(failure_threshold=1)
+
+        def wrong_type():
+            raise redis.ResponseError("WRONGTYPE")
+
+        with pytest.raises(redis.ResponseError):
+            breaker.call(wrong_type)
+
+        assert breaker.state == CLOSED
+
+
+class TestCircuitBreakerRedis:
+    """Tests for the breaker-wrapped client against an unreachable server."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup an app context and a client pointed at a closed port."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        get_local_cache().clear()
+
+        pool = redis.ConnectionPool.from_url(
+            'redis://127.0.0.1:1/0', decode_responses=True, socket_connect_timeout=0.2
+        )
+        self.breaker = RedisCircuitBreaker(failure_threshold=2, reset_seconds=60)
+        self.client = CircuitBreakerRedis(connection_pool=pool, breaker=self.breaker)
+
+        yield
+
+        get_local_cache().clear()
+        self.app_context.pop()
+
+    def test_commands_and_pipelines_short_circuit(self):
+        """Once open, neither commands nor pipelines open a connection."""
+        for _ in range(2):
+            with pytest.raises(redis.ConnectionError):
+                self.client.get('tithi:test:key')
+
+        with patch.object(self.client.connection_pool, 'get_connection') as get_connection:
+            with pytest.raises(CircuitOpenError):
+                self.client.get('tithi:test:key')
+            pipe = self.client.pipeline(transaction=False)
+            pipe.get('tithi:test:key')
+            with pytest.raises(CircuitOpenError):
+                pipe.execute()
+
+        get_connection.assert_not_called()
+        assert self.client.pool_stats()['circuit']['state'] == OPEN
+
+    def test_cache_falls_back_while_open(self):
+        """The cache serves its local tier when the circuit is open."""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        cache = CacheService()
+        cache.redis_client = self.client
+
+        assert cache.set('tithi:test:key', {'a': 1}, ttl_seconds=60) is False
+        assert cache.get('tithi:test:key') == {'a': 1}
+        assert cache.acquire_lock('tithi:test:lock')
+
+    def test_rate_limiter_uses_shared_client(self):
+        """The rate limiter takes the shared client instead of connecting on its own."""
+        with patch('app.extensions.redis_client', self.client):
+            middleware = RateLimitMiddleware(self.app)
+
+        assert middleware.redis_client is self.client
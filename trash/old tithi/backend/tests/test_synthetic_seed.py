@@ -0,0 +1,90 @@
+"""
+Synthetic Seed and Benchmark Tests
+
+Tests for the benchmark data generator and result statistics:
+- Generation is reproducible for a seed
+- Generated bookings sit inside staff shifts and never overlap per resource
+- Percentiles and summaries match hand-computed values
+"""
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models.business import Booking, Customer, StaffAvailability
+from benchmarks.booking_benchmark import percentile, summarize
+from seed_dev import generate_synthetic_tenants
+
+
+class TestSyntheticSeed:
+    """Tests for generate_synthetic_tenants and benchmark statistics."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup app context and an empty database."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _generate(self, seed=7):
+        return generate_synthetic_tenants(
+            num_tenants=2, staff_per_tenant=3, customers_per_tenant=20,
+            history_days=14, future_days=7, bookings_per_staff_day=3, seed=seed
+        )
+
+    def test_generation_is_reproducible(self):
+        """The same seed yields the same ids and booking counts."""
+        first = self._generate()
+        db.drop_all()
+        db.create_all()
+        second = self._generate()
+
+        assert [t['tenant_id'] for t in first] == [t['tenant_id'] for t in second]
+        assert [t['bookings'] for t in first] == [t['bookings'] for t in second]
+        assert Customer.query.count() == 40
+        assert Booking.query.count() == sum(t['bookings'] for t in first)
+
+    def test_bookings_fit_shifts_without_overlap(self):
+        """Every booking is inside its staff member's shift and resources are never double-booked."""
+        summaries = self._generate()
+        shifts = {member['resource_id']: member for summary in summaries for member in summary['staff']}
+
+        by_resource = {}
+        for booking in Booking.query.all():
+            member = shifts[booking.resource_id]
+            assert booking.start_at.isoweekday() in member['weekdays']
+            assert member['start_hour'] <= booking.start_at.hour < member['end_hour']
+            by_resource.setdefault(booking.resource_id, []).append((booking.start_at, booking.end_at))
+
+        for intervals in by_resource.values():
+            intervals.sort()
+            assert all(end <= next_start for (_, end), (next_start, _) in zip(intervals, intervals[1:]))
+
+        assert StaffAvailability.query.count() == sum(
+            len(member['weekdays']) for member in shifts.values()
+        )
+
+    def test_percentiles_and_summary(self):
+        """Nearest-rank percentiles and per-scenario aggregates."""
+        values = [float(value) for value in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 95) == 0.0
+
+        stats = summarize([
+            {'ms': 10.0, 'queries': 4, 'error': None},
+            {'ms': 30.0, 'queries': 6, 'error': 'BookingConflictError'},
+        ], wall_seconds=0.5)
+
+        assert stats['throughput_ops_per_sec'] == 4.0
+        assert stats['succeeded'] == 1
+        assert stats['errors'] == {'BookingConflictError': 1}
+        assert stats['queries_per_op'] == {'mean': 5.0, 'max': 6}
@@ -0,0 +1,188 @@
+"""
+Waitlist Matching Tests
+
+Tests for matching freed slots to waiting customers:
+- Only entries whose preferred window contains the slot are notified
+- Candidates are ranked by priority, then age, and capped per slot
+- Cancelling a booking notifies the waitlist through the outbox
+- The Redis index filters lapsed entries and ranks without the database
+- A missing or incomplete index falls back to the database and is rebuilt
+"""
+
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from app import create_app
+from app.extensions import db
+from app.models.core import Tenant
+from app.models.business import Customer, Service, Resource, Booking, BookingHold, WaitlistEntry
+from app.models.audit import EventOutbox
+from app.services.business_phase2 import AvailabilityService, BookingService
+from app.services.cache import WaitlistCacheService
+
+
+class TestWaitlistMatching:
+    """Tests for the waitlist matching engine."""
+
+    @pytest.fixture(autouse=True)
+    def setup_test_environment(self):
+        """Setup tenant, resource, service and customers."""
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        self.tenant = Tenant(id=uuid.uuid4(), slug="waitlist-tenant", name="Waitlist Tenant")
+        self.resource = Resource(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, type="staff", tz="UTC",
+            capacity=1, name="Stylist"
+        )
+        self.service = Service(
+            id=uuid.uuid4(), tenant_id=self.tenant.id, slug="cut", name="Cut",
+            duration_min=60, price_cents=5000
+        )
+        self.customers = [
+            Customer(id=uuid.uuid4(), tenant_id=self.tenant.id, email=f"wait{index}@example.com")
+            for index in range(4)
+        ]
+        db.session.add_all([self.tenant, self.resource, self.service, *self.customers])
+        db.session.commit()
+
+        self.availability = AvailabilityService()
+        self.availability.waitlist_cache.redis_client = None
+        self.slot_start = datetime.now().replace(microsecond=0) + timedelta(days=2)
+        self.slot_end = self.slot_start + timedelta(hours=1)
+
+        yield
+
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _wait(self, customer, start_offset_hours, end_offset_hours, priority=0):
+        return self.availability.add_to_waitlist(
+            self.tenant.id, self.resource.id, self.service.id, customer.id, {
+                'preferred_start_at': self.slot_start + timedelta(hours=start_offset_hours),
+                'preferred_end_at': self.slot_start + timedelta(hours=end_offset_hours),
+                'priority': priority
+            }
+        )
+
+    def test_matches_containing_windows_by_priority(self):
+        """Entries covering the slot are notified best-first, up to the limit."""
+        too_late = self._wait(self.customers[0], 1, 3)
+        low = self._wait(self.customers[1], -1, 2, priority=0)
+        high = self._wait(self.customers[2], 0, 1, priority=5)
+        overflow = self._wait(self.customers[3], -2, 4, priority=0)
+
+        matched = self.availability.match_waitlist(
+            self.tenant.id, self.resource.id, self.slot_start, self.slot_end, limit=2
+        )
+
+        assert [entry.id for entry in matched] == [high.id, low.id]
+        assert {entry.id: entry.status for entry in WaitlistEntry.query.all()} == {
+            too_late.id: 'waiting', low.id: 'notified', high.id: 'notified', overflow.id: 'waiting'
+        }
+        events = EventOutbox.query.filter_by(event_code="NOTIFY_WAITLIST_SLOT_AVAILABLE").all()
+        assert {event.payload['waitlist_entry_id'] for event in events} == {str(high.id), str(low.id)}
+
+    def test_cancellation_notifies_waitlist(self):
+        """Cancelling a booking offers its slot to the waitlist."""
+        entry = self._wait(self.customers[1], 0, 1)
+        booking = Booking(
+            tenant_id=self.tenant.id, customer_id=self.customers[0].id, resource_id=self.resource.id,
+            client_generated_id=str(uuid.uuid4()), service_snapshot={},
+            start_at=self.slot_start, end_at=self.slot_end, booking_tz="UTC", status="confirmed"
+        )
+        db.session.add(booking)
+        db.session.commit()
+
+        booking_service = BookingService()
+        booking_service._log_audit = MagicMock()
+        booking_service.cancel_booking(self.tenant.id, booking.id, uuid.uuid4())
+
+        assert db.session.get(WaitlistEntry, entry.id).status == 'notified'
+
+    def test_expired_hold_over_booking_notifies_nobody(self):
+        """A lapsed hold whose range is still booked is not offered to the waitlist."""
+        entry = self._wait(self.customers[1], 0, 1)
+        db.session.add_all([
+            Booking(
+                tenant_id=self.tenant.id, customer_id=self.customers[0].id, resource_id=self.resource.id,
+                client_generated_id=str(uuid.uuid4()), service_snapshot={},
+                start_at=self.slot_start, end_at=self.slot_end, booking_tz="UTC", status="confirmed"
+            ),
+            BookingHold(
+                tenant_id=self.tenant.id, resource_id=self.resource.id, service_id=self.service.id,
+                start_at=self.slot_start, end_at=self.slot_end,
+                hold_until=datetime.utcnow() - timedelta(minutes=1), hold_key="converted"
+            ),
+        ])
+        db.session.commit()
+
+        assert self.availability.release_expired_hold(self.tenant.id, "converted")
+
+        assert db.session.get(WaitlistEntry, entry.id).status == 'waiting'
+        assert EventOutbox.query.filter_by(event_code="NOTIFY_WAITLIST_SLOT_AVAILABLE").count() == 0
+
+    def test_redis_index_filters_and_ranks_candidates(self):
+        """Index reads drop lapsed and too-short windows and rank the rest."""
+        cache = WaitlistCacheService()
+        cache.redis_client = MagicMock()
+        cache.redis_client.get.return_value = "7200"
+        slot_end = self.slot_end.timestamp()
+        future, past = slot_end + 86400, datetime.now().timestamp() - 60
+        cache.redis_client.pipeline.return_value.execute.return_value = [
+            [
+                f"0|100|{slot_end}|{future}|older",
+                f"0|200|{slot_end}|{future}|newer",
+                f"9|300|{slot_end - 60}|{future}|too-short",
+                f"9|300|{slot_end}|{past}|lapsed",
+            ],
+            ["1|400|inf|inf|open-ended"],
+        ]
+
+        candidates = cache.find_waitlist_candidates(
+            self.tenant.id, self.resource.id, self.slot_start, self.slot_end, 3
+        )
+
+        assert candidates == ['open-ended', 'older', 'newer']
+        cache.redis_client.pipeline.return_value.zrem.assert_called_once()
+
+    def test_unbuilt_index_falls_back_to_database(self):
+        """Without the completeness marker the index is not trusted."""
+        cache = WaitlistCacheService()
+        cache.redis_client = MagicMock()
+        cache.redis_client.get.return_value = None
+
+        assert cache.find_waitlist_candidates(
+            self.tenant.id, self.resource.id, self.slot_start, self.slot_end, 3
+        ) is None
+        cache.redis_client.pipeline.assert_not_called()
+
+    def test_unindexed_entries_matched_and_indexed(self):
+        """Entries that predate the index are matched and the index rebuilt."""
+        entry = WaitlistEntry(
+            tenant_id=self.tenant.id, resource_id=self.resource.id, service_id=self.service.id,
+            customer_id=self.customers[0].id, preferred_start_at=self.slot_start,
+            preferred_end_at=self.slot_end + timedelta(hours=1), priority=0,
+            expires_at=datetime.now() + timedelta(days=30)
+        )
+        db.session.add(entry)
+        db.session.commit()
+        redis_client = MagicMock()
+        redis_client.get.return_value = None
+        self.availability.waitlist_cache.redis_client = redis_client
+
+        matched = self.availability.match_waitlist(
+            self.tenant.id, self.resource.id, self.slot_start, self.slot_end
+        )
+
+        assert [match.id for match in matched] == [entry.id]
+        pipe = redis_client.pipeline.return_value
+        indexed = pipe.zadd.call_args_list[0][0][1]
+        assert [member.rsplit('|', 1)[1] for member in indexed] == [str(entry.id)]
+        assert pipe.eval.call_args[0][3] == 7200